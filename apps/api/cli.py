@@ -1,18 +1,34 @@
+import asyncio
+import csv
 import random
 import string
-from typing import Annotated
+import sys
+import time
+from datetime import datetime
+from typing import Annotated, Optional
+from fastapi import BackgroundTasks, HTTPException
 from pydantic import EmailStr
 from sqlalchemy import create_engine
-from sqlmodel import SQLModel, Session
+from sqlmodel import SQLModel, Session, select
 import typer
 from config.config import get_learnhouse_config
-from src.db.organizations import OrganizationCreate
-from src.db.users import UserCreate
+from src.db.courses.courses import Course
+from src.db.learning_events import LearningEventBatch, LearningEventCreate, LearningEventTypeEnum
+from src.db.organizations import Organization, OrganizationCreate
+from src.db.users import PublicUser, User, UserCreate
 from src.services.install.install import (
     install_create_organization,
     install_create_organization_user,
     install_default_elements,
 )
+from src.services.trail.learning_events import (
+    LEARNING_EVENTS_MAX_BATCH,
+    flush_learning_events,
+    ingest_learning_events,
+    learning_events_buffer,
+)
+from src.services.trail.progress import recompute_course_progress
+from src.services.users.bulk_import import import_users, user_import_report_csv
 
 cli = typer.Typer()
 
@@ -117,6 +133,142 @@ def install(
 
 
 
+@cli.command()
+def import_users_csv(
+    csv_path: Annotated[str, typer.Argument(help="CSV with email, username, password, first_name, last_name columns")],
+    org_slug: Annotated[str, typer.Option(help="Slug of the organization to add the users to")],
+    report: Annotated[Optional[str], typer.Option(help="Where to write the per-row report, stdout by default")] = None,
+    send_emails: Annotated[bool, typer.Option(help="Send welcome emails to created users")] = True,
+):
+    # Get the database session
+    learnhouse_config = get_learnhouse_config()
+    engine = create_engine(
+        learnhouse_config.database_config.sql_connection_string, echo=False, pool_pre_ping=True  # type: ignore
+    )
+    db_session = Session(engine)
+
+    org = db_session.exec(select(Organization).where(Organization.slug == org_slug)).first()
+    if not org or org.id is None:
+        print(f"Organization {org_slug} not found ❌")
+        raise typer.Exit(code=1)
+
+    background_tasks = BackgroundTasks() if send_emails else None
+
+    async def run():
+        with open(csv_path, newline="", encoding="utf-8-sig") as users_file:
+            results = await import_users(
+                db_session, org.id, csv.DictReader(users_file), background_tasks  # type: ignore
+            )
+        if background_tasks is not None:
+            await background_tasks()
+        return results
+
+    print("Importing users...", file=sys.stderr)
+    results = asyncio.run(run())
+
+    output = open(report, "w", newline="") if report else sys.stdout
+    for chunk in user_import_report_csv(results):
+        output.write(chunk)
+    if report:
+        output.close()
+
+    created = sum(1 for result in results if result.status == "created")
+    print(f"{created} users created, {len(results) - created} rows failed ✅", file=sys.stderr)
+
+
+@cli.command()
+def recompute_progress(
+    course_uuids: Annotated[list[str], typer.Argument(help="Courses to recompute the learners' progress of")],
+):
+    # Get the database session
+    learnhouse_config = get_learnhouse_config()
+    engine = create_engine(
+        learnhouse_config.database_config.sql_connection_string, echo=False, pool_pre_ping=True  # type: ignore
+    )
+    db_session = Session(engine)
+
+    failed = False
+    for course_uuid in course_uuids:
+        course = db_session.exec(select(Course).where(Course.course_uuid == course_uuid)).first()
+        if not course or course.id is None:
+            print(f"Course {course_uuid} not found ❌", file=sys.stderr)
+            failed = True
+            continue
+
+        print(f"Recomputing progress of {course.name}...", file=sys.stderr)
+        report = recompute_course_progress(db_session, course.id)
+        print(
+            f"{report.learners} learners, {report.completed} completed, "
+            f"{report.certificates_issued} certificates issued in {report.duration:.2f}s ✅",
+            file=sys.stderr,
+        )
+
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@cli.command()
+def benchmark_learning_events(
+    user_email: Annotated[str, typer.Option(help="User sending the events")],
+    events: Annotated[int, typer.Option(help="Events to send, written to the configured database")] = 100_000,
+    batch_size: Annotated[int, typer.Option(help="Events per request")] = LEARNING_EVENTS_MAX_BATCH,
+):
+    # Get the database session
+    learnhouse_config = get_learnhouse_config()
+    engine = create_engine(
+        learnhouse_config.database_config.sql_connection_string, echo=False, pool_pre_ping=True  # type: ignore
+    )
+    db_session = Session(engine)
+
+    user = db_session.exec(select(User).where(User.email == user_email)).first()
+    if not user:
+        print(f"User {user_email} not found ❌", file=sys.stderr)
+        raise typer.Exit(code=1)
+    current_user = PublicUser(**user.model_dump())
+
+    batch = LearningEventBatch(
+        events=[
+            LearningEventCreate(
+                event_type=LearningEventTypeEnum.VIDEO_PROGRESS,
+                activity_uuid="activity_benchmark",
+                data={"position": index},
+                occurred_date=datetime.now(),
+            )
+            for index in range(batch_size)
+        ]
+    )
+
+    async def ingest() -> tuple[int, int]:
+        accepted = rejected = 0
+        for _ in range(0, events, batch_size):
+            try:
+                accepted += (await ingest_learning_events(None, batch, current_user))["accepted"]  # type: ignore
+            except HTTPException as e:
+                if e.status_code != 503:
+                    raise
+                # Buffer full, a client would retry after Retry-After
+                rejected += batch_size
+        return accepted, rejected
+
+    print(f"Sending {events} events in batches of {batch_size}...", file=sys.stderr)
+    started = time.perf_counter()
+    accepted, rejected = asyncio.run(ingest())
+    ingest_duration = time.perf_counter() - started
+    print(
+        f"{accepted} events accepted, {rejected} rejected by backpressure "
+        f"({learning_events_buffer.capacity} buffered at most), "
+        f"{accepted / ingest_duration:.0f} events/s ✅",
+        file=sys.stderr,
+    )
+
+    print("Writing buffered events...", file=sys.stderr)
+    started = time.perf_counter()
+    written = 0
+    while flushed := flush_learning_events():
+        written += flushed
+    write_duration = time.perf_counter() - started
+    print(f"{written} events written, {written / write_duration:.0f} events/s ✅", file=sys.stderr)
+
 
 @cli.command()
 def main():
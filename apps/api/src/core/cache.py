@@ -0,0 +1,23 @@
+import logging
+from functools import lru_cache
+from typing import Optional
+import redis
+from config.config import get_learnhouse_config
+
+
+@lru_cache(maxsize=1)
+def get_redis_client() -> Optional[redis.Redis]:
+    """
+    Shared Redis client for caches.
+
+    The client keeps its own connection pool, so it's built once per process.
+    Returns None when no Redis connection string is configured, callers then
+    fall back to the database.
+    """
+    redis_conn_string = get_learnhouse_config().redis_config.redis_connection_string
+
+    if not redis_conn_string:
+        logging.warning("Redis connection string not found, caches are disabled")
+        return None
+
+    return redis.Redis.from_url(redis_conn_string)
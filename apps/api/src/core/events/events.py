@@ -1,3 +1,5 @@
+import asyncio
+import os
 from typing import Callable
 from fastapi import FastAPI
 from config.config import LearnHouseConfig, get_learnhouse_config
@@ -5,6 +7,10 @@ from src.core.events.autoinstall import auto_install
 from src.core.events.content import check_content_directory
 from src.core.events.database import close_database, connect_to_db
 from src.core.events.logs import create_logs_dir
+from src.security.password_hashing import password_hashing_pool
+from src.services.courses.analytics import run_course_analytics_worker
+from src.services.payments.webhooks.payments_webhooks import run_webhook_inbox_worker
+from src.services.trail.learning_events import flush_learning_events, run_learning_events_writer
 
 
 def startup_app(app: FastAPI) -> Callable:
@@ -25,11 +31,27 @@ def startup_app(app: FastAPI) -> Callable:
         # Check if auto-installation is needed
         auto_install()
 
+        # Process queued payment webhooks and their retries, rebuild the
+        # analytics rollups of courses with new learning data and write
+        # buffered learning events
+        if os.getenv("TESTING", "false").lower() != "true":
+            app.webhook_inbox_worker = asyncio.create_task(run_webhook_inbox_worker())  # type: ignore
+            app.course_analytics_worker = asyncio.create_task(run_course_analytics_worker())  # type: ignore
+            app.learning_events_writer = asyncio.create_task(run_learning_events_writer())  # type: ignore
+
     return start_app
 
 
 def shutdown_app(app: FastAPI) -> Callable:
     async def close_app() -> None:
+        for worker in ("webhook_inbox_worker", "course_analytics_worker", "learning_events_writer"):
+            task = getattr(app, worker, None)
+            if task is not None:
+                task.cancel()
+        # Write the events still buffered
+        while await asyncio.to_thread(flush_learning_events):
+            pass
         await close_database(app)
+        password_hashing_pool.shutdown()
 
     return close_app
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Iterable, Optional
+import redis
+from fastapi.encoders import jsonable_encoder
+from src.core.cache import get_redis_client
+
+RESPONSE_CACHE_TTL = 60 * 5
+RESPONSE_CACHE_PURGE_SEQUENCE = "response_purge_sequence"
+# How long a worker loading an entry holds the fill lock, and how long others
+# wait for it before loading on their own
+RESPONSE_CACHE_LOCK_TTL_MS = 5000
+RESPONSE_CACHE_LOCK_WAIT = 2.0
+RESPONSE_CACHE_LOCK_POLL = 0.05
+
+# Loads in flight in this process, by cache key
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def response_cache_key(route: str, **params) -> str:
+    """Cache key of a route called with the given params"""
+    return f"response:{route}:" + ":".join(
+        f"{name}={params[name]}" for name in sorted(params)
+    )
+
+
+def _tag_key(tag: str) -> str:
+    return f"response_tag:{tag}"
+
+
+def _tag_version_key(tag: str) -> str:
+    return f"response_tag_version:{tag}"
+
+
+def purge_response_cache(*tags: str) -> None:
+    """
+    Drop every cached response carrying one of the tags.
+
+    Each tag's version is moved to a new purge sequence number first, so
+    fills that started loading before the purge don't store their payload.
+    """
+    r = get_redis_client()
+    if r is None or not tags:
+        return
+
+    try:
+        sequence = r.incr(RESPONSE_CACHE_PURGE_SEQUENCE)
+        tag_keys = [_tag_key(tag) for tag in tags]
+        pipe = r.pipeline()
+        for tag in tags:
+            pipe.set(_tag_version_key(tag), sequence, ex=RESPONSE_CACHE_TTL * 2)
+        for tag_key in tag_keys:
+            pipe.smembers(tag_key)
+        members = set().union(*pipe.execute()[len(tags):])
+        r.delete(*members, *tag_keys)
+    except redis.RedisError as e:
+        logging.error(f"Could not purge cached responses for {tags}: {e}")
+
+
+def _purge_sequence(r: redis.Redis) -> int:
+    value = r.get(RESPONSE_CACHE_PURGE_SEQUENCE)
+    return int(value) if value else 0  # type: ignore
+
+
+def _store(r: redis.Redis, key: str, payload: Any, tags: Iterable[str], ttl: int, sequence: int) -> bool:
+    """
+    Store an entry unless one of its tags was purged after `sequence`,
+    returns whether it was stored.
+
+    Tag versions are WATCHed, so a purge landing between the check and
+    the write aborts the write.
+    """
+    tags = list(tags)
+    version_keys = [_tag_version_key(tag) for tag in tags]
+    with r.pipeline() as pipe:
+        try:
+            if version_keys:
+                pipe.watch(*version_keys)
+                if any(int(version) > sequence for version in pipe.mget(version_keys) if version):
+                    return False
+            pipe.multi()
+            pipe.set(key, json.dumps(payload), ex=ttl)
+            for tag in tags:
+                # Tag sets outlive their entries so a purge never misses a key
+                pipe.sadd(_tag_key(tag), key)
+                pipe.expire(_tag_key(tag), ttl * 2)
+            pipe.execute()
+        except redis.WatchError:
+            return False
+    return True
+
+
+async def _load_and_store(
+    r: Optional[redis.Redis],
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    tags: Callable[[Any], Iterable[str]],
+    ttl: int,
+) -> Any:
+    lock_key = f"{key}:lock"
+    locked = False
+    sequence = 0
+
+    if r is not None:
+        try:
+            # Purges after this point make the loaded payload unsafe to store
+            sequence = _purge_sequence(r)
+            locked = bool(r.set(lock_key, "1", nx=True, px=RESPONSE_CACHE_LOCK_TTL_MS))
+            if not locked:
+                # Another worker is loading this entry, wait for it
+                waited = 0.0
+                while waited < RESPONSE_CACHE_LOCK_WAIT:
+                    await asyncio.sleep(RESPONSE_CACHE_LOCK_POLL)
+                    waited += RESPONSE_CACHE_LOCK_POLL
+                    cached = r.get(key)
+                    if cached is not None:
+                        return json.loads(cached)  # type: ignore
+        except redis.RedisError as e:
+            logging.error(f"Could not lock cached response {key}: {e}")
+            r = None
+
+    try:
+        payload = jsonable_encoder(await loader())
+
+        if r is not None:
+            try:
+                _store(r, key, payload, tags(payload), ttl, sequence)
+            except redis.RedisError as e:
+                logging.error(f"Could not cache response {key}: {e}")
+
+        return payload
+    finally:
+        if r is not None and locked:
+            try:
+                r.delete(lock_key)
+            except redis.RedisError as e:
+                logging.error(f"Could not release lock of cached response {key}: {e}")
+
+
+async def cached_response(
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    tags: Callable[[Any], Iterable[str]],
+    ttl: int = RESPONSE_CACHE_TTL,
+) -> Any:
+    """
+    Serve a JSON response from Redis, loading it on a miss.
+
+    `tags` receives the encoded payload and returns the tags the entry is
+    purged by. Concurrent misses for the same key share one load: within a
+    process through a shared future, across processes through a short lock
+    the other workers wait on. Errors raised by `loader` are never cached,
+    nor payloads whose tags were purged while they were loading.
+    """
+    r = get_redis_client()
+
+    if r is not None:
+        try:
+            cached = r.get(key)
+            if cached is not None:
+                return json.loads(cached)  # type: ignore
+        except (redis.RedisError, ValueError) as e:
+            logging.error(f"Could not read cached response {key}: {e}")
+            r = None
+
+    inflight = _inflight.get(key)
+    if inflight is not None:
+        return await asyncio.shield(inflight)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+
+    try:
+        payload = await _load_and_store(r, key, loader, tags, ttl)
+    except BaseException as e:
+        future.set_exception(e)
+        # Nobody may be waiting on the future, don't warn about it
+        future.exception()
+        raise
+    else:
+        future.set_result(payload)
+        return payload
+    finally:
+        _inflight.pop(key, None)
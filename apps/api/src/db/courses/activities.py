@@ -1,5 +1,7 @@
-from typing import Optional
+from typing import Any, Literal, Optional
+from pydantic import BaseModel
 from sqlalchemy import JSON, Column, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, SQLModel
 from enum import Enum
 
@@ -31,7 +33,7 @@ class ActivityBase(SQLModel):
     name: str
     activity_type: ActivityTypeEnum 
     activity_sub_type: ActivitySubTypeEnum 
-    content: dict = Field(default={}, sa_column=Column(JSON))
+    content: dict = Field(default={}, sa_column=Column(JSON().with_variant(JSONB(), "postgresql")))
     details: Optional[dict] = Field(default=None, sa_column=Column(JSON))
     published: bool = False
 
@@ -48,6 +50,8 @@ class Activity(ActivityBase, table=True):
     activity_uuid: str = ""
     creation_date: str = ""
     update_date: str = ""
+    # Bumped on every content change, content patches must be based on the current one
+    content_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
 
 class ActivityCreate(ActivityBase):
@@ -76,4 +80,14 @@ class ActivityRead(ActivityBase):
     creation_date: str
     update_date: str
     details: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    content_version: int = 0
     pass
+
+
+class ActivityContentPatchOperation(BaseModel):
+    """One RFC 6902 JSON Patch operation on an activity content"""
+
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str
+    value: Any = None
+    from_: Optional[str] = Field(default=None, alias="from")
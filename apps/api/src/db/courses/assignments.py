@@ -1,4 +1,4 @@
-from typing import Optional, Dict
+from typing import List, Optional, Dict
 from sqlalchemy import JSON, Column, ForeignKey
 from sqlmodel import Field, SQLModel
 from enum import Enum
@@ -286,6 +286,27 @@ class AssignmentUserSubmissionUpdate(SQLModel):
     assignment_id: Optional[int]
 
 
+class AssignmentUserSubmissionBulkGrade(SQLModel):
+    """Model for grading the submissions of many users at once."""
+
+    # Every submission awaiting a grade when omitted
+    user_ids: Optional[List[int]] = None
+
+
+class AssignmentUserSubmissionGrade(SQLModel):
+    """Model for the grade given to one user submission."""
+
+    user_id: int
+    grade: int
+
+
+class AssignmentUserSubmissionBulkGradeRead(SQLModel):
+    """Model for the summary of a bulk grading."""
+
+    graded: int
+    grades: List[AssignmentUserSubmissionGrade]
+
+
 class AssignmentUserSubmission(AssignmentUserSubmissionBase, table=True):
     """Represents the submission status of an assignment for a user."""
 
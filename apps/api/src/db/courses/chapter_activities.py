@@ -1,8 +1,11 @@
 from typing import Optional
-from sqlalchemy import BigInteger, Column, ForeignKey, Integer
+from sqlalchemy import BigInteger, Column, ForeignKey, Index, Integer
 from sqlmodel import Field, SQLModel
 
 class ChapterActivity(SQLModel, table=True):
+    # Serves the last order lookup when appending an activity
+    __table_args__ = (Index("ix_chapteractivity_chapter_id_order", "chapter_id", "order"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     order: int
     chapter_id: int = Field(sa_column=Column(BigInteger, ForeignKey("chapter.id", ondelete="CASCADE")))
@@ -12,4 +15,4 @@ class ChapterActivity(SQLModel, table=True):
         sa_column=Column(Integer, ForeignKey("organization.id", ondelete="CASCADE"))
     )
     creation_date: str
-    update_date: str
\ No newline at end of file
+    update_date: str
@@ -0,0 +1,130 @@
+from typing import Optional
+from pydantic import BaseModel
+from sqlalchemy import Column, ForeignKey, Integer, UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+# Rollups of a course's learning data, kept up to date by
+# src.services.courses.analytics in the transactions changing that data, and
+# rebuilt whenever the course is marked stale
+
+
+class CourseAnalytics(SQLModel, table=True):
+    course_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("course.id", ondelete="CASCADE"), primary_key=True)
+    )
+    enrolled: int = 0
+    completed: int = 0
+    # The course structure changed since the rollups were built
+    stale: bool = Field(default=False, index=True)
+    refreshed_date: str = ""
+
+
+class CourseAnalyticsDay(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("course_id", "day"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    course_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("course.id", ondelete="CASCADE"), index=True)
+    )
+    day: str
+    enrollments: int = 0
+    completions: int = 0
+
+
+class CourseAnalyticsChapter(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("course_id", "chapter_id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    course_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("course.id", ondelete="CASCADE"), index=True)
+    )
+    chapter_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("chapter.id", ondelete="CASCADE"))
+    )
+    # Learners who completed every activity of the chapter
+    completions: int = 0
+
+
+class CourseAnalyticsActivity(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("course_id", "activity_id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    course_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("course.id", ondelete="CASCADE"), index=True)
+    )
+    activity_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("activity.id", ondelete="CASCADE"))
+    )
+    completions: int = 0
+
+
+class CourseAnalyticsGrade(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("course_id", "assignment_id", "bucket"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    course_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("course.id", ondelete="CASCADE"), index=True)
+    )
+    assignment_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("assignment.id", ondelete="CASCADE"))
+    )
+    # Graded submissions with a grade in [bucket * 10, bucket * 10 + 10)
+    bucket: int
+    submissions: int = 0
+
+
+class CourseAnalyticsCompletion(SQLModel, table=True):
+    # One row per completed trail run, the median is computed over them
+    id: Optional[int] = Field(default=None, primary_key=True)
+    course_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("course.id", ondelete="CASCADE"), index=True)
+    )
+    trailrun_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("trailrun.id", ondelete="CASCADE"), unique=True)
+    )
+    day: str
+    hours: float
+
+
+class CourseAnalyticsDayRead(BaseModel):
+    day: str
+    enrollments: int
+    completions: int
+
+
+class CourseAnalyticsActivityRead(BaseModel):
+    activity_uuid: str
+    name: str
+    completions: int
+
+
+class CourseAnalyticsChapterRead(BaseModel):
+    chapter_id: int
+    name: str
+    completions: int
+    activities: list[CourseAnalyticsActivityRead]
+
+
+class CourseAnalyticsGradeBucketRead(BaseModel):
+    grade_from: int
+    grade_to: int
+    submissions: int
+
+
+class CourseAnalyticsAssignmentRead(BaseModel):
+    assignment_uuid: str
+    title: str
+    graded: int
+    distribution: list[CourseAnalyticsGradeBucketRead]
+
+
+class CourseAnalyticsRead(BaseModel):
+    course_uuid: str
+    enrolled: int
+    completed: int
+    median_completion_hours: Optional[float]
+    refreshed_date: str
+    stale: bool
+    enrollments: list[CourseAnalyticsDayRead]
+    chapters: list[CourseAnalyticsChapterRead]
+    assignments: list[CourseAnalyticsAssignmentRead]
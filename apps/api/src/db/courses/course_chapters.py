@@ -1,9 +1,12 @@
 from typing import Optional
-from sqlalchemy import Column, ForeignKey, Integer
+from sqlalchemy import Column, ForeignKey, Index, Integer
 from sqlmodel import Field, SQLModel
 
 
 class CourseChapter(SQLModel, table=True):
+    # Serves the last order lookup when appending a chapter
+    __table_args__ = (Index("ix_coursechapter_course_id_order", "course_id", "order"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     order: int
     course_id: int = Field(
@@ -43,6 +43,8 @@ class Course(CourseBase, table=True):
     course_uuid: str = ""   
     creation_date: str = ""
     update_date: str = ""
+    # Bumped whenever the course, its chapters or its activities change
+    content_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
 
 class CourseCreate(CourseBase):
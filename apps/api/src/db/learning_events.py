@@ -0,0 +1,41 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from pydantic import BaseModel
+from sqlalchemy import JSON, Column, Index
+from sqlmodel import Field, SQLModel
+
+
+class LearningEventTypeEnum(str, Enum):
+    ACTIVITY_OPENED = "ACTIVITY_OPENED"
+    VIDEO_PROGRESS = "VIDEO_PROGRESS"
+    TIME_ON_PAGE = "TIME_ON_PAGE"
+
+
+class LearningEvent(SQLModel, table=True):
+    # Serves "continue where you left off", a learner's latest events
+    __table_args__ = (Index("ix_learningevent_user_id_occurred_date", "user_id", "occurred_date"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    event_type: LearningEventTypeEnum
+    # No foreign keys: events are written in bulk, long after being
+    # accepted, and one deleted row must not fail a whole batch
+    user_id: int
+    course_uuid: Optional[str] = None
+    activity_uuid: Optional[str] = None
+    # Event specific values, e.g. the video position or seconds on page
+    data: dict = Field(default={}, sa_column=Column(JSON))
+    occurred_date: datetime
+    received_date: datetime
+
+
+class LearningEventCreate(BaseModel):
+    event_type: LearningEventTypeEnum
+    course_uuid: Optional[str] = None
+    activity_uuid: Optional[str] = None
+    data: dict = {}
+    occurred_date: datetime
+
+
+class LearningEventBatch(BaseModel):
+    events: list[LearningEventCreate]
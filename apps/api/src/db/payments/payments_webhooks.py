@@ -0,0 +1,36 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from sqlalchemy import JSON, Index, String
+from sqlmodel import Field, SQLModel, Column
+
+
+class PaymentsWebhookEventStatusEnum(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    PROCESSED = "processed"
+    DEAD = "dead"
+
+
+class PaymentsWebhookEvent(SQLModel, table=True):
+    """A verified provider webhook event, waiting in the inbox to be processed"""
+
+    # Serves the worker's scan of unfinished events
+    __table_args__ = (Index("ix_paymentswebhookevent_status_id", "status", "id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # Provider event id, deliveries of the same event are only stored once
+    event_id: str = Field(sa_column=Column(String, unique=True, nullable=False))
+    webhook_type: str
+    # Events of an account are processed in the order they were received
+    account_id: Optional[str] = None
+    event_type: str
+    payload: dict = Field(default={}, sa_column=Column(JSON))
+    status: PaymentsWebhookEventStatusEnum = PaymentsWebhookEventStatusEnum.PENDING
+    attempts: int = 0
+    last_error: Optional[str] = None
+    next_attempt_date: datetime = Field(default_factory=datetime.now)
+    # Set while a worker processes the event, an expired lease can be taken over
+    lease_expires_date: Optional[datetime] = None
+    creation_date: datetime = Field(default_factory=datetime.now)
+    processed_date: Optional[datetime] = None
@@ -18,7 +18,7 @@ class ResourceAuthorshipStatusEnum(str, Enum):
 
 class ResourceAuthor(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    resource_uuid: str
+    resource_uuid: str = Field(index=True)
     user_id: int = Field(
         sa_column=Column(Integer, ForeignKey("user.id", ondelete="CASCADE"))
     )
@@ -35,6 +35,9 @@ class TrailRun(SQLModel, table=True):
     user_id: int = Field(
         sa_column=Column(Integer, ForeignKey("user.id", ondelete="CASCADE"))
     )
+    # progress, maintained by src.services.trail.progress
+    completed_steps: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    total_steps: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
     # timestamps
     creation_date: str
     update_date: str
@@ -59,7 +62,8 @@ class TrailRunRead(BaseModel):
     # timestamps
     creation_date: Optional[str]
     update_date: Optional[str]
-    # number of activities in course
+    # number of activities in course, and how many the user completed
     course_total_steps: int
+    completed_steps: int = 0
     steps: list[TrailStep]
     pass
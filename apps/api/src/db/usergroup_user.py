@@ -9,7 +9,7 @@ class UserGroupUser(SQLModel, table=True):
         sa_column=Column(Integer, ForeignKey("usergroup.id", ondelete="CASCADE"))
     )
     user_id: int = Field(
-        sa_column=Column(Integer, ForeignKey("user.id", ondelete="CASCADE"))
+        sa_column=Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), index=True)
     )
     org_id: int = Field(
         sa_column=Column(Integer, ForeignKey("organization.id", ondelete="CASCADE"))
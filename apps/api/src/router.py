@@ -2,7 +2,7 @@ import os
 from fastapi import APIRouter, Depends
 from src.routers import health
 from src.routers import usergroups
-from src.routers import dev, trail, users, auth, orgs, roles, search
+from src.routers import dev, events, trail, users, auth, orgs, roles, search
 from src.routers.ai import ai
 from src.routers.courses import chapters, collections, courses, assignments, certifications
 from src.routers.courses.activities import activities, blocks
@@ -37,6 +37,7 @@ v1_router.include_router(
     certifications.router, prefix="/certifications", tags=["certifications"]
 )
 v1_router.include_router(trail.router, prefix="/trail", tags=["trail"])
+v1_router.include_router(events.router, prefix="/events", tags=["events"])
 v1_router.include_router(ai.router, prefix="/ai", tags=["ai"])
 v1_router.include_router(payments.router, prefix="/payments", tags=["payments"])
 
@@ -1,6 +1,11 @@
-from typing import List
-from fastapi import APIRouter, Depends, UploadFile, Form, Request
-from src.db.courses.activities import ActivityCreate, ActivityRead, ActivityUpdate
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, UploadFile, Form, Request, Response
+from src.db.courses.activities import (
+    ActivityContentPatchOperation,
+    ActivityCreate,
+    ActivityRead,
+    ActivityUpdate,
+)
 from src.db.users import PublicUser
 from src.core.events.database import get_db_session
 from src.services.courses.activities.activities import (
@@ -10,6 +15,8 @@ from src.services.courses.activities.activities import (
     get_activityby_id,
     update_activity,
     delete_activity,
+    activity_content_etag,
+    patch_activity_content,
 )
 from src.security.auth import get_current_user
 from src.services.courses.activities.pdf import create_documentpdf_activity
@@ -38,15 +45,16 @@ async def api_create_activity(
 @router.get("/{activity_uuid}")
 async def api_get_activity(
     request: Request,
+    response: Response,
     activity_uuid: str,
     current_user: PublicUser = Depends(get_current_user),
     db_session=Depends(get_db_session),
 ) -> ActivityRead:
     """
-    Get single activity by activity_id
+    Get single activity by activity_id, answers 304 when If-None-Match matches the ETag
     """
     return await get_activity(
-        request, activity_uuid, current_user=current_user, db_session=db_session
+        request, activity_uuid, current_user=current_user, db_session=db_session, response=response
     )
 
 @router.get("/id/{activity_id}")
@@ -92,17 +100,43 @@ async def api_update_activity(
     )
 
 
+@router.patch("/{activity_uuid}/content")
+async def api_patch_activity_content(
+    request: Request,
+    response: Response,
+    activity_uuid: str,
+    operations: List[ActivityContentPatchOperation],
+    if_match: Optional[str] = Header(default=None),
+    current_user: PublicUser = Depends(get_current_user),
+    db_session=Depends(get_db_session),
+) -> ActivityRead:
+    """
+    Apply a JSON Patch to the activity content, If-Match must carry the current content version
+    """
+    activity = await patch_activity_content(
+        request,
+        activity_uuid,
+        [operation.dict(by_alias=True, exclude_unset=True) for operation in operations],
+        if_match,
+        current_user,
+        db_session,
+    )
+    response.headers["ETag"] = activity_content_etag(activity.content_version)
+    return activity
+
+
 @router.delete("/{activity_uuid}")
 async def api_delete_activity(
     request: Request,
     activity_uuid: str,
+    background_tasks: BackgroundTasks,
     current_user: PublicUser = Depends(get_current_user),
     db_session=Depends(get_db_session),
 ):
     """
     Delete activity by activity_id
     """
-    return await delete_activity(request, activity_uuid, current_user, db_session)
+    return await delete_activity(request, activity_uuid, current_user, db_session, background_tasks)
 
 
 # Video activity
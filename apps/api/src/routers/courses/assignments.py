@@ -1,4 +1,6 @@
+from typing import Literal
 from fastapi import APIRouter, Depends, Request, UploadFile, HTTPException
+from fastapi.responses import StreamingResponse
 from src.db.courses.assignments import (
     AssignmentCreate,
     AssignmentRead,
@@ -6,6 +8,8 @@ from src.db.courses.assignments import (
     AssignmentTaskSubmissionUpdate,
     AssignmentTaskUpdate,
     AssignmentUpdate,
+    AssignmentUserSubmissionBulkGrade,
+    AssignmentUserSubmissionBulkGradeRead,
     AssignmentUserSubmissionCreate,
 )
 from src.db.users import PublicUser
@@ -23,6 +27,7 @@ from src.services.courses.activities.assignments import (
     get_assignments_from_course,
     get_grade_assignment_submission,
     grade_assignment_submission,
+    grade_assignment_submissions,
     handle_assignment_task_submission,
     mark_activity_as_done_for_user,
     put_assignment_task_reference_file,
@@ -41,6 +46,7 @@ from src.services.courses.activities.assignments import (
     update_assignment_submission,
     update_assignment_task,
 )
+from src.services.courses.gradebook import export_course_gradebook
 
 router = APIRouter()
 
@@ -372,6 +378,24 @@ async def api_read_assignment_submissions(
     )
 
 
+@router.post("/{assignment_uuid}/submissions/grade")
+async def api_grade_submissions(
+    request: Request,
+    assignment_uuid: str,
+    bulk_grade: AssignmentUserSubmissionBulkGrade,
+    current_user: PublicUser = Depends(get_current_user),
+    db_session=Depends(get_db_session),
+) -> AssignmentUserSubmissionBulkGradeRead:
+    """
+    Grade the submissions of many users for an assignment, every
+    submission awaiting a grade when no users are given
+    """
+
+    return await grade_assignment_submissions(
+        request, assignment_uuid, bulk_grade, current_user, db_session
+    )
+
+
 @router.get("/{assignment_uuid}/submissions/me")
 async def api_read_user_assignment_submission_me(
     request: Request,
@@ -500,3 +524,24 @@ async def api_get_assignments(
     return await get_assignments_from_course(
         request, course_uuid, current_user, db_session
     )
+
+
+@router.get("/course/{course_uuid}/gradebook")
+async def api_export_course_gradebook(
+    request: Request,
+    course_uuid: str,
+    format: Literal["csv", "json"] = "csv",
+    current_user: PublicUser = Depends(get_current_user),
+    db_session=Depends(get_db_session),
+):
+    """
+    Export the grade of every learner for every assignment of a course
+    """
+    rows = await export_course_gradebook(request, course_uuid, current_user, db_session, format)
+    return StreamingResponse(
+        rows,
+        media_type="application/json" if format == "json" else "text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="gradebook_{course_uuid}.{format}"'
+        },
+    )
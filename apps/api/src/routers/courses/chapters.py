@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, Request
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, Response
 from src.core.events.database import get_db_session
 from src.db.courses.chapters import (
     ChapterCreate,
@@ -39,28 +39,37 @@ async def api_create_coursechapter(
 @router.get("/{chapter_id}")
 async def api_get_coursechapter(
     request: Request,
+    response: Response,
     chapter_id: int,
     current_user: PublicUser = Depends(get_current_user),
     db_session=Depends(get_db_session),
 ) -> ChapterRead:
     """
-    Get single CourseChapter by chapter_id
+    Get single CourseChapter by chapter_id, answers 304 when If-None-Match matches the ETag
     """
-    return await get_chapter(request, chapter_id, current_user, db_session)
+    return await get_chapter(request, chapter_id, current_user, db_session, response=response)
 
 
 @router.get("/course/{course_uuid}/meta", deprecated=True)
 async def api_get_chapter_meta(
     request: Request,
+    response: Response,
     course_uuid: str,
+    include: Optional[str] = None,
     current_user: PublicUser = Depends(get_current_user),
     db_session=Depends(get_db_session),
 ):
     """
-    Get Chapters metadata
+    Get Chapters metadata, answers 304 when If-None-Match matches the ETag.
+    Activities come without their content unless include=content is passed.
     """
     return await DEPRECEATED_get_course_chapters(
-        request, course_uuid, current_user, db_session
+        request,
+        course_uuid,
+        current_user,
+        db_session,
+        response=response,
+        include_content="content" in (include or "").split(","),
     )
 
 
@@ -69,6 +78,7 @@ async def api_update_chapter_meta(
     request: Request,
     course_uuid: str,
     order: ChapterUpdateOrder,
+    background_tasks: BackgroundTasks,
     current_user: PublicUser = Depends(get_current_user),
     db_session=Depends(get_db_session),
 ):
@@ -76,7 +86,7 @@ async def api_update_chapter_meta(
     Update Chapter metadata
     """
     return await reorder_chapters_and_activities(
-        request, course_uuid, order, current_user, db_session
+        request, course_uuid, order, current_user, db_session, background_tasks
     )
 
 
@@ -86,14 +96,24 @@ async def api_get_chapter_by(
     course_id: int,
     page: int,
     limit: int,
+    include: Optional[str] = None,
     current_user: PublicUser = Depends(get_current_user),
     db_session=Depends(get_db_session),
 ) -> List[ChapterRead]:
     """
-    Get Course Chapters by page and limit
+    Get Course Chapters by page and limit, activities come without their
+    content unless include=content is passed. Unpublished activities are
+    only listed for users who may edit the course.
     """
     return await get_course_chapters(
-        request, course_id, db_session, current_user, page, limit
+        request,
+        course_id,
+        db_session,
+        current_user,
+        with_unpublished_activities=None,
+        page=page,
+        limit=limit,
+        include_content="content" in (include or "").split(","),
     )
 
 
@@ -117,6 +137,7 @@ async def api_update_coursechapter(
 async def api_delete_coursechapter(
     request: Request,
     chapter_id: str,
+    background_tasks: BackgroundTasks,
     current_user: PublicUser = Depends(get_current_user),
     db_session=Depends(get_db_session),
 ):
@@ -124,4 +145,4 @@ async def api_delete_coursechapter(
     Delete CourseChapters by ID
     """
 
-    return await delete_chapter(request, chapter_id, current_user, db_session)
+    return await delete_chapter(request, chapter_id, current_user, db_session, background_tasks)
@@ -2,6 +2,8 @@ from typing import List
 from fastapi import APIRouter, Depends, Request
 from src.core.events.database import get_db_session
 from src.db.collections import CollectionCreate, CollectionRead, CollectionUpdate
+from src.core.response_cache import cached_response, response_cache_key
+from src.db.users import AnonymousUser
 from src.security.auth import get_current_user
 from src.services.users.users import PublicUser
 from src.services.courses.collections import (
@@ -54,6 +56,21 @@ async def api_get_collections_by(
     """
     Get collections by page and limit
     """
+    if isinstance(current_user, AnonymousUser):
+        return await cached_response(
+            response_cache_key("collections", org_id=org_id, page=page, limit=limit),
+            lambda: get_collections(request, org_id, current_user, db_session, page, limit),
+            tags=lambda collections: [
+                f"org:{org_id}",
+                *(f"collection:{collection['collection_uuid']}" for collection in collections),
+                *(
+                    f"course:{course['course_uuid']}"
+                    for collection in collections
+                    for course in collection["courses"]
+                ),
+            ],
+        )
+
     return await get_collections(request, org_id, current_user, db_session, page, limit)
 
 
@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, UploadFile, Form, Request
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, Form, Request, Response
 from sqlmodel import Session
 from src.core.events.database import get_db_session
 from src.db.courses.course_updates import (
@@ -7,7 +7,8 @@ from src.db.courses.course_updates import (
     CourseUpdateRead,
     CourseUpdateUpdate,
 )
-from src.db.users import PublicUser
+from src.db.users import AnonymousUser, PublicUser
+from src.db.courses.course_analytics import CourseAnalyticsRead
 from src.db.courses.courses import (
     CourseCreate,
     CourseRead,
@@ -15,6 +16,7 @@ from src.db.courses.courses import (
     FullCourseRead,
     ThumbnailType,
 )
+from src.core.response_cache import cached_response, response_cache_key
 from src.security.auth import get_current_user
 from src.services.courses.courses import (
     create_course,
@@ -28,6 +30,8 @@ from src.services.courses.courses import (
     search_courses,
     get_course_user_rights,
 )
+from src.services.courses.analytics import get_course_analytics
+from src.services.orgs.slugs import resolve_org_slug
 from src.services.courses.updates import (
     create_update,
     delete_update,
@@ -133,16 +137,66 @@ async def api_get_course_by_id(
 @router.get("/{course_uuid}/meta")
 async def api_get_course_meta(
     request: Request,
+    response: Response,
     course_uuid: str,
     with_unpublished_activities: bool = False,
+    include: Optional[str] = None,
     db_session: Session = Depends(get_db_session),
     current_user: PublicUser = Depends(get_current_user),
 ) -> FullCourseRead:
     """
-    Get single Course Metadata (chapters, activities) by course_uuid
-    """
+    Get single Course Metadata (chapters, activities) by course_uuid, answers
+    304 when If-None-Match matches the ETag. Activities are listed without
+    their content unless include=content is passed.
+    """
+    include_content = "content" in (include or "").split(",")
+
+    if isinstance(current_user, AnonymousUser):
+        # Shared between concurrent requests, so not conditional
+        return await cached_response(
+            response_cache_key(
+                "course_meta",
+                course_uuid=course_uuid,
+                with_unpublished_activities=with_unpublished_activities,
+                include_content=include_content,
+            ),
+            lambda: get_course_meta(
+                request,
+                course_uuid,
+                with_unpublished_activities,
+                current_user=current_user,
+                db_session=db_session,
+                include_content=include_content,
+            ),
+            tags=lambda course: [f"course:{course['course_uuid']}"],
+        )
+
     return await get_course_meta(
-        request, course_uuid, with_unpublished_activities, current_user=current_user, db_session=db_session
+        request,
+        course_uuid,
+        with_unpublished_activities,
+        current_user=current_user,
+        db_session=db_session,
+        response=response,
+        include_content=include_content,
+    )
+
+
+@router.get("/{course_uuid}/analytics")
+async def api_get_course_analytics(
+    request: Request,
+    course_uuid: str,
+    background_tasks: BackgroundTasks,
+    db_session: Session = Depends(get_db_session),
+    current_user: PublicUser = Depends(get_current_user),
+) -> CourseAnalyticsRead:
+    """
+    Get course analytics for its instructors: enrollments and completions
+    per day, completion funnel per chapter and activity, median time to
+    complete and assignment grade distributions
+    """
+    return await get_course_analytics(
+        request, course_uuid, current_user, db_session, background_tasks
     )
 
 
@@ -158,6 +212,20 @@ async def api_get_course_by_orgslug(
     """
     Get courses by page and limit
     """
+    if isinstance(current_user, AnonymousUser):
+        org = resolve_org_slug(db_session, org_slug)
+        # Not cached when no org uses the slug, nothing would purge the
+        # entry once an org takes it
+        if org is None:
+            return []
+        return await cached_response(
+            response_cache_key("courses_orgslug", org_slug=org_slug, page=page, limit=limit),
+            lambda: get_courses_orgslug(
+                request, current_user, org_slug, db_session, page, limit
+            ),
+            tags=lambda courses: [f"org:{org.id}"],
+        )
+
     return await get_courses_orgslug(
         request, current_user, org_slug, db_session, page, limit
     )
@@ -4,6 +4,7 @@ from config.config import get_learnhouse_config
 from migrations.orgconfigs.orgconfigs_migrations import migrate_to_v1_1, migrate_to_v1_2, migrate_v0_to_v1
 from src.core.events.database import get_db_session
 from src.db.organization_config import OrganizationConfig
+from src.services.orgs.config_cache import invalidate_organization_config
 
 
 router = APIRouter()
@@ -30,6 +31,7 @@ async def migrate(
 
         db_session.add(orgConfig)
         db_session.commit()
+        invalidate_organization_config(orgConfig.org_id)
 
     return {"message": "Migration successful"}
 
@@ -49,6 +51,7 @@ async def migratev1_1(
 
         db_session.add(orgConfig)
         db_session.commit()
+        invalidate_organization_config(orgConfig.org_id)
 
     return {"message": "Migration successful"}
 
@@ -67,5 +70,6 @@ async def migratev1_2(
 
         db_session.add(orgConfig)
         db_session.commit()
+        invalidate_organization_config(orgConfig.org_id)
 
     return {"message": "Migration successful"}
\ No newline at end of file
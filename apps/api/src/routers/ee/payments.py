@@ -1,9 +1,11 @@
 from typing import Literal
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 from src.core.events.database import get_db_session
 from src.db.payments.payments import PaymentsConfig, PaymentsConfigRead
-from src.db.users import PublicUser
+from src.core.response_cache import cached_response, response_cache_key
+from src.db.users import AnonymousUser, PublicUser
 from src.security.auth import get_current_user
 from src.services.payments.payments_config import (
     init_payments_config,
@@ -11,6 +13,7 @@ from src.services.payments.payments_config import (
     delete_payments_config,
 )
 from src.db.payments.payments_products import PaymentsProductCreate, PaymentsProductRead, PaymentsProductUpdate
+from src.db.payments.payments_users import PaymentStatusEnum
 from src.services.payments.payments_products import create_payments_product, delete_payments_product, get_payments_product, get_products_by_course, list_payments_products, update_payments_product
 from src.services.payments.payments_courses import (
     link_course_to_product,
@@ -20,9 +23,13 @@ from src.services.payments.payments_courses import (
 from src.services.payments.payments_users import get_owned_courses
 from src.services.payments.payments_stripe import create_checkout_session, handle_stripe_oauth_callback, update_stripe_account_id
 from src.services.payments.payments_access import check_course_paid_access
-from src.services.payments.payments_customers import get_customers
+from src.services.payments.payments_customers import (
+    export_customers_csv,
+    get_customers,
+    get_customers_count,
+)
 from src.services.payments.payments_stripe import generate_stripe_connect_link
-from src.services.payments.webhooks.payments_webhooks import handle_stripe_webhook
+from src.services.payments.webhooks.payments_webhooks import handle_stripe_webhook, wake_webhook_inbox_worker
 
 
 router = APIRouter()
@@ -163,16 +170,24 @@ async def api_get_products_by_course(
 @router.post("/stripe/webhook")
 async def api_handle_connected_accounts_stripe_webhook(
     request: Request,
+    background_tasks: BackgroundTasks,
     db_session: Session = Depends(get_db_session),
 ):
-    return await handle_stripe_webhook(request, "standard", db_session)
+    result = await handle_stripe_webhook(request, "standard", db_session)
+    # Have the inbox worker process the event once Stripe has its answer
+    background_tasks.add_task(wake_webhook_inbox_worker)
+    return result
 
 @router.post("/stripe/webhook/connect")
 async def api_handle_connected_accounts_stripe_webhook_connect(
     request: Request,
+    background_tasks: BackgroundTasks,
     db_session: Session = Depends(get_db_session),
 ):
-    return await handle_stripe_webhook(request, "connect", db_session)
+    result = await handle_stripe_webhook(request, "connect", db_session)
+    # Have the inbox worker process the event once Stripe has its answer
+    background_tasks.add_task(wake_webhook_inbox_worker)
+    return result
 
 # Payments checkout
 
@@ -210,22 +225,77 @@ async def api_check_course_paid_access(
 async def api_get_customers(
     request: Request,
     org_id: int,
+    after: int | None = None,
+    limit: int | None = Query(default=None, ge=1, le=500),
+    status: list[PaymentStatusEnum] | None = Query(default=None),
+    current_user: PublicUser = Depends(get_current_user),
+    db_session: Session = Depends(get_db_session),
+):
+    """
+    Get list of customers and their subscriptions for an organization,
+    optionally paginated with `after` (last payment user id) and `limit`
+    """
+    return await get_customers(
+        request, org_id, current_user, db_session, after, limit, status
+    )
+
+@router.get("/{org_id}/customers/count")
+async def api_get_customers_count(
+    request: Request,
+    org_id: int,
+    status: list[PaymentStatusEnum] | None = Query(default=None),
+    current_user: PublicUser = Depends(get_current_user),
+    db_session: Session = Depends(get_db_session),
+) -> dict:
+    """
+    Get the number of customers matching the filters
+    """
+    return await get_customers_count(request, org_id, current_user, db_session, status)
+
+@router.get("/{org_id}/customers/export")
+async def api_export_customers(
+    request: Request,
+    org_id: int,
+    status: list[PaymentStatusEnum] | None = Query(default=None),
     current_user: PublicUser = Depends(get_current_user),
     db_session: Session = Depends(get_db_session),
 ):
     """
-    Get list of customers and their subscriptions for an organization
+    Export the customers matching the filters as CSV
     """
-    return await get_customers(request, org_id, current_user, db_session)
+    rows = await export_customers_csv(request, org_id, current_user, db_session, status)
+    return StreamingResponse(
+        rows,
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="customers_{org_id}.csv"'
+        },
+    )
 
 @router.get("/{org_id}/courses/owned")
 async def api_get_owned_courses(
     request: Request,
     org_id: int,
+    after: int | None = None,
+    limit: int | None = Query(default=None, ge=1, le=100),
     current_user: PublicUser = Depends(get_current_user),
     db_session: Session = Depends(get_db_session),
 ):
-    return await get_owned_courses(request, current_user, db_session)
+    """
+    Get the courses the current user bought, optionally paginated with
+    `after` (last course id) and `limit`
+    """
+    if isinstance(current_user, AnonymousUser):
+        return []
+
+    return await cached_response(
+        response_cache_key("owned_courses", user_id=current_user.id, after=after, limit=limit),
+        lambda: get_owned_courses(request, current_user, db_session, after, limit),
+        tags=lambda courses: [
+            f"owned_courses:{current_user.id}",
+            *(f"course:{course['course_uuid']}" for course in courses),
+        ],
+    )
 
 @router.put("/{org_id}/stripe/account")
 async def api_update_stripe_account_id(
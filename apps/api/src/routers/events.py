@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Request
+from src.db.learning_events import LearningEventBatch
+from src.security.auth import get_current_user
+from src.services.trail.learning_events import ingest_learning_events
+
+
+router = APIRouter()
+
+
+@router.post("/", status_code=202)
+async def api_ingest_learning_events(
+    request: Request,
+    batch: LearningEventBatch,
+    user=Depends(get_current_user),
+) -> dict:
+    """
+    Send a batch of learning events (activity opened, video progress, time
+    on page). Events are written asynchronously, answers 503 with
+    Retry-After while the buffer is full
+    """
+    return await ingest_learning_events(request, batch, user)
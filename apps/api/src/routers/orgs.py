@@ -1,5 +1,6 @@
 from typing import List, Literal
-from fastapi import APIRouter, Depends, Request, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 from src.services.orgs.invites import (
     create_invite_code,
@@ -12,12 +13,17 @@ from src.services.orgs.join import JoinOrg, join_org
 from src.services.orgs.users import (
     get_list_of_invited_users,
     get_organization_users,
+    get_organization_users_count,
     invite_batch_users,
     remove_invited_user,
     remove_user_from_org,
     update_user_role,
 )
 from src.db.organization_config import OrganizationConfigBase
+from src.services.users.bulk_import import (
+    import_users_from_csv,
+    user_import_report_csv,
+)
 from src.db.users import PublicUser
 from src.db.organizations import (
     OrganizationCreate,
@@ -95,13 +101,36 @@ async def api_get_org(
 async def api_get_org_users(
     request: Request,
     org_id: str,
+    after: int | None = None,
+    limit: int | None = Query(default=None, ge=1, le=500),
+    role_uuid: str | None = None,
+    search: str | None = None,
     current_user: PublicUser = Depends(get_current_user),
     db_session: Session = Depends(get_db_session),
 ) -> list[OrganizationUser]:
     """
-    Get single Org by ID
+    Get Org users, optionally paginated with `after` (last user id) and `limit`
+    """
+    return await get_organization_users(
+        request, org_id, db_session, current_user, after, limit, role_uuid, search
+    )
+
+
+@router.get("/{org_id}/users/count")
+async def api_get_org_users_count(
+    request: Request,
+    org_id: str,
+    role_uuid: str | None = None,
+    search: str | None = None,
+    current_user: PublicUser = Depends(get_current_user),
+    db_session: Session = Depends(get_db_session),
+) -> dict:
+    """
+    Get the number of Org users matching the filters
     """
-    return await get_organization_users(request, org_id, db_session, current_user)
+    return await get_organization_users_count(
+        request, org_id, db_session, current_user, role_uuid, search
+    )
 
 
 @router.post("/join")
@@ -258,6 +287,31 @@ async def api_invite_batch_users(
     )
 
 
+@router.post("/{org_id}/users/import")
+async def api_import_org_users(
+    request: Request,
+    org_id: int,
+    users_file: UploadFile,
+    background_tasks: BackgroundTasks,
+    current_user: PublicUser = Depends(get_current_user),
+    db_session: Session = Depends(get_db_session),
+):
+    """
+    Import users from a CSV file (email, username, password, first_name, last_name),
+    returns a per-row CSV report
+    """
+    results = await import_users_from_csv(
+        request, org_id, users_file.file, background_tasks, current_user, db_session
+    )
+    return StreamingResponse(
+        user_import_report_csv(results),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="users_import_{org_id}.csv"'
+        },
+    )
+
+
 @router.get("/{org_id}/invites/users")
 async def api_get_org_users_invites(
     request: Request,
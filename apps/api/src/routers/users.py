@@ -1,5 +1,6 @@
 from typing import Literal, List
-from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile
+from fastapi.responses import JSONResponse
 from pydantic import EmailStr
 from sqlmodel import Session
 from src.services.users.password_reset import (
@@ -48,16 +49,22 @@ async def api_get_current_user(current_user: User = Depends(get_current_user)):
     return current_user.model_dump()
 
 
-@router.get("/session")
+@router.get("/session", response_model=UserSession)
 async def api_get_current_user_session(
     request: Request,
     db_session: Session = Depends(get_db_session),
     current_user: PublicUser = Depends(get_current_user),
-) -> UserSession:
+):
     """
-    Get current user
+    Get current user session, answers 304 when If-None-Match matches the ETag
     """
-    return await get_user_session(request, db_session, current_user)
+    user_session = await get_user_session(request, db_session, current_user)
+    headers = {"ETag": user_session.etag, "Cache-Control": "private, no-cache"}
+
+    if request.headers.get("if-none-match") == user_session.etag:
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(content=user_session.payload, headers=headers)
 
 
 @router.get("/authorize/ressource/{ressource_uuid}/action/{action}")
@@ -2,6 +2,10 @@ from sqlmodel import Session
 from src.core.events.database import get_db_session
 from src.db.users import AnonymousUser, PublicUser, User, UserRead
 from src.services.users.users import security_get_user
+from src.services.users.current_user_cache import (
+    cache_current_user,
+    get_cached_current_user,
+)
 from config.config import get_learnhouse_config
 from pydantic import BaseModel
 from fastapi import Depends, HTTPException, Request, status
@@ -9,7 +13,7 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 from src.services.dev.dev import isDevModeEnabled
-from src.services.users.users import security_verify_password
+from src.security.password_hashing import verify_password
 from src.security.security import ALGORITHM, SECRET_KEY
 from fastapi_jwt_auth import AuthJWT
 
@@ -59,7 +63,7 @@ async def authenticate_user(
     user = await security_get_user(request, db_session, email)
     if not user:
         return False
-    if not security_verify_password(password, user.password):
+    if not await verify_password(password, user.password):
         return False
     return user
 
@@ -93,10 +97,16 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     if username:
+        cached_user, miss = get_cached_current_user(username)
+        if cached_user is not None:
+            return cached_user
+
         user = await security_get_user(request, db_session, email=token_data.username)  # type: ignore # treated as an email
         if user is None:
             raise credentials_exception
-        return PublicUser(**user.model_dump())
+        public_user = PublicUser(**user.model_dump())
+        cache_current_user(username, public_user, miss)
+        return public_user
     else:
         return AnonymousUser()
 
@@ -1,9 +1,9 @@
 import redis
-from src.db.organization_config import OrganizationConfig
 from config.config import get_learnhouse_config
-from typing import Literal, TypeAlias
+from typing import Literal, Optional, TypeAlias
 from fastapi import HTTPException
-from sqlmodel import Session, select
+from sqlmodel import Session
+from src.services.orgs.config_cache import get_organization_config
 
 FeatureSet: TypeAlias = Literal[
     "ai",
@@ -25,12 +25,26 @@ def check_limits_with_usage(
     org_id: int,
     db_session: Session,
 ):
+    remaining_usage = get_remaining_feature_usage(feature, org_id, db_session)
 
-    # Get the Organization Config
-    statement = select(OrganizationConfig).where(OrganizationConfig.org_id == org_id)
-    result = db_session.exec(statement)
+    # Check if the feature has uses left before the limit
+    if remaining_usage == 0:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Usage Limit has been reached for {feature.capitalize()}",
+        )
+    return True
 
-    org_config = result.first()
+
+def get_remaining_feature_usage(
+    feature: FeatureSet,
+    org_id: int,
+    db_session: Session,
+) -> Optional[int]:
+    """Uses of a feature left before the org limit, None when unlimited"""
+
+    # Get the Organization Config
+    org_config = get_organization_config(db_session, org_id)
 
     if org_config is None:
         raise HTTPException(
@@ -38,13 +52,18 @@ def check_limits_with_usage(
             detail="Organization has no config",
         )
 
-    # Check if the Organizations has AI enabled
-    if org_config.config["features"][feature]["enabled"] == False:
+    # Check if the Organizations has the feature enabled
+    if not org_config.is_feature_enabled(feature):
         raise HTTPException(
             status_code=403,
             detail=f"{feature.capitalize()} is not enabled for this organization",
         )
 
+    feature_limit = org_config.feature_limit(feature)
+
+    if feature_limit <= 0:
+        return None
+
     LH_CONFIG = get_learnhouse_config()
     redis_conn_string = LH_CONFIG.redis_config.redis_connection_string
 
@@ -57,32 +76,18 @@ def check_limits_with_usage(
     # Connect to Redis
     r = redis.Redis.from_url(redis_conn_string)
 
-    # Check limits
-    feature_limit = org_config.config["features"][feature]["limit"]
-
-    if feature_limit > 0:
-        # Get the number of feature usage
-        feature_usage = r.get(f"{feature}_usage:{org_id}")
-
-        # Get a number of feature asks
-        if feature_usage is None:
-            feature_usage_count = 0
-        else:
-            feature_usage_count = int(feature_usage)  # type: ignore
+    # Get the number of feature usage
+    feature_usage = r.get(f"{feature}_usage:{org_id}")
+    feature_usage_count = 0 if feature_usage is None else int(feature_usage)  # type: ignore
 
-        # Check if the Number of usage is less than the max_asks limit
-        if feature_limit <= feature_usage_count:
-            raise HTTPException(
-                status_code=403,
-                detail=f"Usage Limit has been reached for {feature.capitalize()}",
-            )
-        return True
+    return max(feature_limit - feature_usage_count, 0)
 
 
 def increase_feature_usage(
     feature: FeatureSet,
     org_id: int,
     db_session: Session,
+    count: int = 1,
 ):
     LH_CONFIG = get_learnhouse_config()
     redis_conn_string = LH_CONFIG.redis_config.redis_connection_string
@@ -106,7 +111,7 @@ def increase_feature_usage(
         feature_usage_count = int(feature_usage)  # type: ignore
 
     # Increment the feature usage
-    r.set(f"{feature}_usage:{org_id}", feature_usage_count + 1)
+    r.set(f"{feature}_usage:{org_id}", feature_usage_count + count)
     return True
 
 
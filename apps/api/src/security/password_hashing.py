@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional, TypeVar
+import logfire
+from fastapi import HTTPException, status
+from src.security.security import security_hash_password, security_verify_password
+
+T = TypeVar("T")
+
+# 0 workers runs hashing on the default thread pool instead of processes
+PASSWORD_HASHING_WORKERS = int(
+    os.environ.get("LEARNHOUSE_PASSWORD_HASHING_WORKERS", min(4, os.cpu_count() or 1))
+)
+# Jobs allowed in flight (running + queued) per worker before new ones are shed
+PASSWORD_HASHING_PENDING_PER_WORKER = 8
+# Passwords hashed per job by bulk hashing, small enough not to delay logins
+PASSWORD_HASHING_BULK_SLICE = 16
+
+hashing_duration = logfire.metric_histogram(
+    "password_hashing.duration", unit="s", description="Time spent hashing or verifying a password"
+)
+hashing_wait = logfire.metric_histogram(
+    "password_hashing.wait", unit="s", description="Time a password job waited for a free worker"
+)
+hashing_in_flight = logfire.metric_up_down_counter(
+    "password_hashing.in_flight", description="Password jobs running or queued"
+)
+hashing_rejected = logfire.metric_counter(
+    "password_hashing.rejected", description="Password jobs shed because the pool was full"
+)
+
+
+def _hash_many(passwords: list[str]) -> list[str]:
+    return [security_hash_password(password) for password in passwords]
+
+
+def _timed(fn: Callable[..., T], *args) -> tuple[T, float, float]:
+    started = time.perf_counter()
+    return fn(*args), started, time.perf_counter() - started
+
+
+@dataclass
+class PasswordHashingStats:
+    submitted: int = 0
+    completed: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+
+class PasswordHashingPool:
+    """
+    Size-bounded pool running password hashing off the event loop.
+
+    The pool admits at most `max_pending` jobs; beyond that requests are
+    answered with a 503 right away instead of piling up behind the workers.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.stats = PasswordHashingStats()
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        if self.stats.in_flight >= self.max_pending:
+            self.stats.rejected += 1
+            hashing_rejected.add(1)
+            logging.warning("Password hashing pool is full, rejecting request")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again",
+                headers={"Retry-After": "1"},
+            )
+
+        self.stats.submitted += 1
+        self.stats.in_flight += 1
+        self.stats.max_in_flight = max(self.stats.max_in_flight, self.stats.in_flight)
+        hashing_in_flight.add(1)
+        submitted_at = time.perf_counter()
+
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, duration = await loop.run_in_executor(
+                self._get_executor(), _timed, fn, *args
+            )
+        finally:
+            self.stats.in_flight -= 1
+            hashing_in_flight.add(-1)
+
+        self.stats.completed += 1
+        hashing_duration.record(duration)
+        # perf_counter is system-wide, so the worker's start time is comparable
+        hashing_wait.record(max(started - submitted_at, 0))
+
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hashing_pool = PasswordHashingPool(
+    workers=PASSWORD_HASHING_WORKERS,
+    max_pending=max(PASSWORD_HASHING_WORKERS, 1) * PASSWORD_HASHING_PENDING_PER_WORKER,
+)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hashing_pool.run(security_hash_password, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hashing_pool.run(security_verify_password, plain_password, hashed_password)
+
+
+async def hash_passwords(passwords: list[str]) -> list[str]:
+    """
+    Hash many passwords in parallel, in order.
+
+    At most one slice per worker is in flight at a time, so logins queued
+    behind a bulk import wait for one slice at most.
+    """
+    slices = [
+        passwords[i : i + PASSWORD_HASHING_BULK_SLICE]
+        for i in range(0, len(passwords), PASSWORD_HASHING_BULK_SLICE)
+    ]
+    limiter = asyncio.Semaphore(max(password_hashing_pool.workers, 1))
+
+    async def hash_slice(passwords_slice: list[str]) -> list[str]:
+        async with limiter:
+            return await password_hashing_pool.run(_hash_many, passwords_slice)
+
+    hashed = await asyncio.gather(*[hash_slice(s) for s in slices])
+    return [password for hashed_slice in hashed for password in hashed_slice]
+
+
+def get_password_hashing_stats() -> dict:
+    return asdict(password_hashing_pool.stats)
@@ -1,6 +1,5 @@
 from fastapi import Depends, HTTPException, Request
 from sqlmodel import Session, select
-from src.db.organization_config import OrganizationConfig
 from src.db.organizations import Organization
 from src.security.features_utils.usage import (
     check_limits_with_usage,
@@ -12,6 +11,7 @@ from src.db.users import PublicUser
 from src.db.courses.activities import Activity, ActivityRead
 from src.security.auth import get_current_user
 from src.services.ai.base import ask_ai, get_chat_session_history
+from src.services.orgs.config_cache import get_organization_config
 
 from src.services.ai.schemas.ai import (
     ActivityAIChatSessionResponse,
@@ -83,20 +83,17 @@ def ai_start_activity_chat_session(
         structured, course, activity, isActivityEmpty=isEmpty
     )
 
-    # Get Activity Organization
-    statement = select(Organization).where(Organization.id == course.org_id)
-    org = db_session.exec(statement).first()
-
     # Get Organization Config
-    statement = select(OrganizationConfig).where(
-        OrganizationConfig.org_id == org.id  # type: ignore
-    )
-    result = db_session.exec(statement)
-    org_config = result.first()
+    org_config = get_organization_config(db_session, course.org_id)
+
+    if org_config is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization has no config",
+        )
 
-    org_config = OrganizationConfig.model_validate(org_config)
     embeddings = "text-embedding-ada-002"
-    ai_model = org_config.config["features"]["ai"]["model"]
+    ai_model = org_config.config.features.ai.model
 
     chat_session = get_chat_session_history()
 
@@ -151,10 +148,6 @@ def ai_send_activity_chat_message(
     course = db_session.exec(statement).first()
     course = CourseRead.model_validate(course)
 
-    # Get the Organization
-    statement = select(Organization).where(Organization.id == course.org_id)
-    org = db_session.exec(statement).first()
-
     # Check limits and usage
     check_limits_with_usage("ai", course.org_id, db_session)
     increase_feature_usage("ai", course.org_id, db_session)
@@ -174,20 +167,17 @@ def ai_send_activity_chat_message(
         structured, course, activity
     )
 
-    # Get Activity Organization
-    statement = select(Organization).where(Organization.id == course.org_id)
-    org = db_session.exec(statement).first()
-
     # Get Organization Config
-    statement = select(OrganizationConfig).where(
-        OrganizationConfig.org_id == org.id  # type: ignore
-    )
-    result = db_session.exec(statement)
-    org_config = result.first()
+    org_config = get_organization_config(db_session, course.org_id)
+
+    if org_config is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization has no config",
+        )
 
-    org_config = OrganizationConfig.model_validate(org_config)
     embeddings = "text-embedding-ada-002"
-    ai_model = org_config.config["features"]["ai"]["model"]
+    ai_model = org_config.config.features.ai.model
 
     chat_session = get_chat_session_history(chat_session_object.aichat_uuid)
 
@@ -1,15 +1,28 @@
+from sqlalchemy import update
 from sqlmodel import Session, select
 from src.db.courses.courses import Course
 from src.db.courses.chapters import Chapter
 from src.db.courses.activities import ActivityCreate, Activity, ActivityRead, ActivityUpdate
 from src.db.courses.chapter_activities import ChapterActivity
 from src.db.users import AnonymousUser, PublicUser
-from fastapi import HTTPException, Request
+from typing import List, Optional
+from fastapi import BackgroundTasks, HTTPException, Request, Response, status
 from uuid import uuid4
 from datetime import datetime
 
 from src.services.payments.payments_access import check_activity_paid_access
 from src.security.courses_security import courses_rbac_check_for_activities
+from src.services.courses.courses import (
+    bump_course_content_version,
+    check_course_etag,
+    invalidate_course_content,
+)
+from src.services.courses.chapters import next_activity_order
+from src.services.trail.progress import (
+    recompute_course_progress_job,
+    update_course_structure_progress,
+)
+from src.services.utils.json_patch import JsonPatchError, JsonPatchTestFailed, apply_json_patch
 
 
 ####################################################
@@ -55,21 +68,12 @@ async def create_activity(
     activity.org_id = chapter.org_id
     activity.course_id = chapter.course_id
 
+    # Append the activity to its chapter
+    to_be_used_order = next_activity_order(db_session, activity_object.chapter_id)
+
     # Insert Activity in DB
     db_session.add(activity)
-    db_session.commit()
-    db_session.refresh(activity)
-
-    # Find the last activity in the Chapter and add it to the list
-    statement = (
-        select(ChapterActivity)
-        .where(ChapterActivity.chapter_id == activity_object.chapter_id)
-        .order_by(ChapterActivity.order) # type: ignore
-    )
-    chapter_activities = db_session.exec(statement).all()
-
-    last_order = chapter_activities[-1].order if chapter_activities else 0
-    to_be_used_order = last_order + 1
+    db_session.flush()
 
     # Add activity to chapter
     activity_chapter = ChapterActivity(
@@ -82,10 +86,15 @@ async def create_activity(
         order=to_be_used_order,
     )
 
-    # Insert ChapterActivity link in DB
+    # Insert the activity and its ChapterActivity link in one transaction
     db_session.add(activity_chapter)
+    db_session.flush()
+    update_course_structure_progress(db_session, course.id, added_activity_ids=[activity.id])  # type: ignore
+    bump_course_content_version(db_session, course.course_uuid)
     db_session.commit()
-    db_session.refresh(activity_chapter)
+    db_session.refresh(activity)
+
+    invalidate_course_content(course.course_uuid)
 
     return ActivityRead.model_validate(activity)
 
@@ -95,6 +104,7 @@ async def get_activity(
     activity_uuid: str,
     current_user: PublicUser,
     db_session: Session,
+    response: Optional[Response] = None,
 ):
     # Optimize by joining Activity with Course in a single query
     statement = (
@@ -120,9 +130,12 @@ async def get_activity(
         request=request,
         activity_id=activity.id if activity.id else 0,
         user=current_user,
-        db_session=db_session
+        db_session=db_session,
+        course=course,
     )
 
+    check_course_etag(request, response, course, activity.activity_uuid, has_paid_access)
+
     activity_read = ActivityRead.model_validate(activity)
     activity_read.content = activity_read.content if has_paid_access else { "paid_access": False }
 
@@ -184,25 +197,128 @@ async def update_activity(
 
     await courses_rbac_check_for_activities(request, course.course_uuid, current_user, "update", db_session)
 
+    content_changed = activity_object.content != activity.content
+
     # Update only the fields that were passed in
     for var, value in vars(activity_object).items():
         if value is not None:
             setattr(activity, var, value)
 
+    if content_changed:
+        # Pending content patches were based on the previous content
+        activity.content_version = Activity.content_version + 1  # type: ignore
+
     db_session.add(activity)
+    bump_course_content_version(db_session, course.course_uuid)
     db_session.commit()
     db_session.refresh(activity)
 
+    invalidate_course_content(course.course_uuid)
+
     activity = ActivityRead.model_validate(activity)
 
     return activity
 
 
+def activity_content_etag(content_version: int) -> str:
+    return f'"{content_version}"'
+
+
+async def patch_activity_content(
+    request: Request,
+    activity_uuid: str,
+    operations: List[dict],
+    if_match: Optional[str],
+    current_user: PublicUser | AnonymousUser,
+    db_session: Session,
+) -> ActivityRead:
+    """
+    Apply an RFC 6902 JSON Patch to the content of an activity.
+
+    The patch must be based on the current content version, passed as the
+    If-Match ETag. Editors send only what changed instead of the whole
+    document, and an author working on a stale version gets a 412 instead
+    of overwriting someone else's changes.
+    """
+    statement = (
+        select(Activity, Course)
+        .join(Course)
+        .where(Activity.activity_uuid == activity_uuid)
+    )
+    result = db_session.exec(statement).first()
+
+    if not result:
+        raise HTTPException(
+            status_code=404,
+            detail="Activity not found",
+        )
+
+    activity, course = result
+
+    # RBAC check
+    await courses_rbac_check_for_activities(request, course.course_uuid, current_user, "update", db_session)
+
+    current_etag = activity_content_etag(activity.content_version)
+
+    if not if_match:
+        raise HTTPException(
+            status_code=status.HTTP_428_PRECONDITION_REQUIRED,
+            detail="If-Match with the content version is required",
+            headers={"ETag": current_etag},
+        )
+    if if_match.strip() not in (current_etag, str(activity.content_version)):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Activity content was modified, reload it before saving",
+            headers={"ETag": current_etag},
+        )
+
+    try:
+        content = apply_json_patch(activity.content, operations)
+    except JsonPatchTestFailed as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except JsonPatchError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    if not isinstance(content, dict):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Activity content must stay a JSON object",
+        )
+
+    # Only write if nobody saved since the version was checked
+    statement = (
+        update(Activity)
+        .where(Activity.id == activity.id, Activity.content_version == activity.content_version)  # type: ignore
+        .values(
+            content=content,
+            content_version=Activity.content_version + 1,
+            update_date=str(datetime.now()),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if db_session.execute(statement).rowcount != 1:  # type: ignore
+        db_session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Activity content was modified, reload it before saving",
+        )
+
+    bump_course_content_version(db_session, course.course_uuid)
+    db_session.commit()
+    db_session.refresh(activity)
+
+    invalidate_course_content(course.course_uuid)
+
+    return ActivityRead.model_validate(activity)
+
+
 async def delete_activity(
     request: Request,
     activity_uuid: str,
     current_user: PublicUser | AnonymousUser,
     db_session: Session,
+    background_tasks: Optional[BackgroundTasks] = None,
 ):
     statement = select(Activity).where(Activity.activity_uuid == activity_uuid)
     activity = db_session.exec(statement).first()
@@ -238,9 +354,19 @@ async def delete_activity(
         )
 
     db_session.delete(activity_chapter)
+    db_session.flush()
+    # Before the activity, whose trail steps go with it
+    update_course_structure_progress(db_session, course.id, removed_activity_ids=[activity.id])  # type: ignore
     db_session.delete(activity)
+    bump_course_content_version(db_session, course.course_uuid)
     db_session.commit()
 
+    invalidate_course_content(course.course_uuid)
+
+    # Learners may have completed every remaining activity
+    if background_tasks is not None:
+        background_tasks.add_task(recompute_course_progress_job, course.id)
+
     return {"detail": "Activity deleted"}
 
 
@@ -1,7 +1,9 @@
 from datetime import datetime
+from typing import Optional
 from uuid import uuid4
 from fastapi import HTTPException, Request, UploadFile
-from sqlmodel import Session, select
+from sqlalchemy import update
+from sqlmodel import Session, func, select
 
 from src.db.courses.activities import Activity
 from src.db.courses.assignments import (
@@ -18,7 +20,10 @@ from src.db.courses.assignments import (
     AssignmentTaskUpdate,
     AssignmentUpdate,
     AssignmentUserSubmission,
+    AssignmentUserSubmissionBulkGrade,
+    AssignmentUserSubmissionBulkGradeRead,
     AssignmentUserSubmissionCreate,
+    AssignmentUserSubmissionGrade,
     AssignmentUserSubmissionRead,
     AssignmentUserSubmissionStatus,
 )
@@ -39,6 +44,12 @@ from src.services.courses.activities.uploads.sub_file import upload_submission_f
 from src.services.courses.activities.uploads.tasks_ref_files import (
     upload_reference_file,
 )
+from src.services.courses.analytics import (
+    grade_if_graded,
+    record_enrollment,
+    record_grades_changed,
+)
+from src.services.trail.progress import course_total_steps, record_step_completed
 from src.services.trail.trail import check_trail_presence
 from src.services.courses.certifications import check_course_completion_and_create_certificate
 from src.security.courses_security import courses_rbac_check_for_assignments
@@ -1250,10 +1261,12 @@ async def create_assignment_submission(
             course_id=course.id if course.id is not None else 0,
             org_id=course.org_id,
             user_id=user.id,  # type: ignore
+            total_steps=course_total_steps(db_session, course.id),  # type: ignore
             creation_date=str(datetime.now()),
             update_date=str(datetime.now()),
         )
         db_session.add(trailrun)
+        record_enrollment(db_session, trailrun)
         db_session.commit()
         db_session.refresh(trailrun)
 
@@ -1279,6 +1292,8 @@ async def create_assignment_submission(
             update_date=str(datetime.now()),
         )
         db_session.add(trailstep)
+        db_session.flush()
+        record_step_completed(db_session, trailstep)
         db_session.commit()
         db_session.refresh(trailstep)
 
@@ -1435,6 +1450,8 @@ async def update_assignment_submission(
     # RBAC check
     await courses_rbac_check_for_assignments(request, course.course_uuid, current_user, "read", db_session)
 
+    previous_grade = grade_if_graded(assignment_user_submission.submission_status, assignment_user_submission.grade)
+
     # Update only the fields that were passed in
     for var, value in vars(assignment_user_submission_object).items():
         if value is not None:
@@ -1443,6 +1460,17 @@ async def update_assignment_submission(
 
     # Insert Assignment User Submission in DB
     db_session.add(assignment_user_submission)
+    record_grades_changed(
+        db_session,
+        course.id,  # type: ignore
+        assignment.id,  # type: ignore
+        [
+            (
+                previous_grade,
+                grade_if_graded(assignment_user_submission.submission_status, assignment_user_submission.grade),
+            )
+        ],
+    )
     db_session.commit()
     db_session.refresh(assignment_user_submission)
 
@@ -1495,20 +1523,92 @@ async def delete_assignment_submission(
 
     # Delete Assignment User Submission
     db_session.delete(assignment_user_submission)
+    record_grades_changed(
+        db_session,
+        course.id,  # type: ignore
+        assignment.id,  # type: ignore
+        [(grade_if_graded(assignment_user_submission.submission_status, assignment_user_submission.grade), None)],
+    )
     db_session.commit()
 
     return {"message": "Assignment User Submission deleted"}
 
 
 ## > Assignments Submissions Grading
-async def grade_assignment_submission(
+def _grade_submissions(
+    db_session: Session,
+    assignment: Assignment,
+    user_ids: Optional[list[int]] = None,
+) -> list[AssignmentUserSubmissionGrade]:
+    """
+    Grade user submissions with the sum of their task grades, all users'
+    totals in one grouped query and every submission in one update. The
+    caller commits.
+    """
+    task_grades = (
+        select(
+            AssignmentTaskSubmission.user_id,
+            func.sum(AssignmentTaskSubmission.grade).label("grade"),
+        )
+        .where(AssignmentTaskSubmission.activity_id == assignment.activity_id)
+        .group_by(AssignmentTaskSubmission.user_id)  # type: ignore
+        .subquery()
+    )
+    statement = (
+        select(
+            AssignmentUserSubmission.id,
+            AssignmentUserSubmission.user_id,
+            func.coalesce(task_grades.c.grade, 0),
+            AssignmentUserSubmission.submission_status,
+            AssignmentUserSubmission.grade,
+        )
+        .outerjoin(task_grades, task_grades.c.user_id == AssignmentUserSubmission.user_id)
+        .where(AssignmentUserSubmission.assignment_id == assignment.id)
+    )
+    if user_ids is None:
+        statement = statement.where(
+            AssignmentUserSubmission.submission_status.in_(  # type: ignore
+                [AssignmentUserSubmissionStatus.SUBMITTED, AssignmentUserSubmissionStatus.LATE]
+            )
+        )
+    else:
+        statement = statement.where(AssignmentUserSubmission.user_id.in_(user_ids))  # type: ignore
+    submissions = db_session.exec(statement).all()  # type: ignore
+
+    if submissions:
+        # Grade and status change together, by primary key in one statement
+        update_date = str(datetime.now())
+        db_session.execute(
+            update(AssignmentUserSubmission),
+            [
+                {
+                    "id": submission_id,
+                    "grade": grade,
+                    "submission_status": AssignmentUserSubmissionStatus.GRADED,
+                    "update_date": update_date,
+                }
+                for submission_id, _, grade, _, _ in submissions
+            ],
+        )
+        record_grades_changed(
+            db_session,
+            assignment.course_id,
+            assignment.id,  # type: ignore
+            [
+                (grade_if_graded(previous_status, previous_grade), grade)
+                for _, _, grade, previous_status, previous_grade in submissions
+            ],
+        )
+
+    return [AssignmentUserSubmissionGrade(user_id=user_id, grade=grade) for _, user_id, grade, _, _ in submissions]
+
+
+async def _get_assignment_for_grading(
     request: Request,
-    user_id: str,
     assignment_uuid: str,
     current_user: PublicUser | AnonymousUser,
     db_session: Session,
-):
-    # SECURITY: This function should only be accessible by course owners or instructors
+) -> Assignment:
     # Check if assignment exists
     statement = select(Assignment).where(Assignment.assignment_uuid == assignment_uuid)
     assignment = db_session.exec(statement).first()
@@ -1531,51 +1631,49 @@ async def grade_assignment_submission(
     # SECURITY: Require course ownership or instructor role for grading
     await courses_rbac_check_for_assignments(request, course.course_uuid, current_user, "update", db_session)
 
-    # Check if assignment user submission exists
-    statement = select(AssignmentUserSubmission).where(
-        AssignmentUserSubmission.user_id == user_id,
-        AssignmentUserSubmission.assignment_id == assignment.id,
-    )
-    assignment_user_submission = db_session.exec(statement).first()
+    return assignment
 
-    if not assignment_user_submission:
+
+async def grade_assignment_submission(
+    request: Request,
+    user_id: str,
+    assignment_uuid: str,
+    current_user: PublicUser | AnonymousUser,
+    db_session: Session,
+):
+    # SECURITY: This function should only be accessible by course owners or instructors
+    assignment = await _get_assignment_for_grading(request, assignment_uuid, current_user, db_session)
+
+    grades = _grade_submissions(db_session, assignment, [int(user_id)])
+
+    if not grades:
         raise HTTPException(
             status_code=404,
             detail="Assignment User Submission not found",
         )
 
-    # Get all the task submissions for the user
-    task_subs = select(AssignmentTaskSubmission).where(
-        AssignmentTaskSubmission.user_id == user_id,
-        AssignmentTaskSubmission.activity_id == assignment.activity_id,
-    )
-    task_submissions = db_session.exec(task_subs).all()
+    db_session.commit()
 
-    # Calculate the grade
-    grade = 0
-    for task_submission in task_submissions:
-        grade += task_submission.grade
+    # return OK
+    return {
+        "message": "Assignment User Submission graded with the grade of " + str(grades[0].grade)
+    }
 
-    # Update the assignment user submission
-    assignment_user_submission.grade = grade
 
-    # Insert Assignment User Submission in DB
-    db_session.add(assignment_user_submission)
-    db_session.commit()
-    db_session.refresh(assignment_user_submission)
-
-    # Change the status of the submission
-    assignment_user_submission.submission_status = AssignmentUserSubmissionStatus.GRADED
+async def grade_assignment_submissions(
+    request: Request,
+    assignment_uuid: str,
+    bulk_grade: AssignmentUserSubmissionBulkGrade,
+    current_user: PublicUser | AnonymousUser,
+    db_session: Session,
+) -> AssignmentUserSubmissionBulkGradeRead:
+    # SECURITY: This function should only be accessible by course owners or instructors
+    assignment = await _get_assignment_for_grading(request, assignment_uuid, current_user, db_session)
 
-    # Insert Assignment User Submission in DB
-    db_session.add(assignment_user_submission)
+    grades = _grade_submissions(db_session, assignment, bulk_grade.user_ids)
     db_session.commit()
-    db_session.refresh(assignment_user_submission)
 
-    # return OK
-    return {
-        "message": "Assignment User Submission graded with the grade of " + str(grade)
-    }
+    return AssignmentUserSubmissionBulkGradeRead(graded=len(grades), grades=grades)
 
 
 async def get_grade_assignment_submission(
@@ -1704,11 +1802,15 @@ async def mark_activity_as_done_for_user(
         )
 
     # Mark activity as done
+    was_complete = trailstep.complete
     trailstep.complete = True
     trailstep.update_date = str(datetime.now())
 
     # Insert TrailStep in DB
     db_session.add(trailstep)
+    if not was_complete:
+        db_session.flush()
+        record_step_completed(db_session, trailstep)
     db_session.commit()
     db_session.refresh(trailstep)
 
@@ -1738,17 +1840,14 @@ async def get_assignments_from_course(
             detail="Course not found",
         )
 
-    # Get Activities
-    statement = select(Activity).where(Activity.course_id == course.id)
-    activities = db_session.exec(statement).all()
-
-    # Get Assignments
-    assignments = []
-    for activity in activities:
-        statement = select(Assignment).where(Assignment.activity_id == activity.id)
-        assignment = db_session.exec(statement).first()
-        if assignment:
-            assignments.append(assignment)
+    # Get Assignments of the course activities
+    statement = (
+        select(Assignment)
+        .join(Activity, Activity.id == Assignment.activity_id)  # type: ignore
+        .where(Activity.course_id == course.id)
+        .order_by(Activity.id)  # type: ignore
+    )
+    assignments = db_session.exec(statement).all()
 
     # RBAC check
     await courses_rbac_check_for_assignments(request, course.course_uuid, current_user, "read", db_session)
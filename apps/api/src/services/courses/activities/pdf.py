@@ -16,6 +16,9 @@ from fastapi import HTTPException, status, UploadFile, Request
 from uuid import uuid4
 from datetime import datetime
 from src.security.courses_security import courses_rbac_check_for_activities
+from src.services.courses.courses import bump_course_content_version, invalidate_course_content
+from src.services.courses.chapters import next_activity_order
+from src.services.trail.progress import update_course_structure_progress
 
 
 async def create_documentpdf_activity(
@@ -109,17 +112,6 @@ async def create_documentpdf_activity(
     db_session.commit()
     db_session.refresh(activity)
 
-    # Add activity to chapter
-    activity_chapter = ChapterActivity(
-        chapter_id=(int(chapter_id)),
-        activity_id=activity.id,  # type: ignore
-        course_id=coursechapter.course_id,
-        org_id=coursechapter.org_id,
-        creation_date=str(datetime.now()),
-        update_date=str(datetime.now()),
-        order=1,
-    )
-
     # upload pdf
     if pdf_file and organization and course:
         # get pdffile format
@@ -130,9 +122,25 @@ async def create_documentpdf_activity(
             course.course_uuid,
         )
 
+    # Add activity to chapter
+    activity_chapter = ChapterActivity(
+        chapter_id=(int(chapter_id)),
+        activity_id=activity.id,  # type: ignore
+        course_id=coursechapter.course_id,
+        org_id=coursechapter.org_id,
+        creation_date=str(datetime.now()),
+        update_date=str(datetime.now()),
+        order=next_activity_order(db_session, int(chapter_id)),
+    )
+
     # Insert ChapterActivity link in DB
     db_session.add(activity_chapter)
+    db_session.flush()
+    update_course_structure_progress(db_session, coursechapter.course_id, added_activity_ids=[activity.id])  # type: ignore
+    bump_course_content_version(db_session, course.course_uuid)
     db_session.commit()
     db_session.refresh(activity_chapter)
 
+    invalidate_course_content(course.course_uuid)
+
     return ActivityRead.model_validate(activity)
@@ -20,6 +20,9 @@ from fastapi import HTTPException, status, UploadFile, Request
 from uuid import uuid4
 from datetime import datetime
 from src.security.courses_security import courses_rbac_check_for_activities
+from src.services.courses.courses import bump_course_content_version, invalidate_course_content
+from src.services.courses.chapters import next_activity_order
+from src.services.trail.progress import update_course_structure_progress
 
 
 async def create_video_activity(
@@ -135,14 +138,19 @@ async def create_video_activity(
         org_id=coursechapter.org_id,
         creation_date=str(datetime.now()),
         update_date=str(datetime.now()),
-        order=1,
+        order=next_activity_order(db_session, chapter.id),  # type: ignore
     )
 
     # Insert ChapterActivity link in DB
     db_session.add(chapter_activity_object)
+    db_session.flush()
+    update_course_structure_progress(db_session, coursechapter.course_id, added_activity_ids=[activity.id])  # type: ignore
+    bump_course_content_version(db_session, course.course_uuid)
     db_session.commit()
     db_session.refresh(chapter_activity_object)
 
+    invalidate_course_content(course.course_uuid)
+
     return ActivityRead.model_validate(activity)
 
 
@@ -233,13 +241,18 @@ async def create_external_video_activity(
         org_id=coursechapter.org_id,
         creation_date=str(datetime.now()),
         update_date=str(datetime.now()),
-        order=1,
+        order=next_activity_order(db_session, coursechapter.chapter_id),
     )
 
     # Insert ChapterActivity link in DB
     db_session.add(chapter_activity_object)
+    db_session.flush()
+    update_course_structure_progress(db_session, coursechapter.course_id, added_activity_ids=[activity.id])  # type: ignore
+    bump_course_content_version(db_session, course.course_uuid)
     db_session.commit()
 
+    invalidate_course_content(course.course_uuid)
+
     return ActivityRead.model_validate(activity)
 
 
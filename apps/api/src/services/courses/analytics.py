@@ -0,0 +1,684 @@
+import asyncio
+import logging
+import statistics
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Optional
+from fastapi import BackgroundTasks, HTTPException, Request, status
+from sqlalchemy import and_, delete, func, insert, or_, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlmodel import Session, select
+from src.core.events.database import engine
+from src.db.courses.activities import Activity
+from src.db.courses.assignments import (
+    Assignment,
+    AssignmentUserSubmission,
+    AssignmentUserSubmissionStatus,
+)
+from src.db.courses.chapter_activities import ChapterActivity
+from src.db.courses.chapters import Chapter
+from src.db.courses.course_analytics import (
+    CourseAnalytics,
+    CourseAnalyticsActivity,
+    CourseAnalyticsActivityRead,
+    CourseAnalyticsAssignmentRead,
+    CourseAnalyticsChapter,
+    CourseAnalyticsChapterRead,
+    CourseAnalyticsCompletion,
+    CourseAnalyticsDay,
+    CourseAnalyticsDayRead,
+    CourseAnalyticsGrade,
+    CourseAnalyticsGradeBucketRead,
+    CourseAnalyticsRead,
+)
+from src.db.courses.course_chapters import CourseChapter
+from src.db.courses.courses import Course
+from src.db.trail_runs import TrailRun
+from src.db.trail_steps import TrailStep
+from src.db.users import AnonymousUser, PublicUser
+from src.security.courses_security import courses_rbac_check
+from src.services.orgs.config_cache import get_organization_config
+
+COURSE_ANALYTICS_REFRESH_INTERVAL = 60
+# Stale courses refreshed per worker pass
+COURSE_ANALYTICS_REFRESH_BATCH = 20
+GRADE_BUCKET_SIZE = 10
+
+
+def mark_course_analytics_stale(db_session: Session, course_id: int) -> None:
+    """
+    Flag a course's rollups for a full rebuild, in the caller's transaction.
+
+    Only for changes deltas can't follow: course structure changes and
+    progress recomputes. Learning activity updates the rollups in place.
+    """
+    db_session.execute(
+        update(CourseAnalytics)
+        .where(CourseAnalytics.course_id == course_id, CourseAnalytics.stale == False)  # type: ignore # noqa: E712
+        .values(stale=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _rollup_insert(db_session: Session, model):
+    """INSERT with ON CONFLICT support, on PostgreSQL or SQLite"""
+    if db_session.get_bind().dialect.name == "postgresql":
+        return postgresql_insert(model)
+    return sqlite_insert(model)
+
+
+def _add_to_rollup(db_session: Session, model, key: tuple[str, ...], rows: list[dict]) -> None:
+    """Add the counters of each row to the rollup row with the same key, creating it if missing"""
+    if not rows:
+        return
+    statement = _rollup_insert(db_session, model).values(rows)
+    db_session.execute(
+        statement.on_conflict_do_update(
+            index_elements=list(key),
+            set_={name: getattr(model, name) + statement.excluded[name] for name in rows[0] if name not in key},
+        )
+    )
+
+
+def _add_to_summary(db_session: Session, course_id: int, **counters: int) -> None:
+    db_session.execute(
+        update(CourseAnalytics)
+        .where(CourseAnalytics.course_id == course_id)  # type: ignore
+        .values({name: getattr(CourseAnalytics, name) + delta for name, delta in counters.items()})
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _add_to_day(db_session: Session, course_id: int, day: str, enrollments: int = 0, completions: int = 0) -> None:
+    _add_to_rollup(
+        db_session,
+        CourseAnalyticsDay,
+        ("course_id", "day"),
+        [{"course_id": course_id, "day": day, "enrollments": enrollments, "completions": completions}],
+    )
+
+
+def _add_to_activities(db_session: Session, course_id: int, activity_ids: Iterable[int], delta: int) -> None:
+    _add_to_rollup(
+        db_session,
+        CourseAnalyticsActivity,
+        ("course_id", "activity_id"),
+        [{"course_id": course_id, "activity_id": activity_id, "completions": delta} for activity_id in activity_ids],
+    )
+
+
+def _add_to_chapters(db_session: Session, course_id: int, chapter_ids: Iterable[int], delta: int) -> None:
+    _add_to_rollup(
+        db_session,
+        CourseAnalyticsChapter,
+        ("course_id", "chapter_id"),
+        [{"course_id": course_id, "chapter_id": chapter_id, "completions": delta} for chapter_id in chapter_ids],
+    )
+
+
+def _completed_chapters(
+    db_session: Session,
+    course_id: int,
+    user_id: int,
+    activity_id: Optional[int] = None,
+    missing: int = 0,
+) -> list[int]:
+    """
+    Chapters of a course, or of one of its activities, the user completed
+    but for `missing` activities.
+    """
+    statement = (
+        select(ChapterActivity.chapter_id)
+        .outerjoin(
+            TrailStep,
+            and_(
+                TrailStep.activity_id == ChapterActivity.activity_id,
+                TrailStep.user_id == user_id,
+                TrailStep.complete == True,  # noqa: E712
+            ),
+        )  # type: ignore
+        .where(ChapterActivity.course_id == course_id)
+        .group_by(ChapterActivity.chapter_id)
+        .having(
+            func.count(func.distinct(TrailStep.activity_id)) + missing
+            == func.count(func.distinct(ChapterActivity.activity_id))
+        )
+    )
+    if activity_id is not None:
+        statement = statement.where(
+            ChapterActivity.chapter_id.in_(  # type: ignore
+                select(ChapterActivity.chapter_id).where(
+                    ChapterActivity.course_id == course_id, ChapterActivity.activity_id == activity_id
+                )
+            )
+        )
+    return list(db_session.exec(statement).all())
+
+
+def _hours_between(started: datetime, finished: datetime) -> float:
+    return max((finished - started).total_seconds() / 3600, 0.0)
+
+
+def _record_course_completed(db_session: Session, course_id: int, trailrun_id: int, started: str, finished: str) -> None:
+    started_date, finished_date = _parse_date(started), _parse_date(finished)
+    if started_date is None or finished_date is None:
+        return
+
+    result = db_session.execute(
+        _rollup_insert(db_session, CourseAnalyticsCompletion)
+        .values(
+            course_id=course_id,
+            trailrun_id=trailrun_id,
+            day=finished[:10],
+            hours=_hours_between(started_date, finished_date),
+        )
+        .on_conflict_do_nothing(index_elements=["trailrun_id"])
+    )
+    if result.rowcount:  # type: ignore
+        _add_to_summary(db_session, course_id, completed=1)
+        _add_to_day(db_session, course_id, finished[:10], completions=1)
+
+
+def _record_course_uncompleted(db_session: Session, course_id: int, trailrun_id: int) -> None:
+    statement = select(CourseAnalyticsCompletion.id, CourseAnalyticsCompletion.day).where(
+        CourseAnalyticsCompletion.trailrun_id == trailrun_id
+    )
+    completion = db_session.exec(statement).first()
+    if completion is None:
+        return
+
+    completion_id, day = completion
+    db_session.execute(delete(CourseAnalyticsCompletion).where(CourseAnalyticsCompletion.id == completion_id))  # type: ignore
+    _add_to_summary(db_session, course_id, completed=-1)
+    _add_to_day(db_session, course_id, day, completions=-1)
+
+
+def _run_progress(db_session: Session, trailrun_id: int):
+    # Columns rather than the entity, progress was just updated in SQL
+    statement = select(TrailRun.completed_steps, TrailRun.total_steps, TrailRun.creation_date).where(
+        TrailRun.id == trailrun_id
+    )
+    return db_session.exec(statement).first()
+
+
+def record_enrollment(db_session: Session, run: TrailRun) -> None:
+    """Count a new trail run, in the caller's transaction"""
+    _add_to_summary(db_session, run.course_id, enrolled=1)
+    _add_to_day(db_session, run.course_id, run.creation_date[:10], enrollments=1)
+
+
+def record_learner_left(db_session: Session, run: TrailRun) -> None:
+    """Uncount a trail run being deleted and its learner's completions, before their steps are deleted"""
+    course_id = run.course_id
+    statement = select(func.distinct(TrailStep.activity_id)).where(
+        TrailStep.user_id == run.user_id,
+        TrailStep.complete == True,  # noqa: E712
+        TrailStep.activity_id.in_(select(ChapterActivity.activity_id).where(ChapterActivity.course_id == course_id)),  # type: ignore
+    )
+    _add_to_activities(db_session, course_id, db_session.exec(statement).all(), -1)
+    _add_to_chapters(db_session, course_id, _completed_chapters(db_session, course_id, run.user_id), -1)
+    _record_course_uncompleted(db_session, course_id, run.id)  # type: ignore
+
+    _add_to_summary(db_session, course_id, enrolled=-1)
+    _add_to_day(db_session, course_id, run.creation_date[:10], enrollments=-1)
+
+
+def record_activity_completed(db_session: Session, step: TrailStep) -> None:
+    """Count a step that was just counted for progress: its activity, and the chapters and course it completes"""
+    course_id = step.course_id
+    _add_to_activities(db_session, course_id, [step.activity_id], 1)
+    _add_to_chapters(db_session, course_id, _completed_chapters(db_session, course_id, step.user_id, step.activity_id), 1)
+
+    progress = _run_progress(db_session, step.trailrun_id)
+    if progress is not None:
+        completed_steps, total_steps, started = progress
+        if total_steps > 0 and completed_steps == total_steps:
+            _record_course_completed(db_session, course_id, step.trailrun_id, started, step.creation_date)
+
+
+def record_activity_uncompleted(db_session: Session, step: TrailStep) -> None:
+    """Uncount a step that was just uncounted for progress, the reverse of `record_activity_completed`"""
+    course_id = step.course_id
+    _add_to_activities(db_session, course_id, [step.activity_id], -1)
+    _add_to_chapters(
+        db_session, course_id, _completed_chapters(db_session, course_id, step.user_id, step.activity_id, missing=1), -1
+    )
+
+    progress = _run_progress(db_session, step.trailrun_id)
+    if progress is not None:
+        completed_steps, total_steps, _ = progress
+        if total_steps > 0 and completed_steps == total_steps - 1:
+            _record_course_uncompleted(db_session, course_id, step.trailrun_id)
+
+
+def grade_if_graded(submission_status: AssignmentUserSubmissionStatus, grade: int) -> Optional[int]:
+    """The grade a submission counts with in the distribution, None when not graded"""
+    return grade if submission_status == AssignmentUserSubmissionStatus.GRADED else None
+
+
+def record_grades_changed(
+    db_session: Session,
+    course_id: int,
+    assignment_id: int,
+    changes: Iterable[tuple[Optional[int], Optional[int]]],
+) -> None:
+    """Move submissions between grade buckets, `changes` being (previous, new) grades from `grade_if_graded`"""
+    buckets: Counter = Counter()
+    for previous, new in changes:
+        if previous is not None:
+            buckets[previous // GRADE_BUCKET_SIZE] -= 1
+        if new is not None:
+            buckets[new // GRADE_BUCKET_SIZE] += 1
+
+    _add_to_rollup(
+        db_session,
+        CourseAnalyticsGrade,
+        ("course_id", "assignment_id", "bucket"),
+        [
+            {"course_id": course_id, "assignment_id": assignment_id, "bucket": bucket, "submissions": delta}
+            for bucket, delta in buckets.items()
+            if delta
+        ],
+    )
+
+
+def _claim_refresh(db_session: Session, course_id: int) -> bool:
+    """Clear the stale flag before building, so changes made meanwhile mark the course again"""
+    if db_session.get(CourseAnalytics, course_id) is None:
+        try:
+            db_session.add(CourseAnalytics(course_id=course_id))
+            db_session.commit()
+            return True
+        except IntegrityError:
+            # Another worker is building the first rollups
+            db_session.rollback()
+            return False
+
+    result = db_session.execute(
+        update(CourseAnalytics)
+        .where(CourseAnalytics.course_id == course_id, CourseAnalytics.stale == True)  # type: ignore # noqa: E712
+        .values(stale=False)
+        .execution_options(synchronize_session=False)
+    )
+    db_session.commit()
+    return result.rowcount == 1  # type: ignore
+
+
+def _request_first_build(db_session: Session, course_id: int) -> CourseAnalytics:
+    """Add an empty, stale summary so the course's first rollups get built"""
+    summary = CourseAnalytics(course_id=course_id, stale=True)
+    try:
+        db_session.add(summary)
+        db_session.commit()
+    except IntegrityError:
+        # Another request asked first
+        db_session.rollback()
+        summary = db_session.get(CourseAnalytics, course_id)
+    return summary  # type: ignore
+
+
+def _parse_date(value: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def refresh_course_analytics(db_session: Session, course_id: int, force: bool = False) -> bool:
+    """
+    Rebuild the rollups of a course from trail runs, trail steps and
+    assignment submissions, with one grouped query per rollup.
+
+    Learning activity keeps the rollups up to date with deltas, rebuilds
+    are for the changes deltas can't follow: course structure changes and
+    progress recomputes. Only stale courses are rebuilt unless `force`.
+    Returns whether the rollups were rebuilt.
+    """
+    if not _claim_refresh(db_session, course_id) and not force:
+        return False
+
+    if db_session.get_bind().dialect.name == "postgresql":
+        # One snapshot for every rollup, deltas committed meanwhile make the swap fail
+        db_session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    try:
+        _rebuild_course_analytics(db_session, course_id)
+    except (OperationalError, IntegrityError) as e:
+        logging.warning(f"Rebuilding analytics of course {course_id} raced with learning activity: {e}")
+        db_session.rollback()
+        mark_course_analytics_stale(db_session, course_id)
+        db_session.commit()
+        return False
+
+    return True
+
+
+def _rebuild_course_analytics(db_session: Session, course_id: int) -> None:
+    course_activities = select(ChapterActivity.activity_id).where(ChapterActivity.course_id == course_id)
+    # Deltas only follow learners enrolled in the course
+    course_learners = select(TrailRun.user_id).where(TrailRun.course_id == course_id)
+    completed_run = and_(
+        TrailRun.course_id == course_id,
+        TrailRun.total_steps > 0,
+        TrailRun.completed_steps >= TrailRun.total_steps,
+    )
+
+    statement = select(func.count(TrailRun.id)).where(TrailRun.course_id == course_id)  # type: ignore
+    enrolled = db_session.exec(statement).one()
+
+    enrollment_day = func.substr(TrailRun.creation_date, 1, 10)
+    statement = (
+        select(enrollment_day, func.count(TrailRun.id))  # type: ignore
+        .where(TrailRun.course_id == course_id)
+        .group_by(enrollment_day)
+    )
+    days = {day: {"enrollments": count, "completions": 0} for day, count in db_session.exec(statement).all()}
+
+    # A run is completed by the last of its course activities
+    statement = (
+        select(TrailRun.id, TrailRun.creation_date, func.max(TrailStep.creation_date))
+        .join(
+            TrailStep,
+            and_(
+                TrailStep.user_id == TrailRun.user_id,
+                TrailStep.complete == True,  # noqa: E712
+                TrailStep.activity_id.in_(course_activities),  # type: ignore
+            ),
+        )  # type: ignore
+        .where(completed_run)
+        .group_by(TrailRun.id)
+    )
+    completed_runs = []
+    completions = Counter()
+    for trailrun_id, started, finished in db_session.exec(statement).all():
+        started_date, finished_date = _parse_date(started), _parse_date(finished)
+        if started_date is None or finished_date is None:
+            continue
+        completed_runs.append(
+            {
+                "course_id": course_id,
+                "trailrun_id": trailrun_id,
+                "day": finished[:10],
+                "hours": _hours_between(started_date, finished_date),
+            }
+        )
+        completions[finished[:10]] += 1
+    for day, count in completions.items():
+        days.setdefault(day, {"enrollments": 0, "completions": 0})["completions"] = count
+
+    statement = (
+        select(TrailStep.activity_id, func.count(func.distinct(TrailStep.user_id)))
+        .where(
+            TrailStep.complete == True,  # noqa: E712
+            TrailStep.activity_id.in_(course_activities),  # type: ignore
+            TrailStep.user_id.in_(course_learners),  # type: ignore
+        )
+        .group_by(TrailStep.activity_id)
+    )
+    activities = db_session.exec(statement).all()
+
+    chapter_sizes = (
+        select(
+            ChapterActivity.chapter_id,
+            func.count(func.distinct(ChapterActivity.activity_id)).label("size"),
+        )
+        .where(ChapterActivity.course_id == course_id)
+        .group_by(ChapterActivity.chapter_id)
+        .subquery()
+    )
+    learner_chapters = (
+        select(
+            ChapterActivity.chapter_id,
+            TrailStep.user_id,
+            func.count(func.distinct(TrailStep.activity_id)).label("done"),
+        )
+        .join(TrailStep, and_(TrailStep.activity_id == ChapterActivity.activity_id, TrailStep.complete == True))  # type: ignore # noqa: E712
+        .where(ChapterActivity.course_id == course_id, TrailStep.user_id.in_(course_learners))  # type: ignore
+        .group_by(ChapterActivity.chapter_id, TrailStep.user_id)
+        .subquery()
+    )
+    statement = (
+        select(learner_chapters.c.chapter_id, func.count())
+        .join(chapter_sizes, chapter_sizes.c.chapter_id == learner_chapters.c.chapter_id)
+        .where(learner_chapters.c.done >= chapter_sizes.c.size)
+        .group_by(learner_chapters.c.chapter_id)
+    )
+    chapters = db_session.exec(statement).all()
+
+    grade_bucket = AssignmentUserSubmission.grade // GRADE_BUCKET_SIZE
+    statement = (
+        select(AssignmentUserSubmission.assignment_id, grade_bucket, func.count(AssignmentUserSubmission.id))  # type: ignore
+        .join(Assignment, Assignment.id == AssignmentUserSubmission.assignment_id)  # type: ignore
+        .where(
+            Assignment.course_id == course_id,
+            AssignmentUserSubmission.submission_status == AssignmentUserSubmissionStatus.GRADED,
+        )
+        .group_by(AssignmentUserSubmission.assignment_id, grade_bucket)
+    )
+    grades = db_session.exec(statement).all()
+
+    # Swap the rollups at once, under the summary row lock
+    summary = db_session.exec(
+        select(CourseAnalytics).where(CourseAnalytics.course_id == course_id).with_for_update()
+    ).one()
+    for rollup in (
+        CourseAnalyticsDay,
+        CourseAnalyticsChapter,
+        CourseAnalyticsActivity,
+        CourseAnalyticsGrade,
+        CourseAnalyticsCompletion,
+    ):
+        db_session.execute(delete(rollup).where(rollup.course_id == course_id))  # type: ignore
+
+    if days:
+        db_session.execute(
+            insert(CourseAnalyticsDay),
+            [{"course_id": course_id, "day": day, **counts} for day, counts in days.items()],
+        )
+    if completed_runs:
+        db_session.execute(insert(CourseAnalyticsCompletion), completed_runs)
+    if chapters:
+        db_session.execute(
+            insert(CourseAnalyticsChapter),
+            [{"course_id": course_id, "chapter_id": chapter_id, "completions": count} for chapter_id, count in chapters],
+        )
+    if activities:
+        db_session.execute(
+            insert(CourseAnalyticsActivity),
+            [
+                {"course_id": course_id, "activity_id": activity_id, "completions": count}
+                for activity_id, count in activities
+            ],
+        )
+    if grades:
+        db_session.execute(
+            insert(CourseAnalyticsGrade),
+            [
+                {"course_id": course_id, "assignment_id": assignment_id, "bucket": bucket, "submissions": count}
+                for assignment_id, bucket, count in grades
+            ],
+        )
+
+    summary.enrolled = enrolled
+    summary.completed = len(completed_runs)
+    summary.refreshed_date = str(datetime.now())
+    db_session.add(summary)
+    db_session.commit()
+
+
+def refresh_course_analytics_job(course_id: int) -> None:
+    """Background task refreshing one course"""
+    try:
+        with Session(engine) as db_session:
+            refresh_course_analytics(db_session, course_id)
+    except Exception as e:
+        logging.error(f"Could not refresh analytics of course {course_id}: {e}")
+
+
+def refresh_stale_course_analytics(db_session: Session, limit: int = COURSE_ANALYTICS_REFRESH_BATCH) -> int:
+    """Refresh the rollups of stale courses, returns how many were rebuilt"""
+    statement = select(CourseAnalytics.course_id).where(CourseAnalytics.stale == True).limit(limit)  # noqa: E712
+    course_ids = db_session.exec(statement).all()
+
+    return sum(refresh_course_analytics(db_session, course_id) for course_id in course_ids)
+
+
+def refresh_stale_course_analytics_job() -> int:
+    """Refresh one batch of stale courses on a session of its own"""
+    with Session(engine) as db_session:
+        return refresh_stale_course_analytics(db_session)
+
+
+async def run_course_analytics_worker(
+    interval: float = COURSE_ANALYTICS_REFRESH_INTERVAL,
+) -> None:
+    """Periodically refresh the rollups of courses with new learning data"""
+    while True:
+        try:
+            # Rebuilds run blocking queries, keep them off the event loop
+            while await asyncio.to_thread(refresh_stale_course_analytics_job):
+                pass
+        except Exception as e:
+            logging.error(f"Error refreshing course analytics: {e}")
+        await asyncio.sleep(interval)
+
+
+def _median_completion_hours(db_session: Session, course_id: int) -> Optional[float]:
+    if db_session.get_bind().dialect.name == "postgresql":
+        statement = select(func.percentile_cont(0.5).within_group(CourseAnalyticsCompletion.hours)).where(
+            CourseAnalyticsCompletion.course_id == course_id
+        )
+        return db_session.exec(statement).one()
+
+    statement = select(CourseAnalyticsCompletion.hours).where(CourseAnalyticsCompletion.course_id == course_id)
+    hours = db_session.exec(statement).all()
+    return statistics.median(hours) if hours else None
+
+
+async def get_course_analytics(
+    request: Request,
+    course_uuid: str,
+    current_user: PublicUser | AnonymousUser,
+    db_session: Session,
+    background_tasks: Optional[BackgroundTasks] = None,
+) -> CourseAnalyticsRead:
+    """
+    Course analytics for its instructors, read from the rollups only.
+
+    Learning activity updates the rollups as it happens. They are rebuilt
+    in the background when the course structure changes: the first request
+    gets empty rollups, and `stale` tells whether a rebuild is pending. The
+    median completion time is computed from one row per completed run.
+    """
+    statement = select(Course).where(Course.course_uuid == course_uuid)
+    course = db_session.exec(statement).first()
+
+    if not course:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+
+    # RBAC check
+    await courses_rbac_check(request, course.course_uuid, current_user, "update", db_session)
+
+    org_config = get_organization_config(db_session, course.org_id)
+    if org_config is None or not org_config.is_feature_enabled("analytics"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Analytics is not enabled for this organization",
+        )
+
+    summary = db_session.get(CourseAnalytics, course.id)
+    if summary is None:
+        summary = _request_first_build(db_session, course.id)  # type: ignore
+    if summary.stale and background_tasks is not None:
+        background_tasks.add_task(refresh_course_analytics_job, course.id)
+
+    # Deltas can bring a day back to nothing
+    statement = (
+        select(CourseAnalyticsDay)
+        .where(
+            CourseAnalyticsDay.course_id == course.id,
+            or_(CourseAnalyticsDay.enrollments != 0, CourseAnalyticsDay.completions != 0),
+        )
+        .order_by(CourseAnalyticsDay.day)  # type: ignore
+    )
+    enrollments = [
+        CourseAnalyticsDayRead(day=day.day, enrollments=day.enrollments, completions=day.completions)
+        for day in db_session.exec(statement).all()
+    ]
+
+    # Funnel in course order, activities nobody completed included
+    statement = (
+        select(Chapter.id, Chapter.name, func.coalesce(CourseAnalyticsChapter.completions, 0))
+        .join(CourseChapter, CourseChapter.chapter_id == Chapter.id)  # type: ignore
+        .outerjoin(
+            CourseAnalyticsChapter,
+            and_(CourseAnalyticsChapter.course_id == course.id, CourseAnalyticsChapter.chapter_id == Chapter.id),  # type: ignore
+        )
+        .where(CourseChapter.course_id == course.id)
+        .order_by(CourseChapter.order, Chapter.id)  # type: ignore
+    )
+    chapters = {
+        chapter_id: CourseAnalyticsChapterRead(chapter_id=chapter_id, name=name, completions=completions, activities=[])
+        for chapter_id, name, completions in db_session.exec(statement).all()
+    }
+
+    statement = (
+        select(ChapterActivity.chapter_id, Activity.activity_uuid, Activity.name, func.coalesce(CourseAnalyticsActivity.completions, 0))
+        .join(Activity, Activity.id == ChapterActivity.activity_id)  # type: ignore
+        .outerjoin(
+            CourseAnalyticsActivity,
+            and_(
+                CourseAnalyticsActivity.course_id == course.id,  # type: ignore
+                CourseAnalyticsActivity.activity_id == ChapterActivity.activity_id,  # type: ignore
+            ),
+        )
+        .where(ChapterActivity.course_id == course.id)
+        .order_by(ChapterActivity.order, ChapterActivity.id)  # type: ignore
+    )
+    for chapter_id, activity_uuid, name, completions in db_session.exec(statement).all():
+        if chapter_id in chapters:
+            chapters[chapter_id].activities.append(
+                CourseAnalyticsActivityRead(activity_uuid=activity_uuid, name=name, completions=completions)
+            )
+
+    statement = (
+        select(Assignment.id, Assignment.assignment_uuid, Assignment.title, CourseAnalyticsGrade.bucket, CourseAnalyticsGrade.submissions)
+        .outerjoin(
+            CourseAnalyticsGrade,
+            and_(
+                CourseAnalyticsGrade.course_id == course.id,  # type: ignore
+                CourseAnalyticsGrade.assignment_id == Assignment.id,
+                CourseAnalyticsGrade.submissions > 0,
+            ),
+        )
+        .where(Assignment.course_id == course.id)
+        .order_by(Assignment.id, CourseAnalyticsGrade.bucket)  # type: ignore
+    )
+    assignments: dict[int, CourseAnalyticsAssignmentRead] = {}
+    for assignment_id, assignment_uuid, title, bucket, submissions in db_session.exec(statement).all():
+        assignment = assignments.setdefault(
+            assignment_id,
+            CourseAnalyticsAssignmentRead(assignment_uuid=assignment_uuid, title=title, graded=0, distribution=[]),
+        )
+        if bucket is not None:
+            assignment.graded += submissions
+            assignment.distribution.append(
+                CourseAnalyticsGradeBucketRead(
+                    grade_from=bucket * GRADE_BUCKET_SIZE,
+                    grade_to=(bucket + 1) * GRADE_BUCKET_SIZE,
+                    submissions=submissions,
+                )
+            )
+
+    return CourseAnalyticsRead(
+        course_uuid=course.course_uuid,
+        enrolled=summary.enrolled,  # type: ignore
+        completed=summary.completed,  # type: ignore
+        median_completion_hours=_median_completion_hours(db_session, course.id),  # type: ignore
+        refreshed_date=summary.refreshed_date,  # type: ignore
+        stale=summary.stale,  # type: ignore
+        enrollments=enrollments,
+        chapters=list(chapters.values()),
+        assignments=list(assignments.values()),
+    )
@@ -12,8 +12,7 @@ from src.db.courses.certifications import (
     CertificateUserRead,
 )
 from src.db.courses.courses import Course
-from src.db.courses.chapter_activities import ChapterActivity
-from src.db.trail_steps import TrailStep
+from src.db.trail_runs import TrailRun
 from src.db.users import PublicUser, AnonymousUser
 from src.security.courses_security import courses_rbac_check_for_certifications
 
@@ -385,23 +384,20 @@ async def check_course_completion_and_create_certificate(
     - The function is called from mark_activity_as_done_for_user which already has RBAC checks
     """
     
-    # Get all activities in the course
-    statement = select(ChapterActivity).where(ChapterActivity.course_id == course_id)
-    course_activities = db_session.exec(statement).all()
-    
-    if not course_activities:
-        return False  # No activities in course
-    
-    # Get all completed activities for this user in this course
-    statement = select(TrailStep).where(
-        TrailStep.user_id == user_id,
-        TrailStep.course_id == course_id,
-        TrailStep.complete == True
+    # Progress is maintained on the user's trail run of the course
+    statement = select(TrailRun.completed_steps, TrailRun.total_steps).where(
+        TrailRun.user_id == user_id,
+        TrailRun.course_id == course_id,
     )
-    completed_activities = db_session.exec(statement).all()
-    
+    progress = db_session.exec(statement).first()
+
+    if not progress or not progress[1]:
+        return False  # Not started, or no activities in course
+
+    completed_steps, total_steps = progress
+
     # Check if all activities are completed
-    if len(completed_activities) >= len(course_activities):
+    if completed_steps >= total_steps:
         # All activities completed, check if certification exists for this course
         statement = select(Certifications).where(Certifications.course_id == course_id)
         certification = db_session.exec(statement).first()
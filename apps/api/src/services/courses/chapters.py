@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from uuid import uuid4
+from sqlalchemy import case, delete, func, insert, update
 from sqlmodel import Session, select
 from src.db.users import AnonymousUser, PublicUser
 from src.db.courses.course_chapters import CourseChapter
@@ -14,8 +15,17 @@ from src.db.courses.chapters import (
     ChapterUpdateOrder,
 )
 from src.db.courses.courses import Course
-from fastapi import HTTPException, status, Request
+from fastapi import BackgroundTasks, HTTPException, status, Request, Response
 from src.security.courses_security import courses_rbac_check_for_chapters
+from src.services.courses.courses import (
+    bump_course_content_version,
+    check_course_etag,
+    invalidate_course_content,
+)
+from src.services.trail.progress import (
+    recompute_course_progress_job,
+    update_course_structure_progress,
+)
 
 
 ####################################################
@@ -23,6 +33,37 @@ from src.security.courses_security import courses_rbac_check_for_chapters
 ####################################################
 
 
+def _course_uuid(db_session: Session, course_id: int) -> str:
+    statement = select(Course.course_uuid).where(Course.id == course_id)
+    return db_session.exec(statement).one()
+
+
+def next_chapter_order(db_session: Session, course_id: int) -> int:
+    """
+    Order to append a chapter to a course at.
+
+    Locks the course row until the caller commits, so concurrent appends to
+    the same course wait for each other instead of reading the same last
+    order. Take it before inserting rows that reference the course.
+    """
+    db_session.exec(select(Course.id).where(Course.id == course_id).with_for_update())
+    statement = select(func.max(CourseChapter.order)).where(CourseChapter.course_id == course_id)
+    last_order = db_session.exec(statement).one()
+    return (last_order or 0) + 1
+
+
+def next_activity_order(db_session: Session, chapter_id: int) -> int:
+    """
+    Order to append an activity to a chapter at.
+
+    Locks the chapter row until the caller commits, see next_chapter_order.
+    """
+    db_session.exec(select(Chapter.id).where(Chapter.id == chapter_id).with_for_update())
+    statement = select(func.max(ChapterActivity.order)).where(ChapterActivity.chapter_id == chapter_id)
+    last_order = db_session.exec(statement).one()
+    return (last_order or 0) + 1
+
+
 async def create_chapter(
     request: Request,
     chapter_object: ChapterCreate,
@@ -46,49 +87,32 @@ async def create_chapter(
     chapter.update_date = str(datetime.now())
     chapter.org_id = course.org_id
 
-    # Find the last chapter in the course and add it to the list
-    statement = (
-        select(CourseChapter)
-        .where(CourseChapter.course_id == chapter.course_id)
-        .order_by(CourseChapter.order) # type: ignore
-    )
-    course_chapters = db_session.exec(statement).all()
-
-    # get last chapter order
-    last_order = course_chapters[-1].order if course_chapters else 0
-    to_be_used_order = last_order + 1
+    # Append the chapter to the course
+    to_be_used_order = next_chapter_order(db_session, course.id)  # type: ignore
 
     # Add chapter to database
     db_session.add(chapter)
+    db_session.flush()
+
+    # Add CourseChapter link
+    course_chapter = CourseChapter(
+        course_id=chapter.course_id,
+        chapter_id=chapter.id,  # type: ignore
+        org_id=chapter.org_id,
+        creation_date=str(datetime.now()),
+        update_date=str(datetime.now()),
+        order=to_be_used_order,
+    )
+
+    # Insert the chapter and its link in one transaction
+    db_session.add(course_chapter)
+    bump_course_content_version(db_session, course.course_uuid)
     db_session.commit()
     db_session.refresh(chapter)
 
     chapter = ChapterRead(**chapter.model_dump(), activities=[])
 
-    # Check if COurseChapter link exists
-
-    statement = (
-        select(CourseChapter)
-        .where(CourseChapter.chapter_id == chapter.id)
-        .where(CourseChapter.course_id == chapter.course_id)
-        .where(CourseChapter.order == to_be_used_order)
-    )
-    course_chapter = db_session.exec(statement).first()
-
-    if not course_chapter:
-        # Add CourseChapter link
-        course_chapter = CourseChapter(
-            course_id=chapter.course_id,
-            chapter_id=chapter.id,
-            org_id=chapter.org_id,
-            creation_date=str(datetime.now()),
-            update_date=str(datetime.now()),
-            order=to_be_used_order,
-        )
-
-        # Insert CourseChapter link in DB
-        db_session.add(course_chapter)
-        db_session.commit()
+    invalidate_course_content(course.course_uuid)
 
     return chapter
 
@@ -98,6 +122,7 @@ async def get_chapter(
     chapter_id: int,
     current_user: PublicUser | AnonymousUser,
     db_session: Session,
+    response: Optional[Response] = None,
 ) -> ChapterRead:
     statement = select(Chapter).where(Chapter.id == chapter_id)
     chapter = db_session.exec(statement).first()
@@ -119,6 +144,8 @@ async def get_chapter(
     # RBAC check
     await courses_rbac_check_for_chapters(request, course.course_uuid, current_user, "read", db_session)
 
+    check_course_etag(request, response, course, chapter.id)
+
     # Get activities for this chapter
     statement = (
         select(Activity)
@@ -162,9 +189,13 @@ async def update_chapter(
 
     chapter.update_date = str(datetime.now())
 
+    course_uuid = _course_uuid(db_session, chapter.course_id)
+    bump_course_content_version(db_session, course_uuid)
     db_session.commit()
     db_session.refresh(chapter)
 
+    invalidate_course_content(course_uuid)
+
     if chapter:
         chapter = await get_chapter(
             request, chapter.id, current_user, db_session  # type: ignore
@@ -178,6 +209,7 @@ async def delete_chapter(
     chapter_id: str,
     current_user: PublicUser | AnonymousUser,
     db_session: Session,
+    background_tasks: Optional[BackgroundTasks] = None,
 ):
     statement = select(Chapter).where(Chapter.id == chapter_id)
     chapter = db_session.exec(statement).first()
@@ -197,22 +229,81 @@ async def delete_chapter(
     for chapter_activity in chapter_activities:
         db_session.delete(chapter_activity)
 
+    if chapter_activities:
+        db_session.flush()
+        update_course_structure_progress(
+            db_session,
+            chapter.course_id,
+            removed_activity_ids=[ca.activity_id for ca in chapter_activities],
+        )
+
+    course_uuid = _course_uuid(db_session, chapter.course_id)
+
     # Delete the chapter
     db_session.delete(chapter)
+    bump_course_content_version(db_session, course_uuid)
     db_session.commit()
 
+    invalidate_course_content(course_uuid)
+
+    # Learners may have completed every remaining activity
+    if chapter_activities and background_tasks is not None:
+        background_tasks.add_task(recompute_course_progress_job, chapter.course_id)
+
     return {"detail": "chapter deleted"}
 
 
+# What a course outline lists about an activity. Its content and details can
+# weigh megabytes, they are only loaded when asked for.
+ACTIVITY_OUTLINE_COLUMNS = (
+    Activity.id,
+    Activity.name,
+    Activity.activity_type,
+    Activity.activity_sub_type,
+    Activity.published,
+    Activity.org_id,
+    Activity.course_id,
+    Activity.activity_uuid,
+    Activity.creation_date,
+    Activity.update_date,
+    Activity.content_version,
+)
+
+
+def activity_columns(include_content: bool) -> tuple:
+    if include_content:
+        return ACTIVITY_OUTLINE_COLUMNS + (Activity.content, Activity.details)
+    return ACTIVITY_OUTLINE_COLUMNS
+
+
+async def can_edit_course_chapters(
+    request: Request,
+    course_uuid: str,
+    current_user: PublicUser | AnonymousUser,
+    db_session: Session,
+) -> bool:
+    """Whether the user may edit the chapters of a course, so see its unpublished activities"""
+    try:
+        return await courses_rbac_check_for_chapters(request, course_uuid, current_user, "update", db_session)
+    except HTTPException:
+        return False
+
+
 async def get_course_chapters(
     request: Request,
     course_id: int,
     db_session: Session,
     current_user: PublicUser | AnonymousUser,
-    with_unpublished_activities: bool,
+    with_unpublished_activities: Optional[bool],
     page: int = 1,
     limit: int = 10,
+    include_content: bool = False,
 ) -> List[ChapterRead]:
+    """
+    Chapters of a course with their activities. Unpublished activities are
+    listed when `with_unpublished_activities`, or when it is None and the
+    user may edit the course.
+    """
 
     statement = select(Course).where(Course.id == course_id)
     course = db_session.exec(statement).first()
@@ -232,26 +323,28 @@ async def get_course_chapters(
     # RBAC check
     await courses_rbac_check_for_chapters(request, course.course_uuid, current_user, "read", db_session)  # type: ignore
 
-    # Get activities for each chapter
-    for chapter in chapters:
-        statement = (
-            select(ChapterActivity)
-            .where(ChapterActivity.chapter_id == chapter.id)
-            .order_by(ChapterActivity.order) # type: ignore
-            .distinct(ChapterActivity.id, ChapterActivity.order) # type: ignore
+    if not chapters:
+        return chapters
+
+    if with_unpublished_activities is None:
+        with_unpublished_activities = await can_edit_course_chapters(
+            request, course.course_uuid, current_user, db_session  # type: ignore
         )
-        chapter_activities = db_session.exec(statement).all()
 
-        for chapter_activity in chapter_activities:
-            statement = (
-                select(Activity)
-                .where(Activity.id == chapter_activity.activity_id, with_unpublished_activities or Activity.published == True)
-                .distinct(Activity.id) # type: ignore
-            )
-            activity = db_session.exec(statement).first()
+    # Get the activities of every chapter at once
+    statement = (
+        select(ChapterActivity.chapter_id, *activity_columns(include_content))
+        .join(Activity, Activity.id == ChapterActivity.activity_id)  # type: ignore
+        .where(ChapterActivity.chapter_id.in_([chapter.id for chapter in chapters]))  # type: ignore
+        .order_by(ChapterActivity.chapter_id, ChapterActivity.order, ChapterActivity.id)  # type: ignore
+    )
+    if not with_unpublished_activities:
+        statement = statement.where(Activity.published == True)
 
-            if activity:
-                chapter.activities.append(ActivityRead(**activity.model_dump()))
+    chapter_activities = {chapter.id: chapter.activities for chapter in chapters}
+    for row in db_session.exec(statement).all():
+        activity = row._asdict()
+        chapter_activities[activity.pop("chapter_id")].append(ActivityRead(**activity))
 
     return chapters
 
@@ -264,6 +357,8 @@ async def DEPRECEATED_get_course_chapters(
     course_uuid: str,
     current_user: PublicUser,
     db_session: Session,
+    response: Optional[Response] = None,
+    include_content: bool = False,
 ):
     statement = select(Course).where(Course.course_uuid == course_uuid)
     course = db_session.exec(statement).first()
@@ -276,7 +371,11 @@ async def DEPRECEATED_get_course_chapters(
     # RBAC check
     await courses_rbac_check_for_chapters(request, course.course_uuid, current_user, "read", db_session)
 
-    chapters_in_db = await get_course_chapters(request, course.id, db_session, current_user)  # type: ignore
+    check_course_etag(request, response, course, "chapters_meta", include_content)
+
+    chapters_in_db = await get_course_chapters(
+        request, course.id, db_session, current_user, with_unpublished_activities=True  # type: ignore
+    )
 
     # activities
 
@@ -287,7 +386,6 @@ async def DEPRECEATED_get_course_chapters(
         chapter_activityIds = []
 
         for activity in chapter.activities:
-            print("test", activity)
             chapter_activityIds.append(activity.activity_uuid)
 
         chapters[chapter.chapter_uuid] = {
@@ -300,10 +398,9 @@ async def DEPRECEATED_get_course_chapters(
     # activities
     activities_list = {}
     statement = (
-        select(Activity)
+        select(*activity_columns(include_content))
         .join(ChapterActivity, ChapterActivity.activity_id == Activity.id) # type: ignore
-        .where(ChapterActivity.activity_id == Activity.id)
-        .group_by(Activity.id) # type: ignore
+        .where(ChapterActivity.course_id == course.id)
     )
     activities_in_db = db_session.exec(statement).all()
 
@@ -313,23 +410,11 @@ async def DEPRECEATED_get_course_chapters(
             "id": activity.id,
             "name": activity.name,
             "type": activity.activity_type,
-            "content": activity.content,
+            "content": activity.content if include_content else {},
         }
 
     # get chapter order
-    statement = (
-        select(Chapter)
-        .join(CourseChapter, CourseChapter.chapter_id == Chapter.id) # type: ignore
-        .where(CourseChapter.chapter_id == Chapter.id)
-        .group_by(Chapter.id, CourseChapter.order) # type: ignore
-        .order_by(CourseChapter.order) # type: ignore
-    )
-    chapters_in_db = db_session.exec(statement).all()
-
-    chapterOrder = []
-
-    for chapter in chapters_in_db:
-        chapterOrder.append(chapter.chapter_uuid)
+    chapterOrder = [chapter.chapter_uuid for chapter in chapters_in_db]
 
     final = {
         "chapters": chapters,
@@ -340,12 +425,29 @@ async def DEPRECEATED_get_course_chapters(
     return final
 
 
+def _bulk_set_order(
+    db_session: Session, model: type[CourseChapter] | type[ChapterActivity], orders: dict[int, int]
+) -> None:
+    """Set the order of many rows, by primary key, in a single UPDATE"""
+    if not orders:
+        return
+
+    statement = (
+        update(model)
+        .where(model.id.in_(orders))  # type: ignore
+        .values(order=case(orders, value=model.id))
+        .execution_options(synchronize_session=False)
+    )
+    db_session.execute(statement)
+
+
 async def reorder_chapters_and_activities(
     request: Request,
     course_uuid: str,
     chapters_order: ChapterUpdateOrder,
     current_user: PublicUser,
     db_session: Session,
+    background_tasks: Optional[BackgroundTasks] = None,
 ):
     statement = select(Course).where(Course.course_uuid == course_uuid)
     course = db_session.exec(statement).first()
@@ -358,6 +460,8 @@ async def reorder_chapters_and_activities(
     # RBAC check
     await courses_rbac_check_for_chapters(request, course.course_uuid, current_user, "update", db_session)
 
+    now = str(datetime.now())
+
     ###########
     # Chapters
     ###########
@@ -372,33 +476,31 @@ async def reorder_chapters_and_activities(
     # Create a map of existing chapters for faster lookup
     existing_chapter_map = {cc.chapter_id: cc for cc in existing_course_chapters}
 
-    # Update or create course chapters based on new order
+    # Only rows whose order actually changed are updated
+    chapter_orders: dict[int, int] = {}
+    new_course_chapters = []
+
     for index, chapter_order in enumerate(chapters_order.chapter_order_by_ids):
-        if chapter_order.chapter_id in existing_chapter_map:
-            # Update existing chapter order
-            course_chapter = existing_chapter_map[chapter_order.chapter_id]
-            course_chapter.order = index
-            db_session.add(course_chapter)
-        else:
-            # Create new course chapter
-            course_chapter = CourseChapter(
-                chapter_id=chapter_order.chapter_id,
-                course_id=course.id, # type: ignore
-                org_id=course.org_id,
-                creation_date=str(datetime.now()),
-                update_date=str(datetime.now()),
-                order=index,
+        course_chapter = existing_chapter_map.get(chapter_order.chapter_id)
+        if course_chapter is None:
+            new_course_chapters.append(
+                {
+                    "chapter_id": chapter_order.chapter_id,
+                    "course_id": course.id,
+                    "org_id": course.org_id,
+                    "creation_date": now,
+                    "update_date": now,
+                    "order": index,
+                }
             )
-            db_session.add(course_chapter)
-        
-        db_session.commit()
+        elif course_chapter.order != index:
+            chapter_orders[course_chapter.id] = index  # type: ignore
 
     # Remove chapters that are no longer in the order
     chapter_ids_to_keep = {co.chapter_id for co in chapters_order.chapter_order_by_ids}
-    for cc in existing_course_chapters:
-        if cc.chapter_id not in chapter_ids_to_keep:
-            db_session.delete(cc)
-    db_session.commit()
+    stale_course_chapters = [
+        cc.id for cc in existing_course_chapters if cc.chapter_id not in chapter_ids_to_keep
+    ]
 
     ###########
     # Activities
@@ -419,37 +521,77 @@ async def reorder_chapters_and_activities(
 
     # Track which activities we want to keep
     activities_to_keep = set()
+    activity_orders: dict[int, int] = {}
+    new_chapter_activities = []
 
-    # Update or create chapter activities based on new order
     for chapter_order in chapters_order.chapter_order_by_ids:
         for index, activity_order in enumerate(chapter_order.activities_order_by_ids):
             activity_key = (chapter_order.chapter_id, activity_order.activity_id)
             activities_to_keep.add(activity_key)
 
-            if activity_key in existing_activity_map:
-                # Update existing activity order
-                chapter_activity = existing_activity_map[activity_key]
-                chapter_activity.order = index
-                db_session.add(chapter_activity)
-            else:
-                # Create new chapter activity
-                chapter_activity = ChapterActivity(
-                    chapter_id=chapter_order.chapter_id,
-                    activity_id=activity_order.activity_id,
-                    org_id=course.org_id,
-                    course_id=course.id, # type: ignore
-                    creation_date=str(datetime.now()),
-                    update_date=str(datetime.now()),
-                    order=index,
+            chapter_activity = existing_activity_map.get(activity_key)
+            if chapter_activity is None:
+                new_chapter_activities.append(
+                    {
+                        "chapter_id": chapter_order.chapter_id,
+                        "activity_id": activity_order.activity_id,
+                        "org_id": course.org_id,
+                        "course_id": course.id,
+                        "creation_date": now,
+                        "update_date": now,
+                        "order": index,
+                    }
                 )
-                db_session.add(chapter_activity)
-            
-            db_session.commit()
+            elif chapter_activity.order != index:
+                activity_orders[chapter_activity.id] = index  # type: ignore
 
     # Remove activities that are no longer in any chapter
-    for ca in existing_chapter_activities:
-        if (ca.chapter_id, ca.activity_id) not in activities_to_keep:
-            db_session.delete(ca)
-    db_session.commit()
+    stale_chapter_activities = [
+        ca.id
+        for ca in existing_chapter_activities
+        if (ca.chapter_id, ca.activity_id) not in activities_to_keep
+    ]
+
+    course_activity_ids = {ca.activity_id for ca in existing_chapter_activities}
+    kept_activity_ids = {activity_id for _, activity_id in activities_to_keep}
+    added_activity_ids = kept_activity_ids - course_activity_ids
+    removed_activity_ids = course_activity_ids - kept_activity_ids
+
+    # Apply the whole reorder at once, a failure leaves the previous order intact
+    try:
+        _bulk_set_order(db_session, CourseChapter, chapter_orders)
+        _bulk_set_order(db_session, ChapterActivity, activity_orders)
+
+        if new_course_chapters:
+            db_session.execute(insert(CourseChapter), new_course_chapters)
+        if new_chapter_activities:
+            db_session.execute(insert(ChapterActivity), new_chapter_activities)
+
+        if stale_course_chapters:
+            db_session.execute(
+                delete(CourseChapter).where(CourseChapter.id.in_(stale_course_chapters))  # type: ignore
+            )
+        if stale_chapter_activities:
+            db_session.execute(
+                delete(ChapterActivity).where(ChapterActivity.id.in_(stale_chapter_activities))  # type: ignore
+            )
+
+        # Activities that joined or left the course change learners' progress
+        if added_activity_ids or removed_activity_ids:
+            update_course_structure_progress(
+                db_session, course.id, added_activity_ids, removed_activity_ids  # type: ignore
+            )
+
+        bump_course_content_version(db_session, course.course_uuid)
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+
+    invalidate_course_content(course.course_uuid)
+
+    # Learners may have completed every remaining activity
+    if removed_activity_ids and background_tasks is not None:
+        background_tasks.add_task(recompute_course_progress_job, course.id)
 
     return {"detail": "Chapters and activities reordered successfully"}
@@ -13,6 +13,7 @@ from src.db.collections_courses import CollectionCourse
 from src.db.courses.courses import Course
 from fastapi import HTTPException, status, Request
 from src.security.courses_security import courses_rbac_check_for_collections
+from src.core.response_cache import purge_response_cache
 
 
 ####################################################
@@ -135,6 +136,8 @@ async def create_collection(
     )
     courses = list(db_session.exec(statement).all())
 
+    purge_response_cache(f"org:{collection.org_id}")
+
     collection = CollectionRead(**collection.model_dump(), courses=courses)
 
     return CollectionRead.model_validate(collection)
@@ -161,6 +164,7 @@ async def update_collection(
     )
 
     courses = collection_object.courses
+    was_public = collection.public
 
     del collection_object.courses
 
@@ -200,6 +204,12 @@ async def update_collection(
     db_session.commit()
     db_session.refresh(collection)
 
+    if collection.public != was_public:
+        # The collection enters or leaves the public listings
+        purge_response_cache(f"org:{collection.org_id}")
+    else:
+        purge_response_cache(f"collection:{collection.collection_uuid}")
+
     # Get courses once again
     statement = (
         select(Course)
@@ -234,10 +244,14 @@ async def delete_collection(
         request, collection.collection_uuid, current_user, "delete", db_session
     )
 
+    collection_uuid = collection.collection_uuid
+
     # delete collection from database
     db_session.delete(collection)
     db_session.commit()
 
+    purge_response_cache(f"collection:{collection_uuid}")
+
     return {"detail": "Collection deleted"}
 
 
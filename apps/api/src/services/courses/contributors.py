@@ -6,6 +6,9 @@ from src.db.courses.courses import Course
 from src.db.resource_authors import ResourceAuthor, ResourceAuthorshipEnum, ResourceAuthorshipStatusEnum
 from src.security.rbac.rbac import authorization_verify_if_user_is_anon
 from src.security.courses_security import courses_rbac_check
+from src.core.response_cache import purge_response_cache
+from src.services.courses.courses import bump_course_content_version, invalidate_course_content
+from src.services.payments.payments_entitlements import invalidate_user_entitlements
 from typing import List
 
 
@@ -63,9 +66,13 @@ async def apply_course_contributor(
     )
 
     db_session.add(resource_author)
+    bump_course_content_version(db_session, course_uuid)
     db_session.commit()
     db_session.refresh(resource_author)
 
+    invalidate_course_content(course_uuid)
+    purge_response_cache(f"org:{course.org_id}")
+
     return {
         "detail": "Contributor application submitted successfully",
         "status": "pending"
@@ -133,9 +140,14 @@ async def update_course_contributor(
     existing_authorship.update_date = str(datetime.now())
 
     db_session.add(existing_authorship)
+    bump_course_content_version(db_session, course_uuid)
     db_session.commit()
     db_session.refresh(existing_authorship)
 
+    invalidate_course_content(course_uuid)
+    invalidate_user_entitlements(contributor_user_id)
+    purge_response_cache(f"org:{course.org_id}")
+
     return {
         "detail": "Contributor updated successfully",
         "status": "success"
@@ -267,6 +279,7 @@ async def add_bulk_course_contributors(
             )
 
             db_session.add(resource_author)
+            bump_course_content_version(db_session, course_uuid)
             db_session.commit()
             db_session.refresh(resource_author)
 
@@ -280,7 +293,10 @@ async def add_bulk_course_contributors(
                 "username": username,
                 "reason": str(e)
             })
-            
+
+    invalidate_course_content(course_uuid)
+    purge_response_cache(f"org:{course.org_id}")
+
     return results 
 
 async def remove_bulk_course_contributors(
@@ -361,7 +377,9 @@ async def remove_bulk_course_contributors(
 
             # Remove the contributor
             db_session.delete(existing_authorship)
+            bump_course_content_version(db_session, course_uuid)
             db_session.commit()
+            invalidate_user_entitlements(user.id)
 
             results["successful"].append({
                 "username": username,
@@ -373,5 +391,8 @@ async def remove_bulk_course_contributors(
                 "username": username,
                 "reason": str(e)
             })
-            
+
+    invalidate_course_content(course_uuid)
+    purge_response_cache(f"org:{course.org_id}")
+
     return results 
\ No newline at end of file
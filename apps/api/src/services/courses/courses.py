@@ -1,6 +1,8 @@
-from typing import List
+import hashlib
+from typing import List, Optional, Sequence
 from uuid import uuid4
-from sqlmodel import Session, select, or_, and_, text
+from sqlalchemy import exists, update
+from sqlmodel import Session, select, or_, and_
 from src.db.usergroup_resources import UserGroupResource
 from src.db.usergroup_user import UserGroupUser
 from src.db.organizations import Organization
@@ -25,11 +27,157 @@ from src.security.rbac.rbac import (
     authorization_verify_based_on_org_admin_status,
 )
 from src.services.courses.thumbnails import upload_thumbnail
-from fastapi import HTTPException, Request, UploadFile, status
+from src.services.orgs.slugs import resolve_org_slug
+from src.core.response_cache import purge_response_cache
+from fastapi import HTTPException, Request, Response, UploadFile, status
 from datetime import datetime
 from src.security.courses_security import courses_rbac_check
 
 
+def course_visibility_predicate(user_id: int):
+    """
+    Visibility rule for authenticated course listings.
+
+    A course is visible when it is:
+    1. Public
+    2. Not in any UserGroup
+    3. In a UserGroup where the user is a member
+    4. Authored by the user
+
+    Each rule is a correlated EXISTS on the indexed resource_uuid columns,
+    so the listing never multiplies rows per usergroup or author and
+    doesn't need a DISTINCT before offset/limit.
+    """
+    in_any_usergroup = exists().where(
+        UserGroupResource.resource_uuid == Course.course_uuid
+    )
+    in_user_usergroup = (
+        exists()
+        .where(UserGroupResource.resource_uuid == Course.course_uuid)
+        .where(UserGroupUser.usergroup_id == UserGroupResource.usergroup_id)
+        .where(UserGroupUser.user_id == user_id)
+    )
+    is_author = (
+        exists()
+        .where(ResourceAuthor.resource_uuid == Course.course_uuid)
+        .where(ResourceAuthor.user_id == user_id)
+    )
+
+    return or_(
+        Course.public == True,  # noqa: E712
+        ~in_any_usergroup,
+        in_user_usergroup,
+        is_author,
+    )
+
+
+def bump_course_content_version(db_session: Session, course_uuid: str) -> None:
+    """
+    Bump the content version of a course whose content, chapters or
+    activities change. Runs in the caller's transaction so the ETags change
+    exactly when the change commits, call invalidate_course_content after
+    the commit.
+    """
+    db_session.execute(
+        update(Course)
+        .where(Course.course_uuid == course_uuid)  # type: ignore
+        .values(content_version=Course.content_version + 1)
+    )
+
+
+def invalidate_course_content(course_uuid: str) -> None:
+    """Purge the cached responses showing a course, once its change is committed"""
+    purge_response_cache(f"course:{course_uuid}")
+
+
+def invalidate_author_courses(db_session: Session, user_id: int) -> None:
+    """Purge the cached responses listing a user among course authors, once the user's change is committed"""
+    statement = (
+        select(Course.course_uuid, Course.org_id)
+        .join(ResourceAuthor, ResourceAuthor.resource_uuid == Course.course_uuid)  # type: ignore
+        .where(ResourceAuthor.user_id == user_id)
+    )
+    courses = db_session.exec(statement).all()
+    purge_response_cache(
+        *{f"course:{course_uuid}" for course_uuid, _ in courses},
+        *{f"org:{org_id}" for _, org_id in courses},
+    )
+
+
+def check_course_etag(
+    request: Request, response: Optional[Response], course: Course, *variant
+) -> None:
+    """
+    Answer 304 when the client already has this course content response.
+
+    The ETag derives from the course content version and whatever else the
+    response varies on, so it must be checked after the RBAC check and
+    before the response is built. Does nothing without a response to set
+    the ETag on.
+    """
+    if response is None:
+        return
+
+    digest = hashlib.sha256(
+        ":".join(map(str, (course.course_uuid, course.content_version, *variant))).encode("utf-8")
+    ).hexdigest()
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+
+
+def hydrate_course_authors(
+    courses: Sequence[Course],
+    db_session: Session,
+) -> List[CourseRead]:
+    """
+    Build CourseRead objects for a page of courses.
+
+    Every ResourceAuthor and User of the page is loaded in a single query,
+    whatever the number of courses or authors.
+    """
+    if not courses:
+        return []
+
+    course_uuids = [course.course_uuid for course in courses]
+
+    authors_statement = (
+        select(ResourceAuthor, User)
+        .join(User, ResourceAuthor.user_id == User.id)  # type: ignore
+        .where(ResourceAuthor.resource_uuid.in_(course_uuids))  # type: ignore
+        .order_by(
+            ResourceAuthor.id.asc()  # type: ignore
+        )
+    )
+    author_results = db_session.exec(authors_statement).all()
+
+    # Map each course_uuid to its list of authors
+    course_authors: dict[str, List[AuthorWithRole]] = {}
+    for resource_author, user in author_results:
+        course_authors.setdefault(resource_author.resource_uuid, []).append(
+            AuthorWithRole(
+                user=UserRead.model_validate(user),
+                authorship=resource_author.authorship,
+                authorship_status=resource_author.authorship_status,
+                creation_date=resource_author.creation_date,
+                update_date=resource_author.update_date,
+            )
+        )
+
+    return [
+        CourseRead(
+            **course.model_dump(),
+            authors=course_authors.get(course.course_uuid, []),
+        )
+        for course in courses
+    ]
+
+
 async def get_course(
     request: Request,
     course_uuid: str,
@@ -48,32 +196,7 @@ async def get_course(
     # RBAC check
     await courses_rbac_check(request, course.course_uuid, current_user, "read", db_session)
 
-    # Get course authors with their roles
-    authors_statement = (
-        select(ResourceAuthor, User)
-        .join(User, ResourceAuthor.user_id == User.id) # type: ignore
-        .where(ResourceAuthor.resource_uuid == course.course_uuid)
-        .order_by(
-            ResourceAuthor.id.asc() # type: ignore  
-        )
-    )
-    author_results = db_session.exec(authors_statement).all()
-
-    # Convert to AuthorWithRole objects
-    authors = [
-        AuthorWithRole(
-            user=UserRead.model_validate(user),
-            authorship=resource_author.authorship,
-            authorship_status=resource_author.authorship_status,
-            creation_date=resource_author.creation_date,
-            update_date=resource_author.update_date
-        )
-        for resource_author, user in author_results
-    ]
-
-    course = CourseRead(**course.model_dump(), authors=authors)
-
-    return course
+    return hydrate_course_authors([course], db_session)[0]
 
 
 async def get_course_by_id(
@@ -94,32 +217,7 @@ async def get_course_by_id(
     # RBAC check
     await courses_rbac_check(request, course.course_uuid, current_user, "read", db_session)
 
-    # Get course authors with their roles
-    authors_statement = (
-        select(ResourceAuthor, User)
-        .join(User, ResourceAuthor.user_id == User.id) # type: ignore
-        .where(ResourceAuthor.resource_uuid == course.course_uuid)
-        .order_by(
-            ResourceAuthor.id.asc() # type: ignore
-        )
-    )
-    author_results = db_session.exec(authors_statement).all()
-
-    # Convert to AuthorWithRole objects
-    authors = [
-        AuthorWithRole(
-            user=UserRead.model_validate(user),
-            authorship=resource_author.authorship,
-            authorship_status=resource_author.authorship_status,
-            creation_date=resource_author.creation_date,
-            update_date=resource_author.update_date
-        )
-        for resource_author, user in author_results
-    ]
-
-    course = CourseRead(**course.model_dump(), authors=authors)
-
-    return course
+    return hydrate_course_authors([course], db_session)[0]
 
 
 async def get_course_meta(
@@ -128,6 +226,8 @@ async def get_course_meta(
     with_unpublished_activities: bool,
     current_user: PublicUser | AnonymousUser,
     db_session: Session,
+    response: Optional[Response] = None,
+    include_content: bool = False,
 ) -> FullCourseRead:
     # Avoid circular import
     from src.services.courses.chapters import get_course_chapters
@@ -155,10 +255,19 @@ async def get_course_meta(
     # RBAC check
     await courses_rbac_check(request, course.course_uuid, current_user, "read", db_session)
 
+    check_course_etag(request, response, course, with_unpublished_activities, include_content)
+
     # Get course chapters
     chapters = []
     if course.id is not None:
-        chapters = await get_course_chapters(request, course.id, db_session, current_user, with_unpublished_activities)
+        chapters = await get_course_chapters(
+            request,
+            course.id,
+            db_session,
+            current_user,
+            with_unpublished_activities,
+            include_content=include_content,
+        )
     
     # Convert to AuthorWithRole objects
     authors = [
@@ -192,98 +301,27 @@ async def get_courses_orgslug(
 ) -> List[CourseRead]:
     offset = (page - 1) * limit
 
+    org = resolve_org_slug(db_session, org_slug)
+
+    if org is None:
+        return []
+
     # Base query
-    query = (
-        select(Course)
-        .join(Organization)
-        .where(Organization.slug == org_slug)
-    )
+    query = select(Course).where(Course.org_id == org.id)
 
     if isinstance(current_user, AnonymousUser):
         # For anonymous users, only show public courses
         query = query.where(Course.public == True)
     else:
-        # For authenticated users, show:
-        # 1. Public courses
-        # 2. Courses not in any UserGroup
-        # 3. Courses in UserGroups where the user is a member
-        # 4. Courses where the user is a resource author
-        query = (
-            query
-            .outerjoin(UserGroupResource, UserGroupResource.resource_uuid == Course.course_uuid)  # type: ignore
-            .outerjoin(UserGroupUser, and_(
-                UserGroupUser.usergroup_id == UserGroupResource.usergroup_id,
-                UserGroupUser.user_id == current_user.id
-            ))
-            .outerjoin(ResourceAuthor, ResourceAuthor.resource_uuid == Course.course_uuid)  # type: ignore
-            .where(or_(
-                Course.public == True,
-                UserGroupResource.resource_uuid == None,  # Courses not in any UserGroup # noqa: E711
-                UserGroupUser.user_id == current_user.id,  # Courses in UserGroups where user is a member
-                ResourceAuthor.user_id == current_user.id  # Courses where user is a resource author
-            ))
-        )
+        # For authenticated users, only keep courses the user can see
+        query = query.where(course_visibility_predicate(current_user.id))
 
     # Apply pagination
-    query = query.offset(offset).limit(limit).distinct()
+    query = query.offset(offset).limit(limit)
 
     courses = db_session.exec(query).all()
-    
-    if not courses:
-        return []
-        
-    # Get all course UUIDs
-    course_uuids = [course.course_uuid for course in courses]
-    
-    # Fetch all authors for all courses in a single query
-    authors_query = (
-        select(ResourceAuthor, User)
-        .join(User, ResourceAuthor.user_id == User.id)  # type: ignore
-        .where(ResourceAuthor.resource_uuid.in_(course_uuids))  # type: ignore
-        .order_by(
-            ResourceAuthor.id.asc() # type: ignore
-        )
-    )
-    
-    author_results = db_session.exec(authors_query).all()
-    
-    # Create a dictionary mapping course_uuid to list of authors
-    course_authors = {}
-    for resource_author, user in author_results:
-        if resource_author.resource_uuid not in course_authors:
-            course_authors[resource_author.resource_uuid] = []
-        course_authors[resource_author.resource_uuid].append(
-            AuthorWithRole(
-                user=UserRead.model_validate(user),
-                authorship=resource_author.authorship,
-                authorship_status=resource_author.authorship_status,
-                creation_date=resource_author.creation_date,
-                update_date=resource_author.update_date
-            )
-        )
-    
-    # Create CourseRead objects with authors
-    course_reads = []
-    for course in courses:
-        course_read = CourseRead.model_validate({
-            "id": course.id or 0,  # Ensure id is never None
-            "org_id": course.org_id,
-            "name": course.name,
-            "description": course.description or "",
-            "about": course.about or "",
-            "learnings": course.learnings or "",
-            "tags": course.tags or "",
-            "thumbnail_image": course.thumbnail_image or "",
-            "public": course.public,
-            "open_to_contributors": course.open_to_contributors,
-            "course_uuid": course.course_uuid,
-            "creation_date": course.creation_date,
-            "update_date": course.update_date,
-            "authors": course_authors.get(course.course_uuid, [])
-        })
-        course_reads.append(course_read)
-
-    return course_reads
+
+    return hydrate_course_authors(courses, db_session)
 
 
 async def search_courses(
@@ -297,18 +335,24 @@ async def search_courses(
 ) -> List[CourseRead]:
     offset = (page - 1) * limit
 
+    org = resolve_org_slug(db_session, org_slug)
+
+    if org is None:
+        return []
+
+    pattern = f"%{search_query}%"
+
     # Base query
     query = (
         select(Course)
-        .join(Organization)
-        .where(Organization.slug == org_slug)
+        .where(Course.org_id == org.id)
         .where(
             or_(
-                text(f"LOWER(course.name) LIKE LOWER('%{search_query}%')"),
-                text(f"LOWER(course.description) LIKE LOWER('%{search_query}%')"),
-                text(f"LOWER(course.about) LIKE LOWER('%{search_query}%')"),
-                text(f"LOWER(course.learnings) LIKE LOWER('%{search_query}%')"),
-                text(f"LOWER(course.tags) LIKE LOWER('%{search_query}%')")
+                Course.name.ilike(pattern),  # type: ignore
+                Course.description.ilike(pattern),  # type: ignore
+                Course.about.ilike(pattern),  # type: ignore
+                Course.learnings.ilike(pattern),  # type: ignore
+                Course.tags.ilike(pattern),  # type: ignore
             )
         )
     )
@@ -317,77 +361,15 @@ async def search_courses(
         # For anonymous users, only show public courses
         query = query.where(Course.public == True)
     else:
-        # For authenticated users, show:
-        # 1. Public courses
-        # 2. Courses not in any UserGroup
-        # 3. Courses in UserGroups where the user is a member
-        # 4. Courses where the user is a resource author
-        query = (
-            query
-            .outerjoin(UserGroupResource, UserGroupResource.resource_uuid == Course.course_uuid)  # type: ignore
-            .outerjoin(UserGroupUser, and_(
-                UserGroupUser.usergroup_id == UserGroupResource.usergroup_id,
-                UserGroupUser.user_id == current_user.id
-            ))
-            .outerjoin(ResourceAuthor, ResourceAuthor.resource_uuid == Course.course_uuid)  # type: ignore
-            .where(or_(
-                Course.public == True,
-                UserGroupResource.resource_uuid == None,  # Courses not in any UserGroup # noqa: E711
-                UserGroupUser.user_id == current_user.id,  # Courses in UserGroups where user is a member
-                ResourceAuthor.user_id == current_user.id  # Courses where user is a resource author
-            ))
-        )
+        # For authenticated users, only keep courses the user can see
+        query = query.where(course_visibility_predicate(current_user.id))
 
     # Apply pagination
-    query = query.offset(offset).limit(limit).distinct()
+    query = query.offset(offset).limit(limit)
 
     courses = db_session.exec(query).all()
 
-    # Fetch authors for each course
-    course_reads = []
-    for course in courses:
-        # Get course authors with their roles
-        authors_statement = (
-            select(ResourceAuthor, User)
-            .join(User, ResourceAuthor.user_id == User.id) # type: ignore
-            .where(ResourceAuthor.resource_uuid == course.course_uuid)
-            .order_by(
-                ResourceAuthor.id.asc() # type: ignore
-            )
-        )
-        author_results = db_session.exec(authors_statement).all()
-
-        # Convert to AuthorWithRole objects
-        authors = [
-            AuthorWithRole(
-                user=UserRead.model_validate(user),
-                authorship=resource_author.authorship,
-                authorship_status=resource_author.authorship_status,
-                creation_date=resource_author.creation_date,
-                update_date=resource_author.update_date
-            )
-            for resource_author, user in author_results
-        ]
-        
-        course_read = CourseRead.model_validate({
-            "id": course.id or 0,  # Ensure id is never None
-            "org_id": course.org_id,
-            "name": course.name,
-            "description": course.description or "",
-            "about": course.about or "",
-            "learnings": course.learnings or "",
-            "tags": course.tags or "",
-            "thumbnail_image": course.thumbnail_image or "",
-            "public": course.public,
-            "open_to_contributors": course.open_to_contributors,
-            "course_uuid": course.course_uuid,
-            "creation_date": course.creation_date,
-            "update_date": course.update_date,
-            "authors": authors
-        })
-        course_reads.append(course_read)
-
-    return course_reads
+    return hydrate_course_authors(courses, db_session)
 
 
 async def create_course(
@@ -465,35 +447,12 @@ async def create_course(
     db_session.commit()
     db_session.refresh(resource_author)
 
-    # Get course authors with their roles
-    authors_statement = (
-        select(ResourceAuthor, User)
-        .join(User, ResourceAuthor.user_id == User.id) # type: ignore
-        .where(ResourceAuthor.resource_uuid == course.course_uuid)
-        .order_by(
-            ResourceAuthor.id.asc() # type: ignore
-        )
-    )
-    author_results = db_session.exec(authors_statement).all()
-
-    # Convert to AuthorWithRole objects
-    authors = [
-        AuthorWithRole(
-            user=UserRead.model_validate(user),
-            authorship=resource_author.authorship,
-            authorship_status=resource_author.authorship_status,
-            creation_date=resource_author.creation_date,
-            update_date=resource_author.update_date
-        )
-        for resource_author, user in author_results
-    ]
-
     # Feature usage
     increase_feature_usage("courses", course.org_id, db_session)
 
-    course = CourseRead(**course.model_dump(), authors=authors)
+    purge_response_cache(f"org:{course.org_id}")
 
-    return CourseRead.model_validate(course)
+    return hydrate_course_authors([course], db_session)[0]
 
 
 async def update_course_thumbnail(
@@ -547,35 +506,14 @@ async def update_course_thumbnail(
     course.update_date = str(datetime.now())
 
     db_session.add(course)
+    bump_course_content_version(db_session, course.course_uuid)
     db_session.commit()
     db_session.refresh(course)
 
-    # Get course authors with their roles
-    authors_statement = (
-        select(ResourceAuthor, User)
-        .join(User, ResourceAuthor.user_id == User.id) # type: ignore
-        .where(ResourceAuthor.resource_uuid == course.course_uuid)
-        .order_by(
-            ResourceAuthor.id.asc() # type: ignore
-        )
-    )
-    author_results = db_session.exec(authors_statement).all()
-
-    # Convert to AuthorWithRole objects
-    authors = [
-        AuthorWithRole(
-            user=UserRead.model_validate(user),
-            authorship=resource_author.authorship,
-            authorship_status=resource_author.authorship_status,
-            creation_date=resource_author.creation_date,
-            update_date=resource_author.update_date
-        )
-        for resource_author, user in author_results
-    ]
+    invalidate_course_content(course.course_uuid)
+    purge_response_cache(f"org:{course.org_id}")
 
-    course = CourseRead(**course.model_dump(), authors=authors)
-
-    return course
+    return hydrate_course_authors([course], db_session)[0]
 
 
 async def update_course(
@@ -652,35 +590,14 @@ async def update_course(
     course.update_date = str(datetime.now())
 
     db_session.add(course)
+    bump_course_content_version(db_session, course.course_uuid)
     db_session.commit()
     db_session.refresh(course)
 
-    # Get course authors with their roles
-    authors_statement = (
-        select(ResourceAuthor, User)
-        .join(User, ResourceAuthor.user_id == User.id) # type: ignore
-        .where(ResourceAuthor.resource_uuid == course.course_uuid)
-        .order_by(
-            ResourceAuthor.id.asc() # type: ignore
-        )
-    )
-    author_results = db_session.exec(authors_statement).all()
-
-    # Convert to AuthorWithRole objects
-    authors = [
-        AuthorWithRole(
-            user=UserRead.model_validate(user),
-            authorship=resource_author.authorship,
-            authorship_status=resource_author.authorship_status,
-            creation_date=resource_author.creation_date,
-            update_date=resource_author.update_date
-        )
-        for resource_author, user in author_results
-    ]
-
-    course = CourseRead(**course.model_dump(), authors=authors)
+    invalidate_course_content(course.course_uuid)
+    purge_response_cache(f"org:{course.org_id}")
 
-    return course
+    return hydrate_course_authors([course], db_session)[0]
 
 
 async def delete_course(
@@ -704,9 +621,13 @@ async def delete_course(
     # Feature usage
     decrease_feature_usage("courses", course.org_id, db_session)
 
+    org_id, course_uuid = course.org_id, course.course_uuid
+
     db_session.delete(course)
     db_session.commit()
 
+    purge_response_cache(f"org:{org_id}", f"course:{course_uuid}")
+
     return {"detail": "Course deleted"}
 
 
@@ -721,77 +642,21 @@ async def get_user_courses(
     # Verify user is not anonymous
     await authorization_verify_if_user_is_anon(current_user.id)
     
-    # Get all resource authors for the user
-    statement = select(ResourceAuthor).where(
+    # Courses the user is an active author of
+    authored_course_uuids = select(ResourceAuthor.resource_uuid).where(
         and_(
             ResourceAuthor.user_id == user_id,
             ResourceAuthor.authorship_status == ResourceAuthorshipStatusEnum.ACTIVE
         )
     )
-    resource_authors = db_session.exec(statement).all()
-    
-    # Extract course UUIDs from resource authors
-    course_uuids = [author.resource_uuid for author in resource_authors]
-    
-    if not course_uuids:
-        return []
-    
-    # Get courses with the extracted UUIDs
-    statement = select(Course).where(Course.course_uuid.in_(course_uuids)) # type: ignore
-    
+    statement = select(Course).where(Course.course_uuid.in_(authored_course_uuids))  # type: ignore
+
     # Apply pagination
     statement = statement.offset((page - 1) * limit).limit(limit)
-    
+
     courses = db_session.exec(statement).all()
-    
-    # Convert to CourseRead objects
-    result = []
-    for course in courses:
-        # Get authors for the course
-        authors_statement = select(ResourceAuthor).where(
-            ResourceAuthor.resource_uuid == course.course_uuid
-        )
-        authors = db_session.exec(authors_statement).all()
-        
-        # Convert authors to AuthorWithRole objects
-        authors_with_role = []
-        for author in authors:
-            # Get user for the author
-            user_statement = select(User).where(User.id == author.user_id)
-            user = db_session.exec(user_statement).first()
-            
-            if user:
-                authors_with_role.append(
-                    AuthorWithRole(
-                        user=UserRead.model_validate(user),
-                        authorship=author.authorship,
-                        authorship_status=author.authorship_status,
-                        creation_date=author.creation_date,
-                        update_date=author.update_date,
-                    )
-                )
-        
-        # Create CourseRead object
-        course_read = CourseRead.model_validate({
-            "id": course.id or 0,  # Ensure id is never None
-            "org_id": course.org_id,
-            "name": course.name,
-            "description": course.description or "",
-            "about": course.about or "",
-            "learnings": course.learnings or "",
-            "tags": course.tags or "",
-            "thumbnail_image": course.thumbnail_image or "",
-            "public": course.public,
-            "open_to_contributors": course.open_to_contributors,
-            "course_uuid": course.course_uuid,
-            "creation_date": course.creation_date,
-            "update_date": course.update_date,
-            "authors": authors_with_role
-        })
-        
-        result.append(course_read)
-    
-    return result
+
+    return hydrate_course_authors(courses, db_session)
 
 
 async def get_course_user_rights(
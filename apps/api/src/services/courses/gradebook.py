@@ -0,0 +1,246 @@
+import csv
+import io
+import json
+from typing import Iterator, Literal, Optional
+from fastapi import HTTPException, Request
+from pydantic import BaseModel
+from sqlalchemy import union
+from sqlmodel import Session, func, select
+from src.core.events.database import engine
+from src.db.courses.assignments import (
+    Assignment,
+    AssignmentTask,
+    AssignmentTaskSubmission,
+    AssignmentUserSubmission,
+    AssignmentUserSubmissionStatus,
+)
+from src.db.courses.courses import Course
+from src.db.trail_runs import TrailRun
+from src.db.users import AnonymousUser, PublicUser, User
+from src.security.courses_security import courses_rbac_check_for_assignments
+from src.services.utils.keyset import keyset_pages
+
+GRADEBOOK_EXPORT_PAGE_SIZE = 500
+GRADEBOOK_LEARNER_FIELDS = ["user_id", "username", "email", "first_name", "last_name"]
+
+
+def _learner_fields(learner: User) -> list:
+    return [learner.id, learner.username, learner.email, learner.first_name, learner.last_name]
+
+
+class GradebookAssignment(BaseModel):
+    assignment_id: int
+    assignment_uuid: str
+    activity_id: int
+    title: str
+    max_grade: int
+
+
+class GradebookCell(BaseModel):
+    assignment_uuid: str
+    status: AssignmentUserSubmissionStatus
+    # The final grade once graded, the sum of the graded tasks before
+    grade: int
+
+
+async def export_course_gradebook(
+    request: Request,
+    course_uuid: str,
+    current_user: PublicUser | AnonymousUser,
+    db_session: Session,
+    format: Literal["csv", "json"] = "csv",
+) -> Iterator[str]:
+    """Check access, then return the gradebook of a course as chunks read page by page"""
+    statement = select(Course).where(Course.course_uuid == course_uuid)
+    course = db_session.exec(statement).first()
+
+    if not course:
+        raise HTTPException(
+            status_code=404,
+            detail="Course not found",
+        )
+
+    # Grades of every learner are for course owners and instructors only
+    await courses_rbac_check_for_assignments(request, course.course_uuid, current_user, "update", db_session)
+
+    if format == "json":
+        return gradebook_json(course.id)  # type: ignore
+    return gradebook_csv(course.id)  # type: ignore
+
+
+def gradebook_assignments(db_session: Session, course_id: int) -> list[GradebookAssignment]:
+    """Assignments of a course with their max grade, in one query"""
+    statement = (
+        select(
+            Assignment.id,
+            Assignment.assignment_uuid,
+            Assignment.activity_id,
+            Assignment.title,
+            func.coalesce(func.sum(AssignmentTask.max_grade_value), 0),
+        )
+        .outerjoin(AssignmentTask, AssignmentTask.assignment_id == Assignment.id)  # type: ignore
+        .where(Assignment.course_id == course_id)
+        .group_by(Assignment.id)  # type: ignore
+        .order_by(Assignment.id)  # type: ignore
+    )
+    return [
+        GradebookAssignment(
+            assignment_id=assignment_id,
+            assignment_uuid=assignment_uuid,
+            activity_id=activity_id,
+            title=title,
+            max_grade=max_grade,
+        )
+        for assignment_id, assignment_uuid, activity_id, title, max_grade in db_session.exec(statement)  # type: ignore
+    ]
+
+
+def _learners_page(
+    db_session: Session,
+    course_id: int,
+    assignment_ids: list[int],
+    after: Optional[int],
+    limit: int,
+) -> list[User]:
+    """
+    Learners enrolled in the course or with a submission, by id after `after`.
+
+    The keyset is read from the course's trail runs and submissions, each
+    filtered and limited on its own, so only the page's users are read.
+    """
+    enrolled = select(TrailRun.user_id.label("user_id")).where(TrailRun.course_id == course_id)  # type: ignore
+    submitted = select(AssignmentUserSubmission.user_id.label("user_id")).where(  # type: ignore
+        AssignmentUserSubmission.assignment_id.in_(assignment_ids)  # type: ignore
+    )
+    if after is not None:
+        enrolled = enrolled.where(TrailRun.user_id > after)
+        submitted = submitted.where(AssignmentUserSubmission.user_id > after)
+    enrolled = enrolled.order_by(TrailRun.user_id).limit(limit)  # type: ignore
+    submitted = submitted.order_by(AssignmentUserSubmission.user_id).limit(limit)  # type: ignore
+
+    learner_ids = union(enrolled.subquery().select(), submitted.subquery().select()).subquery()
+    page_ids = select(learner_ids.c.user_id).order_by(learner_ids.c.user_id).limit(limit).subquery()
+    statement = select(User).join(page_ids, page_ids.c.user_id == User.id).order_by(User.id)  # type: ignore
+    return list(db_session.exec(statement).all())
+
+
+def _grades_page(
+    db_session: Session,
+    assignments: list[GradebookAssignment],
+    user_ids: list[int],
+) -> dict[tuple[int, int], tuple[AssignmentUserSubmissionStatus, int]]:
+    """Status and grade of a page of learners for every assignment, keyed by (user_id, assignment_id)"""
+    assignment_ids = [assignment.assignment_id for assignment in assignments]
+    assignment_by_activity = {assignment.activity_id: assignment.assignment_id for assignment in assignments}
+
+    statement = select(
+        AssignmentUserSubmission.user_id,
+        AssignmentUserSubmission.assignment_id,
+        AssignmentUserSubmission.submission_status,
+        AssignmentUserSubmission.grade,
+    ).where(
+        AssignmentUserSubmission.assignment_id.in_(assignment_ids),  # type: ignore
+        AssignmentUserSubmission.user_id.in_(user_ids),  # type: ignore
+    )
+    submissions = {
+        (user_id, assignment_id): (submission_status, grade)
+        for user_id, assignment_id, submission_status, grade in db_session.exec(statement)  # type: ignore
+    }
+
+    statement = (
+        select(
+            AssignmentTaskSubmission.user_id,
+            AssignmentTaskSubmission.activity_id,
+            func.sum(AssignmentTaskSubmission.grade),
+        )
+        .where(
+            AssignmentTaskSubmission.activity_id.in_(list(assignment_by_activity)),  # type: ignore
+            AssignmentTaskSubmission.user_id.in_(user_ids),  # type: ignore
+        )
+        .group_by(AssignmentTaskSubmission.user_id, AssignmentTaskSubmission.activity_id)  # type: ignore
+    )
+    task_grades = {
+        (user_id, assignment_by_activity[activity_id]): task_grade
+        for user_id, activity_id, task_grade in db_session.exec(statement)  # type: ignore
+    }
+
+    grades = {}
+    for key, (submission_status, grade) in submissions.items():
+        if submission_status != AssignmentUserSubmissionStatus.GRADED:
+            grade = task_grades.get(key) or 0
+        grades[key] = (submission_status, grade)
+    return grades
+
+
+def _gradebook_pages(
+    db_session: Session,
+    course_id: int,
+    assignments: list[GradebookAssignment],
+) -> Iterator[list[tuple[User, list[GradebookCell]]]]:
+    """Learners with their cells, one page at a time, three queries per page"""
+    assignment_ids = [assignment.assignment_id for assignment in assignments]
+    pages = keyset_pages(
+        db_session,
+        lambda after, limit: _learners_page(db_session, course_id, assignment_ids, after, limit),
+        key=lambda learner: learner.id,
+        page_size=GRADEBOOK_EXPORT_PAGE_SIZE,
+    )
+    for learners in pages:
+        grades = _grades_page(db_session, assignments, [learner.id for learner in learners])  # type: ignore
+        page = []
+        for learner in learners:
+            cells = []
+            for assignment in assignments:
+                status, grade = grades.get(
+                    (learner.id, assignment.assignment_id),  # type: ignore
+                    (AssignmentUserSubmissionStatus.NOT_SUBMITTED, 0),
+                )
+                cells.append(GradebookCell(assignment_uuid=assignment.assignment_uuid, status=status, grade=grade))
+            page.append((learner, cells))
+        yield page
+
+
+def gradebook_csv(course_id: int) -> Iterator[str]:
+    """Render the gradebook as CSV, one chunk per page of learners"""
+    with Session(engine) as db_session:
+        assignments = gradebook_assignments(db_session, course_id)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        header = list(GRADEBOOK_LEARNER_FIELDS)
+        for assignment in assignments:
+            header += [f"{assignment.title} ({assignment.max_grade})", f"{assignment.title} status"]
+        writer.writerow(header)
+
+        for page in _gradebook_pages(db_session, course_id, assignments):
+            for learner, cells in page:
+                row = _learner_fields(learner)
+                for cell in cells:
+                    row += [cell.grade, cell.status.value]
+                writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    # Header only when the course has no learners
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gradebook_json(course_id: int) -> Iterator[str]:
+    """Render the gradebook as one JSON document, one chunk per page of learners"""
+    with Session(engine) as db_session:
+        assignments = gradebook_assignments(db_session, course_id)
+        yield '{"assignments": ' + json.dumps([assignment.dict() for assignment in assignments]) + ', "learners": ['
+
+        separator = ""
+        for page in _gradebook_pages(db_session, course_id, assignments):
+            chunk = []
+            for learner, cells in page:
+                row: dict = dict(zip(GRADEBOOK_LEARNER_FIELDS, _learner_fields(learner)))
+                row["grades"] = [cell.dict() for cell in cells]
+                chunk.append(separator + json.dumps(row))
+                separator = ", "
+            yield "".join(chunk)
+
+    yield "]}"
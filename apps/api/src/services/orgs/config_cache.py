@@ -0,0 +1,153 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+import redis
+from pydantic import BaseModel
+from sqlmodel import Session, select
+from src.core.cache import get_redis_client
+from src.db.organization_config import OrganizationConfig, OrganizationConfigBase
+
+# Local entries are short lived: without Redis this bounds how long another
+# worker may keep serving a config that was updated elsewhere
+ORG_CONFIG_LOCAL_TTL = 30
+ORG_CONFIG_LOCAL_MAXSIZE = 1024
+ORG_CONFIG_REDIS_TTL = 60 * 60
+
+
+class CachedOrganizationConfig(BaseModel):
+    version: int
+    # OrganizationConfig columns, as served by the orgs API
+    row: dict
+    config: OrganizationConfigBase
+
+    def organization_config(self) -> OrganizationConfig:
+        return OrganizationConfig(**self.row)
+
+    def is_feature_enabled(self, feature: str) -> bool:
+        return getattr(self.config.features, feature).enabled
+
+    def feature_limit(self, feature: str) -> int:
+        """Usage limit of a feature, 0 means unlimited"""
+        return getattr(getattr(self.config.features, feature), "limit", 0)
+
+
+_local_configs: OrderedDict[int, tuple[float, CachedOrganizationConfig]] = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _org_config_key(org_id: int) -> str:
+    return f"org_config:{org_id}"
+
+
+def _org_config_version_key(org_id: int) -> str:
+    return f"org_config_version:{org_id}"
+
+
+def _get_local(org_id: int) -> Optional[CachedOrganizationConfig]:
+    with _local_lock:
+        cached = _local_configs.get(org_id)
+        if cached is None:
+            return None
+        expires_at, entry = cached
+        if expires_at < time.monotonic():
+            del _local_configs[org_id]
+            return None
+        _local_configs.move_to_end(org_id)
+        return entry
+
+
+def _set_local(org_id: int, entry: CachedOrganizationConfig) -> None:
+    with _local_lock:
+        _local_configs[org_id] = (time.monotonic() + ORG_CONFIG_LOCAL_TTL, entry)
+        _local_configs.move_to_end(org_id)
+        while len(_local_configs) > ORG_CONFIG_LOCAL_MAXSIZE:
+            _local_configs.popitem(last=False)
+
+
+def clear_local_organization_configs() -> None:
+    with _local_lock:
+        _local_configs.clear()
+
+
+def parse_organization_config(config: dict) -> OrganizationConfigBase:
+    """Validate a raw config, filling sections missing from older configs with defaults"""
+    return OrganizationConfigBase(**{"general": {}, "features": {}, "cloud": {}, **config})
+
+
+def invalidate_organization_config(org_id: int) -> None:
+    """Invalidate the cached config of an organization after it changed"""
+    with _local_lock:
+        _local_configs.pop(org_id, None)
+
+    r = get_redis_client()
+    if r is None:
+        return
+
+    try:
+        r.incr(_org_config_version_key(org_id))
+    except redis.RedisError as e:
+        logging.error(f"Could not bump config version of org {org_id}: {e}")
+
+
+def get_organization_config(
+    db_session: Session, org_id: int
+) -> Optional[CachedOrganizationConfig]:
+    """
+    Return the validated config of an organization, or None if it has none.
+
+    Configs are cached in-process and in Redis along with the version they
+    were loaded at. With Redis, a cached config is only served while its
+    version is current, which costs a single GET.
+    """
+    r = get_redis_client()
+    local = _get_local(org_id)
+    version: Optional[int] = 0
+
+    if r is None:
+        if local is not None:
+            return local
+    else:
+        try:
+            current = r.get(_org_config_version_key(org_id))
+            version = int(current) if current else 0  # type: ignore
+
+            if local is not None and local.version == version:
+                return local
+
+            cached = r.get(_org_config_key(org_id))
+            if cached is not None:
+                entry = CachedOrganizationConfig.parse_raw(cached)  # type: ignore
+                if entry.version == version:
+                    _set_local(org_id, entry)
+                    return entry
+        except (redis.RedisError, ValueError) as e:
+            logging.error(f"Could not read cached config of org {org_id}: {e}")
+            # Don't cache what we can't version
+            version = None
+
+    statement = select(OrganizationConfig).where(OrganizationConfig.org_id == org_id)
+    org_config = db_session.exec(statement).first()
+
+    if org_config is None:
+        return None
+
+    entry = CachedOrganizationConfig(
+        version=version or 0,
+        row=org_config.model_dump(),
+        config=parse_organization_config(org_config.config),
+    )
+
+    if version is None:
+        return entry
+
+    _set_local(org_id, entry)
+
+    if r is not None:
+        try:
+            r.set(_org_config_key(org_id), entry.json(), ex=ORG_CONFIG_REDIS_TTL)
+        except redis.RedisError as e:
+            logging.error(f"Could not cache config of org {org_id}: {e}")
+
+    return entry
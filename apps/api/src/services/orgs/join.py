@@ -12,6 +12,8 @@ from src.security.features_utils.usage import (
 )
 from src.services.orgs.invites import get_invite_code
 from src.services.orgs.orgs import get_org_join_mechanism
+from src.services.orgs.users import invalidate_organization_users_count
+from src.services.users.session_cache import invalidate_user_session
 
 
 class JoinOrg(BaseModel):
@@ -88,6 +90,9 @@ async def join_org(
             db_session.add(user_organization)
             db_session.commit()
 
+            invalidate_organization_users_count(org.id)
+            invalidate_user_session(user.id)
+
             return "Great, You're part of the Organization"
 
         else:
@@ -111,6 +116,8 @@ async def join_org(
             db_session.commit()
 
             increase_feature_usage("members", org.id, db_session)
+            invalidate_organization_users_count(org.id)
+            invalidate_user_session(user.id)
 
             return "Great, You're part of the Organization"
 
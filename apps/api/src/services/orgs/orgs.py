@@ -37,6 +37,12 @@ from src.db.organizations import (
 from fastapi import HTTPException, UploadFile, status, Request
 
 from src.services.orgs.uploads import upload_org_logo, upload_org_preview, upload_org_thumbnail, upload_org_landing_content
+from src.services.orgs.config_cache import (
+    get_organization_config,
+    invalidate_organization_config,
+)
+from src.services.orgs.slugs import invalidate_org_slug
+from src.services.users.session_cache import invalidate_org_sessions, invalidate_user_session
 
 
 async def get_organization(
@@ -60,15 +66,12 @@ async def get_organization(
     await rbac_check(request, org.org_uuid, current_user, "read", db_session)
 
     # Get org config
-    statement = select(OrganizationConfig).where(OrganizationConfig.org_id == org.id)
-    result = db_session.exec(statement)
-
-    org_config = result.first()
+    org_config = get_organization_config(db_session, org.id)  # type: ignore
 
     if org_config is None:
         logging.error(f"Organization {org_id} has no config")
 
-    config = OrganizationConfig.model_validate(org_config) if org_config else {}
+    config = org_config.organization_config() if org_config else {}
 
     org = OrganizationRead(**org.model_dump(), config=config)
 
@@ -96,15 +99,12 @@ async def get_organization_by_slug(
     await rbac_check(request, org.org_uuid, current_user, "read", db_session)
 
     # Get org config
-    statement = select(OrganizationConfig).where(OrganizationConfig.org_id == org.id)
-    result = db_session.exec(statement)
-
-    org_config = result.first()
+    org_config = get_organization_config(db_session, org.id)  # type: ignore
 
     if org_config is None:
         logging.error(f"Organization {org_slug} has no config")
 
-    config = OrganizationConfig.model_validate(org_config) if org_config else {}
+    config = org_config.organization_config() if org_config else {}
 
     org = OrganizationRead(**org.model_dump(), config=config)
 
@@ -158,6 +158,8 @@ async def create_org(
     db_session.commit()
     db_session.refresh(user_org)
 
+    invalidate_user_session(int(current_user.id))
+
     org_config = org_config = OrganizationConfigBase(
         config_version="1.1å",
         general=OrgGeneralConfig(
@@ -261,6 +263,8 @@ async def create_org_with_config(
     db_session.commit()
     db_session.refresh(user_org)
 
+    invalidate_user_session(int(current_user.id))
+
     org_config = submitted_config
 
     org_config = json.loads(org_config.json())
@@ -326,6 +330,8 @@ async def update_org(
             detail="Organization slug already exists",
         )
 
+    previous_slug = org.slug
+
     # Update only the fields that were passed in
     for var, value in vars(org_object).items():
         if value is not None:
@@ -338,6 +344,11 @@ async def update_org(
     db_session.commit()
     db_session.refresh(org)
 
+    invalidate_org_sessions(org_id)
+    invalidate_organization_config(org_id)
+    if org.slug != previous_slug:
+        invalidate_org_slug(previous_slug)
+
     org = OrganizationRead.model_validate(org)
 
     return org
@@ -383,6 +394,8 @@ async def update_org_with_config_no_auth(
     db_session.commit()
     db_session.refresh(org_config)
 
+    invalidate_organization_config(org_id)
+
     return {"detail": "Organization updated"}
 
 
@@ -420,6 +433,8 @@ async def update_org_logo(
     db_session.commit()
     db_session.refresh(org)
 
+    invalidate_org_sessions(org.id)  # type: ignore
+
     return {"detail": "Logo updated"}
 
 async def update_org_thumbnail(
@@ -456,6 +471,8 @@ async def update_org_thumbnail(
     db_session.commit()
     db_session.refresh(org)
 
+    invalidate_org_sessions(org.id)  # type: ignore
+
     return {"detail": "Thumbnail updated"}
 
 async def update_org_preview(
@@ -504,9 +521,15 @@ async def delete_org(
     # RBAC check
     await rbac_check(request, org.org_uuid, current_user, "delete", db_session)
 
+    org_slug = org.slug
+
     db_session.delete(org)
     db_session.commit()
 
+    invalidate_org_sessions(org_id)
+    invalidate_organization_config(org_id)
+    invalidate_org_slug(org_slug)
+
     # Delete links to org
     statement = select(UserOrganization).where(UserOrganization.org_id == org_id)
     result = db_session.exec(statement)
@@ -642,6 +665,8 @@ async def update_org_signup_mechanism(
     db_session.commit()
     db_session.refresh(org_config)
 
+    invalidate_organization_config(org_id)
+
     return {"detail": "Signup mechanism updated"}
 
 
@@ -666,10 +691,7 @@ async def get_org_join_mechanism(
     await rbac_check(request, org.org_uuid, current_user, "read", db_session)
 
     # Get org config
-    statement = select(OrganizationConfig).where(OrganizationConfig.org_id == org.id)
-    result = db_session.exec(statement)
-
-    org_config = result.first()
+    org_config = get_organization_config(db_session, org.id)  # type: ignore
 
     if org_config is None:
         logging.error(f"Organization {org_id} has no config")
@@ -678,11 +700,8 @@ async def get_org_join_mechanism(
             detail="Organization config not found",
         )
 
-    config = org_config.config
-
     # Get the signup mechanism
-    config = OrganizationConfigBase(**config)
-    signup_mechanism = config.features.members.signup_mode
+    signup_mechanism = org_config.config.features.members.signup_mode
 
     return signup_mechanism
 
@@ -749,6 +768,8 @@ async def update_org_landing(
     db_session.commit()
     db_session.refresh(org_config)
 
+    invalidate_organization_config(org_id)
+
     return {"detail": "Landing object updated"}
 
 async def upload_org_landing_content_service(
@@ -0,0 +1,89 @@
+import logging
+import threading
+import time
+from typing import Optional
+import redis
+from pydantic import BaseModel
+from sqlmodel import Session, select
+from src.core.cache import get_redis_client
+from src.db.organizations import Organization
+
+# Slugs rarely change: entries live long, slug changes delete them. Local
+# entries are kept shorter since other workers can't reach them.
+ORG_SLUG_LOCAL_TTL = 60
+ORG_SLUG_REDIS_TTL = 60 * 60 * 24
+
+
+class OrganizationRef(BaseModel):
+    id: int
+    org_uuid: str
+
+
+_local_slugs: dict[str, tuple[float, OrganizationRef]] = {}
+_local_lock = threading.Lock()
+
+
+def _org_slug_key(org_slug: str) -> str:
+    return f"org_slug:{org_slug}"
+
+
+def clear_local_org_slugs() -> None:
+    with _local_lock:
+        _local_slugs.clear()
+
+
+def invalidate_org_slug(org_slug: str) -> None:
+    """Forget a slug after the organization using it was renamed or deleted"""
+    with _local_lock:
+        _local_slugs.pop(org_slug, None)
+
+    r = get_redis_client()
+    if r is None:
+        return
+
+    try:
+        r.delete(_org_slug_key(org_slug))
+    except redis.RedisError as e:
+        logging.error(f"Could not invalidate org slug {org_slug}: {e}")
+
+
+def resolve_org_slug(db_session: Session, org_slug: str) -> Optional[OrganizationRef]:
+    """Resolve an org slug to its id and uuid, or None if no org uses it"""
+    with _local_lock:
+        cached = _local_slugs.get(org_slug)
+    if cached is not None and cached[0] >= time.monotonic():
+        return cached[1]
+
+    r = get_redis_client()
+    if r is not None:
+        try:
+            value = r.get(_org_slug_key(org_slug))
+            if value is not None:
+                org_ref = OrganizationRef.parse_raw(value)  # type: ignore
+                with _local_lock:
+                    _local_slugs[org_slug] = (time.monotonic() + ORG_SLUG_LOCAL_TTL, org_ref)
+                return org_ref
+        except (redis.RedisError, ValueError) as e:
+            logging.error(f"Could not read cached org slug {org_slug}: {e}")
+            r = None
+
+    statement = select(Organization.id, Organization.org_uuid).where(
+        Organization.slug == org_slug
+    )
+    row = db_session.exec(statement).first()
+
+    if row is None:
+        return None
+
+    org_ref = OrganizationRef(id=row[0], org_uuid=row[1])
+
+    with _local_lock:
+        _local_slugs[org_slug] = (time.monotonic() + ORG_SLUG_LOCAL_TTL, org_ref)
+
+    if r is not None:
+        try:
+            r.set(_org_slug_key(org_slug), org_ref.json(), ex=ORG_SLUG_REDIS_TTL)
+        except redis.RedisError as e:
+            logging.error(f"Could not cache org slug {org_slug}: {e}")
+
+    return org_ref
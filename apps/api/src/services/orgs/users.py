@@ -4,11 +4,13 @@ import logging
 
 import redis
 from fastapi import HTTPException, Request
-from sqlmodel import Session, select
+from sqlmodel import Session, func, or_, select
+from src.core.cache import get_redis_client
 from src.security.features_utils.usage import decrease_feature_usage
 from src.services.orgs.invites import send_invite_email
 from config.config import get_learnhouse_config
 from src.services.orgs.orgs import rbac_check
+from src.services.users.session_cache import invalidate_user_session
 from src.db.roles import Role, RoleRead
 from src.db.users import AnonymousUser, PublicUser, User, UserRead
 from src.db.user_organizations import UserOrganization
@@ -19,12 +21,68 @@ from src.db.organizations import (
 )
 
 
+ORG_USERS_COUNT_TTL = 300
+
+
+def _organization_users_filters(
+    org_id: int,
+    role_uuid: str | None = None,
+    search: str | None = None,
+) -> list:
+    filters = [UserOrganization.org_id == org_id]
+
+    if role_uuid:
+        filters.append(Role.role_uuid == role_uuid)
+
+    if search:
+        # Match `%` and `_` literally, not as wildcards
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        filters.append(
+            or_(
+                User.username.ilike(pattern, escape="\\"),  # type: ignore
+                User.first_name.ilike(pattern, escape="\\"),  # type: ignore
+                User.last_name.ilike(pattern, escape="\\"),  # type: ignore
+                User.email.ilike(pattern, escape="\\"),  # type: ignore
+            )
+        )
+
+    return filters
+
+
+def invalidate_organization_users_count(*org_ids: int) -> None:
+    r = get_redis_client()
+    if r is None or not org_ids:
+        return
+
+    try:
+        r.delete(*[f"org_users_count:{org_id}" for org_id in org_ids])
+    except redis.RedisError as e:
+        logging.error(f"Could not invalidate users count of orgs {list(org_ids)}: {e}")
+
+
+def get_user_org_ids(db_session: Session, user_id: int) -> list[int]:
+    statement = select(UserOrganization.org_id).where(UserOrganization.user_id == user_id)
+    return list(db_session.exec(statement).all())
+
+
 async def get_organization_users(
     request: Request,
     org_id: str,
     db_session: Session,
     current_user: PublicUser | AnonymousUser,
+    after: int | None = None,
+    limit: int | None = None,
+    role_uuid: str | None = None,
+    search: str | None = None,
 ) -> list[OrganizationUser]:
+    """
+    List the members of an organization with their role.
+
+    Users, memberships and roles come from a single join. Results are
+    ordered by user id, pass the last id of a page as `after` to get the
+    next one (keyset pagination). Without `limit` every member is returned.
+    """
     statement = select(Organization).where(Organization.id == org_id)
     result = db_session.exec(statement)
 
@@ -40,62 +98,85 @@ async def get_organization_users(
     await rbac_check(request, org.org_uuid, current_user, "read", db_session)
 
     statement = (
-        select(User)
-        .join(UserOrganization)
-        .join(Organization)
-        .where(Organization.id == org_id)
+        select(User, Role)
+        .join(UserOrganization, UserOrganization.user_id == User.id)  # type: ignore
+        .join(Role, Role.id == UserOrganization.role_id)  # type: ignore
+        .where(*_organization_users_filters(org.id, role_uuid, search))  # type: ignore
+        .order_by(User.id.asc())  # type: ignore
     )
-    users = db_session.exec(statement)
-    users = users.all()
-
-    org_users_list = []
 
-    for user in users:
-        statement = select(UserOrganization).where(
-            UserOrganization.user_id == user.id, UserOrganization.org_id == org_id
-        )
-        result = db_session.exec(statement)
-        user_org = result.first()
+    if after is not None:
+        statement = statement.where(User.id > after)
 
-        if not user_org:
-            logging.error(f"User {user.id} not found")
+    if limit is not None:
+        statement = statement.limit(limit)
 
-            # skip this user
-            continue
-
-        statement = select(Role).where(Role.id == user_org.role_id)
-        result = db_session.exec(statement)
-
-        role = result.first()
+    return [
+        OrganizationUser(
+            user=UserRead.model_validate(user),
+            role=RoleRead.model_validate(role),
+        )
+        for user, role in db_session.exec(statement).all()
+    ]
 
-        if not role:
-            logging.error(f"Role {user_org.role_id} not found")
 
-            # skip this user
-            continue
+async def get_organization_users_count(
+    request: Request,
+    org_id: str,
+    db_session: Session,
+    current_user: PublicUser | AnonymousUser,
+    role_uuid: str | None = None,
+    search: str | None = None,
+) -> dict:
+    """
+    Count the members of an organization matching the listing filters.
+
+    Counts are cached in Redis per org and filter set for a few minutes and
+    dropped whenever the org membership changes.
+    """
+    statement = select(Organization).where(Organization.id == org_id)
+    result = db_session.exec(statement)
 
-        statement = select(User).where(User.id == user_org.user_id)
-        result = db_session.exec(statement)
+    org = result.first()
 
-        user = result.first()
+    if not org:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
 
-        if not user:
-            logging.error(f"User {user_org.user_id} not found")
+    # RBAC check
+    await rbac_check(request, org.org_uuid, current_user, "read", db_session)
 
-            # skip this user
-            continue
+    cache_key = f"org_users_count:{org.id}"
+    cache_field = f"{role_uuid or ''}:{search or ''}"
 
-        user = UserRead.model_validate(user)
-        role = RoleRead.model_validate(role)
+    r = get_redis_client()
+    if r is not None:
+        try:
+            cached_count = r.hget(cache_key, cache_field)
+            if cached_count is not None:
+                return {"count": int(cached_count)}  # type: ignore
+        except redis.RedisError as e:
+            logging.error(f"Could not read users count of org {org.id}: {e}")
 
-        org_user = OrganizationUser(
-            user=user,
-            role=role,
-        )
+    statement = (
+        select(func.count(UserOrganization.id))  # type: ignore
+        .select_from(UserOrganization)
+        .join(User, User.id == UserOrganization.user_id)  # type: ignore
+        .join(Role, Role.id == UserOrganization.role_id)  # type: ignore
+        .where(*_organization_users_filters(org.id, role_uuid, search))  # type: ignore
+    )
+    count = db_session.exec(statement).one()
 
-        org_users_list.append(org_user)
+    if r is not None:
+        try:
+            r.hset(cache_key, cache_field, count)
+            r.expire(cache_key, ORG_USERS_COUNT_TTL)
+        except redis.RedisError as e:
+            logging.error(f"Could not cache users count of org {org.id}: {e}")
 
-    return org_users_list
+    return {"count": count}
 
 
 async def remove_user_from_org(
@@ -148,6 +229,9 @@ async def remove_user_from_org(
     db_session.delete(user_org)
     db_session.commit()
 
+    invalidate_organization_users_count(org.id)  # type: ignore
+    invalidate_user_session(user_id)
+
     decrease_feature_usage("members", org_id, db_session)
 
     return {"detail": "User removed from org"}
@@ -232,6 +316,9 @@ async def update_user_role(
     db_session.commit()
     db_session.refresh(user_org)
 
+    invalidate_organization_users_count(org.id)  # type: ignore
+    invalidate_user_session(int(user_id))
+
     return {"detail": "User role updated"}
 
 
@@ -1,10 +1,9 @@
+from typing import Optional
 from sqlmodel import Session, select
-from src.security.rbac.rbac import authorization_verify_if_user_is_author
-from src.db.payments.payments_users import PaymentStatusEnum, PaymentsUser
 from src.db.users import PublicUser, AnonymousUser
-from src.db.payments.payments_courses import PaymentsCourse
 from src.db.courses.activities import Activity
 from src.db.courses.courses import Course
+from src.services.payments.payments_entitlements import get_course_entitlements
 from fastapi import HTTPException, Request
 
 async def check_activity_paid_access(
@@ -12,6 +11,7 @@ async def check_activity_paid_access(
     activity_id: int,
     user: PublicUser | AnonymousUser,
     db_session: Session,
+    course: Optional[Course] = None,
 ) -> bool:
     """
     Check if a user has access to a specific activity
@@ -19,52 +19,24 @@ async def check_activity_paid_access(
     - User is an author of the course
     - Activity is in a free course
     - User has a valid subscription for the course
-    """
-
-
-    # Get activity and associated course
-    statement = select(Activity).where(Activity.id == activity_id)
-    activity = db_session.exec(statement).first()
-
-    if not activity:
-        raise HTTPException(status_code=404, detail="Activity not found")
-
-    # Check if course exists
-    statement = select(Course).where(Course.id == activity.course_id)
-    course = db_session.exec(statement).first()
 
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    
-    # Check if user is author of the course
-    is_course_author = await authorization_verify_if_user_is_author(request, user.id, "update", course.course_uuid, db_session)
-
-    if is_course_author:
-        return True
+    Pass the activity's course when it's already loaded to skip the lookup.
+    """
+    if course is None:
+        # Get the course of the activity
+        statement = (
+            select(Course)
+            .join(Activity, Activity.course_id == Course.id)  # type: ignore
+            .where(Activity.id == activity_id)
+        )
+        course = db_session.exec(statement).first()
 
-    # Check if course is linked to a product
-    statement = select(PaymentsCourse).where(PaymentsCourse.course_id == course.id)
-    course_payment = db_session.exec(statement).first()
+        if not course:
+            raise HTTPException(status_code=404, detail="Activity not found")
 
-    # If course is not linked to any product, it's free
-    if not course_payment:
-        return True
-    
-    # Anonymous users have no access to paid activities
-    if isinstance(user, AnonymousUser):
-        return False
-    
-    # Check if user has a valid subscription or payment
-    statement = select(PaymentsUser).where(
-        PaymentsUser.user_id == user.id,
-        PaymentsUser.payment_product_id == course_payment.payment_product_id,
-        PaymentsUser.status.in_( # type: ignore
-            [PaymentStatusEnum.ACTIVE, PaymentStatusEnum.COMPLETED]
-        ),
-    )
-    access = db_session.exec(statement).first()
+    entitlements = get_course_entitlements(db_session, course.org_id, user)
 
-    return bool(access)
+    return entitlements.has_access(course.id)  # type: ignore
 
 async def check_course_paid_access(
     course_id: int,
@@ -85,22 +57,6 @@ async def check_course_paid_access(
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
 
-    # Check if course is linked to a product
-    statement = select(PaymentsCourse).where(PaymentsCourse.course_id == course.id)
-    course_payment = db_session.exec(statement).first()
-
-    # If course is not linked to any product, it's free
-    if not course_payment:
-        return True
-
-    # Check if user has a valid subscription
-    statement = select(PaymentsUser).where(
-        PaymentsUser.user_id == user.id,
-        PaymentsUser.payment_product_id == course_payment.payment_product_id,
-        PaymentsUser.status.in_( # type: ignore
-            [PaymentStatusEnum.ACTIVE, PaymentStatusEnum.COMPLETED]
-        ),
-    )
-    subscription = db_session.exec(statement).first()
+    entitlements = get_course_entitlements(db_session, course.org_id, user)
 
-    return bool(subscription)
+    return entitlements.has_access(course.id)  # type: ignore
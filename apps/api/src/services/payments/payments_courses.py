@@ -5,6 +5,8 @@ from src.db.payments.payments_products import PaymentsProduct
 from src.db.courses.courses import Course
 from src.db.users import PublicUser, AnonymousUser
 from src.security.courses_security import courses_rbac_check
+from src.services.payments.payments_entitlements import invalidate_org_entitlements
+from src.services.payments.payments_users import invalidate_product_owners
 
 async def link_course_to_product(
     request: Request,
@@ -54,6 +56,9 @@ async def link_course_to_product(
     db_session.add(payment_course)
     db_session.commit()
 
+    invalidate_org_entitlements(course.org_id)
+    invalidate_product_owners(db_session, product_id)
+
     return {"message": "Course linked to product successfully"}
 
 async def unlink_course_from_product(
@@ -89,6 +94,9 @@ async def unlink_course_from_product(
     db_session.delete(payment_course)
     db_session.commit()
 
+    invalidate_org_entitlements(course.org_id)
+    invalidate_product_owners(db_session, payment_course.payment_product_id)
+
     return {"message": "Course unlinked from product successfully"}
 
 async def get_courses_by_product(
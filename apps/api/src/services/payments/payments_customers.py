@@ -1,18 +1,45 @@
+import csv
+import io
+import logging
+from typing import Iterator, Optional
+import redis
 from fastapi import HTTPException, Request
-from sqlmodel import Session, select
+from sqlmodel import Session, func, select
+from src.core.cache import get_redis_client
+from src.core.events.database import engine
 from src.db.organizations import Organization
-from src.db.users import PublicUser, AnonymousUser
-from src.db.payments.payments_users import PaymentsUser
+from src.db.users import PublicUser, AnonymousUser, User, UserRead
+from src.db.payments.payments_products import PaymentsProduct
+from src.db.payments.payments_users import PaymentStatusEnum, PaymentsUser
 from src.services.orgs.orgs import rbac_check
-from src.services.payments.payments_products import get_payments_product
-from src.services.users.users import read_user_by_id
+from src.services.utils.keyset import keyset_pages
 
-async def get_customers(
+CUSTOMERS_COUNT_TTL = 300
+CUSTOMERS_EXPORT_PAGE_SIZE = 500
+CUSTOMERS_EXPORT_FIELDS = [
+    "payment_user_id",
+    "user_id",
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "product_id",
+    "product_name",
+    "product_type",
+    "amount",
+    "currency",
+    "status",
+    "creation_date",
+    "update_date",
+]
+
+
+async def _get_org(
     request: Request,
     org_id: int,
     current_user: PublicUser | AnonymousUser,
     db_session: Session,
-):
+) -> Organization:
     # Check if organization exists
     statement = select(Organization).where(Organization.id == org_id)
     org = db_session.exec(statement).first()
@@ -22,29 +49,184 @@ async def get_customers(
     # RBAC check
     await rbac_check(request, org.org_uuid, current_user, "read", db_session)
 
-    # Get all payment users for the organization
-    statement = select(PaymentsUser).where(PaymentsUser.org_id == org_id)
-    payment_users = db_session.exec(statement).all()
-
-    customers_data = []
-    
-    for payment_user in payment_users:
-        # Get user data
-        user = await read_user_by_id(request, db_session, current_user, payment_user.user_id)
-        
-        # Get product data
-        if org.id is None:
-            raise HTTPException(status_code=400, detail="Invalid organization ID")
-        product = await get_payments_product(request, org.id, payment_user.payment_product_id, current_user, db_session)
-
-        customer_data = {
+    return org
+
+
+def _customers_filters(org_id: int, status: Optional[list[PaymentStatusEnum]] = None) -> list:
+    filters = [PaymentsUser.org_id == org_id]
+
+    if status:
+        filters.append(PaymentsUser.status.in_(status))  # type: ignore
+
+    return filters
+
+
+def _customers_page(
+    db_session: Session,
+    org_id: int,
+    after: Optional[int] = None,
+    limit: Optional[int] = None,
+    status: Optional[list[PaymentStatusEnum]] = None,
+) -> list[tuple[PaymentsUser, User, PaymentsProduct]]:
+    statement = (
+        select(PaymentsUser, User, PaymentsProduct)
+        .join(User, User.id == PaymentsUser.user_id)  # type: ignore
+        .join(PaymentsProduct, PaymentsProduct.id == PaymentsUser.payment_product_id)  # type: ignore
+        .where(*_customers_filters(org_id, status))
+        .order_by(PaymentsUser.id.asc())  # type: ignore
+    )
+
+    if after is not None:
+        statement = statement.where(PaymentsUser.id > after)
+
+    if limit is not None:
+        statement = statement.limit(limit)
+
+    return list(db_session.exec(statement).all())  # type: ignore
+
+
+def invalidate_customers_count(org_id: int) -> None:
+    r = get_redis_client()
+    if r is None:
+        return
+
+    try:
+        r.delete(f"payments_customers_count:{org_id}")
+    except redis.RedisError as e:
+        logging.error(f"Could not invalidate customers count of org {org_id}: {e}")
+
+
+async def get_customers(
+    request: Request,
+    org_id: int,
+    current_user: PublicUser | AnonymousUser,
+    db_session: Session,
+    after: Optional[int] = None,
+    limit: Optional[int] = None,
+    status: Optional[list[PaymentStatusEnum]] = None,
+):
+    """
+    List the customers of an organization with their product.
+
+    Payment users, users and products come from a single join. Results are
+    ordered by payment user id, pass the last `payment_user_id` of a page as
+    `after` to get the next one (keyset pagination). Without `limit` every
+    customer is returned.
+    """
+    org = await _get_org(request, org_id, current_user, db_session)
+
+    return [
+        {
             'payment_user_id': payment_user.id,
-            'user': user if user else None,
-            'product': product if product else None,
+            'user': UserRead.model_validate(user),
+            'product': product,
             'status': payment_user.status,
             'creation_date': payment_user.creation_date,
             'update_date': payment_user.update_date
         }
-        customers_data.append(customer_data)
+        for payment_user, user, product in _customers_page(db_session, org.id, after, limit, status)  # type: ignore
+    ]
+
+
+async def get_customers_count(
+    request: Request,
+    org_id: int,
+    current_user: PublicUser | AnonymousUser,
+    db_session: Session,
+    status: Optional[list[PaymentStatusEnum]] = None,
+) -> dict:
+    """
+    Count the customers of an organization matching the listing filters.
+
+    Counts are cached in Redis per org and status filter for a few minutes
+    and dropped whenever a payment user of the org changes.
+    """
+    org = await _get_org(request, org_id, current_user, db_session)
+
+    cache_key = f"payments_customers_count:{org.id}"
+    cache_field = ",".join(sorted(status)) if status else ""
+
+    r = get_redis_client()
+    if r is not None:
+        try:
+            cached_count = r.hget(cache_key, cache_field)
+            if cached_count is not None:
+                return {"count": int(cached_count)}  # type: ignore
+        except redis.RedisError as e:
+            logging.error(f"Could not read customers count of org {org.id}: {e}")
+
+    statement = (
+        select(func.count(PaymentsUser.id))  # type: ignore
+        .select_from(PaymentsUser)
+        .join(User, User.id == PaymentsUser.user_id)  # type: ignore
+        .join(PaymentsProduct, PaymentsProduct.id == PaymentsUser.payment_product_id)  # type: ignore
+        .where(*_customers_filters(org.id, status))  # type: ignore
+    )
+    count = db_session.exec(statement).one()
+
+    if r is not None:
+        try:
+            r.hset(cache_key, cache_field, count)
+            r.expire(cache_key, CUSTOMERS_COUNT_TTL)
+        except redis.RedisError as e:
+            logging.error(f"Could not cache customers count of org {org.id}: {e}")
+
+    return {"count": count}
+
+
+async def export_customers_csv(
+    request: Request,
+    org_id: int,
+    current_user: PublicUser | AnonymousUser,
+    db_session: Session,
+    status: Optional[list[PaymentStatusEnum]] = None,
+) -> Iterator[str]:
+    """Check access, then return the customers as CSV chunks read page by page"""
+    org = await _get_org(request, org_id, current_user, db_session)
+
+    return customers_csv(org.id, status)  # type: ignore
+
+
+def customers_csv(
+    org_id: int,
+    status: Optional[list[PaymentStatusEnum]] = None,
+) -> Iterator[str]:
+    """Render customers as CSV, one chunk per page, without loading them all"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CUSTOMERS_EXPORT_FIELDS)
+
+    writer.writeheader()
+    with Session(engine) as db_session:
+        pages = keyset_pages(
+            db_session,
+            lambda after, limit: _customers_page(db_session, org_id, after, limit, status),
+            key=lambda row: row[0].id,
+            page_size=CUSTOMERS_EXPORT_PAGE_SIZE,
+        )
+        for page in pages:
+            for payment_user, user, product in page:
+                writer.writerow(
+                    {
+                        "payment_user_id": payment_user.id,
+                        "user_id": user.id,
+                        "username": user.username,
+                        "email": user.email,
+                        "first_name": user.first_name,
+                        "last_name": user.last_name,
+                        "product_id": product.id,
+                        "product_name": product.name,
+                        "product_type": product.product_type.value,
+                        "amount": product.amount,
+                        "currency": product.currency,
+                        "status": payment_user.status.value,
+                        "creation_date": payment_user.creation_date.isoformat(),
+                        "update_date": payment_user.update_date.isoformat(),
+                    }
+                )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
 
-    return customers_data
\ No newline at end of file
+    # Header only when there are no customers
+    if buffer.tell():
+        yield buffer.getvalue()
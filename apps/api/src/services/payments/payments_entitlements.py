@@ -0,0 +1,217 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Set
+import redis
+from pydantic import BaseModel
+from sqlmodel import Session, select
+from src.core.cache import get_redis_client
+from src.db.courses.courses import Course
+from src.db.payments.payments_courses import PaymentsCourse
+from src.db.payments.payments_users import PaymentStatusEnum, PaymentsUser
+from src.db.resource_authors import (
+    ResourceAuthor,
+    ResourceAuthorshipEnum,
+    ResourceAuthorshipStatusEnum,
+)
+from src.db.users import AnonymousUser, PublicUser
+
+# Local entries are short lived: without Redis this bounds how long another
+# worker may keep serving entitlements that changed elsewhere
+ENTITLEMENTS_LOCAL_TTL = 30
+ENTITLEMENTS_LOCAL_MAXSIZE = 4096
+ENTITLEMENTS_REDIS_TTL = 60 * 60
+
+
+class CourseEntitlements(BaseModel):
+    """The courses of an organization a user can open"""
+
+    user_version: int
+    org_version: int
+    # Courses of the organization linked to a product
+    paid_course_ids: Set[int]
+    # Courses the user authors or bought access to
+    unlocked_course_ids: Set[int]
+
+    def has_access(self, course_id: int) -> bool:
+        return course_id not in self.paid_course_ids or course_id in self.unlocked_course_ids
+
+
+_local_entitlements: OrderedDict[tuple[int, int], tuple[float, CourseEntitlements]] = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _entitlements_key(org_id: int, user_id: int) -> str:
+    return f"entitlements:{org_id}:{user_id}"
+
+
+def _user_version_key(user_id: int) -> str:
+    return f"entitlements_user_version:{user_id}"
+
+
+def _org_version_key(org_id: int) -> str:
+    return f"entitlements_org_version:{org_id}"
+
+
+def _get_local(org_id: int, user_id: int) -> Optional[CourseEntitlements]:
+    with _local_lock:
+        cached = _local_entitlements.get((org_id, user_id))
+        if cached is None:
+            return None
+        expires_at, entry = cached
+        if expires_at < time.monotonic():
+            del _local_entitlements[(org_id, user_id)]
+            return None
+        _local_entitlements.move_to_end((org_id, user_id))
+        return entry
+
+
+def _set_local(org_id: int, user_id: int, entry: CourseEntitlements) -> None:
+    with _local_lock:
+        _local_entitlements[(org_id, user_id)] = (time.monotonic() + ENTITLEMENTS_LOCAL_TTL, entry)
+        _local_entitlements.move_to_end((org_id, user_id))
+        while len(_local_entitlements) > ENTITLEMENTS_LOCAL_MAXSIZE:
+            _local_entitlements.popitem(last=False)
+
+
+def clear_local_entitlements() -> None:
+    with _local_lock:
+        _local_entitlements.clear()
+
+
+def _bump(key: str) -> None:
+    r = get_redis_client()
+    if r is None:
+        return
+
+    try:
+        r.incr(key)
+    except redis.RedisError as e:
+        logging.error(f"Could not bump entitlements version {key}: {e}")
+
+
+def invalidate_user_entitlements(user_id: int) -> None:
+    """Invalidate the entitlements of a user after a purchase or authorship changed"""
+    with _local_lock:
+        for key in [key for key in _local_entitlements if key[1] == user_id]:
+            del _local_entitlements[key]
+
+    _bump(_user_version_key(user_id))
+
+
+def invalidate_org_entitlements(org_id: int) -> None:
+    """Invalidate every entitlement of an organization after its paid courses changed"""
+    with _local_lock:
+        for key in [key for key in _local_entitlements if key[0] == org_id]:
+            del _local_entitlements[key]
+
+    _bump(_org_version_key(org_id))
+
+
+def _load_entitlements(
+    db_session: Session, org_id: int, user_id: int, user_version: int, org_version: int
+) -> CourseEntitlements:
+    statement = (
+        select(PaymentsCourse.course_id)
+        .join(Course, Course.id == PaymentsCourse.course_id)  # type: ignore
+        .where(Course.org_id == org_id)
+    )
+    paid_course_ids = set(db_session.exec(statement).all())
+
+    unlocked_course_ids: Set[int] = set()
+    if user_id and paid_course_ids:
+        statement = (
+            select(Course.id)
+            .join(ResourceAuthor, ResourceAuthor.resource_uuid == Course.course_uuid)  # type: ignore
+            .where(
+                Course.org_id == org_id,
+                ResourceAuthor.user_id == user_id,
+                ResourceAuthor.authorship.in_(  # type: ignore
+                    [
+                        ResourceAuthorshipEnum.CREATOR,
+                        ResourceAuthorshipEnum.MAINTAINER,
+                        ResourceAuthorshipEnum.CONTRIBUTOR,
+                    ]
+                ),
+                ResourceAuthor.authorship_status == ResourceAuthorshipStatusEnum.ACTIVE,
+            )
+        )
+        unlocked_course_ids.update(db_session.exec(statement).all())
+
+        statement = (
+            select(PaymentsCourse.course_id)
+            .join(
+                PaymentsUser,
+                PaymentsUser.payment_product_id == PaymentsCourse.payment_product_id,  # type: ignore
+            )
+            .where(
+                PaymentsCourse.course_id.in_(paid_course_ids),  # type: ignore
+                PaymentsUser.user_id == user_id,
+                PaymentsUser.status.in_(  # type: ignore
+                    [PaymentStatusEnum.ACTIVE, PaymentStatusEnum.COMPLETED]
+                ),
+            )
+        )
+        unlocked_course_ids.update(db_session.exec(statement).all())
+
+    return CourseEntitlements(
+        user_version=user_version,
+        org_version=org_version,
+        paid_course_ids=paid_course_ids,
+        unlocked_course_ids=unlocked_course_ids & paid_course_ids,
+    )
+
+
+def get_course_entitlements(
+    db_session: Session, org_id: int, user: PublicUser | AnonymousUser
+) -> CourseEntitlements:
+    """
+    Return the entitlements of a user within an organization.
+
+    Entitlements are cached in-process and in Redis along with the user and
+    organization versions they were loaded at. With Redis, a cached entry is
+    only served while both versions are current, which costs a single MGET.
+    """
+    user_id = 0 if isinstance(user, AnonymousUser) else user.id
+    r = get_redis_client()
+    local = _get_local(org_id, user_id)
+    versions: Optional[tuple[int, int]] = (0, 0)
+
+    if r is None:
+        if local is not None:
+            return local
+    else:
+        try:
+            user_version, org_version, cached = r.mget(
+                [_user_version_key(user_id), _org_version_key(org_id), _entitlements_key(org_id, user_id)]
+            )
+            versions = (int(user_version or 0), int(org_version or 0))  # type: ignore
+
+            if local is not None and (local.user_version, local.org_version) == versions:
+                return local
+
+            if cached is not None:
+                entry = CourseEntitlements.parse_raw(cached)  # type: ignore
+                if (entry.user_version, entry.org_version) == versions:
+                    _set_local(org_id, user_id, entry)
+                    return entry
+        except (redis.RedisError, ValueError) as e:
+            logging.error(f"Could not read cached entitlements of user {user_id}: {e}")
+            # Don't cache what we can't version
+            versions = None
+
+    entry = _load_entitlements(db_session, org_id, user_id, *(versions or (0, 0)))
+
+    if versions is None:
+        return entry
+
+    _set_local(org_id, user_id, entry)
+
+    if r is not None:
+        try:
+            r.set(_entitlements_key(org_id, user_id), entry.json(), ex=ENTITLEMENTS_REDIS_TTL)
+        except redis.RedisError as e:
+            logging.error(f"Could not cache entitlements of user {user_id}: {e}")
+
+    return entry
@@ -16,6 +16,7 @@ from src.services.orgs.orgs import rbac_check
 from datetime import datetime
 
 from src.services.payments.payments_stripe import archive_stripe_product, create_stripe_product, update_stripe_product
+from src.services.payments.payments_entitlements import invalidate_org_entitlements
 
 async def create_payments_product(
     request: Request,
@@ -161,6 +162,9 @@ async def delete_payments_product(
     db_session.delete(product)
     db_session.commit()
 
+    # Its courses are free again
+    invalidate_org_entitlements(org_id)
+
 async def list_payments_products(
     request: Request,
     org_id: int,
@@ -1,14 +1,17 @@
 from fastapi import HTTPException, Request
 from sqlmodel import Session, select
-from typing import Any
-from src.db.courses.courses import Course, CourseRead, AuthorWithRole
+from typing import Any, Optional
+from src.db.courses.courses import Course, CourseRead
 from src.db.payments.payments_courses import PaymentsCourse
 from src.db.payments.payments_users import PaymentsUser, PaymentStatusEnum, ProviderSpecificData
 from src.db.payments.payments_products import PaymentsProduct
-from src.db.resource_authors import ResourceAuthor
-from src.db.users import InternalUser, PublicUser, AnonymousUser, User, UserRead
+from src.db.users import InternalUser, PublicUser, AnonymousUser
 from src.db.organizations import Organization
 from src.services.orgs.orgs import rbac_check
+from src.core.response_cache import purge_response_cache
+from src.services.courses.courses import hydrate_course_authors
+from src.services.payments.payments_entitlements import invalidate_user_entitlements
+from src.services.payments.payments_customers import invalidate_customers_count
 from datetime import datetime
 
 async def create_payment_user(
@@ -76,6 +79,10 @@ async def create_payment_user(
     db_session.commit()
     db_session.refresh(payment_user)
 
+    invalidate_user_entitlements(user_id)
+    invalidate_customers_count(org_id)
+    invalidate_owned_courses(user_id)
+
     return payment_user
 
 async def get_payment_user(
@@ -139,6 +146,11 @@ async def update_payment_user_status(
     db_session.commit()
     db_session.refresh(payment_user)
 
+    # Webhooks grant and revoke access through here
+    invalidate_user_entitlements(payment_user.user_id)
+    invalidate_customers_count(org_id)
+    invalidate_owned_courses(payment_user.user_id)
+
     return payment_user
 
 async def list_payment_users(
@@ -193,67 +205,67 @@ async def delete_payment_user(
     db_session.delete(payment_user)
     db_session.commit()
 
+    invalidate_user_entitlements(payment_user.user_id)
+    invalidate_customers_count(org_id)
+    invalidate_owned_courses(payment_user.user_id)
+
+
+def invalidate_owned_courses(*user_ids: int) -> None:
+    """Drop the cached purchased courses of users after their access changed"""
+    purge_response_cache(*(f"owned_courses:{user_id}" for user_id in user_ids))
+
+
+def invalidate_product_owners(db_session: Session, product_id: int) -> None:
+    """Drop the cached purchased courses of everyone who bought a product"""
+    statement = select(PaymentsUser.user_id).where(
+        PaymentsUser.payment_product_id == product_id,
+        PaymentsUser.status.in_([PaymentStatusEnum.ACTIVE, PaymentStatusEnum.COMPLETED])  # type: ignore
+    )
+    invalidate_owned_courses(*db_session.exec(statement).all())
+
 
 async def get_owned_courses(
     request: Request,
     current_user: PublicUser | AnonymousUser,
     db_session: Session,
+    after: Optional[int] = None,
+    limit: Optional[int] = None,
 ) -> list[CourseRead]:
+    """
+    List the courses a user bought access to.
+
+    Courses are read in a single query, ordered by id: pass the last course
+    id of a page as `after` to get the next one (keyset pagination). Their
+    authors are loaded in one more query.
+    """
     # Anonymous users don't own any courses
     if isinstance(current_user, AnonymousUser):
         return []
 
-    # Get all active/completed payment users for the current user
-    statement = select(PaymentsUser).where(
-        PaymentsUser.user_id == current_user.id,
-        PaymentsUser.status.in_([PaymentStatusEnum.ACTIVE, PaymentStatusEnum.COMPLETED])  # type: ignore
-    )
-    payment_users = db_session.exec(statement).all()
-
-    # Get all product IDs from payment users
-    product_ids = [pu.payment_product_id for pu in payment_users]
-
-    # Get all courses linked to these products
-    courses = []
-    for product_id in product_ids:
-        # Get courses linked to this product through PaymentsCourse
-        statement = (
-            select(Course)
-            .join(PaymentsCourse, Course.id == PaymentsCourse.course_id)  # type: ignore
-            .where(PaymentsCourse.payment_product_id == product_id)
+    # Courses linked to a product the user has an active or completed payment for
+    owned_course_ids = (
+        select(PaymentsCourse.course_id)
+        .join(
+            PaymentsUser,
+            PaymentsUser.payment_product_id == PaymentsCourse.payment_product_id,  # type: ignore
         )
-        product_courses = db_session.exec(statement).all()
-        courses.extend(product_courses)
-
-    # Remove duplicates by converting to set and back to list
-    unique_courses = list({course.id: course for course in courses}.values())
-
-    # Get authors for each course and convert to CourseRead
-    course_reads = []
-    for course in unique_courses:
-        # Get course authors with their roles
-        authors_statement = (
-            select(ResourceAuthor, User)
-            .join(User, ResourceAuthor.user_id == User.id)
-            .where(ResourceAuthor.resource_uuid == course.course_uuid)
+        .where(
+            PaymentsUser.user_id == current_user.id,
+            PaymentsUser.status.in_([PaymentStatusEnum.ACTIVE, PaymentStatusEnum.COMPLETED])  # type: ignore
         )
-        author_results = db_session.exec(authors_statement).all()
-
-        # Convert to AuthorWithRole objects
-        authors = [
-            AuthorWithRole(
-                user=UserRead.model_validate(user),
-                authorship=resource_author.authorship,
-                authorship_status=resource_author.authorship_status,
-                creation_date=resource_author.creation_date,
-                update_date=resource_author.update_date
-            )
-            for resource_author, user in author_results
-        ]
-
-        # Create CourseRead object
-        course_read = CourseRead(**course.model_dump(), authors=authors)
-        course_reads.append(course_read)
-
-    return course_reads
+    )
+    statement = (
+        select(Course)
+        .where(Course.id.in_(owned_course_ids))  # type: ignore
+        .order_by(Course.id.asc())  # type: ignore
+    )
+
+    if after is not None:
+        statement = statement.where(Course.id > after)
+
+    if limit is not None:
+        statement = statement.limit(limit)
+
+    courses = db_session.exec(statement).all()
 
+    return hydrate_course_authors(courses, db_session)
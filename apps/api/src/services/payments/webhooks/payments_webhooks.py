@@ -1,9 +1,19 @@
-from typing import Literal
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import Literal, Optional
 from fastapi import HTTPException, Request
-from sqlmodel import Session, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, and_, exists, func, or_, select
 import stripe
 import logging
+from src.core.events.database import engine
 from src.db.payments.payments_users import PaymentStatusEnum
+from src.db.payments.payments_webhooks import (
+    PaymentsWebhookEvent,
+    PaymentsWebhookEventStatusEnum,
+)
 from src.db.users import InternalUser
 from src.services.payments.payments_users import update_payment_user_status
 from src.services.payments.payments_stripe import get_stripe_internal_credentials
@@ -13,12 +23,30 @@ from src.services.payments.utils.stripe_utils import get_org_id_from_stripe_acco
 
 logger = logging.getLogger(__name__)
 
+WEBHOOK_INBOX_BATCH_SIZE = 100
+WEBHOOK_INBOX_POLL_INTERVAL = 5
+# How long a worker owns the events it claimed before another may retry them
+WEBHOOK_INBOX_LEASE = 300
+WEBHOOK_INBOX_MAX_ATTEMPTS = 8
+# Retries back off exponentially: 30s, 1m, 2m, ... about an hour in total
+WEBHOOK_INBOX_RETRY_DELAY = 30
+
+# Set by webhook requests to wake the inbox worker of this process
+_webhook_inbox_wakeup: Optional[asyncio.Event] = None
+
 
 async def handle_stripe_webhook(
     request: Request,
     webhook_type: Literal["connect", "standard"],
     db_session: Session,
 ) -> dict:
+    """
+    Verify a Stripe webhook and store it in the inbox.
+
+    Events are processed by the inbox worker, so Stripe gets its answer
+    without waiting on the processing. Stripe retries deliveries, an event
+    already in the inbox is acknowledged without being stored again.
+    """
     # Get Stripe credentials
     creds = await get_stripe_internal_credentials()
     webhook_secret = creds.get(f'stripe_webhook_{webhook_type}_secret')
@@ -42,138 +70,318 @@ async def handle_stripe_webhook(
         logger.error(stripe.SignatureVerificationError)
         raise HTTPException(status_code=400, detail="Invalid signature")
 
+    webhook_event = PaymentsWebhookEvent(
+        event_id=event.id,
+        webhook_type=webhook_type,
+        account_id=event.get("account"),
+        event_type=event.type,
+        payload=json.loads(payload),
+    )
+
     try:
-        event_type = event.type
-        event_data = event.data.object
-
-        # Get organization ID based on the event type
-        stripe_account_id = event.account
-        if not stripe_account_id:
-            logger.error("Stripe account ID not found")
-            raise HTTPException(status_code=400, detail="Stripe account ID not found")
+        db_session.add(webhook_event)
+        db_session.commit()
+    except IntegrityError:
+        db_session.rollback()
+        logger.info(f"Stripe event {event.id} already received")
+        return {"status": "duplicate"}
+
+    return {"status": "queued"}
+
+
+async def process_stripe_event(
+    request: Request,
+    payload: dict,
+    db_session: Session,
+) -> dict:
+    """Apply a verified Stripe event, raises if it should be retried"""
+    event = stripe.Event.construct_from(payload, stripe.api_key)
+
+    event_type = event.type
+    event_data = event.data.object
+
+    # Get organization ID based on the event type
+    stripe_account_id = event.get("account")
+    if not stripe_account_id:
+        logger.error("Stripe account ID not found")
+        raise HTTPException(status_code=400, detail="Stripe account ID not found")
+    
+    org_id = await get_org_id_from_stripe_account(stripe_account_id, db_session)
+
+    # Handle internal account events
+    if event_type == 'account.application.authorized':
+        statement = select(PaymentsConfig).where(PaymentsConfig.org_id == org_id)
+        config = db_session.exec(statement).first()
         
-        org_id = await get_org_id_from_stripe_account(stripe_account_id, db_session)
-
-        # Handle internal account events
-        if event_type == 'account.application.authorized':
-            statement = select(PaymentsConfig).where(PaymentsConfig.org_id == org_id)
-            config = db_session.exec(statement).first()
-            
-            if not config:
-                logger.error("No payments configuration found for this organization")
-                raise HTTPException(
-                    status_code=404,
-                    detail="No payments configuration found for this organization"
-                )
+        if not config:
+            logger.error("No payments configuration found for this organization")
+            raise HTTPException(
+                status_code=404,
+                detail="No payments configuration found for this organization"
+            )
+
+        config_data = config.model_dump()
+        config_data.update({
+            "enabled": True,
+            "active": True,
+            "provider_config": {
+                **config.provider_config,
+                "onboarding_completed": True
+            }
+        })
+        await update_payments_config(
+            request,
+            org_id,
+            PaymentsConfigUpdate(**config_data),
+            InternalUser(),
+            db_session,
+        )
 
-            config_data = config.model_dump()
-            config_data.update({
-                "enabled": True,
-                "active": True,
-                "provider_config": {
-                    **config.provider_config,
-                    "onboarding_completed": True
-                }
-            })
-            await update_payments_config(
-                request,
-                org_id,
-                PaymentsConfigUpdate(**config_data),
-                InternalUser(),
-                db_session,
+        logger.info(f"Account authorized for organization {org_id}")
+        return {"status": "success", "message": "Account authorized successfully"}
+
+    elif event_type == 'account.application.deauthorized':
+        statement = select(PaymentsConfig).where(PaymentsConfig.org_id == org_id)
+        config = db_session.exec(statement).first()
+        
+        if not config:
+            raise HTTPException(
+                status_code=404,
+                detail="No payments configuration found for this organization"
             )
 
-            logger.info(f"Account authorized for organization {org_id}")
-            return {"status": "success", "message": "Account authorized successfully"}
-
-        elif event_type == 'account.application.deauthorized':
-            statement = select(PaymentsConfig).where(PaymentsConfig.org_id == org_id)
-            config = db_session.exec(statement).first()
-            
-            if not config:
-                raise HTTPException(
-                    status_code=404,
-                    detail="No payments configuration found for this organization"
+        config_data = config.model_dump()
+        config_data.update({
+            "enabled": True,
+            "active": False,
+            "provider_config": {
+                **config.provider_config,
+                "onboarding_completed": False
+            }
+        })
+        await update_payments_config(
+            request,
+            org_id,
+            PaymentsConfigUpdate(**config_data),
+            InternalUser(),
+            db_session,
+        )
+
+        logger.info(f"Account deauthorized for organization {org_id}")
+        return {"status": "success", "message": "Account deauthorized successfully"}
+
+    # Handle payment-related events
+    elif event_type == "checkout.session.completed":
+        session = event_data
+        payment_user_id = int(session.get("metadata", {}).get("payment_user_id"))
+
+        if session.get("mode") == "subscription":
+            if session.get("subscription"):
+                await update_payment_user_status(
+                    request=request,
+                    org_id=org_id,
+                    payment_user_id=payment_user_id,
+                    status=PaymentStatusEnum.ACTIVE,
+                    current_user=InternalUser(),
+                    db_session=db_session,
+                )
+        else:
+            if session.get("payment_status") == "paid":
+                await update_payment_user_status(
+                    request=request,
+                    org_id=org_id,
+                    payment_user_id=payment_user_id,
+                    status=PaymentStatusEnum.COMPLETED,
+                    current_user=InternalUser(),
+                    db_session=db_session,
                 )
 
-            config_data = config.model_dump()
-            config_data.update({
-                "enabled": True,
-                "active": False,
-                "provider_config": {
-                    **config.provider_config,
-                    "onboarding_completed": False
-                }
-            })
-            await update_payments_config(
-                request,
-                org_id,
-                PaymentsConfigUpdate(**config_data),
-                InternalUser(),
-                db_session,
-            )
+    elif event_type == "customer.subscription.deleted":
+        subscription = event_data
+        payment_user_id = int(subscription.get("metadata", {}).get("payment_user_id"))
 
-            logger.info(f"Account deauthorized for organization {org_id}")
-            return {"status": "success", "message": "Account deauthorized successfully"}
-
-        # Handle payment-related events
-        elif event_type == "checkout.session.completed":
-            session = event_data
-            payment_user_id = int(session.get("metadata", {}).get("payment_user_id"))
-
-            if session.get("mode") == "subscription":
-                if session.get("subscription"):
-                    await update_payment_user_status(
-                        request=request,
-                        org_id=org_id,
-                        payment_user_id=payment_user_id,
-                        status=PaymentStatusEnum.ACTIVE,
-                        current_user=InternalUser(),
-                        db_session=db_session,
-                    )
-            else:
-                if session.get("payment_status") == "paid":
-                    await update_payment_user_status(
-                        request=request,
-                        org_id=org_id,
-                        payment_user_id=payment_user_id,
-                        status=PaymentStatusEnum.COMPLETED,
-                        current_user=InternalUser(),
-                        db_session=db_session,
-                    )
-
-        elif event_type == "customer.subscription.deleted":
-            subscription = event_data
-            payment_user_id = int(subscription.get("metadata", {}).get("payment_user_id"))
-
-            await update_payment_user_status(
-                request=request,
-                org_id=org_id,
-                payment_user_id=payment_user_id,
-                status=PaymentStatusEnum.CANCELLED,
-                current_user=InternalUser(),
-                db_session=db_session,
-            )
+        await update_payment_user_status(
+            request=request,
+            org_id=org_id,
+            payment_user_id=payment_user_id,
+            status=PaymentStatusEnum.CANCELLED,
+            current_user=InternalUser(),
+            db_session=db_session,
+        )
 
-        elif event_type == "payment_intent.payment_failed":
-            payment_intent = event_data
-            payment_user_id = int(payment_intent.get("metadata", {}).get("payment_user_id"))
-
-            await update_payment_user_status(
-                request=request,
-                org_id=org_id,
-                payment_user_id=payment_user_id,
-                status=PaymentStatusEnum.FAILED,
-                current_user=InternalUser(),
-                db_session=db_session,
-            )
+    elif event_type == "payment_intent.payment_failed":
+        payment_intent = event_data
+        payment_user_id = int(payment_intent.get("metadata", {}).get("payment_user_id"))
+
+        await update_payment_user_status(
+            request=request,
+            org_id=org_id,
+            payment_user_id=payment_user_id,
+            status=PaymentStatusEnum.FAILED,
+            current_user=InternalUser(),
+            db_session=db_session,
+        )
+
+    else:
+        logger.warning(f"Unhandled event type: {event_type}")
+        return {"status": "ignored", "message": f"Unhandled event type: {event_type}"}
 
+    return {"status": "success"}
+
+
+async def process_webhook_inbox(
+    request: Request,
+    db_session: Session,
+    limit: int = WEBHOOK_INBOX_BATCH_SIZE,
+) -> int:
+    """
+    Process a batch of inbox events and return how many were attempted.
+
+    Events of an account are processed in the order they were received: an
+    account with an event waiting for a retry, or being processed by another
+    worker, is skipped until that event is done. Failed events are retried
+    with an exponential backoff, then dead-lettered for an operator to look
+    at, which lets the account's later events through.
+    """
+    now = datetime.now()
+    unfinished = [PaymentsWebhookEventStatusEnum.PENDING, PaymentsWebhookEventStatusEnum.PROCESSING]
+
+    # An event waits while it, or an earlier event of its account, waits for
+    # a retry or is leased by a worker. Those are left out of the scan so
+    # that a blocked account doesn't use up the batch of the others.
+    earlier = aliased(PaymentsWebhookEvent)
+    blocked = exists().where(
+        func.coalesce(earlier.account_id, "") == func.coalesce(PaymentsWebhookEvent.account_id, ""),
+        earlier.id <= PaymentsWebhookEvent.id,  # type: ignore
+        earlier.status.in_(unfinished),  # type: ignore
+        or_(
+            earlier.next_attempt_date > now,  # type: ignore
+            and_(
+                earlier.status == PaymentsWebhookEventStatusEnum.PROCESSING,
+                earlier.lease_expires_date > now,  # type: ignore
+            ),
+        ),
+    )
+
+    # Lock the scanned events while claiming them, so that two workers can't
+    # claim the same events or events of the same account
+    statement = (
+        select(PaymentsWebhookEvent)
+        .where(
+            PaymentsWebhookEvent.status.in_(unfinished),  # type: ignore
+            ~blocked,
+        )
+        .order_by(PaymentsWebhookEvent.id)  # type: ignore
+        .limit(limit)
+        .with_for_update()
+    )
+    events = db_session.exec(statement).all()
+
+    claimed: list[PaymentsWebhookEvent] = []
+    blocked_accounts: set[str] = set()
+    for event in events:
+        account = event.account_id or ""
+        if account in blocked_accounts:
+            continue
+
+        leased = (
+            event.status == PaymentsWebhookEventStatusEnum.PROCESSING
+            and event.lease_expires_date is not None
+            and event.lease_expires_date > now
+        )
+        if leased or event.next_attempt_date > now:
+            blocked_accounts.add(account)
+            continue
+
+        event.status = PaymentsWebhookEventStatusEnum.PROCESSING
+        event.lease_expires_date = now + timedelta(seconds=WEBHOOK_INBOX_LEASE)
+        db_session.add(event)
+        claimed.append(event)
+
+    db_session.commit()
+
+    failed_accounts: set[str] = set()
+    for event in claimed:
+        account = event.account_id or ""
+        event_id = event.event_id
+
+        if account in failed_accounts:
+            # Wait for the account's failed event to be retried first
+            event.status = PaymentsWebhookEventStatusEnum.PENDING
+            event.lease_expires_date = None
+            db_session.add(event)
+            db_session.commit()
+            continue
+
+        try:
+            await process_stripe_event(request, event.payload, db_session)
+        except Exception as e:
+            db_session.rollback()
+
+            event.attempts += 1
+            event.last_error = str(getattr(e, "detail", None) or e)
+            event.lease_expires_date = None
+
+            if event.attempts >= WEBHOOK_INBOX_MAX_ATTEMPTS:
+                event.status = PaymentsWebhookEventStatusEnum.DEAD
+                logger.error(f"Stripe event {event_id} dead-lettered after {event.attempts} attempts: {event.last_error}")
+            else:
+                event.status = PaymentsWebhookEventStatusEnum.PENDING
+                event.next_attempt_date = datetime.now() + timedelta(
+                    seconds=WEBHOOK_INBOX_RETRY_DELAY * 2 ** (event.attempts - 1)
+                )
+                failed_accounts.add(account)
+                logger.warning(f"Stripe event {event_id} failed, retrying: {event.last_error}")
         else:
-            logger.warning(f"Unhandled event type: {event_type}")
-            return {"status": "ignored", "message": f"Unhandled event type: {event_type}"}
+            event.status = PaymentsWebhookEventStatusEnum.PROCESSED
+            event.processed_date = datetime.now()
+            event.lease_expires_date = None
+
+        db_session.add(event)
+        db_session.commit()
+
+    return len(claimed)
+
+
+def _internal_request() -> Request:
+    # Services take the request for RBAC, which internal users skip
+    return Request({"type": "http", "method": "POST", "headers": []})
+
+
+def process_webhook_inbox_batch() -> int:
+    """Process one batch of due events on a session of its own, for a worker thread"""
+    with Session(engine) as db_session:
+        # Event handlers are coroutines, run them on this thread's own loop
+        return asyncio.run(process_webhook_inbox(_internal_request(), db_session))
+
+
+async def drain_webhook_inbox() -> None:
+    """Process every event that is due, one batch at a time off the event loop"""
+    while await asyncio.to_thread(process_webhook_inbox_batch):
+        pass
+
+
+async def wake_webhook_inbox_worker() -> None:
+    """Have the worker drain the inbox now rather than at its next poll"""
+    if _webhook_inbox_wakeup is not None:
+        _webhook_inbox_wakeup.set()
+
 
-        return {"status": "success"}
+async def run_webhook_inbox_worker(
+    interval: float = WEBHOOK_INBOX_POLL_INTERVAL,
+) -> None:
+    """Periodically drain the inbox, picking up retries and missed events"""
+    global _webhook_inbox_wakeup
+    _webhook_inbox_wakeup = asyncio.Event()
 
-    except Exception as e:
-        logger.error(f"Error processing webhook: {str(e)}")
-        raise HTTPException(status_code=400, detail=f"Error processing webhook: {str(e)}") 
\ No newline at end of file
+    while True:
+        # Events queued while draining wake the next pass right away
+        _webhook_inbox_wakeup.clear()
+        try:
+            await drain_webhook_inbox()
+        except Exception as e:
+            logger.error(f"Error processing the webhook inbox: {e}")
+        try:
+            await asyncio.wait_for(_webhook_inbox_wakeup.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
@@ -10,6 +10,7 @@ from src.db.users import AnonymousUser, PublicUser
 from src.db.roles import Role, RoleCreate, RoleRead, RoleUpdate, RoleTypeEnum
 from src.db.organizations import Organization
 from src.db.user_organizations import UserOrganization
+from src.services.users.session_cache import invalidate_org_sessions
 from fastapi import HTTPException, Request
 from datetime import datetime
 
@@ -589,6 +590,9 @@ async def update_role(
     db_session.commit()
     db_session.refresh(role)
 
+    if role.org_id:
+        invalidate_org_sessions(role.org_id)
+
     role = RoleRead(**role.model_dump())
 
     return role
@@ -633,6 +637,9 @@ async def delete_role(
     db_session.delete(role)
     db_session.commit()
 
+    if role.org_id:
+        invalidate_org_sessions(role.org_id)
+
     return "Role deleted"
 
 
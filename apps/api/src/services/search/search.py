@@ -7,9 +7,9 @@ from src.db.users import PublicUser, AnonymousUser, UserRead, User
 from src.db.courses.courses import Course, CourseRead
 from src.db.collections import Collection, CollectionRead
 from src.db.collections_courses import CollectionCourse
-from src.db.organizations import Organization
 from src.db.user_organizations import UserOrganization
 from src.services.courses.courses import search_courses
+from src.services.orgs.slugs import resolve_org_slug
 
 T = TypeVar('T')
 
@@ -36,9 +36,8 @@ async def search_across_org(
     offset = (page - 1) * limit
 
     # Get organization
-    org_statement = select(Organization).where(Organization.slug == org_slug)
-    org = db_session.exec(org_statement).first()
-    
+    org = resolve_org_slug(db_session, org_slug)
+
     if not org:
         return SearchResult(courses=[], collections=[], users=[])
 
@@ -0,0 +1,279 @@
+import asyncio
+import csv
+import io
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Optional
+from fastapi import HTTPException, Request, status
+from sqlalchemy import insert
+from sqlalchemy.engine import Connection
+from src.core.events.database import engine
+from src.db.learning_events import LearningEvent, LearningEventBatch
+from src.db.users import AnonymousUser, PublicUser
+
+# Events accepted but not written yet, per worker process
+LEARNING_EVENTS_BUFFER_SIZE = 100_000
+LEARNING_EVENTS_BUFFER_BYTES = 64 * 1024 * 1024
+LEARNING_EVENTS_MAX_BATCH = 500
+# Events written by one COPY
+LEARNING_EVENTS_FLUSH_SIZE = 5_000
+LEARNING_EVENTS_FLUSH_INTERVAL = 1.0
+LEARNING_EVENTS_RETRY_AFTER = 1
+LEARNING_EVENT_MAX_UUID_LENGTH = 100
+# Serialized size of an event's data
+LEARNING_EVENT_MAX_DATA_BYTES = 4096
+LEARNING_EVENT_COLUMNS = [
+    "event_type",
+    "user_id",
+    "course_uuid",
+    "activity_uuid",
+    "data",
+    "occurred_date",
+    "received_date",
+]
+
+
+def learning_event_size(event: dict, data: Optional[str] = None) -> int:
+    """Approximate memory held by a buffered event: its serialized data and uuids"""
+    if data is None:
+        data = json.dumps(event["data"])
+    return len(data) + len(event["course_uuid"] or "") + len(event["activity_uuid"] or "")
+
+
+class LearningEventBuffer:
+    """
+    Bounded buffer between the ingestion endpoint and the database writer.
+
+    Bounded both in events and in bytes of event data. Batches are
+    accepted whole or not at all, a full buffer is the signal for clients
+    to back off.
+    """
+
+    def __init__(self, capacity: int, capacity_bytes: int = LEARNING_EVENTS_BUFFER_BYTES):
+        self.capacity = capacity
+        self.capacity_bytes = capacity_bytes
+        self._events: deque[tuple[int, dict]] = deque()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def offer(self, events: list[dict], sizes: Optional[list[int]] = None) -> bool:
+        if sizes is None:
+            sizes = [learning_event_size(event) for event in events]
+        size = sum(sizes)
+        with self._lock:
+            if len(self._events) + len(events) > self.capacity or self._bytes + size > self.capacity_bytes:
+                return False
+            self._events.extend(zip(sizes, events))
+            self._bytes += size
+            return True
+
+    def take(self, limit: int) -> list[dict]:
+        with self._lock:
+            taken = [self._events.popleft() for _ in range(min(limit, len(self._events)))]
+            self._bytes -= sum(size for size, _ in taken)
+            return [event for _, event in taken]
+
+    def requeue(self, events: list[dict]) -> int:
+        """Put back events that failed to be written, returns how many were dropped for lack of room"""
+        sized = [(learning_event_size(event), event) for event in events]
+        with self._lock:
+            room = max(self.capacity - len(self._events), 0)
+            room_bytes = self.capacity_bytes - self._bytes
+            kept = []
+            for size, event in sized[:room]:
+                if size > room_bytes:
+                    break
+                kept.append((size, event))
+                room_bytes -= size
+            self._events.extendleft(reversed(kept))
+            self._bytes += sum(size for size, _ in kept)
+            return len(events) - len(kept)
+
+
+learning_events_buffer = LearningEventBuffer(LEARNING_EVENTS_BUFFER_SIZE)
+
+
+async def ingest_learning_events(
+    request: Request,
+    batch: LearningEventBatch,
+    current_user: PublicUser | AnonymousUser,
+) -> dict:
+    """Accept a batch of learning events for the writer, without touching the database"""
+    if isinstance(current_user, AnonymousUser):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Anonymous users cannot send learning events",
+        )
+
+    if len(batch.events) > LEARNING_EVENTS_MAX_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {LEARNING_EVENTS_MAX_BATCH} events per batch",
+        )
+
+    received_date = datetime.now()
+    events = []
+    sizes = []
+    for index, event in enumerate(batch.events):
+        # Rows the writer can't store would fail whole batches, refuse them here
+        data = json.dumps(event.data)
+        error = _invalid_event_reason(event.course_uuid, event.activity_uuid, event.data, data)
+        if error:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Event {index}: {error}",
+            )
+
+        events.append(
+            {
+                "event_type": event.event_type,
+                "user_id": current_user.id,
+                "course_uuid": event.course_uuid,
+                "activity_uuid": event.activity_uuid,
+                "data": event.data,
+                "occurred_date": event.occurred_date,
+                "received_date": received_date,
+            }
+        )
+        sizes.append(learning_event_size(events[-1], data))
+
+    if not learning_events_buffer.offer(events, sizes):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many learning events, retry later",
+            headers={"Retry-After": str(LEARNING_EVENTS_RETRY_AFTER)},
+        )
+
+    return {"accepted": len(events)}
+
+
+def _contains_nul(value: Any) -> bool:
+    if isinstance(value, str):
+        return "\x00" in value
+    if isinstance(value, dict):
+        return any(_contains_nul(key) or _contains_nul(item) for key, item in value.items())
+    if isinstance(value, list):
+        return any(_contains_nul(item) for item in value)
+    return False
+
+
+def _invalid_event_reason(
+    course_uuid: Optional[str],
+    activity_uuid: Optional[str],
+    data: dict,
+    serialized_data: str,
+) -> Optional[str]:
+    for name, uuid in (("course_uuid", course_uuid), ("activity_uuid", activity_uuid)):
+        if uuid is not None and len(uuid) > LEARNING_EVENT_MAX_UUID_LENGTH:
+            return f"{name} is longer than {LEARNING_EVENT_MAX_UUID_LENGTH} characters"
+        if uuid is not None and "\x00" in uuid:
+            return f"{name} contains a NUL character"
+    if len(serialized_data) > LEARNING_EVENT_MAX_DATA_BYTES:
+        return f"data is larger than {LEARNING_EVENT_MAX_DATA_BYTES} bytes"
+    if _contains_nul(data):
+        return "data contains a NUL character"
+    return None
+
+
+def _copy_learning_events(connection: Connection, events: list[dict]) -> None:
+    rows = io.StringIO()
+    writer = csv.writer(rows)
+    for event in events:
+        writer.writerow(
+            [
+                event["event_type"].value,
+                event["user_id"],
+                event["course_uuid"],
+                event["activity_uuid"],
+                json.dumps(event["data"]),
+                event["occurred_date"].isoformat(),
+                event["received_date"].isoformat(),
+            ]
+        )
+    rows.seek(0)
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(  # type: ignore
+            f"COPY learningevent ({', '.join(LEARNING_EVENT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            rows,
+        )
+    finally:
+        cursor.close()
+
+
+def write_learning_events(connection: Connection, events: list[dict]) -> None:
+    """Write events with COPY on PostgreSQL, one multi-row insert elsewhere"""
+    if connection.dialect.name == "postgresql":
+        _copy_learning_events(connection, events)
+    else:
+        connection.execute(insert(LearningEvent), events)
+
+
+def _is_bad_rows_error(error: Exception) -> bool:
+    """Whether the database refused the rows themselves, as opposed to being unavailable"""
+    dbapi = engine.dialect.dbapi
+    # SQLAlchemy wraps driver errors, COPY raises them as is
+    error = getattr(error, "orig", None) or error
+    return isinstance(error, (dbapi.DataError, dbapi.IntegrityError))  # type: ignore
+
+
+def _write_learning_events_batch(events: list[dict]) -> tuple[int, list[dict]]:
+    """
+    Write events in one transaction, returns how many were written and the
+    events to retry.
+
+    A batch refused for its rows is split in halves until the bad events
+    are isolated and dropped, so one of them can't block the others
+    forever. Events are only retried when the database is unavailable.
+    """
+    try:
+        with engine.begin() as connection:
+            write_learning_events(connection, events)
+        return len(events), []
+    except Exception as e:
+        if not _is_bad_rows_error(e):
+            logging.error(f"Could not write {len(events)} learning events: {e}")
+            return 0, events
+        if len(events) == 1:
+            logging.error(f"Dropped a learning event the database refused: {events[0]!r}: {e}")
+            return 0, []
+
+    middle = len(events) // 2
+    first_written, first_failed = _write_learning_events_batch(events[:middle])
+    last_written, last_failed = _write_learning_events_batch(events[middle:])
+    return first_written + last_written, first_failed + last_failed
+
+
+def flush_learning_events(limit: int = LEARNING_EVENTS_FLUSH_SIZE) -> int:
+    """Write up to `limit` buffered events, returns how many left the buffer for good"""
+    events = learning_events_buffer.take(limit)
+    if not events:
+        return 0
+
+    _, failed = _write_learning_events_batch(events)
+    if failed:
+        dropped = learning_events_buffer.requeue(failed)
+        if dropped:
+            logging.error(f"No room to retry {dropped} learning events, dropped")
+
+    return len(events) - len(failed)
+
+
+async def run_learning_events_writer(
+    interval: float = LEARNING_EVENTS_FLUSH_INTERVAL,
+) -> None:
+    """Periodically write buffered events, off the event loop"""
+    while True:
+        try:
+            while await asyncio.to_thread(flush_learning_events):
+                pass
+        except Exception as e:
+            logging.error(f"Error writing learning events: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,276 @@
+import logging
+import random
+import string
+import time
+from datetime import datetime
+from typing import Iterable
+from pydantic import BaseModel
+from sqlalchemy import exists, func, insert, update
+from sqlmodel import Session, select
+from src.core.events.database import engine
+from src.db.courses.certifications import CertificateUser, Certifications
+from src.db.courses.chapter_activities import ChapterActivity
+from src.db.trail_runs import TrailRun
+from src.db.trail_steps import TrailStep
+from src.db.users import User
+from src.services.courses.analytics import (
+    mark_course_analytics_stale,
+    record_activity_completed,
+    record_activity_uncompleted,
+)
+
+# Certificates inserted together by a recompute
+CERTIFICATE_ISSUE_BATCH_SIZE = 1000
+
+# Course progress lives on trail runs, one per user and course: the number
+# of activities of the course, and how many of them the user completed.
+# Both are kept up to date by the statements below, in the transaction of
+# the change, so reading progress never counts steps.
+
+
+def course_total_steps(db_session: Session, course_id: int) -> int:
+    """Number of activities in a course, for a trail run being created"""
+    statement = select(func.count(func.distinct(ChapterActivity.activity_id))).where(
+        ChapterActivity.course_id == course_id
+    )
+    return db_session.exec(statement).one()
+
+
+def _counts_for_progress(step: TrailStep):
+    """Whether a completed step counts: its activity is in the course and the user has no other completion of it"""
+    in_course = select(ChapterActivity.id).where(
+        ChapterActivity.course_id == step.course_id,
+        ChapterActivity.activity_id == step.activity_id,
+    )
+    other_completion = select(TrailStep.id).where(
+        TrailStep.user_id == step.user_id,
+        TrailStep.activity_id == step.activity_id,
+        TrailStep.complete == True,  # noqa: E712
+        TrailStep.id != step.id,
+    )
+    return exists(in_course), ~exists(other_completion)
+
+
+def record_step_completed(db_session: Session, step: TrailStep) -> None:
+    """Count a completed step that was just flushed"""
+    result = db_session.execute(
+        update(TrailRun)
+        .where(TrailRun.id == step.trailrun_id, *_counts_for_progress(step))  # type: ignore
+        .values(completed_steps=TrailRun.completed_steps + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:  # type: ignore
+        record_activity_completed(db_session, step)
+
+
+def record_step_removed(db_session: Session, step: TrailStep) -> None:
+    """Uncount a completed step that was just deleted"""
+    result = db_session.execute(
+        update(TrailRun)
+        .where(
+            TrailRun.id == step.trailrun_id,
+            TrailRun.completed_steps > 0,
+            *_counts_for_progress(step),
+        )  # type: ignore
+        .values(completed_steps=TrailRun.completed_steps - 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:  # type: ignore
+        record_activity_uncompleted(db_session, step)
+
+
+def _completed_among(activity_ids: set[int]):
+    # Activities of the set each user completed, correlated to the trail run
+    return (
+        select(func.count(func.distinct(TrailStep.activity_id)))
+        .where(
+            TrailStep.user_id == TrailRun.user_id,
+            TrailStep.complete == True,  # noqa: E712
+            TrailStep.activity_id.in_(activity_ids),  # type: ignore
+        )
+        .scalar_subquery()
+    )
+
+
+def update_course_structure_progress(
+    db_session: Session,
+    course_id: int,
+    added_activity_ids: Iterable[int] = (),
+    removed_activity_ids: Iterable[int] = (),
+) -> None:
+    """
+    Update the progress of every learner of a course after activities were
+    added to or removed from it.
+
+    Call it once the chapter activity links changed, but before deleting
+    the activities themselves: trail steps of removed activities are needed
+    to know who had completed them. Activities still linked from another
+    chapter aren't counted as removed.
+    """
+    still_linked = select(ChapterActivity.activity_id).where(ChapterActivity.course_id == course_id)
+    removed = set(removed_activity_ids) - set(db_session.exec(still_linked).all())
+    added = set(added_activity_ids)
+
+    completed_steps = TrailRun.completed_steps
+    if added:
+        completed_steps = completed_steps + _completed_among(added)
+    if removed:
+        completed_steps = completed_steps - _completed_among(removed)
+
+    db_session.execute(
+        update(TrailRun)
+        .where(TrailRun.course_id == course_id)  # type: ignore
+        .values(
+            total_steps=(
+                select(func.count(func.distinct(ChapterActivity.activity_id)))
+                .where(ChapterActivity.course_id == course_id)
+                .scalar_subquery()
+            ),
+            completed_steps=completed_steps,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    mark_course_analytics_stale(db_session, course_id)
+
+
+class CourseProgressRecompute(BaseModel):
+    course_id: int
+    learners: int
+    completed: int
+    certificates_issued: int
+    duration: float
+
+
+def _certificate_uuid(user_uuid: str, day: str, taken: set[str]) -> str:
+    # Same shape as certificates issued one by one, PREFIX-DATE-USER-NUMBER
+    prefix = "".join(random.choices(string.ascii_uppercase, k=2))
+    user_uuid_short = user_uuid[-4:] if user_uuid else "USER"
+    number = 1
+    while (certificate_uuid := f"{prefix}-{day}-{user_uuid_short}-{number:03d}") in taken:
+        number += 1
+    taken.add(certificate_uuid)
+    return certificate_uuid
+
+
+def _issue_certificates(db_session: Session, course_id: int) -> int:
+    statement = select(Certifications.id).where(Certifications.course_id == course_id)
+    certification_id = db_session.exec(statement).first()
+    if certification_id is None:
+        return 0
+
+    # Learners who completed the course and have no certificate yet
+    has_certificate = select(CertificateUser.id).where(
+        CertificateUser.user_id == TrailRun.user_id,
+        CertificateUser.certification_id == certification_id,
+    )
+    statement = (
+        select(User.id, User.user_uuid)
+        .join(TrailRun, TrailRun.user_id == User.id)  # type: ignore
+        .where(
+            TrailRun.course_id == course_id,
+            TrailRun.total_steps > 0,
+            TrailRun.completed_steps >= TrailRun.total_steps,
+            ~exists(has_certificate),
+        )
+        .distinct()
+    )
+    eligible = db_session.exec(statement).all()
+
+    now = datetime.now()
+    day = now.strftime("%Y%m%d")
+    for start in range(0, len(eligible), CERTIFICATE_ISSUE_BATCH_SIZE):
+        batch = eligible[start : start + CERTIFICATE_ISSUE_BATCH_SIZE]
+
+        # Numbers already used today by these learners
+        statement = select(CertificateUser.user_certification_uuid).where(
+            CertificateUser.user_id.in_([user_id for user_id, _ in batch]),  # type: ignore
+            CertificateUser.user_certification_uuid.contains(f"-{day}-"),  # type: ignore
+        )
+        taken = set(db_session.exec(statement).all())
+
+        db_session.execute(
+            insert(CertificateUser),
+            [
+                {
+                    "user_id": user_id,
+                    "certification_id": certification_id,
+                    "user_certification_uuid": _certificate_uuid(user_uuid, day, taken),
+                    "created_at": str(now),
+                    "updated_at": str(now),
+                }
+                for user_id, user_uuid in batch
+            ],
+        )
+
+    return len(eligible)
+
+
+def recompute_course_progress(db_session: Session, course_id: int) -> CourseProgressRecompute:
+    """
+    Recount the progress of every learner of a course from their trail steps,
+    then issue the certificates of learners who completed it.
+
+    Runs a fixed number of statements whatever the number of learners:
+    one UPDATE for all trail runs, one query for the learners to certify and
+    one INSERT per CERTIFICATE_ISSUE_BATCH_SIZE certificates.
+    """
+    started = time.perf_counter()
+
+    course_activities = select(ChapterActivity.activity_id).where(ChapterActivity.course_id == course_id)
+    result = db_session.execute(
+        update(TrailRun)
+        .where(TrailRun.course_id == course_id)  # type: ignore
+        .values(
+            total_steps=(
+                select(func.count(func.distinct(ChapterActivity.activity_id)))
+                .where(ChapterActivity.course_id == course_id)
+                .scalar_subquery()
+            ),
+            completed_steps=(
+                select(func.count(func.distinct(TrailStep.activity_id)))
+                .where(
+                    TrailStep.user_id == TrailRun.user_id,
+                    TrailStep.complete == True,  # noqa: E712
+                    TrailStep.activity_id.in_(course_activities),  # type: ignore
+                )
+                .scalar_subquery()
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    learners = result.rowcount  # type: ignore
+
+    statement = select(func.count(TrailRun.id)).where(  # type: ignore
+        TrailRun.course_id == course_id,
+        TrailRun.total_steps > 0,
+        TrailRun.completed_steps >= TrailRun.total_steps,
+    )
+    completed = db_session.exec(statement).one()
+
+    certificates_issued = _issue_certificates(db_session, course_id)
+    mark_course_analytics_stale(db_session, course_id)
+    db_session.commit()
+
+    return CourseProgressRecompute(
+        course_id=course_id,
+        learners=learners,
+        completed=completed,
+        certificates_issued=certificates_issued,
+        duration=time.perf_counter() - started,
+    )
+
+
+def recompute_course_progress_job(course_id: int) -> None:
+    """Background task run once a course's structure changed"""
+    try:
+        with Session(engine) as db_session:
+            report = recompute_course_progress(db_session, course_id)
+    except Exception as e:
+        logging.error(f"Could not recompute progress of course {course_id}: {e}")
+        return
+
+    logging.info(
+        f"Recomputed progress of course {course_id}: {report.learners} learners, "
+        f"{report.completed} completed, {report.certificates_issued} certificates issued "
+        f"in {report.duration:.2f}s"
+    )
@@ -1,6 +1,5 @@
 from datetime import datetime
 from uuid import uuid4
-from src.db.courses.chapter_activities import ChapterActivity
 from fastapi import HTTPException, Request, status
 from sqlmodel import Session, select
 from src.db.courses.activities import Activity
@@ -9,7 +8,13 @@ from src.db.trail_runs import TrailRun, TrailRunRead
 from src.db.trail_steps import TrailStep
 from src.db.trails import Trail, TrailCreate, TrailRead
 from src.db.users import AnonymousUser, PublicUser
+from src.services.courses.analytics import record_enrollment, record_learner_left
 from src.services.courses.certifications import check_course_completion_and_create_certificate
+from src.services.trail.progress import (
+    course_total_steps,
+    record_step_completed,
+    record_step_removed,
+)
 
 
 async def create_user_trail(
@@ -61,24 +66,16 @@ async def get_user_trails(
     trail_runs = db_session.exec(statement).all()
 
     trail_runs = [
-        TrailRunRead(**trail_run.__dict__, course={}, steps=[], course_total_steps=0)
+        TrailRunRead(**trail_run.__dict__, course={}, steps=[], course_total_steps=trail_run.total_steps)
         for trail_run in trail_runs
     ]
 
-    # Add course object and total activities in a course to trail runs
+    # Add course object to trail runs
     for trail_run in trail_runs:
         statement = select(Course).where(Course.id == trail_run.course_id)
         course = db_session.exec(statement).first()
         trail_run.course = course.model_dump() if course else {}
 
-        # Add number of activities (steps) in a course
-        statement = select(ChapterActivity).where(
-            ChapterActivity.course_id == trail_run.course_id
-        )
-        course_total_steps = db_session.exec(statement)
-        # count number of activities in a this list
-        trail_run.course_total_steps = len(course_total_steps.all())
-
     for trail_run in trail_runs:
         statement = select(TrailStep).where(TrailStep.trailrun_id == trail_run.id)
         trail_steps = db_session.exec(statement).all()
@@ -146,24 +143,16 @@ async def get_user_trail_with_orgid(
     trail_runs = db_session.exec(statement).all()
 
     trail_runs = [
-        TrailRunRead(**trail_run.__dict__, course={}, steps=[], course_total_steps=0)
+        TrailRunRead(**trail_run.__dict__, course={}, steps=[], course_total_steps=trail_run.total_steps)
         for trail_run in trail_runs
     ]
 
-    # Add course object and total activities in a course to trail runs
+    # Add course object to trail runs
     for trail_run in trail_runs:
         statement = select(Course).where(Course.id == trail_run.course_id)
         course = db_session.exec(statement).first()
         trail_run.course = course.model_dump() if course else {}
 
-        # Add number of activities (steps) in a course
-        statement = select(ChapterActivity).where(
-            ChapterActivity.course_id == trail_run.course_id
-        )
-        course_total_steps = db_session.exec(statement)
-        # count number of activities in a this list
-        trail_run.course_total_steps = len(course_total_steps.all())
-
     for trail_run in trail_runs:
         statement = select(TrailStep).where(TrailStep.trailrun_id == trail_run.id)
         trail_steps = db_session.exec(statement).all()
@@ -226,10 +215,12 @@ async def add_activity_to_trail(
             course_id=course.id if course.id is not None else 0,
             org_id=course.org_id,
             user_id=user.id,
+            total_steps=course_total_steps(db_session, course.id),  # type: ignore
             creation_date=str(datetime.now()),
             update_date=str(datetime.now()),
         )
         db_session.add(trailrun)
+        record_enrollment(db_session, trailrun)
         db_session.commit()
         db_session.refresh(trailrun)
 
@@ -253,6 +244,8 @@ async def add_activity_to_trail(
             update_date=str(datetime.now()),
         )
         db_session.add(trailstep)
+        db_session.flush()
+        record_step_completed(db_session, trailstep)
         db_session.commit()
         db_session.refresh(trailstep)
 
@@ -266,7 +259,7 @@ async def add_activity_to_trail(
     trail_runs = db_session.exec(statement).all()
 
     trail_runs = [
-        TrailRunRead(**trail_run.__dict__, course={}, steps=[], course_total_steps=0)
+        TrailRunRead(**trail_run.__dict__, course={}, steps=[], course_total_steps=trail_run.total_steps)
         for trail_run in trail_runs
     ]
 
@@ -332,6 +325,8 @@ async def remove_activity_from_trail(
 
     if trail_step:
         db_session.delete(trail_step)
+        db_session.flush()
+        record_step_removed(db_session, trail_step)
         db_session.commit()
 
     # Get updated trail data
@@ -339,7 +334,7 @@ async def remove_activity_from_trail(
     trail_runs = db_session.exec(statement).all()
 
     trail_runs = [
-        TrailRunRead(**trail_run.__dict__, course={}, steps=[], course_total_steps=0)
+        TrailRunRead(**trail_run.__dict__, course={}, steps=[], course_total_steps=trail_run.total_steps)
         for trail_run in trail_runs
     ]
 
@@ -409,10 +404,12 @@ async def add_course_to_trail(
             course_id=course.id if course.id is not None else 0,
             org_id=course.org_id,
             user_id=user.id,
+            total_steps=course_total_steps(db_session, course.id),  # type: ignore
             creation_date=str(datetime.now()),
             update_date=str(datetime.now()),
         )
         db_session.add(trail_run)
+        record_enrollment(db_session, trail_run)
         db_session.commit()
         db_session.refresh(trail_run)
 
@@ -420,7 +417,7 @@ async def add_course_to_trail(
     trail_runs = db_session.exec(statement).all()
 
     trail_runs = [
-        TrailRunRead(**trail_run.__dict__, course={}, steps=[], course_total_steps=0)
+        TrailRunRead(**trail_run.__dict__, course={}, steps=[], course_total_steps=trail_run.total_steps)
         for trail_run in trail_runs
     ]
 
@@ -474,6 +471,7 @@ async def remove_course_from_trail(
     trail_run = db_session.exec(statement).first()
 
     if trail_run:
+        record_learner_left(db_session, trail_run)
         db_session.delete(trail_run)
         db_session.commit()
 
@@ -489,7 +487,7 @@ async def remove_course_from_trail(
     trail_runs = db_session.exec(statement).all()
 
     trail_runs = [
-        TrailRunRead(**trail_run.__dict__, course={}, steps=[], course_total_steps=0)
+        TrailRunRead(**trail_run.__dict__, course={}, steps=[], course_total_steps=trail_run.total_steps)
         for trail_run in trail_runs
     ]
 
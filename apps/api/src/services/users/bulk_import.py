@@ -0,0 +1,303 @@
+import csv
+import io
+from datetime import datetime
+from typing import Iterable, Iterator, Literal, Optional
+from uuid import uuid4
+from fastapi import BackgroundTasks, HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, or_, select
+from src.db.organizations import Organization
+from src.db.user_organizations import UserOrganization
+from src.db.users import AnonymousUser, PublicUser, User, UserCreate, UserRead
+from src.security.features_utils.usage import (
+    get_remaining_feature_usage,
+    increase_feature_usage,
+)
+from src.security.password_hashing import hash_passwords
+from src.services.orgs.orgs import rbac_check
+from src.services.orgs.users import invalidate_organization_users_count
+from src.services.users.emails import send_account_creation_email
+
+# Rows hashed, inserted and committed together
+USER_IMPORT_BATCH_SIZE = 500
+USER_IMPORT_COLUMNS = ("email", "username", "password", "first_name", "last_name")
+USER_IMPORT_REPORT_FIELDS = ["row", "email", "username", "status", "detail", "user_uuid"]
+
+
+class UserImportResult(BaseModel):
+    row: int
+    email: str = ""
+    username: str = ""
+    status: Literal["created", "error"]
+    detail: str = ""
+    user_uuid: str = ""
+
+
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+async def _import_batch(
+    db_session: Session,
+    org_id: int,
+    batch: list[tuple[int, UserCreate]],
+    background_tasks: Optional[BackgroundTasks],
+) -> list[UserImportResult]:
+    results: list[UserImportResult] = []
+
+    # Existing accounts, one query for the whole batch
+    emails = [user_object.email for _, user_object in batch]
+    usernames = [user_object.username for _, user_object in batch]
+    existing = db_session.exec(
+        select(User.email, User.username).where(
+            or_(User.email.in_(emails), User.username.in_(usernames))  # type: ignore
+        )
+    ).all()
+    existing_emails = {email for email, _ in existing}
+    existing_usernames = {username for _, username in existing}
+
+    pending: list[tuple[int, UserCreate]] = []
+    for row, user_object in batch:
+        if user_object.email in existing_emails:
+            detail = "Email already exists"
+        elif user_object.username in existing_usernames:
+            detail = "Username already exists"
+        else:
+            pending.append((row, user_object))
+            continue
+        results.append(
+            UserImportResult(
+                row=row,
+                email=user_object.email,
+                username=user_object.username,
+                status="error",
+                detail=detail,
+            )
+        )
+
+    if not pending:
+        return results
+
+    # Usage check, rows past the member limit are reported, not created
+    remaining = get_remaining_feature_usage("members", org_id, db_session)
+    if remaining is not None and remaining < len(pending):
+        results += [
+            UserImportResult(
+                row=row,
+                email=user_object.email,
+                username=user_object.username,
+                status="error",
+                detail="Member limit reached",
+            )
+            for row, user_object in pending[remaining:]
+        ]
+        pending = pending[:remaining]
+
+    if not pending:
+        return results
+
+    hashed_passwords = await hash_passwords(
+        [user_object.password for _, user_object in pending]
+    )
+
+    now = str(datetime.now())
+    user_rows = [
+        {
+            **user_object.dict(exclude={"password"}),
+            "password": hashed_password,
+            "user_uuid": f"user_{uuid4()}",
+            "email_verified": False,
+            "creation_date": now,
+            "update_date": now,
+        }
+        for (_, user_object), hashed_password in zip(pending, hashed_passwords)
+    ]
+
+    try:
+        user_ids = db_session.execute(
+            insert(User).returning(User.id, sort_by_parameter_order=True),  # type: ignore
+            user_rows,
+        ).scalars().all()
+        db_session.execute(
+            insert(UserOrganization),
+            [
+                {
+                    "user_id": user_id,
+                    "org_id": org_id,
+                    "role_id": 4,
+                    "creation_date": now,
+                    "update_date": now,
+                }
+                for user_id in user_ids
+            ],
+        )
+        db_session.commit()
+    except IntegrityError:
+        # Another request created one of these accounts in the meantime
+        db_session.rollback()
+        return results + [
+            UserImportResult(
+                row=row,
+                email=user_object.email,
+                username=user_object.username,
+                status="error",
+                detail="Could not create user, please retry this row",
+            )
+            for row, user_object in pending
+        ]
+
+    increase_feature_usage("members", org_id, db_session, count=len(user_ids))
+
+    for (row, user_object), user_row, user_id in zip(pending, user_rows, user_ids):
+        results.append(
+            UserImportResult(
+                row=row,
+                email=user_object.email,
+                username=user_object.username,
+                status="created",
+                user_uuid=user_row["user_uuid"],
+            )
+        )
+
+        if background_tasks is not None:
+            user = UserRead(
+                id=user_id,
+                user_uuid=user_row["user_uuid"],
+                **user_object.dict(exclude={"password"}),
+            )
+            background_tasks.add_task(
+                send_account_creation_email, user=user, email=user.email
+            )
+
+    return results
+
+
+async def import_users(
+    db_session: Session,
+    org_id: int,
+    rows: Iterable[dict],
+    background_tasks: Optional[BackgroundTasks] = None,
+) -> list[UserImportResult]:
+    """
+    Create users from CSV rows and add them to an organization.
+
+    Rows are validated one by one, then hashed and inserted by batches of
+    USER_IMPORT_BATCH_SIZE, each batch in its own transaction. Welcome
+    emails are queued on `background_tasks` when given. Returns one result
+    per row, in file order.
+    """
+    results: list[UserImportResult] = []
+    batch: list[tuple[int, UserCreate]] = []
+    seen_emails: set[str] = set()
+    seen_usernames: set[str] = set()
+
+    # Row 1 is the header
+    for row_number, row in enumerate(rows, start=2):
+        values = {
+            column: (row.get(column) or "").strip() for column in USER_IMPORT_COLUMNS
+        }
+
+        try:
+            user_object = UserCreate(**values)
+        except ValidationError as e:
+            results.append(
+                UserImportResult(
+                    row=row_number,
+                    email=values["email"],
+                    username=values["username"],
+                    status="error",
+                    detail=_validation_detail(e),
+                )
+            )
+            continue
+
+        detail = ""
+        if not user_object.username:
+            detail = "Username is required"
+        elif not user_object.password:
+            detail = "Password is required"
+        elif user_object.email in seen_emails:
+            detail = "Email is duplicated in the file"
+        elif user_object.username in seen_usernames:
+            detail = "Username is duplicated in the file"
+
+        if detail:
+            results.append(
+                UserImportResult(
+                    row=row_number,
+                    email=values["email"],
+                    username=values["username"],
+                    status="error",
+                    detail=detail,
+                )
+            )
+            continue
+
+        seen_emails.add(user_object.email)
+        seen_usernames.add(user_object.username)
+        batch.append((row_number, user_object))
+
+        if len(batch) >= USER_IMPORT_BATCH_SIZE:
+            results += await _import_batch(db_session, org_id, batch, background_tasks)
+            batch = []
+
+    if batch:
+        results += await _import_batch(db_session, org_id, batch, background_tasks)
+
+    if any(result.status == "created" for result in results):
+        invalidate_organization_users_count(org_id)
+
+    return sorted(results, key=lambda result: result.row)
+
+
+async def import_users_from_csv(
+    request: Request,
+    org_id: int,
+    users_file: io.IOBase,
+    background_tasks: Optional[BackgroundTasks],
+    current_user: PublicUser | AnonymousUser,
+    db_session: Session,
+) -> list[UserImportResult]:
+    statement = select(Organization).where(Organization.id == org_id)
+    org = db_session.exec(statement).first()
+
+    if not org:
+        raise HTTPException(
+            status_code=404,
+            detail="Organization not found",
+        )
+
+    # RBAC check
+    await rbac_check(request, org.org_uuid, current_user, "create", db_session)
+
+    # Rows are read from the file as they're processed
+    reader = csv.DictReader(io.TextIOWrapper(users_file, encoding="utf-8-sig"))  # type: ignore
+
+    if not reader.fieldnames or not {"email", "username", "password"} <= set(
+        reader.fieldnames
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="CSV must have email, username and password columns",
+        )
+
+    return await import_users(db_session, org_id, reader, background_tasks)
+
+
+def user_import_report_csv(results: Iterable[UserImportResult]) -> Iterator[str]:
+    """Render import results as CSV, one chunk per row"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=USER_IMPORT_REPORT_FIELDS)
+
+    writer.writeheader()
+    for result in results:
+        writer.writerow(result.dict())
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    yield buffer.getvalue()
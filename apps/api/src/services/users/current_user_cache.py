@@ -0,0 +1,190 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+import redis
+from src.core.cache import get_redis_client
+from src.db.users import PublicUser
+
+# Local entries are short lived: without Redis this bounds how long another
+# worker may keep serving a user that was updated or deleted elsewhere
+CURRENT_USER_LOCAL_TTL = 30
+CURRENT_USER_LOCAL_MAXSIZE = 2048
+CURRENT_USER_REDIS_TTL = 60 * 5
+# Subject to user id, to read the token version before loading the user
+CURRENT_USER_ID_TTL = 60 * 60 * 24
+
+
+class _CachedUser(NamedTuple):
+    user: dict
+    version: int
+    expires_at: float
+
+
+class CurrentUserLRU:
+    """Bounded, thread-safe LRU of authenticated users keyed by JWT subject"""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, _CachedUser] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, subject: str) -> Optional[_CachedUser]:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            if entry.expires_at < time.monotonic():
+                del self._entries[subject]
+                return None
+            self._entries.move_to_end(subject)
+            return entry
+
+    def set(self, subject: str, user: dict, version: int) -> None:
+        with self._lock:
+            self._entries[subject] = _CachedUser(
+                user=user, version=version, expires_at=time.monotonic() + self.ttl
+            )
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, subject: str) -> None:
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def discard_user(self, user_id: int) -> None:
+        with self._lock:
+            for subject in [
+                subject
+                for subject, entry in self._entries.items()
+                if entry.user["id"] == user_id
+            ]:
+                del self._entries[subject]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+current_user_lru = CurrentUserLRU(CURRENT_USER_LOCAL_MAXSIZE, CURRENT_USER_LOCAL_TTL)
+
+
+def _current_user_key(subject: str) -> str:
+    return f"current_user:{subject}"
+
+
+def _current_user_id_key(subject: str) -> str:
+    return f"current_user_id:{subject}"
+
+
+def _token_version_key(user_id: int) -> str:
+    return f"user_token_version:{user_id}"
+
+
+def _read_version(r: redis.Redis, user_id: int) -> int:
+    value = r.get(_token_version_key(user_id))
+    return int(value) if value else 0  # type: ignore
+
+
+def invalidate_current_user(user_id: int) -> None:
+    """
+    Invalidate the cached authenticated user (update, deletion, password change).
+
+    Local entries are dropped right away; other workers see the bumped token
+    version on their next lookup.
+    """
+    current_user_lru.discard_user(user_id)
+
+    r = get_redis_client()
+    if r is None:
+        return
+
+    try:
+        r.incr(_token_version_key(user_id))
+    except redis.RedisError as e:
+        logging.error(f"Could not bump token version of user {user_id}: {e}")
+
+
+class CurrentUserMiss(NamedTuple):
+    """Token version seen on a cache miss, before the user is loaded"""
+
+    user_id: int
+    version: int
+
+
+def get_cached_current_user(subject: str) -> tuple[Optional[PublicUser], Optional[CurrentUserMiss]]:
+    """
+    Return the cached user for a JWT subject, or None on a miss.
+
+    Without Redis, local entries are trusted until they expire. With Redis,
+    every hit is checked against the user's token version, which is a single
+    GET instead of a database round trip. On a miss, the version of the
+    subject's user is returned when known, to be passed to
+    `cache_current_user` once the user is loaded.
+    """
+    r = get_redis_client()
+    entry = current_user_lru.get(subject)
+
+    if r is None:
+        return (PublicUser(**entry.user) if entry else None), None
+
+    try:
+        if entry is None:
+            cached = r.get(_current_user_key(subject))
+            if cached is not None:
+                data = json.loads(cached)  # type: ignore
+                entry = _CachedUser(user=data["user"], version=data["version"], expires_at=0)
+                current_user_lru.set(subject, entry.user, entry.version)
+
+        user_id = entry.user["id"] if entry else r.get(_current_user_id_key(subject))
+        if user_id is None:
+            return None, None
+
+        version = _read_version(r, int(user_id))  # type: ignore
+        if entry is None or version != entry.version:
+            current_user_lru.discard(subject)
+            return None, CurrentUserMiss(user_id=int(user_id), version=version)  # type: ignore
+    except (redis.RedisError, ValueError, KeyError) as e:
+        logging.error(f"Could not read cached user {subject}: {e}")
+        return None, None
+
+    return PublicUser(**entry.user), None
+
+
+def cache_current_user(subject: str, user: PublicUser, miss: Optional[CurrentUserMiss] = None) -> None:
+    """
+    Store an authenticated user loaded from the database.
+
+    With Redis, the user is only cached under the version read before it
+    was loaded, so an invalidation racing the load leaves the entry stale
+    instead of hiding the change. The first load of a subject only records
+    its user id, the next one caches it.
+    """
+    user_data = json.loads(user.json())
+    user_id = user_data["id"]
+    r = get_redis_client()
+
+    if r is None:
+        current_user_lru.set(subject, user_data, 0)
+        return
+
+    try:
+        if miss is None or miss.user_id != user_id:
+            r.set(_current_user_id_key(subject), user_id, ex=CURRENT_USER_ID_TTL)
+            return
+
+        current_user_lru.set(subject, user_data, miss.version)
+        r.set(
+            _current_user_key(subject),
+            json.dumps({"user": user_data, "version": miss.version}),
+            ex=CURRENT_USER_REDIS_TTL,
+        )
+    except redis.RedisError as e:
+        logging.error(f"Could not cache user {user_id}: {e}")
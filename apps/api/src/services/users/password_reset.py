@@ -8,8 +8,9 @@ from fastapi import HTTPException, Request
 from pydantic import EmailStr
 from sqlmodel import Session, select
 from src.db.organizations import Organization, OrganizationRead
-from src.security.security import security_hash_password
+from src.security.password_hashing import hash_password
 from config.config import get_learnhouse_config
+from src.services.users.current_user_cache import invalidate_current_user
 from src.services.users.emails import (
     send_password_reset_email,
 )
@@ -190,12 +191,14 @@ async def change_password_with_reset_code(
         )
 
     # Change password
-    user.password = security_hash_password(new_password)
+    user.password = await hash_password(new_password)
     db_session.add(user)
 
     db_session.commit()
     db_session.refresh(user)
 
+    invalidate_current_user(user.id)  # type: ignore
+
     # Delete reset code
     r.delete(keys[0])
 
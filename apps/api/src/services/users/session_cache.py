@@ -0,0 +1,149 @@
+import hashlib
+import json
+import logging
+from typing import Optional
+import redis
+from pydantic import BaseModel
+from sqlmodel import Session, select
+from src.core.cache import get_redis_client
+from src.db.organizations import Organization, OrganizationRead
+from src.db.roles import Role, RoleRead
+from src.db.user_organizations import UserOrganization
+from src.db.users import User, UserRead, UserRoleWithOrg, UserSession
+
+# Cached sessions expire on their own after a day even if nothing changes
+USER_SESSION_TTL = 60 * 60 * 24
+
+
+class UserSessionCacheEntry(BaseModel):
+    etag: str
+    versions: dict[str, int]
+    payload: dict
+
+
+def _user_session_key(user_id: int) -> str:
+    return f"user_session:{user_id}"
+
+
+def _user_version_key(user_id: int) -> str:
+    return f"user_session_version:user:{user_id}"
+
+
+def _org_version_key(org_id: int) -> str:
+    return f"user_session_version:org:{org_id}"
+
+
+def _bump(key: str) -> None:
+    r = get_redis_client()
+    if r is None:
+        return
+
+    try:
+        r.incr(key)
+    except redis.RedisError as e:
+        logging.error(f"Could not bump session version {key}: {e}")
+
+
+def invalidate_user_session(user_id: int) -> None:
+    """Invalidate the cached session of a user (profile or membership changes)"""
+    _bump(_user_version_key(user_id))
+
+
+def invalidate_org_sessions(org_id: int) -> None:
+    """Invalidate the cached sessions of every member of an organization"""
+    _bump(_org_version_key(org_id))
+
+
+def _read_versions(r: redis.Redis, keys: list[str]) -> dict[str, int]:
+    values = r.mget(keys)
+    return {key: int(value) if value else 0 for key, value in zip(keys, values)}  # type: ignore
+
+
+def build_user_session(db_session: Session, user: User) -> UserSession:
+    """Build the session payload of a user with one join over memberships"""
+    statement = (
+        select(Role, Organization)
+        .select_from(UserOrganization)
+        .join(Role, Role.id == UserOrganization.role_id)  # type: ignore
+        .join(Organization, Organization.id == UserOrganization.org_id)  # type: ignore
+        .where(UserOrganization.user_id == user.id)
+        .order_by(UserOrganization.id.asc())  # type: ignore
+    )
+
+    roles = [
+        UserRoleWithOrg(
+            role=RoleRead.model_validate(role),
+            org=OrganizationRead.model_validate(org),
+        )
+        for role, org in db_session.exec(statement).all()
+    ]
+
+    return UserSession(user=UserRead.model_validate(user), roles=roles)
+
+
+def get_cached_user_session(user_id: int) -> Optional[UserSessionCacheEntry]:
+    """
+    Return the cached session of a user if none of the versions it was
+    built with has been bumped since.
+    """
+    r = get_redis_client()
+    if r is None:
+        return None
+
+    try:
+        cached = r.get(_user_session_key(user_id))
+        if cached is None:
+            return None
+
+        entry = UserSessionCacheEntry.parse_raw(cached)  # type: ignore
+        if _read_versions(r, list(entry.versions)) != entry.versions:
+            return None
+
+        return entry
+    except (redis.RedisError, ValueError) as e:
+        logging.error(f"Could not read cached session of user {user_id}: {e}")
+        return None
+
+
+def cache_user_session(
+    db_session: Session,
+    user: User,
+) -> UserSessionCacheEntry:
+    """
+    Build the session of a user and store it in Redis.
+
+    Versions are read before the payload is built, so a change committed
+    while building leaves the entry stale instead of hiding the change.
+    """
+    user_id = int(user.id)  # type: ignore
+    r = get_redis_client()
+
+    org_ids = db_session.exec(
+        select(UserOrganization.org_id).where(UserOrganization.user_id == user_id)
+    ).all()
+    version_keys = [_user_version_key(user_id)] + [
+        _org_version_key(org_id) for org_id in org_ids
+    ]
+
+    versions: dict[str, int] = {}
+    if r is not None:
+        try:
+            versions = _read_versions(r, version_keys)
+        except redis.RedisError as e:
+            logging.error(f"Could not read session versions of user {user_id}: {e}")
+            r = None
+
+    payload = json.loads(build_user_session(db_session, user).json())
+    etag = hashlib.sha256(
+        json.dumps(payload, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:32]
+
+    entry = UserSessionCacheEntry(etag=f'"{etag}"', versions=versions, payload=payload)
+
+    if r is not None:
+        try:
+            r.set(_user_session_key(user_id), entry.json(), ex=USER_SESSION_TTL)
+        except redis.RedisError as e:
+            logging.error(f"Could not cache session of user {user_id}: {e}")
+
+    return entry
@@ -12,13 +12,21 @@ from src.services.users.emails import (
     send_account_creation_email,
 )
 from src.services.orgs.invites import get_invite_code
+from src.services.courses.courses import invalidate_author_courses
+from src.services.orgs.users import get_user_org_ids, invalidate_organization_users_count
 from src.services.users.avatars import upload_avatar
-from src.db.roles import Role, RoleRead
+from src.services.users.current_user_cache import invalidate_current_user
+from src.services.users.session_cache import (
+    UserSessionCacheEntry,
+    cache_user_session,
+    get_cached_user_session,
+    invalidate_user_session,
+)
 from src.security.rbac.rbac import (
     authorization_verify_based_on_roles_and_authorship,
     authorization_verify_if_user_is_anon,
 )
-from src.db.organizations import Organization, OrganizationRead
+from src.db.organizations import Organization
 from src.db.users import (
     AnonymousUser,
     InternalUser,
@@ -26,13 +34,11 @@ from src.db.users import (
     User,
     UserCreate,
     UserRead,
-    UserRoleWithOrg,
-    UserSession,
     UserUpdate,
     UserUpdatePassword,
 )
 from src.db.user_organizations import UserOrganization
-from src.security.security import security_hash_password, security_verify_password
+from src.security.password_hashing import hash_password, verify_password
 
 
 async def create_user(
@@ -49,7 +55,7 @@ async def create_user(
 
     # Complete the user object
     user.user_uuid = f"user_{uuid4()}"
-    user.password = security_hash_password(user_object.password)
+    user.password = await hash_password(user_object.password)
     user.email_verified = False
     user.creation_date = str(datetime.now())
     user.update_date = str(datetime.now())
@@ -115,6 +121,7 @@ async def create_user(
     user = UserRead.model_validate(user)
 
     increase_feature_usage("members", org_id, db_session)
+    invalidate_organization_users_count(int(org_id))
 
     # Send Account creation email
     send_account_creation_email(
@@ -181,7 +188,7 @@ async def create_user_without_org(
 
     # Complete the user object
     user.user_uuid = f"user_{uuid4()}"
-    user.password = security_hash_password(user_object.password)
+    user.password = await hash_password(user_object.password)
     user.email_verified = False
     user.creation_date = str(datetime.now())
     user.update_date = str(datetime.now())
@@ -287,6 +294,13 @@ async def update_user(
     db_session.commit()
     db_session.refresh(user)
 
+    invalidate_user_session(user_id)
+    invalidate_current_user(user_id)
+    # Cached course pages embed their authors' profiles
+    invalidate_author_courses(db_session, user_id)
+    # Member counts filtered by search may change with the profile
+    invalidate_organization_users_count(*get_user_org_ids(db_session, user_id))
+
     user = UserRead.model_validate(user)
 
     return user
@@ -332,6 +346,10 @@ async def update_user_avatar(
     db_session.commit()
     db_session.refresh(user)
 
+    invalidate_user_session(user.id)  # type: ignore
+    invalidate_current_user(user.id)  # type: ignore
+    invalidate_author_courses(db_session, user.id)  # type: ignore
+
     user = UserRead.model_validate(user)
 
     return user
@@ -357,13 +375,13 @@ async def update_user_password(
     # RBAC check
     await rbac_check(request, current_user, "update", user.user_uuid, db_session)
 
-    if not security_verify_password(form.old_password, user.password):
+    if not await verify_password(form.old_password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Wrong password"
         )
 
     # Update user
-    user.password = security_hash_password(form.new_password)
+    user.password = await hash_password(form.new_password)
     user.update_date = str(datetime.now())
 
     # Update user in database
@@ -371,6 +389,8 @@ async def update_user_password(
     db_session.commit()
     db_session.refresh(user)
 
+    invalidate_current_user(user_id)
+
     user = UserRead.model_validate(user)
 
     return user
@@ -447,7 +467,18 @@ async def get_user_session(
     request: Request,
     db_session: Session,
     current_user: PublicUser | AnonymousUser,
-) -> UserSession:
+) -> UserSessionCacheEntry:
+    """
+    Get the session payload (user, roles and orgs) of the current user.
+
+    Repeat calls are served from Redis without touching the database until
+    the user's profile, memberships, roles or orgs change.
+    """
+    if not isinstance(current_user, AnonymousUser):
+        cached_session = get_cached_user_session(current_user.id)
+        if cached_session is not None:
+            return cached_session
+
     # Get user
     statement = select(User).where(User.user_uuid == current_user.user_uuid)
     user = db_session.exec(statement).first()
@@ -458,40 +489,7 @@ async def get_user_session(
             detail="User does not exist",
         )
 
-    user = UserRead.model_validate(user)
-
-    # Get roles and orgs
-    statement = (
-        select(UserOrganization)
-        .where(UserOrganization.user_id == user.id)
-        .join(Organization)
-    )
-    user_organizations = db_session.exec(statement).all()
-
-    roles = []
-
-    for user_organization in user_organizations:
-        role_statement = select(Role).where(Role.id == user_organization.role_id)
-        role = db_session.exec(role_statement).first()
-
-        org_statement = select(Organization).where(
-            Organization.id == user_organization.org_id
-        )
-        org = db_session.exec(org_statement).first()
-
-        roles.append(
-            UserRoleWithOrg(
-                role=RoleRead.model_validate(role),
-                org=OrganizationRead.model_validate(org),
-            )
-        )
-
-    user_session = UserSession(
-        user=user,
-        roles=roles,
-    )
-
-    return user_session
+    return cache_user_session(db_session, user)
 
 
 async def authorize_user_action(
@@ -546,10 +544,16 @@ async def delete_user_by_id(
     # RBAC check
     await rbac_check(request, current_user, "delete", user.user_uuid, db_session)
 
+    org_ids = get_user_org_ids(db_session, user_id)
+
     # Delete user
     db_session.delete(user)
     db_session.commit()
 
+    invalidate_user_session(user_id)
+    invalidate_current_user(user_id)
+    invalidate_organization_users_count(*org_ids)
+
     return "User deleted"
 
 
@@ -0,0 +1,114 @@
+import copy
+from typing import Any, List
+
+
+class JsonPatchError(ValueError):
+    """The patch is malformed or doesn't apply to the document"""
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    """A `test` operation didn't match the document"""
+
+
+def _parse_pointer(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _array_index(container: list, token: str, allow_end: bool) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index: {token}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {token}")
+    return index
+
+
+def _resolve(document: Any, tokens: List[str]) -> Any:
+    for token in tokens:
+        if isinstance(document, dict):
+            if token not in document:
+                raise JsonPatchError(f"Path not found: {token}")
+            document = document[token]
+        elif isinstance(document, list):
+            document = document[_array_index(document, token, allow_end=False)]
+        else:
+            raise JsonPatchError(f"Path not found: {token}")
+    return document
+
+
+def _add(document: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent = _resolve(document, tokens[:-1])
+    if isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    elif isinstance(parent, list):
+        parent.insert(_array_index(parent, tokens[-1], allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to a {type(parent).__name__}")
+    return document
+
+
+def _remove(document: Any, tokens: List[str]) -> tuple[Any, Any]:
+    if not tokens:
+        raise JsonPatchError("Cannot remove the whole document")
+    parent = _resolve(document, tokens[:-1])
+    if isinstance(parent, dict):
+        if tokens[-1] not in parent:
+            raise JsonPatchError(f"Path not found: {tokens[-1]}")
+        return document, parent.pop(tokens[-1])
+    if isinstance(parent, list):
+        return document, parent.pop(_array_index(parent, tokens[-1], allow_end=False))
+    raise JsonPatchError(f"Cannot remove from a {type(parent).__name__}")
+
+
+def apply_json_patch(document: Any, operations: List[dict]) -> Any:
+    """
+    Apply an RFC 6902 JSON Patch and return the patched document.
+
+    The patch applies as a whole: the input document is never modified and
+    any failing operation raises JsonPatchError.
+    """
+    document = copy.deepcopy(document)
+
+    for operation in operations:
+        op = operation.get("op")
+        if "path" not in operation:
+            raise JsonPatchError(f"Operation without path: {operation}")
+        tokens = _parse_pointer(operation["path"])
+
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"{op} operation without value")
+        if op in ("move", "copy") and "from" not in operation:
+            raise JsonPatchError(f"{op} operation without from")
+
+        if op == "add":
+            document = _add(document, tokens, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            document, _ = _remove(document, tokens)
+        elif op == "replace":
+            if tokens:
+                document, _ = _remove(document, tokens)
+            document = _add(document, tokens, copy.deepcopy(operation["value"]))
+        elif op == "move":
+            from_tokens = _parse_pointer(operation["from"])
+            if tokens[: len(from_tokens)] == from_tokens and tokens != from_tokens:
+                raise JsonPatchError("Cannot move a value into itself")
+            document, value = _remove(document, from_tokens)
+            document = _add(document, tokens, value)
+        elif op == "copy":
+            value = _resolve(document, _parse_pointer(operation["from"]))
+            document = _add(document, tokens, copy.deepcopy(value))
+        elif op == "test":
+            if _resolve(document, tokens) != operation["value"]:
+                raise JsonPatchTestFailed(f"Test failed at {operation['path']}")
+        else:
+            raise JsonPatchError(f"Unknown operation: {op}")
+
+    return document
@@ -0,0 +1,32 @@
+from typing import Any, Callable, Iterator, Optional, TypeVar
+from sqlmodel import Session
+
+T = TypeVar("T")
+
+
+def keyset_pages(
+    db_session: Session,
+    fetch_page: Callable[[Optional[Any], int], list[T]],
+    key: Callable[[T], Any],
+    page_size: int,
+) -> Iterator[list[T]]:
+    """
+    Yield the non-empty pages of a keyset paginated query until it runs out.
+
+    `fetch_page(after, limit)` returns the rows ordered by key after `after`,
+    `key(row)` the key of a row. Exports stream on a session of their own,
+    as streaming responses are read once the request's session is closed.
+    """
+    after = None
+    while True:
+        page = fetch_page(after, page_size)
+        if not page:
+            break
+        yield page
+
+        if len(page) < page_size:
+            break
+        after = key(page[-1])
+
+        # Don't keep every exported row in the identity map
+        db_session.expunge_all()
@@ -1,5 +1,6 @@
 import sys
 import os
+import pytest
 
 # Ensure src/ is on the Python path for all tests
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
@@ -8,4 +9,14 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 os.environ["TESTING"] = "true"
 
 # Suppress logfire warnings in tests
-os.environ["LOGFIRE_IGNORE_NO_CONFIG"] = "1" 
\ No newline at end of file
+os.environ["LOGFIRE_IGNORE_NO_CONFIG"] = "1" 
+
+
+@pytest.fixture(autouse=True)
+def reset_redis_client():
+    """Don't let a Redis client built while redis is patched leak into other tests"""
+    from src.core.cache import get_redis_client
+
+    get_redis_client.cache_clear()
+    yield
+    get_redis_client.cache_clear()
@@ -80,7 +80,7 @@ class TestAuth:
     async def test_authenticate_user_success(self, mock_request, mock_db_session, mock_user):
         """Test successful user authentication"""
         with patch('src.security.auth.security_get_user', new_callable=AsyncMock) as mock_get_user, \
-             patch('src.security.auth.security_verify_password', return_value=True):
+             patch('src.security.auth.verify_password', new_callable=AsyncMock, return_value=True):
             
             mock_get_user.return_value = mock_user
             
@@ -113,7 +113,7 @@ class TestAuth:
     async def test_authenticate_user_wrong_password(self, mock_request, mock_db_session, mock_user):
         """Test authentication with wrong password"""
         with patch('src.security.auth.security_get_user', new_callable=AsyncMock) as mock_get_user, \
-             patch('src.security.auth.security_verify_password', return_value=False):
+             patch('src.security.auth.verify_password', new_callable=AsyncMock, return_value=False):
             
             mock_get_user.return_value = mock_user
             
@@ -4,10 +4,12 @@ from fastapi import HTTPException
 from sqlmodel import Session
 from src.security.features_utils.usage import (
     check_limits_with_usage,
+    get_remaining_feature_usage,
     increase_feature_usage,
     decrease_feature_usage,
 )
 from src.db.organization_config import OrganizationConfig
+from src.services.orgs.config_cache import clear_local_organization_configs
 
 
 class TestFeaturesUtils:
@@ -18,11 +20,18 @@ class TestFeaturesUtils:
         """Create a mock database session"""
         return Mock(spec=Session)
 
+    @pytest.fixture(autouse=True)
+    def local_org_config_cache(self):
+        """Serve org configs from a fresh in-process cache"""
+        clear_local_organization_configs()
+        with patch('src.services.orgs.config_cache.get_redis_client', return_value=None):
+            yield
+        clear_local_organization_configs()
+
     @pytest.fixture
     def mock_org_config(self):
-        """Create a mock organization config"""
-        config = Mock(spec=OrganizationConfig)
-        config.org_id = 1
+        """Create an organization config"""
+        config = OrganizationConfig(id=1, org_id=1)
         config.config = {
             "features": {
                 "ai": {"enabled": True, "limit": 100},
@@ -90,6 +99,29 @@ class TestFeaturesUtils:
             assert result is True
             mock_redis.get.assert_called_once_with("ai_usage:1")
 
+    def test_get_remaining_feature_usage(self, mock_db_session, mock_org_config):
+        """Test remaining uses of limited and unlimited features"""
+        with patch('src.security.features_utils.usage.get_learnhouse_config') as mock_config, \
+             patch('redis.Redis.from_url') as mock_redis_class:
+
+            mock_config.return_value.redis_config.redis_connection_string = "redis://localhost:6379"
+            mock_redis_class.return_value.get.return_value = b"98"
+            mock_db_session.exec.return_value.first.return_value = mock_org_config
+
+            assert get_remaining_feature_usage("members", 1, mock_db_session) == 2
+            assert get_remaining_feature_usage("payments", 1, mock_db_session) is None
+
+            mock_redis_class.return_value.get.return_value = b"120"
+            assert get_remaining_feature_usage("members", 1, mock_db_session) == 0
+
+    def test_check_limits_with_usage_unlimited(self, mock_db_session, mock_org_config):
+        """Test that unlimited features pass without reading usage"""
+        with patch('redis.Redis.from_url') as mock_redis_class:
+            mock_db_session.exec.return_value.first.return_value = mock_org_config
+
+            assert check_limits_with_usage("api", 1, mock_db_session) is True
+            mock_redis_class.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_check_limits_with_usage_feature_disabled(self, mock_db_session, mock_org_config):
         """Test feature limit check when feature is disabled"""
@@ -0,0 +1,79 @@
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from src.security.password_hashing import PasswordHashingPool
+from src.security.security import security_hash_password, security_verify_password
+
+CONCURRENT_LOGINS = 16
+
+
+class TestPasswordHashingPool:
+    """Test cases for password_hashing.py module"""
+
+    @pytest.fixture(params=[0, 2], ids=["threads", "processes"])
+    def pool(self, request):
+        pool = PasswordHashingPool(workers=request.param, max_pending=CONCURRENT_LOGINS)
+        yield pool
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify(self, pool):
+        """Test that pooled hashing matches the synchronous helpers"""
+        hashed = await pool.run(security_hash_password, "password")
+
+        assert await pool.run(security_verify_password, "password", hashed) is True
+        assert await pool.run(security_verify_password, "wrong", hashed) is False
+        assert pool.stats.completed == 3
+        assert pool.stats.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_logins_dont_block_event_loop(self, pool):
+        """Test that a burst of logins keeps the event loop responsive"""
+        hashed = security_hash_password("password")
+        lags = []
+        done = asyncio.Event()
+
+        async def heartbeat():
+            while not done.is_set():
+                before = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lags.append(time.perf_counter() - before - 0.005)
+
+        ticker = asyncio.create_task(heartbeat())
+        started = time.perf_counter()
+        inline = [security_verify_password("password", hashed) for _ in range(4)]
+        inline_duration = (time.perf_counter() - started) / 4 * CONCURRENT_LOGINS
+
+        results = await asyncio.gather(
+            *[
+                pool.run(security_verify_password, "password", hashed)
+                for _ in range(CONCURRENT_LOGINS)
+            ]
+        )
+        done.set()
+        await ticker
+
+        assert all(inline) and all(results)
+        lags.sort()
+        p99 = lags[int(len(lags) * 0.99) - 1]
+        # Running the same burst inline would stall the loop for its whole duration
+        assert p99 < inline_duration / 2
+
+    @pytest.mark.asyncio
+    async def test_full_pool_sheds_load(self):
+        """Test that jobs beyond max_pending are rejected with a 503"""
+        pool = PasswordHashingPool(workers=0, max_pending=2)
+
+        results = await asyncio.gather(
+            *[pool.run(security_hash_password, "password") for _ in range(3)],
+            return_exceptions=True,
+        )
+
+        rejected = [r for r in results if isinstance(r, HTTPException)]
+        assert len(rejected) == 1
+        assert rejected[0].status_code == 503
+        assert rejected[0].headers == {"Retry-After": "1"}
+        assert pool.stats.rejected == 1
+        assert pool.stats.completed == 2
+        assert pool.stats.max_in_flight == 2
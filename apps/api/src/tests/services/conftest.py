@@ -0,0 +1,311 @@
+import pytest
+import redis
+from contextlib import ExitStack
+from typing import Optional
+from unittest.mock import AsyncMock, patch
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+# Importing the database module registers every table on SQLModel.metadata
+import src.core.events.database  # noqa: F401
+from src.db.courses.activities import Activity, ActivitySubTypeEnum, ActivityTypeEnum
+from src.db.courses.chapter_activities import ChapterActivity
+from src.db.courses.chapters import Chapter
+from src.db.courses.course_chapters import CourseChapter
+from src.db.courses.courses import Course
+from src.db.organizations import Organization
+from src.db.users import User
+
+
+class QueryCounter:
+    """Collects the SQL statements issued on an engine while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements: list[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def db_engine():
+    """In-memory SQLite engine with every table created"""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine):
+    """Database session bound to the in-memory engine"""
+    with Session(db_engine) as session:
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def clear_local_caches():
+    """Start every test with empty in-process caches"""
+    from src.services.orgs.config_cache import clear_local_organization_configs
+    from src.services.orgs.slugs import clear_local_org_slugs
+    from src.services.users.current_user_cache import current_user_lru
+    from src.services.payments.payments_entitlements import clear_local_entitlements
+
+    clear_local_organization_configs()
+    clear_local_entitlements()
+    clear_local_org_slugs()
+    current_user_lru.clear()
+    yield
+
+
+class Seed:
+    """
+    Adds the rows tests build on, with defaults for the fields they don't
+    check. Nothing is committed, keyword arguments override the defaults.
+    """
+
+    def __init__(self, db_session: Session):
+        self.db_session = db_session
+
+    def org(self, org_id: int = 1, **fields) -> Organization:
+        org = Organization(
+            **{"id": org_id, "name": "Org", "slug": "org", "email": "o@org.dev", "org_uuid": f"org_{org_id}", **fields}
+        )
+        self.db_session.add(org)
+        return org
+
+    def course(self, course_id: int = 1, org_id: int = 1, **fields) -> Course:
+        course = Course(
+            **{
+                "id": course_id,
+                "org_id": org_id,
+                "name": "Course",
+                "description": "",
+                "about": "",
+                "learnings": "",
+                "tags": "",
+                "public": True,
+                "open_to_contributors": False,
+                "course_uuid": f"course_{course_id}",
+                **fields,
+            }
+        )
+        self.db_session.add(course)
+        return course
+
+    def chapter(self, chapter_id: int, course_id: int = 1, org_id: int = 1, order: Optional[int] = None, **fields) -> Chapter:
+        """A chapter linked to its course, in `order` or by id"""
+        chapter = Chapter(
+            **{"id": chapter_id, "name": f"Chapter {chapter_id}", "org_id": org_id, "course_id": course_id, **fields}
+        )
+        self.db_session.add(chapter)
+        self.db_session.add(
+            CourseChapter(
+                course_id=course_id,
+                chapter_id=chapter_id,
+                org_id=org_id,
+                order=chapter_id if order is None else order,
+                creation_date="",
+                update_date="",
+            )
+        )
+        return chapter
+
+    def activity(
+        self,
+        activity_id: int,
+        chapter_id: Optional[int] = None,
+        course_id: int = 1,
+        org_id: int = 1,
+        order: int = 0,
+        **fields,
+    ) -> Activity:
+        """A lesson, linked to a chapter at `order` when given one"""
+        activity = Activity(
+            **{
+                "id": activity_id,
+                "name": f"Lesson {activity_id}",
+                "activity_type": ActivityTypeEnum.TYPE_DYNAMIC,
+                "activity_sub_type": ActivitySubTypeEnum.SUBTYPE_DYNAMIC_PAGE,
+                "org_id": org_id,
+                "course_id": course_id,
+                "activity_uuid": f"activity_{activity_id}",
+                **fields,
+            }
+        )
+        self.db_session.add(activity)
+        if chapter_id is not None:
+            self.db_session.add(
+                ChapterActivity(
+                    chapter_id=chapter_id,
+                    activity_id=activity_id,
+                    course_id=course_id,
+                    org_id=org_id,
+                    order=order,
+                    creation_date="",
+                    update_date="",
+                )
+            )
+        return activity
+
+    def user(self, user_id: int, **fields) -> User:
+        user = User(
+            **{
+                "id": user_id,
+                "username": f"learner{user_id}",
+                "first_name": "",
+                "last_name": "",
+                "email": f"learner{user_id}@org.dev",
+                "user_uuid": f"user_{user_id}",
+                **fields,
+            }
+        )
+        self.db_session.add(user)
+        return user
+
+
+@pytest.fixture
+def seed(db_session):
+    """Seed helpers bound to the test session"""
+    return Seed(db_session)
+
+
+@pytest.fixture
+def bypass_rbac():
+    """Factory patching the given RBAC checks to allow everything until the test ends"""
+    with ExitStack() as stack:
+        yield lambda *targets: [
+            stack.enter_context(patch(target, new=AsyncMock(return_value=True))) for target in targets
+        ]
+
+
+@pytest.fixture
+def count_queries(db_engine):
+    """Factory returning a QueryCounter context manager for the test engine"""
+    return lambda: QueryCounter(db_engine)
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.Redis used by the caches"""
+
+    def __init__(self):
+        self.store: dict = {}
+
+    @staticmethod
+    def _encode(value):
+        return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = self._encode(value)
+        return True
+
+    def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def incr(self, key, amount=1):
+        value = int(self.store.get(key, b"0")) + amount
+        self.store[key] = self._encode(value)
+        return value
+
+    def delete(self, *keys):
+        keys = [key.decode("utf-8") if isinstance(key, bytes) else key for key in keys]
+        return sum(1 for key in keys if self.store.pop(key, None) is not None)
+
+    def hget(self, key, field):
+        return self.store.get(key, {}).get(field)
+
+    def hset(self, key, field, value):
+        self.store.setdefault(key, {})[field] = self._encode(value)
+        return 1
+
+    def expire(self, key, seconds):
+        return key in self.store
+
+    def sadd(self, key, *members):
+        values = self.store.setdefault(key, set())
+        before = len(values)
+        values.update(self._encode(member) for member in members)
+        return len(values) - before
+
+    def smembers(self, key):
+        return set(self.store.get(key, set()))
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """
+    Queues FakeRedis calls until execute, like a redis-py pipeline.
+
+    After `watch`, calls run right away until `multi`, and execute raises
+    WatchError when a watched key changed meanwhile.
+    """
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls: list = []
+        self.watched: dict = {}
+        self.immediate = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.calls, self.watched, self.immediate = [], {}, False
+
+    def _snapshot(self, key):
+        value = self.redis.store.get(key)
+        return set(value) if isinstance(value, set) else value
+
+    def watch(self, *keys):
+        self.watched = {key: self._snapshot(key) for key in keys}
+        self.immediate = True
+
+    def multi(self):
+        self.immediate = False
+
+    def __getattr__(self, name):
+        method = getattr(self.redis, name)
+        if self.immediate:
+            return method
+
+        def queue(*args, **kwargs):
+            self.calls.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        watched, self.watched = self.watched, {}
+        if any(self._snapshot(key) != value for key, value in watched.items()):
+            raise redis.WatchError()
+        return [method(*args, **kwargs) for method, args, kwargs in calls]
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
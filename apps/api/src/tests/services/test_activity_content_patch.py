@@ -0,0 +1,167 @@
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import HTTPException, Request
+from src.db.courses.activities import Activity, ActivityUpdate
+from src.db.users import PublicUser
+from src.services.courses.activities.activities import (
+    patch_activity_content,
+    update_activity,
+)
+from src.services.utils.json_patch import JsonPatchError, apply_json_patch
+
+CONTENT = {
+    "type": "doc",
+    "content": [
+        {"type": "heading", "content": [{"type": "text", "text": "Intro"}]},
+        {"type": "paragraph", "content": [{"type": "text", "text": "First"}]},
+    ],
+}
+
+
+class TestApplyJsonPatch:
+    """Test cases for the RFC 6902 patch applier"""
+
+    def test_operations(self):
+        document = {"a": {"b": [1, 2]}, "c": "x"}
+
+        patched = apply_json_patch(
+            document,
+            [
+                {"op": "add", "path": "/a/b/-", "value": 3},
+                {"op": "replace", "path": "/c", "value": "y"},
+                {"op": "copy", "from": "/a/b/0", "path": "/d"},
+                {"op": "move", "from": "/a/b/1", "path": "/e~1f"},
+                {"op": "remove", "path": "/a/b/0"},
+                {"op": "test", "path": "/a/b", "value": [3]},
+            ],
+        )
+
+        assert patched == {"a": {"b": [3]}, "c": "y", "d": 1, "e/f": 2}
+        # The input document is left untouched
+        assert document == {"a": {"b": [1, 2]}, "c": "x"}
+
+    @pytest.mark.parametrize(
+        "operation",
+        [
+            {"op": "remove", "path": "/missing"},
+            {"op": "replace", "path": "/a/b/5", "value": 0},
+            {"op": "add", "path": "a", "value": 0},
+            {"op": "move", "from": "/a", "path": "/a/b/0"},
+            {"op": "rename", "path": "/a"},
+        ],
+    )
+    def test_invalid_operations(self, operation):
+        with pytest.raises(JsonPatchError):
+            apply_json_patch({"a": {"b": [1]}}, [operation])
+
+
+class TestPatchActivityContent:
+    """Test cases for delta saves of activity content"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac("src.services.courses.activities.activities.courses_rbac_check_for_activities")
+        with patch("src.core.response_cache.get_redis_client", return_value=None):
+            yield
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.org()
+        seed.course()
+        seed.activity(1, content=CONTENT)
+        db_session.commit()
+        return db_session
+
+    async def _patch(self, db_session, operations, if_match='"0"'):
+        return await patch_activity_content(
+            Mock(spec=Request), "activity_1", operations, if_match, Mock(spec=PublicUser), db_session
+        )
+
+    def _stored(self, db_session) -> Activity:
+        activity = db_session.get(Activity, 1)
+        db_session.refresh(activity)
+        return activity
+
+    @pytest.mark.asyncio
+    async def test_patch_applies_and_bumps_version(self, seeded_session):
+        activity = await self._patch(
+            seeded_session,
+            [{"op": "replace", "path": "/content/1/content/0/text", "value": "Edited"}],
+        )
+
+        assert activity.content_version == 1
+        stored = self._stored(seeded_session)
+        assert stored.content_version == 1
+        assert stored.content["content"][1]["content"][0]["text"] == "Edited"
+        assert stored.content["content"][0] == CONTENT["content"][0]
+
+        # The next save is based on the new version
+        await self._patch(seeded_session, [{"op": "remove", "path": "/content/0"}], if_match='"1"')
+        assert len(self._stored(seeded_session).content["content"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_version_is_rejected(self, seeded_session):
+        """Test that two authors saving from the same version can't overwrite each other"""
+        await self._patch(seeded_session, [{"op": "add", "path": "/content/-", "value": {"type": "paragraph"}}])
+
+        with pytest.raises(HTTPException) as e:
+            await self._patch(seeded_session, [{"op": "remove", "path": "/content/0"}])
+
+        assert e.value.status_code == 412
+        assert e.value.headers == {"ETag": '"1"'}
+        assert len(self._stored(seeded_session).content["content"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_save_between_check_and_write(self, seeded_session):
+        """Test that the write itself is conditional on the version"""
+        original_apply = apply_json_patch
+
+        def save_elsewhere(document, operations):
+            # Another author saves while this patch is being applied
+            seeded_session.connection().exec_driver_sql("UPDATE activity SET content_version = 5 WHERE id = 1")
+            return original_apply(document, operations)
+
+        with patch("src.services.courses.activities.activities.apply_json_patch", side_effect=save_elsewhere):
+            with pytest.raises(HTTPException) as e:
+                await self._patch(seeded_session, [{"op": "remove", "path": "/content/0"}])
+
+        assert e.value.status_code == 412
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "operations, if_match, status_code",
+        [
+            ([{"op": "remove", "path": "/content/0"}], None, 428),
+            ([{"op": "test", "path": "/type", "value": "page"}], '"0"', 409),
+            ([{"op": "remove", "path": "/content/9"}], '"0"', 422),
+            ([{"op": "replace", "path": "", "value": []}], '"0"', 422),
+        ],
+    )
+    async def test_rejected_patches_leave_content(self, seeded_session, operations, if_match, status_code):
+        with pytest.raises(HTTPException) as e:
+            await self._patch(seeded_session, operations, if_match=if_match)
+
+        assert e.value.status_code == status_code
+        stored = self._stored(seeded_session)
+        assert stored.content == CONTENT
+        assert stored.content_version == 0
+
+    @pytest.mark.asyncio
+    async def test_full_content_update_bumps_version(self, seeded_session):
+        emptied = {"type": "doc", "content": []}
+        await update_activity(
+            Mock(spec=Request), ActivityUpdate(content=emptied), "activity_1", Mock(spec=PublicUser), seeded_session  # type: ignore
+        )
+        # Saving the same content again doesn't invalidate pending patches
+        await update_activity(
+            Mock(spec=Request),
+            ActivityUpdate(name="Renamed", content=emptied),  # type: ignore
+            "activity_1",
+            Mock(spec=PublicUser),
+            seeded_session,
+        )
+
+        assert self._stored(seeded_session).content_version == 1
+        with pytest.raises(HTTPException) as e:
+            await self._patch(seeded_session, [{"op": "remove", "path": "/content/0"}])
+        assert e.value.status_code == 412
@@ -0,0 +1,153 @@
+import pytest
+from unittest.mock import Mock
+from fastapi import HTTPException, Request
+from sqlmodel import select
+from src.db.courses.activities import ActivitySubTypeEnum, ActivityTypeEnum
+from src.db.courses.assignments import (
+    Assignment,
+    AssignmentTaskSubmission,
+    AssignmentTaskTypeEnum,
+    AssignmentUserSubmission,
+    AssignmentUserSubmissionBulkGrade,
+    AssignmentUserSubmissionStatus,
+    GradingTypeEnum,
+)
+from src.db.users import PublicUser
+from src.services.courses.activities.assignments import (
+    grade_assignment_submission,
+    grade_assignment_submissions,
+)
+
+LEARNERS = 30
+
+
+class TestAssignmentsGrading:
+    """Test cases for grading assignment submissions"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac("src.services.courses.activities.assignments.courses_rbac_check_for_assignments")
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        """
+        Every learner has two graded tasks, worth their id and 10. Learners
+        divisible by five are still working on the assignment.
+        """
+        seed.org()
+        seed.course()
+        seed.chapter(1)
+        seed.activity(
+            1,
+            name="Assignment",
+            activity_type=ActivityTypeEnum.TYPE_ASSIGNMENT,
+            activity_sub_type=ActivitySubTypeEnum.SUBTYPE_ASSIGNMENT_ANY,
+        )
+        db_session.add(
+            Assignment(
+                id=1,
+                title="Assignment",
+                description="",
+                due_date="",
+                grading_type=GradingTypeEnum.NUMERIC,
+                org_id=1,
+                course_id=1,
+                chapter_id=1,
+                activity_id=1,
+                assignment_uuid="assignment_1",
+            )
+        )
+        for user_id in range(1, LEARNERS + 1):
+            seed.user(user_id)
+            db_session.add(
+                AssignmentUserSubmission(
+                    user_id=user_id,
+                    assignment_id=1,
+                    grade=0,
+                    submission_status=(
+                        AssignmentUserSubmissionStatus.PENDING
+                        if user_id % 5 == 0
+                        else AssignmentUserSubmissionStatus.SUBMITTED
+                    ),
+                    assignmentusersubmission_uuid=f"assignmentusersubmission_{user_id}",
+                    creation_date="",
+                    update_date="",
+                )
+            )
+            for task_index, task_grade in enumerate([user_id, 10]):
+                db_session.add(
+                    AssignmentTaskSubmission(
+                        assignment_task_submission_uuid=f"assignmenttasksubmission_{user_id}_{task_index}",
+                        grade=task_grade,
+                        task_submission_grade_feedback="",
+                        assignment_type=AssignmentTaskTypeEnum.OTHER,
+                        user_id=user_id,
+                        activity_id=1,
+                        course_id=1,
+                        chapter_id=1,
+                        assignment_task_id=task_index + 1,
+                        creation_date="",
+                        update_date="",
+                    )
+                )
+        db_session.commit()
+        return db_session
+
+    def _submissions(self, db_session) -> dict[int, tuple[AssignmentUserSubmissionStatus, int]]:
+        db_session.expire_all()
+        return {
+            submission.user_id: (submission.submission_status, submission.grade)
+            for submission in db_session.exec(select(AssignmentUserSubmission))
+        }
+
+    @pytest.mark.asyncio
+    async def test_bulk_grading_awaiting_submissions(self, seeded_session, count_queries):
+        with count_queries() as queries:
+            summary = await grade_assignment_submissions(
+                Mock(spec=Request),
+                "assignment_1",
+                AssignmentUserSubmissionBulkGrade(),
+                Mock(spec=PublicUser),
+                seeded_session,
+            )
+
+        # The assignment and course, the totals, one update of the
+        # submissions and one of the course analytics
+        assert queries.count == 5
+        assert summary.graded == 24
+        assert {grade.user_id: grade.grade for grade in summary.grades}[7] == 17
+
+        submissions = self._submissions(seeded_session)
+        assert submissions[7] == (AssignmentUserSubmissionStatus.GRADED, 17)
+        assert submissions[5] == (AssignmentUserSubmissionStatus.PENDING, 0)
+
+    @pytest.mark.asyncio
+    async def test_bulk_grading_given_users(self, seeded_session):
+        summary = await grade_assignment_submissions(
+            Mock(spec=Request),
+            "assignment_1",
+            AssignmentUserSubmissionBulkGrade(user_ids=[1, 5, 99]),
+            Mock(spec=PublicUser),
+            seeded_session,
+        )
+
+        assert summary.graded == 2
+        submissions = self._submissions(seeded_session)
+        assert submissions[1] == (AssignmentUserSubmissionStatus.GRADED, 11)
+        assert submissions[5] == (AssignmentUserSubmissionStatus.GRADED, 15)
+        assert submissions[2] == (AssignmentUserSubmissionStatus.SUBMITTED, 0)
+
+    @pytest.mark.asyncio
+    async def test_grading_one_user(self, seeded_session):
+        response = await grade_assignment_submission(
+            Mock(spec=Request), "3", "assignment_1", Mock(spec=PublicUser), seeded_session
+        )
+
+        assert response == {"message": "Assignment User Submission graded with the grade of 13"}
+        assert self._submissions(seeded_session)[3] == (AssignmentUserSubmissionStatus.GRADED, 13)
+
+        with pytest.raises(HTTPException) as e:
+            await grade_assignment_submission(
+                Mock(spec=Request), "99", "assignment_1", Mock(spec=PublicUser), seeded_session
+            )
+        assert e.value.status_code == 404
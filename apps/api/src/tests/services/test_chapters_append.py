@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import Request
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine, select
+from src.db.courses.activities import ActivityCreate
+from src.db.courses.chapter_activities import ChapterActivity
+from src.db.courses.chapters import ChapterCreate
+from src.db.courses.course_chapters import CourseChapter
+from src.db.users import PublicUser
+from src.services.courses.activities.activities import create_activity
+from src.services.courses.chapters import create_chapter
+from src.tests.services.conftest import Seed
+
+THREADS = 8
+ACTIVITIES_PER_THREAD = 5
+
+
+def seed_chapters(seed: Seed, links: int = 0):
+    """A course with two chapters, the second linking `links` activities"""
+    seed.org()
+    seed.course()
+    for chapter_id in (1, 2):
+        seed.chapter(chapter_id)
+    for order in range(1, links + 1):
+        seed.db_session.add(
+            ChapterActivity(
+                chapter_id=2, activity_id=1000 + order, course_id=1, org_id=1, order=order, creation_date="", update_date=""
+            )
+        )
+    seed.db_session.commit()
+
+
+async def append_activity(db_session, chapter_id: int):
+    return await create_activity(
+        Mock(spec=Request), ActivityCreate(name="Lesson", chapter_id=chapter_id), Mock(spec=PublicUser), db_session
+    )
+
+
+class TestAppendOrdering:
+    """Test cases for appending chapters and activities"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac(
+            "src.services.courses.activities.activities.courses_rbac_check_for_activities",
+            "src.services.courses.chapters.courses_rbac_check_for_chapters",
+        )
+        with patch("src.core.response_cache.get_redis_client", return_value=None):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_append_cost_does_not_grow_with_chapter(self, db_session, seed, count_queries):
+        """Test that appending reads the last order instead of every link"""
+        seed_chapters(seed, links=300)
+
+        with count_queries() as empty_chapter:
+            await append_activity(db_session, 1)
+        with count_queries() as full_chapter:
+            activity = await append_activity(db_session, 2)
+
+        assert empty_chapter.count == full_chapter.count
+        statement = select(ChapterActivity.order).where(
+            ChapterActivity.chapter_id == 2, ChapterActivity.activity_id == activity.id
+        )
+        assert db_session.exec(statement).all() == [301]
+
+    @pytest.mark.asyncio
+    async def test_chapters_are_appended(self, db_session, seed):
+        seed_chapters(seed)
+
+        chapter = await create_chapter(
+            Mock(spec=Request), ChapterCreate(name="Outro", org_id=1, course_id=1), Mock(spec=PublicUser), db_session
+        )
+
+        link = db_session.exec(select(CourseChapter).where(CourseChapter.chapter_id == chapter.id)).one()
+        assert link.order == 3
+
+    def test_concurrent_appends_get_distinct_orders(self, tmp_path):
+        """Test that activities created in parallel never share an order"""
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'append.db'}", connect_args={"check_same_thread": False, "timeout": 30}
+        )
+
+        # SQLite has no row locks: start every transaction by taking the
+        # write lock, as locking the chapter row does on PostgreSQL
+        @event.listens_for(engine, "connect")
+        def disable_pysqlite_begin(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def begin_immediate(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as db_session:
+            seed_chapters(Seed(db_session))
+
+        errors = []
+
+        def author():
+            try:
+                with Session(engine) as db_session:
+                    for _ in range(ACTIVITIES_PER_THREAD):
+                        asyncio.run(append_activity(db_session, 1))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=author) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with Session(engine) as db_session:
+            orders = db_session.exec(select(ChapterActivity.order).where(ChapterActivity.chapter_id == 1)).all()
+        engine.dispose()
+
+        assert errors == []
+        assert sorted(orders) == list(range(1, THREADS * ACTIVITIES_PER_THREAD + 1))
@@ -0,0 +1,134 @@
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import Request
+from sqlmodel import select
+from src.db.courses.chapter_activities import ChapterActivity
+from src.db.courses.chapters import (
+    ActivityOrder,
+    ChapterOrder,
+    ChapterUpdateOrder,
+)
+from src.db.courses.course_chapters import CourseChapter
+from src.db.courses.courses import Course
+from src.db.users import PublicUser
+from src.services.courses import chapters
+from src.services.courses.chapters import reorder_chapters_and_activities
+
+CHAPTERS = 5
+ACTIVITIES_PER_CHAPTER = 100
+
+
+def activity_id(chapter_id: int, index: int) -> int:
+    return chapter_id * 1000 + index
+
+
+class TestReorderChaptersAndActivities:
+    """Test cases for the transactional, diff-based course reorder"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac("src.services.courses.chapters.courses_rbac_check_for_chapters")
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.org()
+        seed.course()
+        for chapter_id in range(1, CHAPTERS + 1):
+            seed.chapter(chapter_id, order=chapter_id - 1)
+            for index in range(ACTIVITIES_PER_CHAPTER):
+                seed.activity(activity_id(chapter_id, index), chapter_id=chapter_id, order=index)
+        db_session.commit()
+        return db_session
+
+    def _current_order(self, db_session) -> dict[int, list[int]]:
+        statement = (
+            select(CourseChapter.chapter_id, ChapterActivity.activity_id)
+            .join(ChapterActivity, ChapterActivity.chapter_id == CourseChapter.chapter_id)  # type: ignore
+            .order_by(CourseChapter.order, ChapterActivity.order)  # type: ignore
+        )
+        order: dict[int, list[int]] = {}
+        for chapter_id, activity in db_session.exec(statement).all():
+            order.setdefault(chapter_id, []).append(activity)
+        return order
+
+    async def _reorder(self, db_session, order: dict[int, list[int]]):
+        chapters_order = ChapterUpdateOrder(
+            chapter_order_by_ids=[
+                ChapterOrder(
+                    chapter_id=chapter_id,
+                    activities_order_by_ids=[ActivityOrder(activity_id=activity) for activity in activities],
+                )
+                for chapter_id, activities in order.items()
+            ]
+        )
+        return await reorder_chapters_and_activities(
+            Mock(spec=Request), "course_1", chapters_order, Mock(spec=PublicUser), db_session
+        )
+
+    @pytest.mark.asyncio
+    async def test_moving_one_activity_updates_changed_rows_only(self, seeded_session, count_queries):
+        """Test that dragging a lesson costs one UPDATE whatever the course size"""
+        order = self._current_order(seeded_session)
+        # Swap the first two lessons of the first chapter
+        order[1][0], order[1][1] = order[1][1], order[1][0]
+
+        with count_queries() as queries:
+            await self._reorder(seeded_session, order)
+
+        writes = [s for s in queries.statements if s.split()[0] in ("UPDATE", "INSERT", "DELETE")]
+        # The chapter activities, then the course content version bump
+        assert len(writes) == 2
+        assert writes[0].startswith("UPDATE chapteractivity")
+        assert self._current_order(seeded_session) == order
+
+    @pytest.mark.asyncio
+    async def test_moves_across_chapters_and_reorders_chapters(self, seeded_session):
+        order = self._current_order(seeded_session)
+        moved = order[1].pop(0)
+        order[2].insert(3, moved)
+        order = {chapter_id: order[chapter_id] for chapter_id in reversed(order)}
+
+        await self._reorder(seeded_session, order)
+
+        assert self._current_order(seeded_session) == order
+        links = seeded_session.exec(select(ChapterActivity).where(ChapterActivity.activity_id == moved)).all()
+        assert [link.chapter_id for link in links] == [2]
+
+    @pytest.mark.asyncio
+    async def test_failure_keeps_previous_order(self, seeded_session):
+        """Test that a failure halfway through leaves no partial ordering"""
+        before = self._current_order(seeded_session)
+        order = {chapter_id: list(reversed(activities)) for chapter_id, activities in reversed(before.items())}
+
+        bulk_set_order = chapters._bulk_set_order
+        calls = []
+
+        def fail_on_activities(db_session, model, orders):
+            calls.append(model)
+            if model is ChapterActivity:
+                raise RuntimeError("connection lost")
+            bulk_set_order(db_session, model, orders)
+
+        with patch("src.services.courses.chapters._bulk_set_order", side_effect=fail_on_activities):
+            with pytest.raises(RuntimeError):
+                await self._reorder(seeded_session, order)
+
+        # The chapters were reordered before the failure, and rolled back with it
+        assert calls == [CourseChapter, ChapterActivity]
+        assert self._current_order(seeded_session) == before
+        # Clients keep their cached course since nothing changed
+        seeded_session.expire_all()
+        assert seeded_session.get(Course, 1).content_version == 0
+
+    @pytest.mark.asyncio
+    async def test_reorder_commits_once(self, seeded_session):
+        """Test that the reorder and its content version bump share one commit"""
+        order = self._current_order(seeded_session)
+        order[1].reverse()
+
+        with patch.object(seeded_session, "commit", wraps=seeded_session.commit) as commit:
+            await self._reorder(seeded_session, order)
+
+        assert commit.call_count == 1
+        seeded_session.expire_all()
+        assert seeded_session.get(Course, 1).content_version == 1
@@ -0,0 +1,270 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+from fastapi import BackgroundTasks, HTTPException, Request
+from src.db.courses.assignments import (
+    Assignment,
+    AssignmentUserSubmission,
+    AssignmentUserSubmissionStatus,
+    GradingTypeEnum,
+)
+from src.db.organization_config import OrganizationConfig
+from src.db.trail_runs import TrailRun
+from src.db.trail_steps import TrailStep
+from src.db.trails import Trail
+from src.db.users import PublicUser
+from src.services.courses.activities.assignments import (
+    delete_assignment_submission,
+    grade_assignment_submission,
+)
+from src.services.courses.analytics import (
+    get_course_analytics,
+    refresh_course_analytics,
+    refresh_course_analytics_job,
+    refresh_stale_course_analytics,
+)
+from src.services.trail.trail import (
+    add_activity_to_trail,
+    remove_activity_from_trail,
+    remove_course_from_trail,
+)
+
+CHAPTERS = {1: [11, 12, 13], 2: [21, 22, 23]}
+ENROLLED = datetime(2026, 10, 1, 9)
+
+
+def org_config(analytics: bool = True) -> dict:
+    return {
+        "config_version": "1.3",
+        "general": {"enabled": True, "color": "normal", "watermark": True},
+        "features": {"analytics": {"enabled": analytics, "limit": 0}},
+        "cloud": {"plan": "free", "custom_domain": False},
+        "landing": {},
+    }
+
+
+class TestCourseAnalytics:
+    """Test cases for course analytics served from rollups"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac(
+            "src.services.courses.analytics.courses_rbac_check",
+            "src.services.courses.activities.assignments.courses_rbac_check_for_assignments",
+        )
+        with patch("src.services.orgs.config_cache.get_redis_client", return_value=None):
+            yield
+
+    def _seed_learners(self, seed, learners: range):
+        """
+        Every learner completes the first activity. One in four completes
+        the whole course, `user_id` hours after enrolling, one in four only
+        the first chapter. Learners enroll over three days.
+        """
+        db_session = seed.db_session
+        for user_id in learners:
+            seed.user(user_id)
+            db_session.add(Trail(id=user_id, org_id=1, user_id=user_id, trail_uuid=f"trail_{user_id}"))
+            enrolled = ENROLLED + timedelta(days=user_id % 3)
+            if user_id % 4 == 0:
+                completed = CHAPTERS[1] + CHAPTERS[2]
+            elif user_id % 4 == 1:
+                completed = CHAPTERS[1]
+            else:
+                completed = CHAPTERS[1][:1]
+
+            run = TrailRun(
+                trail_id=user_id,
+                course_id=1,
+                org_id=1,
+                user_id=user_id,
+                completed_steps=len(completed),
+                total_steps=6,
+                creation_date=str(enrolled),
+                update_date=str(enrolled),
+            )
+            db_session.add(run)
+            db_session.flush()
+            for index, activity_id in enumerate(completed):
+                done = enrolled + timedelta(hours=user_id) if index == len(completed) - 1 else enrolled
+                db_session.add(
+                    TrailStep(
+                        trailrun_id=run.id,  # type: ignore
+                        trail_id=user_id,
+                        activity_id=activity_id,
+                        course_id=1,
+                        org_id=1,
+                        user_id=user_id,
+                        complete=True,
+                        teacher_verified=False,
+                        grade="",
+                        creation_date=str(done),
+                        update_date=str(done),
+                    )
+                )
+            db_session.add(
+                AssignmentUserSubmission(
+                    user_id=user_id,
+                    assignment_id=1,
+                    grade=user_id * 7 % 100,
+                    submission_status=AssignmentUserSubmissionStatus.GRADED,
+                    assignmentusersubmission_uuid=f"assignmentusersubmission_{user_id}",
+                    creation_date="",
+                    update_date="",
+                )
+            )
+        db_session.commit()
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.org()
+        db_session.add(OrganizationConfig(id=1, org_id=1, config=org_config()))
+        seed.course()
+        for chapter_id, activity_ids in CHAPTERS.items():
+            seed.chapter(chapter_id)
+            for order, activity_id in enumerate(activity_ids):
+                seed.activity(activity_id, chapter_id=chapter_id, order=order)
+        db_session.add(
+            Assignment(
+                id=1,
+                title="Final",
+                description="",
+                due_date="",
+                grading_type=GradingTypeEnum.NUMERIC,
+                org_id=1,
+                course_id=1,
+                chapter_id=2,
+                activity_id=23,
+                assignment_uuid="assignment_1",
+            )
+        )
+        self._seed_learners(seed, range(1, 13))
+        return db_session
+
+    async def _analytics(self, db_session, background_tasks=None):
+        return await get_course_analytics(
+            Mock(spec=Request), "course_1", Mock(spec=PublicUser), db_session, background_tasks
+        )
+
+    async def _build(self, db_session):
+        """Request the first rollups, then run the worker's pass"""
+        await self._analytics(db_session)
+        assert refresh_stale_course_analytics(db_session) == 1
+
+    @pytest.mark.asyncio
+    async def test_first_read_builds_in_the_background(self, seeded_session, count_queries):
+        background_tasks = Mock(spec=BackgroundTasks)
+        with count_queries() as queries:
+            analytics = await self._analytics(seeded_session, background_tasks)
+
+        assert analytics.stale
+        assert (analytics.enrolled, analytics.completed) == (0, 0)
+        assert [chapter.completions for chapter in analytics.chapters] == [0, 0]
+        # Only the rollups were read, the learning data is left to the rebuild
+        assert not any("trailrun" in statement.lower() for statement in queries.statements)
+        background_tasks.add_task.assert_called_once_with(refresh_course_analytics_job, 1)
+
+        assert refresh_stale_course_analytics(seeded_session) == 1
+        analytics = await self._analytics(seeded_session)
+        assert not analytics.stale
+        assert analytics.enrolled == 12
+
+    @pytest.mark.asyncio
+    async def test_rollups(self, seeded_session):
+        await self._build(seeded_session)
+        analytics = await self._analytics(seeded_session)
+
+        assert (analytics.enrolled, analytics.completed) == (12, 3)
+        # Completed 4, 8 and 12 hours after enrolling
+        assert analytics.median_completion_hours == 8.0
+        assert [(day.day, day.enrollments, day.completions) for day in analytics.enrollments] == [
+            ("2026-10-01", 4, 1),
+            ("2026-10-02", 4, 1),
+            ("2026-10-03", 4, 1),
+        ]
+
+        assert [(chapter.name, chapter.completions) for chapter in analytics.chapters] == [
+            ("Chapter 1", 6),
+            ("Chapter 2", 3),
+        ]
+        assert [activity.completions for chapter in analytics.chapters for activity in chapter.activities] == [
+            12, 6, 6, 3, 3, 3
+        ]
+
+        [assignment] = analytics.assignments
+        assert assignment.graded == 12
+        assert sum(bucket.submissions for bucket in assignment.distribution) == 12
+        assert assignment.distribution[0].grade_from == 0
+        assert {bucket.grade_to - bucket.grade_from for bucket in assignment.distribution} == {10}
+
+    @pytest.mark.asyncio
+    async def test_reads_do_not_grow_with_learners(self, seeded_session, seed, count_queries):
+        """Test that analytics read the rollups, not the learners' rows"""
+        await self._build(seeded_session)
+        with count_queries() as few_learners:
+            await self._analytics(seeded_session)
+
+        self._seed_learners(seed, range(13, 413))
+        refresh_course_analytics(seeded_session, 1, force=True)
+        with count_queries() as many_learners:
+            analytics = await self._analytics(seeded_session)
+
+        assert few_learners.count == many_learners.count
+        assert analytics.enrolled == 412
+        assert analytics.assignments[0].graded == 412
+
+    @pytest.mark.asyncio
+    async def test_learning_updates_the_rollups(self, seeded_session):
+        """Test that learning updates the rollups in its transaction, without a rebuild"""
+        await self._build(seeded_session)
+
+        # Learner 2 completes the rest of the first chapter
+        learner = Mock(spec=PublicUser, id=2)
+        await add_activity_to_trail(Mock(spec=Request), learner, "activity_12", seeded_session)
+        await add_activity_to_trail(Mock(spec=Request), learner, "activity_13", seeded_session)
+
+        analytics = await self._analytics(seeded_session)
+        assert not analytics.stale
+        assert [activity.completions for activity in analytics.chapters[0].activities] == [12, 7, 7]
+        assert analytics.chapters[0].completions == 7
+        assert refresh_stale_course_analytics(seeded_session) == 0
+
+    @pytest.mark.asyncio
+    async def test_deltas_match_a_rebuild(self, seeded_session, seed):
+        await self._build(seeded_session)
+        request = Mock(spec=Request)
+
+        # Learner 2 completes the course, learner 4 undoes their last activity
+        for activity_id in CHAPTERS[1][1:] + CHAPTERS[2]:
+            await add_activity_to_trail(request, Mock(spec=PublicUser, id=2), f"activity_{activity_id}", seeded_session)
+        await remove_activity_from_trail(request, Mock(spec=PublicUser, id=4), "activity_23", seeded_session)
+
+        # Learner 8 leaves, learner 13 enrolls
+        await remove_course_from_trail(request, Mock(spec=PublicUser, id=8), "course_1", seeded_session)
+        seed.user(13)
+        seeded_session.commit()
+        await add_activity_to_trail(request, Mock(spec=PublicUser, id=13), "activity_21", seeded_session)
+
+        # Learner 6 is regraded, learner 7's submission deleted
+        await grade_assignment_submission(request, 6, "assignment_1", Mock(spec=PublicUser), seeded_session)
+        await delete_assignment_submission(request, "7", "assignment_1", Mock(spec=PublicUser), seeded_session)
+
+        analytics = await self._analytics(seeded_session)
+        assert not analytics.stale
+        assert (analytics.enrolled, analytics.completed) == (12, 2)
+
+        assert refresh_course_analytics(seeded_session, 1, force=True)
+        rebuilt = await self._analytics(seeded_session)
+        assert analytics.copy(exclude={"refreshed_date"}) == rebuilt.copy(exclude={"refreshed_date"})
+
+    @pytest.mark.asyncio
+    async def test_feature_must_be_enabled(self, seeded_session):
+        config = seeded_session.get(OrganizationConfig, 1)
+        config.config = org_config(analytics=False)
+        seeded_session.add(config)
+        seeded_session.commit()
+
+        with pytest.raises(HTTPException) as e:
+            await self._analytics(seeded_session)
+
+        assert e.value.status_code == 403
@@ -0,0 +1,148 @@
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi import HTTPException, Request, Response
+from src.db.courses.activities import ActivityUpdate
+from src.db.courses.chapters import Chapter, ChapterUpdate
+from src.db.courses.courses import Course
+from src.db.users import PublicUser
+from src.services.courses.activities.activities import get_activity, update_activity
+from src.services.courses.chapters import get_chapter, update_chapter
+from src.services.courses.courses import get_course_meta
+
+
+def make_request(if_none_match=None):
+    request = Mock(spec=Request)
+    request.headers = {"if-none-match": if_none_match} if if_none_match else {}
+    return request
+
+
+class TestCourseContentETag:
+    """Test cases for conditional course, chapter and activity reads"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac(
+            "src.services.courses.courses.courses_rbac_check",
+            "src.services.courses.chapters.courses_rbac_check_for_chapters",
+            "src.services.courses.activities.activities.courses_rbac_check_for_activities",
+        )
+        with patch(
+            "src.services.courses.activities.activities.check_activity_paid_access",
+            new=AsyncMock(return_value=True),
+        ) as paid_access:
+            yield paid_access
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.org()
+        seed.course()
+        seed.chapter(1, name="Intro", chapter_uuid="chapter_1", order=1)
+        seed.activity(1, chapter_id=1, order=1, name="Lesson", content={"type": "doc"}, published=True)
+        db_session.commit()
+        return db_session
+
+    async def _meta(self, db_session, if_none_match=None):
+        response = Response()
+        await get_course_meta(
+            make_request(if_none_match), "course_1", False, Mock(spec=PublicUser), db_session, response=response
+        )
+        return response.headers["etag"]
+
+    @pytest.mark.asyncio
+    async def test_meta_not_modified_skips_tree_load(self, seeded_session, count_queries):
+        """Test that a matching If-None-Match answers 304 before loading chapters"""
+        etag = await self._meta(seeded_session)
+
+        with patch("src.services.courses.chapters.get_course_chapters", new=AsyncMock()) as load_tree:
+            with count_queries() as queries:
+                with pytest.raises(HTTPException) as exc:
+                    await self._meta(seeded_session, if_none_match=etag)
+
+        assert exc.value.status_code == 304
+        assert exc.value.headers["ETag"] == etag
+        load_tree.assert_not_called()
+        # Only the course and authors lookup
+        assert queries.count == 1
+
+    @pytest.mark.asyncio
+    async def test_rbac_runs_before_etag(self, seeded_session, skip_rbac):
+        """Test that a matching ETag never bypasses a failing RBAC check"""
+        etag = await self._meta(seeded_session)
+
+        with patch(
+            "src.services.courses.courses.courses_rbac_check",
+            new=AsyncMock(side_effect=HTTPException(status_code=403)),
+        ):
+            with pytest.raises(HTTPException) as exc:
+                await self._meta(seeded_session, if_none_match=etag)
+
+        assert exc.value.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_mutations_change_etags(self, seeded_session):
+        """Test that chapter and activity changes bump the course content version"""
+        etags = [await self._meta(seeded_session)]
+
+        await update_chapter(
+            make_request(), ChapterUpdate(name="Basics", org_id=1, course_id=1), 1, Mock(spec=PublicUser), seeded_session
+        )
+        etags.append(await self._meta(seeded_session))
+
+        await update_activity(
+            make_request(),
+            ActivityUpdate(
+                name=None,
+                content={"type": "doc", "content": []},
+                activity_type=None,
+                activity_sub_type=None,
+                published_version=None,
+                version=None,
+            ),
+            "activity_1",
+            Mock(spec=PublicUser),
+            seeded_session,
+        )
+        etags.append(await self._meta(seeded_session))
+
+        assert len(set(etags)) == 3
+        assert seeded_session.get(Course, 1).content_version == 2
+
+    @pytest.mark.asyncio
+    async def test_version_bump_commits_with_the_change(self, seeded_session):
+        """Test that a change and its content version bump share one commit"""
+        with patch.object(seeded_session, "commit", wraps=seeded_session.commit) as commit:
+            await update_chapter(
+                make_request(), ChapterUpdate(name="Basics", org_id=1, course_id=1), 1, Mock(spec=PublicUser), seeded_session
+            )
+
+        assert commit.call_count == 1
+        seeded_session.expire_all()
+        assert seeded_session.get(Course, 1).content_version == 1
+        assert seeded_session.get(Chapter, 1).name == "Basics"
+
+    @pytest.mark.asyncio
+    async def test_activity_and_chapter_etags(self, seeded_session, skip_rbac):
+        """Test that activity ETags vary with paid access and chapters answer 304"""
+        response = Response()
+        await get_activity(make_request(), "activity_1", Mock(spec=PublicUser), seeded_session, response=response)
+        paid_etag = response.headers["etag"]
+
+        skip_rbac.return_value = False
+        response = Response()
+        activity = await get_activity(
+            make_request(paid_etag), "activity_1", Mock(spec=PublicUser), seeded_session, response=response
+        )
+        assert response.headers["etag"] != paid_etag
+        assert activity.content == {"paid_access": False}
+
+        response = Response()
+        await get_chapter(make_request(), 1, Mock(spec=PublicUser), seeded_session, response=response)
+        with pytest.raises(HTTPException) as exc:
+            await get_chapter(make_request(response.headers["etag"]), 1, Mock(spec=PublicUser), seeded_session, response=Response())
+        assert exc.value.status_code == 304
+
+    @pytest.mark.asyncio
+    async def test_without_response_no_etag(self, seeded_session):
+        """Test that internal callers get the full response whatever the request sends"""
+        course = await get_course_meta(make_request('"anything"'), "course_1", False, Mock(spec=PublicUser), seeded_session)
+        assert [chapter.name for chapter in course.chapters] == ["Intro"]
@@ -0,0 +1,103 @@
+import re
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi import HTTPException, Request
+from src.db.users import PublicUser
+from src.routers.courses.chapters import api_get_chapter_by
+from src.services.courses.courses import get_course_meta
+
+CHAPTERS = 10
+ACTIVITIES_PER_CHAPTER = 30
+# A paragraph-heavy Tiptap document
+LESSON_CONTENT = {
+    "type": "doc",
+    "content": [{"type": "paragraph", "content": [{"type": "text", "text": "Lorem ipsum " * 40}]}] * 40,
+}
+
+
+class TestCourseOutline:
+    """Test cases for course trees listing activities without their content"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac(
+            "src.services.courses.courses.courses_rbac_check",
+            "src.services.courses.chapters.courses_rbac_check_for_chapters",
+        )
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.org()
+        seed.course()
+        for chapter_id in range(1, CHAPTERS + 1):
+            seed.chapter(chapter_id)
+            for order in range(ACTIVITIES_PER_CHAPTER):
+                seed.activity(
+                    chapter_id * 100 + order,
+                    chapter_id=chapter_id,
+                    order=order,
+                    content=LESSON_CONTENT,
+                    details={"notes": "x" * 200},
+                    # The last lesson of every chapter is a draft
+                    published=order < ACTIVITIES_PER_CHAPTER - 1,
+                )
+        db_session.commit()
+        return db_session
+
+    async def _meta(self, db_session, include_content=False, with_unpublished_activities=False):
+        return await get_course_meta(
+            Mock(spec=Request),
+            "course_1",
+            with_unpublished_activities,
+            Mock(spec=PublicUser),
+            db_session,
+            include_content=include_content,
+        )
+
+    @pytest.mark.asyncio
+    async def test_outline_skips_content(self, seeded_session, count_queries):
+        """Test that the outline never reads activity content, in a fixed number of queries"""
+        with count_queries() as queries:
+            course = await self._meta(seeded_session)
+
+        # Course and authors, course, chapters, activities
+        assert queries.count == 4
+        assert not any(re.search(r"activity\.content\b", statement) for statement in queries.statements)
+
+        activities = [activity for chapter in course.chapters for activity in chapter.activities]
+        assert len(activities) == CHAPTERS * (ACTIVITIES_PER_CHAPTER - 1)
+        assert all(activity.content == {} and activity.details is None for activity in activities)
+        assert course.chapters[0].activities[0].name == "Lesson 100"
+        assert course.chapters[0].activities[1].activity_uuid == "activity_101"
+
+    @pytest.mark.asyncio
+    async def test_include_content_and_payload_size(self, seeded_session):
+        """Test that include=content returns full activities, and how much the outline saves"""
+        outline = await self._meta(seeded_session, with_unpublished_activities=True)
+        full = await self._meta(seeded_session, include_content=True, with_unpublished_activities=True)
+
+        activities = [activity for chapter in full.chapters for activity in chapter.activities]
+        assert len(activities) == CHAPTERS * ACTIVITIES_PER_CHAPTER
+        assert all(activity.content == LESSON_CONTENT for activity in activities)
+        assert activities[0].details == {"notes": "x" * 200}
+
+        # 300 activities: the outline is a small fraction of the full tree
+        assert len(outline.json()) * 20 < len(full.json())
+
+    @pytest.mark.parametrize("can_edit", [True, False])
+    @pytest.mark.asyncio
+    async def test_chapters_by_page_show_drafts_to_editors(self, seeded_session, can_edit):
+        """Test that paged chapters list unpublished activities for users who may edit the course only"""
+
+        async def rbac_check(request, course_uuid, current_user, action, db_session):
+            if action != "read" and not can_edit:
+                raise HTTPException(status_code=403, detail="Forbidden")
+            return True
+
+        with patch("src.services.courses.chapters.courses_rbac_check_for_chapters", new=AsyncMock(side_effect=rbac_check)):
+            chapters = await api_get_chapter_by(
+                Mock(spec=Request), 1, 1, 10, current_user=Mock(spec=PublicUser), db_session=seeded_session
+            )
+
+        activities_per_chapter = ACTIVITIES_PER_CHAPTER if can_edit else ACTIVITIES_PER_CHAPTER - 1
+        assert [len(chapter.activities) for chapter in chapters] == [activities_per_chapter] * CHAPTERS
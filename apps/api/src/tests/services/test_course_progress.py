@@ -0,0 +1,239 @@
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import BackgroundTasks, Request
+from sqlmodel import select
+from src.db.courses.activities import ActivityCreate
+from src.db.courses.certifications import CertificateUser, Certifications
+from src.db.courses.chapters import ActivityOrder, ChapterOrder, ChapterUpdateOrder
+from src.db.trail_runs import TrailRun
+from src.db.trail_steps import TrailStep
+from src.db.users import PublicUser
+from src.services.courses.activities.activities import create_activity, delete_activity
+from src.services.courses.certifications import check_course_completion_and_create_certificate
+from src.services.courses.chapters import delete_chapter, reorder_chapters_and_activities
+from src.services.trail.progress import recompute_course_progress
+from src.services.trail.trail import add_activity_to_trail, remove_activity_from_trail
+
+LEARNER = 1
+ACTIVITIES_PER_CHAPTER = 5
+
+
+def learner() -> PublicUser:
+    return Mock(spec=PublicUser, id=LEARNER)
+
+
+class TestCourseProgress:
+    """Test cases for the progress counters maintained on trail runs"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac(
+            "src.services.courses.activities.activities.courses_rbac_check_for_activities",
+            "src.services.courses.chapters.courses_rbac_check_for_chapters",
+        )
+        with patch("src.core.response_cache.get_redis_client", return_value=None):
+            yield
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.org()
+        seed.course()
+        seed.user(LEARNER)
+        db_session.add(Certifications(id=1, course_id=1, certification_uuid="certification_1"))
+        for chapter_id in (1, 2):
+            seed.chapter(chapter_id)
+            for order in range(ACTIVITIES_PER_CHAPTER):
+                seed.activity(chapter_id * 100 + order, chapter_id=chapter_id, order=order)
+        db_session.commit()
+        return db_session
+
+    def _progress(self, db_session) -> tuple[int, int]:
+        db_session.expire_all()
+        run = db_session.exec(select(TrailRun).where(TrailRun.user_id == LEARNER, TrailRun.course_id == 1)).one()
+        return run.completed_steps, run.total_steps
+
+    async def _complete(self, db_session, *activity_ids: int):
+        for activity_id in activity_ids:
+            await add_activity_to_trail(Mock(spec=Request), learner(), f"activity_{activity_id}", db_session)
+
+    def _chapter_activities(self, chapter_id: int) -> list[int]:
+        return [chapter_id * 100 + order for order in range(ACTIVITIES_PER_CHAPTER)]
+
+    @pytest.mark.asyncio
+    async def test_completion_check_reads_counters(self, seeded_session, count_queries):
+        """Test that checking completion doesn't load the course's activities or steps"""
+        await self._complete(seeded_session, *self._chapter_activities(1))
+        assert self._progress(seeded_session) == (5, 10)
+
+        with count_queries() as queries:
+            assert not await check_course_completion_and_create_certificate(
+                Mock(spec=Request), LEARNER, 1, seeded_session
+            )
+        assert queries.count == 1
+
+        await self._complete(seeded_session, *self._chapter_activities(2))
+        assert self._progress(seeded_session) == (10, 10)
+        certificate = seeded_session.exec(select(CertificateUser).where(CertificateUser.user_id == LEARNER)).one()
+        assert certificate.certification_id == 1
+
+    @pytest.mark.asyncio
+    async def test_steps_count_once(self, seeded_session):
+        await self._complete(seeded_session, 100, 100, 101)
+        assert self._progress(seeded_session) == (2, 10)
+
+        await remove_activity_from_trail(Mock(spec=Request), learner(), "activity_100", seeded_session)
+        assert self._progress(seeded_session) == (1, 10)
+        # Removing it again changes nothing
+        await remove_activity_from_trail(Mock(spec=Request), learner(), "activity_100", seeded_session)
+        assert self._progress(seeded_session) == (1, 10)
+
+    @pytest.mark.asyncio
+    async def test_activities_added_and_deleted(self, seeded_session):
+        await self._complete(seeded_session, 100, 200)
+
+        await create_activity(
+            Mock(spec=Request), ActivityCreate(name="Lesson", chapter_id=1), Mock(spec=PublicUser), seeded_session
+        )
+        assert self._progress(seeded_session) == (2, 11)
+
+        await delete_activity(Mock(spec=Request), "activity_100", Mock(spec=PublicUser), seeded_session)
+        assert self._progress(seeded_session) == (1, 10)
+
+        # An activity nobody completed
+        await delete_activity(Mock(spec=Request), "activity_101", Mock(spec=PublicUser), seeded_session)
+        assert self._progress(seeded_session) == (1, 9)
+
+        await delete_chapter(Mock(spec=Request), "2", Mock(spec=PublicUser), seeded_session)
+        assert self._progress(seeded_session) == (0, 4)
+
+    @pytest.mark.asyncio
+    async def test_reorder_moves_activities_in_and_out(self, seeded_session):
+        await self._complete(seeded_session, 100, 101)
+
+        async def reorder(chapters: dict[int, list[int]]):
+            await reorder_chapters_and_activities(
+                Mock(spec=Request),
+                "course_1",
+                ChapterUpdateOrder(
+                    chapter_order_by_ids=[
+                        ChapterOrder(
+                            chapter_id=chapter_id,
+                            activities_order_by_ids=[ActivityOrder(activity_id=activity) for activity in activities],
+                        )
+                        for chapter_id, activities in chapters.items()
+                    ]
+                ),
+                Mock(spec=PublicUser),
+                seeded_session,
+            )
+
+        # Activity 100 moves to chapter 2, 101 leaves the course
+        await reorder({1: self._chapter_activities(1)[2:], 2: [100] + self._chapter_activities(2)})
+        assert self._progress(seeded_session) == (1, 9)
+
+        # 101 comes back, the learner's completion with it
+        await reorder({1: self._chapter_activities(1)[1:], 2: [100] + self._chapter_activities(2)})
+        assert self._progress(seeded_session) == (2, 10)
+
+
+class TestCourseProgressRecompute:
+    """Test cases for recomputing the progress of every learner of a course"""
+
+    ACTIVITIES = 4
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac("src.services.courses.activities.activities.courses_rbac_check_for_activities")
+        with patch("src.core.response_cache.get_redis_client", return_value=None):
+            yield
+
+    def _seed_course(self, seed, course_id: int, learners: range):
+        db_session = seed.db_session
+        seed.course(course_id, name=f"Course {course_id}")
+        db_session.add(Certifications(id=course_id, course_id=course_id, certification_uuid=f"certification_{course_id}"))
+        seed.chapter(course_id, course_id=course_id, name="Chapter")
+        activity_ids = [course_id * 10 + index for index in range(self.ACTIVITIES)]
+        for order, activity_id in enumerate(activity_ids):
+            seed.activity(activity_id, chapter_id=course_id, course_id=course_id, order=order)
+
+        for user_id in learners:
+            seed.user(user_id, user_uuid=f"user_{user_id:04d}")
+            # Counters as left by a structure change, not maintained yet
+            run = TrailRun(trail_id=user_id, course_id=course_id, org_id=1, user_id=user_id, creation_date="", update_date="")
+            db_session.add(run)
+            db_session.flush()
+            # Even learners completed every activity, odd ones half of them
+            completed = activity_ids if user_id % 2 == 0 else activity_ids[:2]
+            for activity_id in completed:
+                db_session.add(
+                    TrailStep(
+                        trailrun_id=run.id,  # type: ignore
+                        trail_id=user_id,
+                        activity_id=activity_id,
+                        course_id=course_id,
+                        org_id=1,
+                        user_id=user_id,
+                        complete=True,
+                        teacher_verified=False,
+                        grade="",
+                        creation_date="",
+                        update_date="",
+                    )
+                )
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.org()
+        self._seed_course(seed, 1, range(1, 11))
+        self._seed_course(seed, 2, range(11, 111))
+        # A learner already certified
+        db_session.add(CertificateUser(user_id=2, certification_id=1, user_certification_uuid="AB-20260101-0002-001"))
+        db_session.commit()
+        return db_session
+
+    def _certified(self, db_session, course_id: int) -> list[int]:
+        statement = (
+            select(CertificateUser.user_id)
+            .where(CertificateUser.certification_id == course_id)
+            .order_by(CertificateUser.user_id)  # type: ignore
+        )
+        return list(db_session.exec(statement).all())
+
+    @pytest.mark.asyncio
+    async def test_recompute_is_set_based(self, seeded_session, count_queries):
+        """Test that the recompute cost doesn't grow with the number of learners"""
+        with count_queries() as small_course:
+            small = recompute_course_progress(seeded_session, 1)
+        with count_queries() as large_course:
+            large = recompute_course_progress(seeded_session, 2)
+
+        assert small_course.count == large_course.count
+
+        assert (small.learners, small.completed, small.certificates_issued) == (10, 5, 4)
+        assert (large.learners, large.completed, large.certificates_issued) == (100, 50, 50)
+        assert self._certified(seeded_session, 1) == [2, 4, 6, 8, 10]
+        assert self._certified(seeded_session, 2) == list(range(12, 111, 2))
+
+        runs = seeded_session.exec(select(TrailRun).where(TrailRun.course_id == 2)).all()
+        assert {(run.user_id % 2, run.completed_steps, run.total_steps) for run in runs} == {(0, 4, 4), (1, 2, 4)}
+
+        certificate = seeded_session.exec(select(CertificateUser).where(CertificateUser.user_id == 12)).one()
+        assert certificate.user_certification_uuid.endswith("-0012-001")
+
+        # Nothing more to issue
+        assert recompute_course_progress(seeded_session, 2).certificates_issued == 0
+
+    @pytest.mark.asyncio
+    async def test_deleting_activities_schedules_recompute(self, seeded_session, db_engine):
+        """Test that learners who completed every remaining activity get certified"""
+        background_tasks = BackgroundTasks()
+        for activity_uuid in ("activity_12", "activity_13"):
+            await delete_activity(
+                Mock(spec=Request), activity_uuid, Mock(spec=PublicUser), seeded_session, background_tasks
+            )
+
+        with patch("src.services.trail.progress.engine", db_engine):
+            await background_tasks()
+
+        seeded_session.expire_all()
+        assert self._certified(seeded_session, 1) == list(range(1, 11))
@@ -0,0 +1,294 @@
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import Request
+from sqlmodel import select
+from src.db.courses.courses import Course
+from src.db.organizations import OrganizationUpdate
+from src.db.payments.payments_courses import PaymentsCourse
+from src.db.payments.payments_users import PaymentsUser, PaymentStatusEnum
+from src.db.resource_authors import (
+    ResourceAuthor,
+    ResourceAuthorshipEnum,
+    ResourceAuthorshipStatusEnum,
+)
+from src.db.usergroup_resources import UserGroupResource
+from src.db.usergroup_user import UserGroupUser
+from src.db.users import AnonymousUser, PublicUser
+from src.services.courses.courses import (
+    course_visibility_predicate,
+    get_courses_orgslug,
+    get_user_courses,
+    hydrate_course_authors,
+    search_courses,
+)
+from src.services.explore.explore import (
+    get_course_for_explore,
+    get_courses_for_an_org_explore,
+)
+from src.services.orgs.orgs import update_org
+from src.services.orgs.slugs import resolve_org_slug
+from src.services.payments.payments_users import get_owned_courses
+
+USERGROUPS_PER_COURSE = 50
+
+
+def make_author(course_id: int, user_id: int) -> ResourceAuthor:
+    return ResourceAuthor(
+        resource_uuid=f"course_{course_id}",
+        user_id=user_id,
+        authorship=ResourceAuthorshipEnum.CREATOR,
+        authorship_status=ResourceAuthorshipStatusEnum.ACTIVE,
+    )
+
+
+def make_public_user(user_id: int):
+    user = Mock(spec=PublicUser)
+    user.id = user_id
+    return user
+
+
+class TestCourseVisibility:
+    """Test cases for the course listing visibility rule"""
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        """Courses that each have 50 usergroups"""
+        seed.org()
+        seed.user(1)
+        seed.user(2)
+
+        # course_0..9: private, restricted to 50 usergroups, user 1 is in the last one
+        # course_10..14: public, also restricted to 50 usergroups
+        # course_15..19: private, not restricted to any usergroup
+        # course_20..24: private, restricted, nobody is a member
+        # course_25: private, restricted, user 2 is its author
+        for i in range(26):
+            course = seed.course(i, name=f"Course {i}", public=10 <= i < 15)
+            if 15 <= i < 20:
+                continue
+            for group in range(USERGROUPS_PER_COURSE):
+                db_session.add(
+                    UserGroupResource(
+                        usergroup_id=i * USERGROUPS_PER_COURSE + group,
+                        resource_uuid=course.course_uuid,
+                        org_id=1,
+                    )
+                )
+            if i < 10:
+                db_session.add(
+                    UserGroupUser(
+                        usergroup_id=i * USERGROUPS_PER_COURSE + USERGROUPS_PER_COURSE - 1,
+                        user_id=1,
+                        org_id=1,
+                    )
+                )
+            if i == 25:
+                db_session.add(make_author(25, 2))
+        db_session.commit()
+        return db_session
+
+    def _visible_uuids(self, db_session, user_id):
+        statement = select(Course.course_uuid).where(course_visibility_predicate(user_id))
+        return set(db_session.exec(statement).all())
+
+    def test_member_sees_public_open_and_own_usergroup_courses(self, seeded_session):
+        """Test that a usergroup member sees exactly the courses they're allowed to"""
+        expected = {f"course_{i}" for i in range(20)}
+        assert self._visible_uuids(seeded_session, 1) == expected
+
+    def test_author_sees_own_restricted_course(self, seeded_session):
+        """Test that resource authors see their restricted course"""
+        visible = self._visible_uuids(seeded_session, 2)
+        assert "course_25" in visible
+        assert not any(f"course_{i}" in visible for i in range(10))
+
+    def test_predicate_does_not_multiply_rows(self, seeded_session):
+        """Test that courses with many usergroups come back once each"""
+        statement = select(Course).where(course_visibility_predicate(1))
+        courses = seeded_session.exec(statement).all()
+        assert len(courses) == len({course.course_uuid for course in courses}) == 20
+
+    @pytest.mark.asyncio
+    async def test_get_courses_orgslug_pages_are_full(self, seeded_session, count_queries):
+        """Test that offset/limit apply to courses, not to joined rows"""
+        with count_queries() as queries:
+            pages = [
+                await get_courses_orgslug(
+                    Mock(spec=Request), make_public_user(1), "org", seeded_session, page, 7
+                )
+                for page in (1, 2, 3)
+            ]
+
+        assert [len(page) for page in pages] == [7, 7, 6]
+        uuids = [course.course_uuid for page in pages for course in page]
+        assert len(uuids) == len(set(uuids)) == 20
+        assert not any("DISTINCT" in statement for statement in queries.statements)
+
+    @pytest.mark.asyncio
+    async def test_get_courses_orgslug_anonymous_public_only(self, seeded_session):
+        """Test that anonymous users only see public courses"""
+        courses = await get_courses_orgslug(
+            Mock(spec=Request), AnonymousUser(), "org", seeded_session, 1, 50
+        )
+        assert {course.course_uuid for course in courses} == {
+            f"course_{i}" for i in range(10, 15)
+        }
+
+
+class TestHydrateCourseAuthors:
+    """Test cases for batched author hydration of CourseRead listings"""
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        """12 public courses, each with 3 authors, all bought through one product"""
+        seed.org()
+        for user_id in range(1, 5):
+            seed.user(user_id)
+        for course_id in range(1, 13):
+            seed.course(course_id, name=f"Course {course_id}")
+            for user_id in (1, 2, 3):
+                db_session.add(make_author(course_id, user_id))
+            db_session.add(PaymentsCourse(course_id=course_id, payment_product_id=1, org_id=1))
+        db_session.add(
+            PaymentsUser(user_id=4, org_id=1, payment_product_id=1, status=PaymentStatusEnum.ACTIVE)
+        )
+        db_session.commit()
+        return db_session
+
+    def _assert_hydrated(self, courses, expected_count):
+        assert len(courses) == expected_count
+        for course in courses:
+            assert [author.user.id for author in course.authors] == [1, 2, 3]
+
+    def test_hydrate_keeps_course_order_and_author_order(self, seeded_session, count_queries):
+        """Test that hydration is a single query and preserves ordering"""
+        courses = seeded_session.exec(select(Course).order_by(Course.id.desc())).all()  # type: ignore
+
+        with count_queries() as queries:
+            course_reads = hydrate_course_authors(courses, seeded_session)
+
+        assert queries.count == 1
+        assert [course.id for course in course_reads] == list(range(12, 0, -1))
+        self._assert_hydrated(course_reads, 12)
+
+    def test_hydrate_empty_list_runs_no_query(self, seeded_session, count_queries):
+        """Test that an empty page doesn't hit the database"""
+        with count_queries() as queries:
+            assert hydrate_course_authors([], seeded_session) == []
+        assert queries.count == 0
+
+    @pytest.mark.asyncio
+    async def test_get_courses_orgslug_query_count(self, seeded_session, count_queries):
+        resolve_org_slug(seeded_session, "org")
+        with count_queries() as queries:
+            courses = await get_courses_orgslug(
+                Mock(spec=Request), make_public_user(1), "org", seeded_session, 1, 12
+            )
+        self._assert_hydrated(courses, 12)
+        assert queries.count == 2
+
+    @pytest.mark.asyncio
+    async def test_search_courses_query_count(self, seeded_session, count_queries):
+        resolve_org_slug(seeded_session, "org")
+        with count_queries() as queries:
+            courses = await search_courses(
+                Mock(spec=Request), make_public_user(1), "org", "course", seeded_session, 1, 12
+            )
+        self._assert_hydrated(courses, 12)
+        assert queries.count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_user_courses_query_count(self, seeded_session, count_queries):
+        with count_queries() as queries:
+            courses = await get_user_courses(
+                Mock(spec=Request), make_public_user(1), 2, seeded_session, 1, 12
+            )
+        self._assert_hydrated(courses, 12)
+        assert queries.count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_owned_courses_query_count(self, seeded_session, count_queries):
+        with count_queries() as queries:
+            courses = await get_owned_courses(
+                Mock(spec=Request), make_public_user(4), seeded_session
+            )
+        self._assert_hydrated(courses, 12)
+        assert queries.count <= 3
+
+    @pytest.mark.asyncio
+    async def test_get_courses_for_an_org_explore_query_count(self, seeded_session, count_queries):
+        with count_queries() as queries:
+            courses = await get_courses_for_an_org_explore(
+                Mock(spec=Request), seeded_session, "org_1"
+            )
+        self._assert_hydrated(courses, 12)
+        assert queries.count == 3
+
+    @pytest.mark.asyncio
+    async def test_get_course_for_explore_query_count(self, seeded_session, count_queries):
+        with count_queries() as queries:
+            course = await get_course_for_explore(Mock(spec=Request), "5", seeded_session)
+        self._assert_hydrated([course], 1)
+        assert queries.count == 2
+
+
+class TestOrgSlugResolver:
+    """Test cases for slug-addressed course listings"""
+
+    @pytest.fixture(autouse=True)
+    def no_redis(self):
+        with patch("src.services.orgs.slugs.get_redis_client", return_value=None):
+            yield
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        for org_id, slug in ((1, "org"), (2, "other")):
+            seed.org(org_id, name=slug, slug=slug)
+        seed.course(1, name="Course 1")
+        seed.course(2, org_id=2, name="Course 2")
+        db_session.commit()
+        return db_session
+
+    def test_resolve_is_cached(self, seeded_session, count_queries):
+        with count_queries() as queries:
+            refs = [resolve_org_slug(seeded_session, "org") for _ in range(10)]
+
+        assert queries.count == 1
+        assert refs[0] is not None and (refs[0].id, refs[0].org_uuid) == (1, "org_1")
+        assert resolve_org_slug(seeded_session, "missing") is None
+
+    @pytest.mark.asyncio
+    async def test_listings_filter_on_org_id(self, seeded_session, count_queries):
+        """Test that course listings don't join organizations"""
+        with count_queries() as queries:
+            listed = await get_courses_orgslug(Mock(spec=Request), AnonymousUser(), "org", seeded_session, 1, 10)
+            found = await search_courses(Mock(spec=Request), AnonymousUser(), "other", "course", seeded_session, 1, 10)
+
+        assert [course.course_uuid for course in listed] == ["course_1"]
+        assert [course.course_uuid for course in found] == ["course_2"]
+        assert not any("JOIN organization" in statement for statement in queries.statements)
+
+    @pytest.mark.asyncio
+    async def test_search_query_is_parameterized(self, seeded_session):
+        """Test that quotes in the search query are matched, not executed"""
+        courses = await search_courses(
+            Mock(spec=Request), AnonymousUser(), "org", "') OR 1=1 --", seeded_session, 1, 10
+        )
+        assert courses == []
+
+    @pytest.mark.asyncio
+    async def test_slug_change_invalidates(self, seeded_session, bypass_rbac):
+        """Test that a renamed org stops resolving under its old slug"""
+        assert resolve_org_slug(seeded_session, "org") is not None
+
+        bypass_rbac("src.services.orgs.orgs.rbac_check")
+        await update_org(
+            Mock(spec=Request),
+            OrganizationUpdate(slug="renamed"),  # type: ignore
+            1,
+            make_public_user(1),
+            seeded_session,
+        )
+
+        assert resolve_org_slug(seeded_session, "org") is None
+        assert resolve_org_slug(seeded_session, "renamed").id == 1  # type: ignore
@@ -0,0 +1,140 @@
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import HTTPException, Request
+from fastapi_jwt_auth import AuthJWT
+from src.db.users import PublicUser, User
+from src.security.auth import get_current_user
+from src.services.users.users import security_get_user
+from src.services.users.current_user_cache import (
+    CurrentUserLRU,
+    current_user_lru,
+    invalidate_current_user,
+)
+
+REQUESTS = 100
+
+
+def make_authorize(subject: str):
+    authorize = Mock(spec=AuthJWT)
+    authorize.jwt_optional.return_value = None
+    authorize.get_jwt_subject.return_value = subject
+    return authorize
+
+
+class TestCurrentUserCache:
+    """Test cases for the authenticated-user lookup cache"""
+
+    @pytest.fixture(params=["local", "redis"])
+    def redis_client(self, request, fake_redis):
+        client = fake_redis if request.param == "redis" else None
+        with patch("src.services.users.current_user_cache.get_redis_client", return_value=client):
+            yield client
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.user(1, username="bruce", email="b@w.dev")
+        db_session.commit()
+        return db_session
+
+    async def _get(self, db_session, subject="b@w.dev"):
+        return await get_current_user(Mock(spec=Request), make_authorize(subject), db_session)
+
+    @pytest.mark.asyncio
+    async def test_repeated_requests_hit_database_once(self, seeded_session, redis_client, count_queries):
+        """Test that a burst of authenticated requests costs one user lookup, two with Redis"""
+        with count_queries() as queries:
+            users = [await self._get(seeded_session) for _ in range(REQUESTS)]
+
+        # With Redis the first lookup only records the subject's user id
+        assert queries.count == (2 if redis_client else 1)
+        assert all(isinstance(user, PublicUser) and user.id == 1 for user in users)
+
+    @pytest.mark.asyncio
+    async def test_update_invalidates(self, seeded_session, redis_client):
+        """Test that a profile update is visible on the next request"""
+        await self._get(seeded_session)
+
+        user = seeded_session.get(User, 1)
+        user.username = "batman"
+        seeded_session.add(user)
+        seeded_session.commit()
+        invalidate_current_user(1)
+
+        assert (await self._get(seeded_session)).username == "batman"
+
+    @pytest.mark.asyncio
+    async def test_deletion_invalidates(self, seeded_session, redis_client):
+        """Test that a deleted user can't authenticate from the cache"""
+        await self._get(seeded_session)
+
+        seeded_session.delete(seeded_session.get(User, 1))
+        seeded_session.commit()
+        invalidate_current_user(1)
+
+        with pytest.raises(HTTPException):
+            await self._get(seeded_session)
+
+    @pytest.mark.asyncio
+    async def test_other_worker_sees_version_bump(self, seeded_session, fake_redis):
+        """Test that a version bump from another process evicts local entries"""
+        with patch("src.services.users.current_user_cache.get_redis_client", return_value=fake_redis):
+            await self._get(seeded_session)
+            # Another worker bumps the version without touching our local LRU
+            fake_redis.incr("user_token_version:1")
+
+            user = seeded_session.get(User, 1)
+            user.username = "batman"
+            seeded_session.add(user)
+            seeded_session.commit()
+
+            assert (await self._get(seeded_session)).username == "batman"
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_shared_between_workers(self, seeded_session, fake_redis, count_queries):
+        """Test that an empty local LRU is refilled from Redis"""
+        with patch("src.services.users.current_user_cache.get_redis_client", return_value=fake_redis):
+            await self._get(seeded_session)
+            await self._get(seeded_session)
+            current_user_lru.clear()
+
+            with count_queries() as queries:
+                user = await self._get(seeded_session)
+
+        assert queries.count == 0
+        assert user.id == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_load_is_not_hidden(self, seeded_session, fake_redis):
+        """Test that a user loaded before a version bump isn't cached under the new version"""
+        async def load_then_bump(*args, **kwargs):
+            user = await security_get_user(*args, **kwargs)
+            # The user is renamed and invalidated while the old row is in hand
+            renamed = seeded_session.get(User, 1)
+            renamed.username = "batman"
+            seeded_session.add(renamed)
+            seeded_session.commit()
+            invalidate_current_user(1)
+            return user
+
+        with patch("src.services.users.current_user_cache.get_redis_client", return_value=fake_redis):
+            await self._get(seeded_session)
+            with patch("src.security.auth.security_get_user", new=load_then_bump):
+                assert (await self._get(seeded_session)).username == "bruce"
+
+            assert (await self._get(seeded_session)).username == "batman"
+
+    def test_lru_is_bounded_and_expires(self):
+        """Test that the local LRU evicts least recently used and expired entries"""
+        lru = CurrentUserLRU(maxsize=2, ttl=30)
+        lru.set("a", {"id": 1}, 0)
+        lru.set("b", {"id": 2}, 0)
+        lru.get("a")
+        lru.set("c", {"id": 3}, 0)
+
+        assert lru.get("b") is None
+        assert lru.get("a") is not None and lru.get("c") is not None
+        assert len(lru) == 2
+
+        expired = CurrentUserLRU(maxsize=2, ttl=-1)
+        expired.set("a", {"id": 1}, 0)
+        assert expired.get("a") is None
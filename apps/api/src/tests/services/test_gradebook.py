@@ -0,0 +1,226 @@
+import csv
+import io
+import json
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import HTTPException, Request
+from src.db.courses.activities import ActivitySubTypeEnum, ActivityTypeEnum
+from src.db.courses.assignments import (
+    Assignment,
+    AssignmentTask,
+    AssignmentTaskSubmission,
+    AssignmentTaskTypeEnum,
+    AssignmentUserSubmission,
+    AssignmentUserSubmissionStatus,
+    GradingTypeEnum,
+)
+from src.db.trail_runs import TrailRun
+from src.db.users import PublicUser
+from src.services.courses.activities.assignments import get_assignments_from_course
+from src.services.courses.gradebook import export_course_gradebook
+
+LEARNERS = 45
+TASK_GRADES = {1: [10, 20], 2: [30]}
+
+
+class TestGradebook:
+    """Test cases for the course gradebook export"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac(
+            "src.services.courses.gradebook.courses_rbac_check_for_assignments",
+            "src.services.courses.activities.assignments.courses_rbac_check_for_assignments",
+        )
+
+    @pytest.fixture(autouse=True)
+    def export_engine(self, db_engine):
+        with patch("src.services.courses.gradebook.engine", new=db_engine):
+            yield
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        """
+        Learners divisible by three were graded on the first assignment,
+        the next ones submitted it and had their tasks graded, the others
+        never submitted. Nobody submitted the second assignment.
+        """
+        seed.org()
+        seed.course()
+        seed.chapter(1, name="Chapter")
+        for assignment_id, task_grades in TASK_GRADES.items():
+            seed.activity(
+                assignment_id,
+                name=f"Assignment {assignment_id}",
+                activity_type=ActivityTypeEnum.TYPE_ASSIGNMENT,
+                activity_sub_type=ActivitySubTypeEnum.SUBTYPE_ASSIGNMENT_ANY,
+            )
+            db_session.add(
+                Assignment(
+                    id=assignment_id,
+                    title=f"Assignment {assignment_id}",
+                    description="",
+                    due_date="",
+                    grading_type=GradingTypeEnum.NUMERIC,
+                    org_id=1,
+                    course_id=1,
+                    chapter_id=1,
+                    activity_id=assignment_id,
+                    assignment_uuid=f"assignment_{assignment_id}",
+                )
+            )
+            for task_index, _ in enumerate(task_grades):
+                db_session.add(
+                    AssignmentTask(
+                        id=assignment_id * 10 + task_index,
+                        title="Task",
+                        description="",
+                        hint="",
+                        reference_file=None,
+                        assignment_type=AssignmentTaskTypeEnum.OTHER,
+                        max_grade_value=50,
+                        assignment_task_uuid=f"assignmenttask_{assignment_id}_{task_index}",
+                        creation_date="",
+                        update_date="",
+                        assignment_id=assignment_id,
+                        org_id=1,
+                        course_id=1,
+                        chapter_id=1,
+                        activity_id=assignment_id,
+                    )
+                )
+
+        for user_id in range(1, LEARNERS + 1):
+            seed.user(user_id)
+            db_session.add(
+                TrailRun(trail_id=user_id, course_id=1, org_id=1, user_id=user_id, creation_date="", update_date="")
+            )
+            if user_id % 3 == 2:
+                continue
+
+            graded = user_id % 3 == 0
+            db_session.add(
+                AssignmentUserSubmission(
+                    user_id=user_id,
+                    assignment_id=1,
+                    grade=user_id if graded else 0,
+                    submission_status=(
+                        AssignmentUserSubmissionStatus.GRADED if graded else AssignmentUserSubmissionStatus.SUBMITTED
+                    ),
+                    assignmentusersubmission_uuid=f"assignmentusersubmission_{user_id}",
+                    creation_date="",
+                    update_date="",
+                )
+            )
+            for task_index, task_grade in enumerate(TASK_GRADES[1]):
+                db_session.add(
+                    AssignmentTaskSubmission(
+                        assignment_task_submission_uuid=f"assignmenttasksubmission_{user_id}_{task_index}",
+                        grade=task_grade,
+                        task_submission_grade_feedback="",
+                        assignment_type=AssignmentTaskTypeEnum.OTHER,
+                        user_id=user_id,
+                        activity_id=1,
+                        course_id=1,
+                        chapter_id=1,
+                        assignment_task_id=10 + task_index,
+                        creation_date="",
+                        update_date="",
+                    )
+                )
+        db_session.commit()
+        return db_session
+
+    async def _export(self, db_session, format="csv"):
+        return await export_course_gradebook(Mock(spec=Request), "course_1", Mock(spec=PublicUser), db_session, format)
+
+    @pytest.mark.asyncio
+    async def test_csv_export_streams_pages(self, seeded_session, count_queries):
+        with patch("src.services.courses.gradebook.GRADEBOOK_EXPORT_PAGE_SIZE", 20):
+            rows = await self._export(seeded_session)
+            # The request's session is closed before the response body is read
+            seeded_session.close()
+
+            with patch.object(seeded_session, "exec", side_effect=AssertionError("request session used")):
+                with count_queries() as queries:
+                    chunks = list(rows)
+
+        # The assignments, then three queries and one chunk per page
+        assert queries.count == 1 + 3 * 3
+        assert len(chunks) == 3
+
+        exported = list(csv.reader(io.StringIO("".join(chunks))))
+        assert exported[0][5:] == [
+            "Assignment 1 (100)",
+            "Assignment 1 status",
+            "Assignment 2 (50)",
+            "Assignment 2 status",
+        ]
+        assert len(exported) == LEARNERS + 1
+        assert exported[1][:3] == ["1", "learner1", "learner1@org.dev"]
+        assert exported[1][5:] == ["30", "SUBMITTED", "0", "NOT_SUBMITTED"]
+        assert exported[2][5:7] == ["0", "NOT_SUBMITTED"]
+        assert exported[3][5:7] == ["3", "GRADED"]
+
+    @pytest.mark.asyncio
+    async def test_json_export_is_one_document(self, seeded_session):
+        with patch("src.services.courses.gradebook.GRADEBOOK_EXPORT_PAGE_SIZE", 20):
+            gradebook = json.loads("".join(await self._export(seeded_session, "json")))
+
+        assert [assignment["max_grade"] for assignment in gradebook["assignments"]] == [100, 50]
+        assert len(gradebook["learners"]) == LEARNERS
+        assert gradebook["learners"][44]["user_id"] == 45
+        assert gradebook["learners"][44]["grades"] == [
+            {"assignment_uuid": "assignment_1", "status": "GRADED", "grade": 45},
+            {"assignment_uuid": "assignment_2", "status": "NOT_SUBMITTED", "grade": 0},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_learners_come_from_the_course(self, seeded_session, seed, count_queries):
+        """Test that learners are paged from the course's runs and submissions, not the user table"""
+        for user_id in (LEARNERS + 1, LEARNERS + 2):
+            seed.user(user_id)
+        # Enrolled in another course only, then submitted without a trail run
+        seeded_session.add(
+            TrailRun(trail_id=LEARNERS + 1, course_id=2, org_id=1, user_id=LEARNERS + 1, creation_date="", update_date="")
+        )
+        seeded_session.add(
+            AssignmentUserSubmission(
+                user_id=LEARNERS + 2,
+                assignment_id=2,
+                grade=0,
+                submission_status=AssignmentUserSubmissionStatus.SUBMITTED,
+                assignmentusersubmission_uuid="assignmentusersubmission_late",
+                creation_date="",
+                update_date="",
+            )
+        )
+        seeded_session.commit()
+
+        with patch("src.services.courses.gradebook.GRADEBOOK_EXPORT_PAGE_SIZE", 20):
+            with count_queries() as queries:
+                gradebook = json.loads("".join(await self._export(seeded_session, "json")))
+
+        assert [learner["user_id"] for learner in gradebook["learners"]] == list(range(1, LEARNERS + 1)) + [
+            LEARNERS + 2
+        ]
+        learner_pages = [statement for statement in queries.statements if "UNION" in statement]
+        assert learner_pages and not any("EXISTS" in statement for statement in learner_pages)
+
+    @pytest.mark.asyncio
+    async def test_course_must_exist(self, seeded_session):
+        with pytest.raises(HTTPException) as e:
+            await export_course_gradebook(Mock(spec=Request), "course_2", Mock(spec=PublicUser), seeded_session)
+
+        assert e.value.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_course_assignments_in_one_query(self, seeded_session, count_queries):
+        with count_queries() as queries:
+            assignments = await get_assignments_from_course(
+                Mock(spec=Request), "course_1", Mock(spec=PublicUser), seeded_session
+            )
+
+        # The course, then its assignments
+        assert queries.count == 2
+        assert [assignment.assignment_uuid for assignment in assignments] == ["assignment_1", "assignment_2"]
@@ -0,0 +1,149 @@
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+from fastapi import HTTPException, Request
+from sqlmodel import func, select
+from src.db.learning_events import (
+    LearningEvent,
+    LearningEventBatch,
+    LearningEventCreate,
+    LearningEventTypeEnum,
+)
+from src.db.users import AnonymousUser, PublicUser
+from src.services.trail.learning_events import (
+    LearningEventBuffer,
+    flush_learning_events,
+    ingest_learning_events,
+)
+
+
+def event_batch(size: int) -> LearningEventBatch:
+    return LearningEventBatch(
+        events=[
+            LearningEventCreate(
+                event_type=LearningEventTypeEnum.VIDEO_PROGRESS,
+                course_uuid="course_1",
+                activity_uuid="activity_1",
+                data={"position": index},
+                occurred_date=datetime(2026, 10, 1, 9),
+            )
+            for index in range(size)
+        ]
+    )
+
+
+class TestLearningEvents:
+    """Test cases for buffered learning event ingestion"""
+
+    @pytest.fixture
+    def buffer(self, db_engine):
+        buffer = LearningEventBuffer(capacity=10)
+        with patch("src.services.trail.learning_events.learning_events_buffer", new=buffer), patch(
+            "src.services.trail.learning_events.engine", new=db_engine
+        ):
+            yield buffer
+
+    async def _ingest(self, batch: LearningEventBatch, user=None):
+        return await ingest_learning_events(Mock(spec=Request), batch, user or Mock(spec=PublicUser, id=1))
+
+    @pytest.mark.asyncio
+    async def test_ingest_does_not_touch_the_database(self, buffer, count_queries):
+        with count_queries() as queries:
+            assert await self._ingest(event_batch(4)) == {"accepted": 4}
+
+        assert queries.count == 0
+        assert len(buffer) == 4
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_asks_clients_to_retry(self, buffer):
+        await self._ingest(event_batch(8))
+
+        with pytest.raises(HTTPException) as e:
+            await self._ingest(event_batch(3))
+
+        assert e.value.status_code == 503
+        assert e.value.headers == {"Retry-After": "1"}
+        # Batches are accepted whole or not at all
+        assert len(buffer) == 8
+
+    @pytest.mark.asyncio
+    async def test_rejects_anonymous_users_and_large_batches(self, buffer):
+        with pytest.raises(HTTPException) as e:
+            await self._ingest(event_batch(1), user=AnonymousUser())
+        assert e.value.status_code == 401
+
+        with patch("src.services.trail.learning_events.LEARNING_EVENTS_MAX_BATCH", new=2):
+            with pytest.raises(HTTPException) as e:
+                await self._ingest(event_batch(3))
+        assert e.value.status_code == 413
+        assert len(buffer) == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_events_in_one_statement(self, buffer, db_session, count_queries):
+        await self._ingest(event_batch(6))
+
+        with count_queries() as queries:
+            assert flush_learning_events() == 6
+
+        assert len([statement for statement in queries.statements if "INSERT" in statement]) == 1
+        assert len(buffer) == 0
+        assert db_session.exec(select(func.count()).select_from(LearningEvent)).one() == 6
+        assert [event.data["position"] for event in db_session.exec(select(LearningEvent))] == list(range(6))
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_the_events(self, buffer, db_session):
+        await self._ingest(event_batch(6))
+
+        with patch("src.services.trail.learning_events.write_learning_events", side_effect=RuntimeError("down")):
+            assert flush_learning_events() == 0
+
+        assert len(buffer) == 6
+        assert flush_learning_events() == 6
+        assert db_session.exec(select(func.count()).select_from(LearningEvent)).one() == 6
+
+    @pytest.mark.asyncio
+    async def test_rejects_events_the_writer_cannot_store(self, buffer):
+        invalid = [
+            {"course_uuid": "c" * 101},
+            {"activity_uuid": "activity\x00"},
+            {"data": {"notes": ["ok", {"key": "value\x00"}]}},
+            {"data": {"blob": "x" * 5000}},
+        ]
+        for fields in invalid:
+            batch = event_batch(2)
+            for name, value in fields.items():
+                setattr(batch.events[1], name, value)
+
+            with pytest.raises(HTTPException) as e:
+                await self._ingest(batch)
+            assert e.value.status_code == 422
+            assert e.value.detail.startswith("Event 1: ")
+
+        assert len(buffer) == 0
+
+    @pytest.mark.asyncio
+    async def test_buffer_is_bounded_in_bytes(self, buffer):
+        buffer.capacity_bytes = 1000
+        batch = event_batch(3)
+        for event in batch.events:
+            event.data = {"text": "x" * 300}
+        await self._ingest(batch)
+
+        with pytest.raises(HTTPException) as e:
+            await self._ingest(batch)
+
+        assert e.value.status_code == 503
+        assert len(buffer) == 3
+
+    @pytest.mark.asyncio
+    async def test_refused_event_does_not_block_the_batch(self, buffer, db_session):
+        await self._ingest(event_batch(6))
+        # Only the database finds out this one can't be stored
+        bad_event = dict(buffer.take(1)[0], user_id=None)
+        buffer.requeue([bad_event])
+
+        assert flush_learning_events() == 6
+
+        assert len(buffer) == 0
+        assert db_session.exec(select(func.count()).select_from(LearningEvent)).one() == 5
+        assert flush_learning_events() == 0
@@ -0,0 +1,127 @@
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import Request
+from src.db.organization_config import OrganizationConfig
+from src.db.users import PublicUser
+from src.services.orgs.config_cache import (
+    get_organization_config,
+    invalidate_organization_config,
+    parse_organization_config,
+)
+from src.services.orgs.orgs import (
+    get_organization,
+    get_organization_by_slug,
+    update_org_landing,
+    update_org_signup_mechanism,
+)
+
+ORG_CONFIG = {
+    "config_version": "1.3",
+    "general": {"enabled": True, "color": "normal", "watermark": True},
+    "features": {
+        "ai": {"enabled": True, "limit": 10, "model": "gpt-4o-mini"},
+        "members": {"enabled": True, "signup_mode": "open", "admin_limit": 1, "limit": 0},
+        "payments": {"enabled": False},
+    },
+    "cloud": {"plan": "free", "custom_domain": False},
+    "landing": {},
+}
+
+
+class TestOrganizationConfigCache:
+    """Test cases for the cached, typed organization config"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac("src.services.orgs.orgs.rbac_check")
+
+    @pytest.fixture(params=["local", "redis"])
+    def redis_client(self, request, fake_redis):
+        client = fake_redis if request.param == "redis" else None
+        with patch("src.services.orgs.config_cache.get_redis_client", return_value=client):
+            yield client
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.org()
+        db_session.add(OrganizationConfig(id=1, org_id=1, config=ORG_CONFIG))
+        db_session.commit()
+        return db_session
+
+    def test_config_is_typed_and_cached(self, seeded_session, redis_client, count_queries):
+        """Test that repeated lookups parse and query the config once"""
+        with count_queries() as queries:
+            configs = [get_organization_config(seeded_session, 1) for _ in range(20)]
+
+        assert queries.count == 1
+        config = configs[-1]
+        assert config is not None
+        assert config.is_feature_enabled("ai") is True
+        assert config.is_feature_enabled("payments") is False
+        assert config.feature_limit("ai") == 10
+        assert config.feature_limit("payments") == 0
+        assert config.config.features.members.signup_mode == "open"
+
+    def test_missing_config_is_not_cached(self, seeded_session, redis_client, count_queries):
+        """Test that an org without config is looked up again next time"""
+        with count_queries() as queries:
+            assert get_organization_config(seeded_session, 2) is None
+            assert get_organization_config(seeded_session, 2) is None
+        assert queries.count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_organization_serves_cached_config(self, seeded_session, redis_client, count_queries):
+        """Test that org reads keep their response shape and reuse the cached config"""
+        await get_organization(Mock(spec=Request), "1", seeded_session, Mock(spec=PublicUser))
+
+        with count_queries() as queries:
+            by_id = await get_organization(Mock(spec=Request), "1", seeded_session, Mock(spec=PublicUser))
+            by_slug = await get_organization_by_slug(Mock(spec=Request), "org", seeded_session, Mock(spec=PublicUser))
+
+        # Only the organization rows themselves
+        assert queries.count == 2
+        for org in (by_id, by_slug):
+            assert isinstance(org.config, OrganizationConfig)
+            assert org.config.org_id == 1
+            assert org.config.config["features"]["ai"]["model"] == "gpt-4o-mini"
+
+    @pytest.mark.asyncio
+    async def test_updates_invalidate(self, seeded_session, redis_client):
+        """Test that config updates are visible on the next lookup"""
+        assert get_organization_config(seeded_session, 1).config.features.members.signup_mode == "open"  # type: ignore
+
+        await update_org_signup_mechanism(Mock(spec=Request), "inviteOnly", 1, Mock(spec=PublicUser), seeded_session)
+        assert get_organization_config(seeded_session, 1).config.features.members.signup_mode == "inviteOnly"  # type: ignore
+
+        await update_org_landing(Mock(spec=Request), {"title": "Hi"}, 1, Mock(spec=PublicUser), seeded_session)
+        assert get_organization_config(seeded_session, 1).config.landing == {"title": "Hi"}  # type: ignore
+
+    def test_other_worker_sees_version_bump(self, seeded_session, fake_redis):
+        """Test that a version bump from another process invalidates local entries"""
+        with patch("src.services.orgs.config_cache.get_redis_client", return_value=fake_redis):
+            get_organization_config(seeded_session, 1)
+
+            org_config = seeded_session.get(OrganizationConfig, 1)
+            org_config.config = {**ORG_CONFIG, "landing": {"title": "New"}}
+            seeded_session.add(org_config)
+            seeded_session.commit()
+            # Another worker bumps the version without touching our local cache
+            fake_redis.incr("org_config_version:1")
+
+            assert get_organization_config(seeded_session, 1).config.landing == {"title": "New"}  # type: ignore
+
+    def test_invalidate_drops_local_entry_without_redis(self, seeded_session, count_queries):
+        with patch("src.services.orgs.config_cache.get_redis_client", return_value=None):
+            get_organization_config(seeded_session, 1)
+            invalidate_organization_config(1)
+
+            with count_queries() as queries:
+                get_organization_config(seeded_session, 1)
+        assert queries.count == 1
+
+    def test_parse_fills_missing_sections(self):
+        """Test that older configs without some sections still validate"""
+        config = parse_organization_config({"features": {"ai": {"enabled": False}}})
+        assert config.features.ai.enabled is False
+        assert config.features.courses.enabled is True
+        assert config.cloud.plan == "free"
@@ -0,0 +1,138 @@
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import Request
+from src.db.roles import Role
+from src.db.user_organizations import UserOrganization
+from src.db.users import PublicUser
+from src.services.orgs.users import (
+    get_organization_users,
+    get_organization_users_count,
+)
+from src.services.users.users import delete_user_by_id
+
+
+class TestOrganizationUsers:
+    """Test cases for the org members listing"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac("src.services.orgs.users.rbac_check")
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        """One org with 1 admin and 29 users"""
+        seed.org()
+        for role_id, role_uuid in ((1, "role_global_admin"), (4, "role_global_user")):
+            db_session.add(Role(id=role_id, name=role_uuid, description="", role_uuid=role_uuid))
+        for user_id in range(1, 31):
+            seed.user(
+                user_id, username=f"learner{user_id}" if user_id > 1 else "admin", email=f"user{user_id}@org.dev"
+            )
+            db_session.add(
+                UserOrganization(
+                    user_id=user_id,
+                    org_id=1,
+                    role_id=1 if user_id == 1 else 4,
+                    creation_date="",
+                    update_date="",
+                )
+            )
+        db_session.commit()
+        return db_session
+
+    @pytest.fixture
+    def current_user(self):
+        user = Mock(spec=PublicUser)
+        user.id = 1
+        return user
+
+    @pytest.mark.asyncio
+    async def test_lists_every_member_in_two_queries(self, seeded_session, current_user, count_queries):
+        """Test that org lookup plus one join load all members and their roles"""
+        with count_queries() as queries:
+            org_users = await get_organization_users(
+                Mock(spec=Request), "1", seeded_session, current_user
+            )
+
+        assert queries.count == 2
+        assert [org_user.user.id for org_user in org_users] == list(range(1, 31))
+        assert org_users[0].role.role_uuid == "role_global_admin"
+        assert org_users[1].role.role_uuid == "role_global_user"
+
+    @pytest.mark.asyncio
+    async def test_keyset_pagination(self, seeded_session, current_user):
+        """Test that pages chain through the last user id"""
+        seen = []
+        after = None
+        while True:
+            page = await get_organization_users(
+                Mock(spec=Request), "1", seeded_session, current_user, after=after, limit=8
+            )
+            if not page:
+                break
+            seen.extend(org_user.user.id for org_user in page)
+            after = page[-1].user.id
+
+        assert seen == list(range(1, 31))
+
+    @pytest.mark.asyncio
+    async def test_role_and_search_filters(self, seeded_session, current_user):
+        """Test the role and text filters"""
+        admins = await get_organization_users(
+            Mock(spec=Request), "1", seeded_session, current_user, role_uuid="role_global_admin"
+        )
+        assert [org_user.user.username for org_user in admins] == ["admin"]
+
+        learners = await get_organization_users(
+            Mock(spec=Request), "1", seeded_session, current_user, search="LEARNER2"
+        )
+        assert {org_user.user.id for org_user in learners} == {2} | set(range(20, 30))
+
+    @pytest.mark.asyncio
+    async def test_count_is_cached(self, seeded_session, current_user):
+        """Test that the count is served from Redis once cached"""
+        redis_mock = Mock()
+        redis_mock.hget.return_value = None
+
+        with patch("src.services.orgs.users.get_redis_client", return_value=redis_mock):
+            result = await get_organization_users_count(
+                Mock(spec=Request), "1", seeded_session, current_user, role_uuid="role_global_user"
+            )
+            assert result == {"count": 29}
+            redis_mock.hset.assert_called_once_with("org_users_count:1", "role_global_user:", 29)
+
+            redis_mock.hget.return_value = b"29"
+            result = await get_organization_users_count(
+                Mock(spec=Request), "1", seeded_session, current_user, role_uuid="role_global_user"
+            )
+            assert result == {"count": 29}
+            assert redis_mock.hset.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_count_without_redis(self, seeded_session, current_user):
+        """Test that the count falls back to the database without Redis"""
+        with patch("src.services.orgs.users.get_redis_client", return_value=None):
+            result = await get_organization_users_count(
+                Mock(spec=Request), "1", seeded_session, current_user
+            )
+        assert result == {"count": 30}
+
+    @pytest.mark.asyncio
+    async def test_search_wildcards_match_literally(self, seeded_session, current_user):
+        """Test that `%` and `_` in a search are not LIKE wildcards"""
+        for search in ("_", "%", "learner_"):
+            learners = await get_organization_users(
+                Mock(spec=Request), "1", seeded_session, current_user, search=search
+            )
+            assert learners == []
+
+    @pytest.mark.asyncio
+    async def test_deleting_a_user_drops_the_count(self, seeded_session, current_user, bypass_rbac):
+        """Test that counts of the user's orgs are invalidated when the user is deleted"""
+        redis_mock = Mock()
+
+        bypass_rbac("src.services.users.users.rbac_check")
+        with patch("src.services.orgs.users.get_redis_client", return_value=redis_mock):
+            await delete_user_by_id(Mock(spec=Request), seeded_session, current_user, 5)
+
+        redis_mock.delete.assert_called_once_with("org_users_count:1")
@@ -0,0 +1,125 @@
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import Request
+from src.db.courses.courses import Course
+from src.db.payments.payments_courses import PaymentsCourse
+from src.db.payments.payments_products import PaymentsProduct
+from src.db.payments.payments_users import PaymentStatusEnum, PaymentsUser
+from src.db.resource_authors import (
+    ResourceAuthor,
+    ResourceAuthorshipEnum,
+    ResourceAuthorshipStatusEnum,
+)
+from src.db.users import AnonymousUser, PublicUser
+from src.services.payments.payments_access import (
+    check_activity_paid_access,
+    check_course_paid_access,
+)
+from src.services.payments.payments_courses import (
+    link_course_to_product,
+    unlink_course_from_product,
+)
+from src.services.payments.payments_users import update_payment_user_status
+
+BUYER = 7
+AUTHOR = 8
+STRANGER = 9
+
+
+def user(user_id: int) -> PublicUser:
+    return Mock(spec=PublicUser, id=user_id)
+
+
+class TestPaidEntitlements:
+    """Test cases for the cached per-user paid course entitlements"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac(
+            "src.services.payments.payments_courses.courses_rbac_check",
+            "src.services.payments.payments_users.rbac_check",
+        )
+
+    @pytest.fixture(params=["local", "redis"])
+    def redis_client(self, request, fake_redis):
+        client = fake_redis if request.param == "redis" else None
+        with patch("src.services.payments.payments_entitlements.get_redis_client", return_value=client):
+            yield client
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.org()
+        # Course 1 and 3 are sold through products 1 and 2, course 2 is free
+        for course_id in (1, 2, 3):
+            seed.course(course_id, name=f"Course {course_id}")
+            seed.activity(course_id, course_id=course_id, name="Lesson")
+        for product_id in (1, 2):
+            db_session.add(PaymentsProduct(id=product_id, org_id=1, payments_config_id=1, provider_product_id=""))
+        db_session.add(PaymentsCourse(course_id=1, payment_product_id=1, org_id=1))
+        db_session.add(PaymentsCourse(course_id=3, payment_product_id=2, org_id=1))
+        db_session.add(PaymentsUser(id=1, user_id=BUYER, org_id=1, payment_product_id=1, status=PaymentStatusEnum.ACTIVE))
+        db_session.add(
+            ResourceAuthor(
+                resource_uuid="course_3",
+                user_id=AUTHOR,
+                authorship=ResourceAuthorshipEnum.CONTRIBUTOR,
+                authorship_status=ResourceAuthorshipStatusEnum.ACTIVE,
+            )
+        )
+        db_session.commit()
+        return db_session
+
+    async def _access(self, db_session, user_id: int) -> list[bool]:
+        current_user = AnonymousUser() if user_id == 0 else user(user_id)
+        return [
+            await check_course_paid_access(course_id, current_user, db_session)  # type: ignore
+            for course_id in (1, 2, 3)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_access(self, seeded_session, redis_client):
+        assert await self._access(seeded_session, BUYER) == [True, True, False]
+        assert await self._access(seeded_session, AUTHOR) == [False, True, True]
+        assert await self._access(seeded_session, STRANGER) == [False, True, False]
+        assert await self._access(seeded_session, 0) == [False, True, False]
+
+    @pytest.mark.asyncio
+    async def test_activity_checks_are_set_lookups(self, seeded_session, redis_client, count_queries):
+        """Test that checking many activities queries entitlements once"""
+        course = seeded_session.get(Course, 1)
+
+        with count_queries() as queries:
+            results = [
+                await check_activity_paid_access(Mock(spec=Request), 1, user(BUYER), seeded_session, course=course)
+                for _ in range(20)
+            ]
+
+        assert all(results)
+        # Paid courses, authored courses, bought courses
+        assert queries.count == 3
+
+        # Without the course, it's looked up from the activity
+        assert not await check_activity_paid_access(Mock(spec=Request), 3, user(BUYER), seeded_session)
+
+    @pytest.mark.asyncio
+    async def test_payment_status_change_invalidates(self, seeded_session, redis_client):
+        assert await self._access(seeded_session, BUYER) == [True, True, False]
+
+        # A refund coming through the Stripe webhook
+        await update_payment_user_status(
+            Mock(spec=Request), 1, 1, PaymentStatusEnum.CANCELLED, Mock(spec=PublicUser), seeded_session
+        )
+
+        assert await self._access(seeded_session, BUYER) == [False, True, False]
+
+    @pytest.mark.asyncio
+    async def test_product_links_invalidate(self, seeded_session, redis_client):
+        assert await self._access(seeded_session, STRANGER) == [False, True, False]
+
+        await unlink_course_from_product(Mock(spec=Request), 1, 1, Mock(spec=PublicUser), seeded_session)
+        assert await self._access(seeded_session, STRANGER) == [True, True, False]
+
+        await link_course_to_product(Mock(spec=Request), 1, 2, 2, Mock(spec=PublicUser), seeded_session)
+        assert await self._access(seeded_session, STRANGER) == [True, False, False]
+        # Buyers of product 1 don't get the course sold through product 2
+        assert await self._access(seeded_session, BUYER) == [True, False, False]
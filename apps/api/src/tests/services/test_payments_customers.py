@@ -0,0 +1,158 @@
+import csv
+import io
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import Request
+from src.db.payments.payments_products import PaymentsProduct
+from src.db.payments.payments_users import PaymentStatusEnum, PaymentsUser
+from src.db.users import PublicUser
+from src.services.payments.payments_customers import (
+    export_customers_csv,
+    get_customers,
+    get_customers_count,
+)
+from src.services.payments.payments_users import update_payment_user_status
+
+CUSTOMERS = 50
+
+
+def status_of(index: int) -> PaymentStatusEnum:
+    # Every fifth customer cancelled, the others active
+    return PaymentStatusEnum.CANCELLED if index % 5 == 0 else PaymentStatusEnum.ACTIVE
+
+
+class TestPaymentsCustomers:
+    """Test cases for the joined, paginated customers listing"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac(
+            "src.services.payments.payments_customers.rbac_check",
+            "src.services.payments.payments_users.rbac_check",
+        )
+        with patch("src.services.payments.payments_entitlements.get_redis_client", return_value=None):
+            yield
+
+    @pytest.fixture(params=["no_redis", "redis"])
+    def redis_client(self, request, fake_redis):
+        client = fake_redis if request.param == "redis" else None
+        with patch("src.services.payments.payments_customers.get_redis_client", return_value=client):
+            yield client
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.org()
+        for product_id in (1, 2):
+            db_session.add(
+                PaymentsProduct(
+                    id=product_id, org_id=1, payments_config_id=1, provider_product_id="", name=f"Plan {product_id}"
+                )
+            )
+        for index in range(1, CUSTOMERS + 1):
+            seed.user(
+                index, username=f"user{index}", first_name="First", last_name="Last", email=f"user{index}@org.dev"
+            )
+            db_session.add(
+                PaymentsUser(
+                    id=index,
+                    user_id=index,
+                    org_id=1,
+                    payment_product_id=index % 2 + 1,
+                    status=status_of(index),
+                )
+            )
+        db_session.commit()
+        return db_session
+
+    @pytest.mark.asyncio
+    async def test_listing_is_one_query(self, seeded_session, count_queries):
+        """Test that the listing cost doesn't grow with the number of customers"""
+        with count_queries() as queries:
+            customers = await get_customers(Mock(spec=Request), 1, Mock(spec=PublicUser), seeded_session)
+
+        # Organization, then customers with their user and product
+        assert queries.count == 2
+        assert len(customers) == CUSTOMERS
+        assert customers[0]["user"].username == "user1"
+        assert customers[0]["product"].name == "Plan 2"
+        assert customers[1]["product"].name == "Plan 1"
+        assert customers[4]["status"] == PaymentStatusEnum.CANCELLED
+
+    @pytest.mark.asyncio
+    async def test_keyset_pagination_and_filters(self, seeded_session):
+        pages = []
+        after = None
+        while True:
+            page = await get_customers(
+                Mock(spec=Request),
+                1,
+                Mock(spec=PublicUser),
+                seeded_session,
+                after=after,
+                limit=15,
+                status=[PaymentStatusEnum.ACTIVE],
+            )
+            if not page:
+                break
+            pages.append(page)
+            after = page[-1]["payment_user_id"]
+
+        assert [len(page) for page in pages] == [15, 15, 10]
+        ids = [customer["payment_user_id"] for page in pages for customer in page]
+        assert ids == [index for index in range(1, CUSTOMERS + 1) if status_of(index) == PaymentStatusEnum.ACTIVE]
+
+    @pytest.mark.asyncio
+    async def test_count_is_cached_and_invalidated(self, seeded_session, redis_client, count_queries):
+        async def count(status=None):
+            return (await get_customers_count(Mock(spec=Request), 1, Mock(spec=PublicUser), seeded_session, status))[
+                "count"
+            ]
+
+        assert await count() == CUSTOMERS
+        assert await count([PaymentStatusEnum.CANCELLED]) == 10
+
+        with count_queries() as queries:
+            assert await count([PaymentStatusEnum.CANCELLED]) == 10
+        # Only the organization lookup when cached
+        assert queries.count == (1 if redis_client else 2)
+
+        await update_payment_user_status(
+            Mock(spec=Request), 1, 1, PaymentStatusEnum.CANCELLED, Mock(spec=PublicUser), seeded_session
+        )
+
+        assert await count([PaymentStatusEnum.CANCELLED]) == 11
+        assert await count() == CUSTOMERS
+
+    @pytest.mark.asyncio
+    async def test_csv_export_streams_pages(self, seeded_session, db_engine, count_queries):
+        with patch("src.services.payments.payments_customers.CUSTOMERS_EXPORT_PAGE_SIZE", 20), patch(
+            "src.services.payments.payments_customers.engine", new=db_engine
+        ):
+            rows = await export_customers_csv(Mock(spec=Request), 1, Mock(spec=PublicUser), seeded_session)
+            # The request's session is closed before the response body is read
+            seeded_session.close()
+
+            with patch.object(seeded_session, "exec", side_effect=AssertionError("request session used")):
+                with count_queries() as queries:
+                    chunks = list(rows)
+
+        # One query and one chunk per page
+        assert queries.count == 3
+        assert len(chunks) == 3
+
+        exported = list(csv.DictReader(io.StringIO("".join(chunks))))
+        assert len(exported) == CUSTOMERS
+        assert exported[0]["email"] == "user1@org.dev"
+        assert exported[0]["product_name"] == "Plan 2"
+        assert exported[4]["status"] == "cancelled"
+
+    @pytest.mark.asyncio
+    async def test_csv_export_without_customers_is_the_header(self, seeded_session, db_engine):
+        with patch("src.services.payments.payments_customers.engine", new=db_engine):
+            rows = await export_customers_csv(
+                Mock(spec=Request), 1, Mock(spec=PublicUser), seeded_session, [PaymentStatusEnum.REFUNDED]
+            )
+            chunks = list(rows)
+
+        assert len(chunks) == 1
+        assert chunks[0].startswith("payment_user_id,user_id,")
@@ -0,0 +1,117 @@
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import Request
+from src.db.payments.payments_courses import PaymentsCourse
+from src.db.payments.payments_products import PaymentsProduct
+from src.db.payments.payments_users import PaymentStatusEnum, PaymentsUser
+from src.db.resource_authors import (
+    ResourceAuthor,
+    ResourceAuthorshipEnum,
+    ResourceAuthorshipStatusEnum,
+)
+from src.db.users import AnonymousUser, PublicUser
+from src.routers.ee.payments import api_get_owned_courses
+from src.services.payments.payments_courses import link_course_to_product
+from src.services.payments.payments_users import get_owned_courses, update_payment_user_status
+
+BUYER = 1
+COURSES = 30
+
+
+def buyer() -> PublicUser:
+    return Mock(spec=PublicUser, id=BUYER)
+
+
+class TestOwnedCourses:
+    """Test cases for the purchased courses listing"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac(
+            "src.services.payments.payments_users.rbac_check",
+            "src.services.payments.payments_courses.courses_rbac_check",
+        )
+        with patch("src.services.payments.payments_entitlements.get_redis_client", return_value=None), patch(
+            "src.services.payments.payments_customers.get_redis_client", return_value=None
+        ):
+            yield
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.org()
+        seed.user(2, username="author")
+        # Product 1 sells the even courses, product 2 every course from 10,
+        # product 3 is bought by nobody
+        for product_id in (1, 2, 3):
+            db_session.add(PaymentsProduct(id=product_id, org_id=1, payments_config_id=1, provider_product_id=""))
+        for course_id in range(1, COURSES + 1):
+            seed.course(course_id, name=f"Course {course_id}")
+            db_session.add(
+                ResourceAuthor(
+                    resource_uuid=f"course_{course_id}",
+                    user_id=2,
+                    authorship=ResourceAuthorshipEnum.CREATOR,
+                    authorship_status=ResourceAuthorshipStatusEnum.ACTIVE,
+                )
+            )
+            if course_id % 2 == 0:
+                db_session.add(PaymentsCourse(course_id=course_id, payment_product_id=1, org_id=1))
+            if course_id >= 10:
+                db_session.add(PaymentsCourse(course_id=course_id, payment_product_id=2, org_id=1))
+        db_session.add(PaymentsUser(id=1, user_id=BUYER, org_id=1, payment_product_id=1, status=PaymentStatusEnum.ACTIVE))
+        db_session.add(
+            PaymentsUser(id=2, user_id=BUYER, org_id=1, payment_product_id=2, status=PaymentStatusEnum.COMPLETED)
+        )
+        db_session.commit()
+        return db_session
+
+    def _expected(self) -> list[int]:
+        return [course_id for course_id in range(1, COURSES + 1) if course_id % 2 == 0 or course_id >= 10]
+
+    @pytest.mark.asyncio
+    async def test_single_query_with_authors(self, seeded_session, count_queries):
+        with count_queries() as queries:
+            courses = await get_owned_courses(Mock(spec=Request), buyer(), seeded_session)
+
+        # Courses, then every author at once
+        assert queries.count == 2
+        # Courses sold through both products are listed once
+        assert [course.id for course in courses] == self._expected()
+        assert all(course.authors[0].user.username == "author" for course in courses)
+
+        assert await get_owned_courses(Mock(spec=Request), AnonymousUser(), seeded_session) == []
+
+    @pytest.mark.asyncio
+    async def test_keyset_pagination(self, seeded_session):
+        pages = []
+        after = None
+        while page := await get_owned_courses(Mock(spec=Request), buyer(), seeded_session, after=after, limit=10):
+            pages.append([course.id for course in page])
+            after = page[-1].id
+
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert sum(pages, []) == self._expected()
+
+    @pytest.mark.asyncio
+    async def test_cached_per_user_and_purged(self, seeded_session, fake_redis, count_queries):
+        """Test that purchases are served from the cache until the user's access changes"""
+
+        async def owned() -> list[int]:
+            courses = await api_get_owned_courses(Mock(spec=Request), 1, None, None, buyer(), seeded_session)
+            return [course["id"] for course in courses]
+
+        with patch("src.core.response_cache.get_redis_client", return_value=fake_redis):
+            assert await owned() == self._expected()
+            with count_queries() as queries:
+                assert await owned() == self._expected()
+            assert queries.count == 0
+
+            # Product 2 is refunded
+            await update_payment_user_status(
+                Mock(spec=Request), 1, 2, PaymentStatusEnum.REFUNDED, Mock(spec=PublicUser), seeded_session
+            )
+            assert await owned() == [course_id for course_id in range(2, COURSES + 1, 2)]
+
+            # A course is added to product 1
+            await link_course_to_product(Mock(spec=Request), 1, 1, 1, Mock(spec=PublicUser), seeded_session)
+            assert (await owned())[0] == 1
@@ -0,0 +1,254 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import threading
+import time
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi import HTTPException, Request
+from sqlmodel import select
+from src.db.payments.payments import PaymentsConfig
+from src.db.payments.payments_users import PaymentStatusEnum, PaymentsUser
+from src.db.payments.payments_webhooks import (
+    PaymentsWebhookEvent,
+    PaymentsWebhookEventStatusEnum,
+)
+from src.services.payments.webhooks import payments_webhooks
+from src.services.payments.webhooks.payments_webhooks import (
+    WEBHOOK_INBOX_MAX_ATTEMPTS,
+    drain_webhook_inbox,
+    handle_stripe_webhook,
+    process_webhook_inbox,
+    run_webhook_inbox_worker,
+    wake_webhook_inbox_worker,
+)
+
+WEBHOOK_SECRET = "whsec_test"
+
+
+def stripe_event(event_id: str, payment_user_id: int = 1, account: str = "acct_1") -> dict:
+    return {
+        "id": event_id,
+        "object": "event",
+        "account": account,
+        "type": "checkout.session.completed",
+        "data": {
+            "object": {
+                "object": "checkout.session",
+                "mode": "payment",
+                "payment_status": "paid",
+                "metadata": {"payment_user_id": str(payment_user_id)},
+            }
+        },
+    }
+
+
+def signed_request(event: dict, secret: str = WEBHOOK_SECRET) -> Request:
+    """A webhook request signed the way Stripe signs them"""
+    payload = json.dumps(event).encode()
+    timestamp = int(time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256).hexdigest()
+
+    request = Mock(spec=Request)
+    request.body = AsyncMock(return_value=payload)
+    request.headers = {"stripe-signature": f"t={timestamp},v1={signature}"}
+    return request
+
+
+class TestStripeWebhookInbox:
+    """Test cases for the idempotent, asynchronous Stripe webhook inbox"""
+
+    @pytest.fixture(autouse=True)
+    def stripe_credentials(self):
+        credentials = {"stripe_secret_key": "sk_test", "stripe_webhook_standard_secret": WEBHOOK_SECRET}
+        with patch(
+            "src.services.payments.webhooks.payments_webhooks.get_stripe_internal_credentials",
+            new=AsyncMock(return_value=credentials),
+        ), patch("src.services.payments.payments_entitlements.get_redis_client", return_value=None):
+            yield
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.org()
+        db_session.add(PaymentsConfig(id=1, org_id=1, provider_specific_id="acct_1"))
+        for payment_user_id in (1, 2):
+            db_session.add(PaymentsUser(id=payment_user_id, user_id=payment_user_id, org_id=1, payment_product_id=1))
+        db_session.commit()
+        return db_session
+
+    async def _receive(self, db_session, event: dict) -> dict:
+        return await handle_stripe_webhook(signed_request(event), "standard", db_session)
+
+    def _inbox(self, db_session) -> list[PaymentsWebhookEvent]:
+        db_session.expire_all()
+        return list(db_session.exec(select(PaymentsWebhookEvent).order_by(PaymentsWebhookEvent.id)).all())  # type: ignore
+
+    def _status(self, db_session, payment_user_id: int) -> PaymentStatusEnum:
+        db_session.expire_all()
+        return db_session.get(PaymentsUser, payment_user_id).status
+
+    @pytest.mark.asyncio
+    async def test_event_is_queued_then_processed(self, seeded_session):
+        with patch.object(payments_webhooks, "process_stripe_event") as process:
+            assert await self._receive(seeded_session, stripe_event("evt_1")) == {"status": "queued"}
+        # Nothing is processed while answering Stripe
+        process.assert_not_called()
+        assert self._status(seeded_session, 1) == PaymentStatusEnum.PENDING
+
+        assert await process_webhook_inbox(Mock(spec=Request), seeded_session) == 1
+
+        assert self._status(seeded_session, 1) == PaymentStatusEnum.COMPLETED
+        [event] = self._inbox(seeded_session)
+        assert event.status == PaymentsWebhookEventStatusEnum.PROCESSED
+        assert event.event_type == "checkout.session.completed"
+        assert event.account_id == "acct_1"
+
+    @pytest.mark.asyncio
+    async def test_retried_deliveries_are_stored_once(self, seeded_session):
+        assert await self._receive(seeded_session, stripe_event("evt_1")) == {"status": "queued"}
+        assert await self._receive(seeded_session, stripe_event("evt_1")) == {"status": "duplicate"}
+        await process_webhook_inbox(Mock(spec=Request), seeded_session)
+        assert await self._receive(seeded_session, stripe_event("evt_1")) == {"status": "duplicate"}
+
+        assert len(self._inbox(seeded_session)) == 1
+        assert await process_webhook_inbox(Mock(spec=Request), seeded_session) == 0
+
+    @pytest.mark.asyncio
+    async def test_invalid_signature_is_rejected(self, seeded_session):
+        with pytest.raises(HTTPException) as e:
+            await handle_stripe_webhook(
+                signed_request(stripe_event("evt_1"), secret="whsec_other"), "standard", seeded_session
+            )
+
+        assert e.value.status_code == 400
+        assert self._inbox(seeded_session) == []
+
+    @pytest.mark.asyncio
+    async def test_failed_event_holds_back_its_account(self, seeded_session):
+        """Test that an account's events wait for its failed event, other accounts don't"""
+        await self._receive(seeded_session, stripe_event("evt_1", payment_user_id=1))
+        await self._receive(seeded_session, stripe_event("evt_2", payment_user_id=2))
+        # The first event of an unknown account
+        await self._receive(seeded_session, stripe_event("evt_3", account="acct_unknown"))
+        await self._receive(seeded_session, stripe_event("evt_4", account="acct_unknown"))
+
+        original = payments_webhooks.process_stripe_event
+        calls = []
+
+        async def fail_first(request, payload, db_session):
+            calls.append(payload["id"])
+            if payload["id"] == "evt_1":
+                raise HTTPException(status_code=503, detail="Database unavailable")
+            return await original(request, payload, db_session)
+
+        with patch.object(payments_webhooks, "process_stripe_event", side_effect=fail_first):
+            await process_webhook_inbox(Mock(spec=Request), seeded_session)
+
+        assert calls == ["evt_1", "evt_3"]
+        statuses = {event.event_id: (event.status, event.attempts) for event in self._inbox(seeded_session)}
+        assert statuses == {
+            "evt_1": (PaymentsWebhookEventStatusEnum.PENDING, 1),
+            "evt_2": (PaymentsWebhookEventStatusEnum.PENDING, 0),
+            "evt_3": (PaymentsWebhookEventStatusEnum.PENDING, 1),
+            "evt_4": (PaymentsWebhookEventStatusEnum.PENDING, 0),
+        }
+        assert self._inbox(seeded_session)[0].last_error == "Database unavailable"
+
+        # Nothing is due until the retry delay passed
+        assert await process_webhook_inbox(Mock(spec=Request), seeded_session) == 0
+
+        with patch.object(payments_webhooks, "WEBHOOK_INBOX_RETRY_DELAY", 0):
+            for event in self._inbox(seeded_session):
+                event.next_attempt_date = event.creation_date
+                seeded_session.add(event)
+            seeded_session.commit()
+            while await process_webhook_inbox(Mock(spec=Request), seeded_session):
+                pass
+
+        # Once it succeeds, the account's later events follow
+        assert self._status(seeded_session, 1) == PaymentStatusEnum.COMPLETED
+        assert self._status(seeded_session, 2) == PaymentStatusEnum.COMPLETED
+
+        statuses = {event.event_id: (event.status, event.attempts) for event in self._inbox(seeded_session)}
+        assert statuses["evt_1"] == (PaymentsWebhookEventStatusEnum.PROCESSED, 1)
+        assert statuses["evt_2"] == (PaymentsWebhookEventStatusEnum.PROCESSED, 0)
+        # Events of the unknown account are dead-lettered one after the other
+        assert statuses["evt_3"] == (PaymentsWebhookEventStatusEnum.DEAD, WEBHOOK_INBOX_MAX_ATTEMPTS)
+        assert statuses["evt_4"] == (PaymentsWebhookEventStatusEnum.DEAD, WEBHOOK_INBOX_MAX_ATTEMPTS)
+
+    @pytest.mark.asyncio
+    async def test_events_leased_by_another_worker_are_skipped(self, seeded_session):
+        await self._receive(seeded_session, stripe_event("evt_1", payment_user_id=1))
+        await self._receive(seeded_session, stripe_event("evt_2", payment_user_id=2))
+
+        [first, _] = self._inbox(seeded_session)
+        first.status = PaymentsWebhookEventStatusEnum.PROCESSING
+        first.lease_expires_date = first.creation_date.replace(year=first.creation_date.year + 1)
+        seeded_session.add(first)
+        seeded_session.commit()
+
+        assert await process_webhook_inbox(Mock(spec=Request), seeded_session) == 0
+
+        # The lease expires, as when a worker crashed
+        first.lease_expires_date = first.creation_date
+        seeded_session.add(first)
+        seeded_session.commit()
+
+        assert await process_webhook_inbox(Mock(spec=Request), seeded_session) == 2
+        assert self._status(seeded_session, 2) == PaymentStatusEnum.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_blocked_account_does_not_fill_the_batch(self, seeded_session):
+        """Test that events queued behind a failed event leave room for other accounts"""
+        for index in range(1, 6):
+            await self._receive(seeded_session, stripe_event(f"evt_{index}"))
+        await self._receive(seeded_session, stripe_event("evt_other", account="acct_2"))
+
+        [failed, *_] = self._inbox(seeded_session)
+        failed.attempts = 1
+        failed.next_attempt_date = failed.creation_date.replace(year=failed.creation_date.year + 1)
+        seeded_session.add(failed)
+        seeded_session.commit()
+
+        with patch.object(payments_webhooks, "process_stripe_event", new=AsyncMock()) as process:
+            assert await process_webhook_inbox(Mock(spec=Request), seeded_session, limit=3) == 1
+
+        assert [call.args[1]["id"] for call in process.call_args_list] == ["evt_other"]
+        statuses = [event.status for event in self._inbox(seeded_session)]
+        assert statuses == [PaymentsWebhookEventStatusEnum.PENDING] * 5 + [PaymentsWebhookEventStatusEnum.PROCESSED]
+
+    @pytest.mark.asyncio
+    async def test_drain_runs_off_the_event_loop(self, seeded_session, db_engine):
+        threads = []
+
+        async def process(request, payload, db_session):
+            threads.append(threading.get_ident())
+
+        await self._receive(seeded_session, stripe_event("evt_1"))
+        with patch.object(payments_webhooks, "engine", new=db_engine), patch.object(
+            payments_webhooks, "process_stripe_event", new=process
+        ):
+            await drain_webhook_inbox()
+
+        assert threads and threading.get_ident() not in threads
+        [event] = self._inbox(seeded_session)
+        assert event.status == PaymentsWebhookEventStatusEnum.PROCESSED
+
+    @pytest.mark.asyncio
+    async def test_webhooks_wake_the_worker(self):
+        """Test that a webhook has the worker drain now instead of at its next poll"""
+        drain = AsyncMock()
+        with patch.object(payments_webhooks, "drain_webhook_inbox", new=drain), patch.object(
+            payments_webhooks, "_webhook_inbox_wakeup", new=None
+        ):
+            worker = asyncio.create_task(run_webhook_inbox_worker(interval=60))
+            try:
+                await asyncio.sleep(0.01)
+                assert drain.await_count == 1
+
+                await wake_webhook_inbox_worker()
+                await asyncio.sleep(0.01)
+                assert drain.await_count == 2
+            finally:
+                worker.cancel()
@@ -0,0 +1,280 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi import HTTPException, Request, Response
+from src.core import response_cache
+from src.core.response_cache import (
+    cached_response,
+    purge_response_cache,
+    response_cache_key,
+)
+from src.db.courses.courses import CourseUpdate
+from src.db.resource_authors import ResourceAuthor, ResourceAuthorshipEnum, ResourceAuthorshipStatusEnum
+from src.db.users import AnonymousUser, PublicUser, UserUpdate
+from src.routers.courses.courses import api_get_course_by_orgslug, api_get_course_meta
+from src.services.courses.chapters import delete_chapter
+from src.services.courses.courses import update_course
+from src.services.users.users import update_user
+
+CONCURRENT_REQUESTS = 20
+
+
+def meta_key(course_uuid: str) -> str:
+    return response_cache_key(
+        "course_meta", course_uuid=course_uuid, with_unpublished_activities=False, include_content=False
+    )
+
+
+class CountingLoader:
+    def __init__(self, payload, delay: float = 0):
+        self.payload = payload
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.payload
+
+
+class TestResponseCache:
+    """Test cases for the tagged response cache of anonymous reads"""
+
+    @pytest.fixture
+    def redis_client(self, fake_redis):
+        with patch("src.core.response_cache.get_redis_client", return_value=fake_redis):
+            yield fake_redis
+
+    @pytest.mark.asyncio
+    async def test_hits_skip_the_loader(self, redis_client):
+        """Test that a cached response is served without loading it again"""
+        loader = CountingLoader({"name": "Course"})
+        key = response_cache_key("course_meta", course_uuid="course_1")
+
+        for _ in range(5):
+            assert await cached_response(key, loader, tags=lambda _: ["course:course_1"]) == {"name": "Course"}
+
+        assert loader.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_load_once(self, redis_client):
+        """Test that a burst of misses on a cold key shares a single load"""
+        loader = CountingLoader([1, 2, 3], delay=0.05)
+        key = response_cache_key("courses_orgslug", org_slug="org", page=1, limit=10)
+
+        results = await asyncio.gather(
+            *(cached_response(key, loader, tags=lambda _: ["org:1"]) for _ in range(CONCURRENT_REQUESTS))
+        )
+
+        assert loader.calls == 1
+        assert all(result == [1, 2, 3] for result in results)
+
+    @pytest.mark.asyncio
+    async def test_waits_for_other_worker_fill(self, redis_client):
+        """Test that a miss locked by another process waits for its result"""
+        key = response_cache_key("collections", org_id=1, page=1, limit=10)
+        redis_client.set(f"{key}:lock", "1")
+        loader = CountingLoader(["mine"])
+
+        async def other_worker_fill():
+            await asyncio.sleep(0.02)
+            redis_client.set(key, '["theirs"]')
+
+        with patch.object(response_cache, "RESPONSE_CACHE_LOCK_POLL", 0.01):
+            result, _ = await asyncio.gather(
+                cached_response(key, loader, tags=lambda _: []), other_worker_fill()
+            )
+
+        assert result == ["theirs"]
+        assert loader.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_purge_drops_only_tagged_entries(self, redis_client):
+        """Test that purging a tag keeps unrelated entries"""
+        course_1 = CountingLoader({"course": 1})
+        course_2 = CountingLoader({"course": 2})
+
+        async def load_both():
+            await cached_response("response:a", course_1, tags=lambda _: ["course:course_1", "org:1"])
+            await cached_response("response:b", course_2, tags=lambda _: ["course:course_2", "org:1"])
+
+        await load_both()
+        purge_response_cache("course:course_1")
+        await load_both()
+        assert (course_1.calls, course_2.calls) == (2, 1)
+
+        purge_response_cache("org:1")
+        await load_both()
+        assert (course_1.calls, course_2.calls) == (3, 2)
+
+    @pytest.mark.asyncio
+    async def test_purge_during_load_is_not_stored(self, redis_client):
+        """Test that a payload read before a purge of its tags isn't cached"""
+
+        async def load_then_purge():
+            # A write commits and purges while the old payload is in hand
+            purge_response_cache("course:course_1")
+            return {"name": "Old"}
+
+        assert await cached_response("response:a", load_then_purge, tags=lambda _: ["course:course_1"]) == {
+            "name": "Old"
+        }
+        assert "response:a" not in redis_client.store
+
+        # Purges of other tags don't block the fill
+        purge_response_cache("course:course_2")
+        await cached_response("response:a", CountingLoader({"name": "New"}), tags=lambda _: ["course:course_1"])
+        assert "response:a" in redis_client.store
+
+    @pytest.mark.asyncio
+    async def test_purge_racing_the_store_aborts_it(self, redis_client):
+        """Test that a purge between the version check and the write aborts the write"""
+        read_versions = redis_client.mget
+
+        def read_then_purge(keys):
+            versions = read_versions(keys)
+            purge_response_cache("course:course_1")
+            return versions
+
+        with patch.object(redis_client, "mget", side_effect=read_then_purge):
+            await cached_response("response:a", CountingLoader({"name": "Old"}), tags=lambda _: ["course:course_1"])
+
+        assert "response:a" not in redis_client.store
+        assert "response_tag:course:course_1" not in redis_client.store
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, redis_client):
+        """Test that a failed load is raised to every waiter and retried next time"""
+        loader = AsyncMock(side_effect=HTTPException(status_code=403))
+
+        results = await asyncio.gather(
+            *(cached_response("response:private", loader, tags=lambda _: []) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, HTTPException) for result in results)
+        assert "response:private" not in redis_client.store
+        assert "response:private:lock" not in redis_client.store
+
+    @pytest.mark.asyncio
+    async def test_without_redis_every_request_loads(self):
+        with patch("src.core.response_cache.get_redis_client", return_value=None):
+            loader = CountingLoader({"name": "Course"})
+            await cached_response("response:a", loader, tags=lambda _: [])
+            await cached_response("response:a", loader, tags=lambda _: [])
+
+        assert loader.calls == 2
+
+
+class TestCourseResponsePurge:
+    """Test cases for the purges done by course mutations"""
+
+    @pytest.fixture(autouse=True)
+    def skip_rbac(self, bypass_rbac):
+        bypass_rbac(
+            "src.services.courses.courses.courses_rbac_check",
+            "src.services.courses.chapters.courses_rbac_check_for_chapters",
+        )
+
+    @pytest.fixture(autouse=True)
+    def redis_client(self, fake_redis):
+        with patch("src.core.response_cache.get_redis_client", return_value=fake_redis):
+            yield fake_redis
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.org()
+        seed.course(1, name="Course 1")
+        seed.course(2, name="Course 2")
+        seed.chapter(1, name="Intro", chapter_uuid="chapter_1")
+        db_session.commit()
+        return db_session
+
+    async def _warm(self, db_session):
+        for course_uuid in ("course_1", "course_2"):
+            await api_get_course_meta(
+                Mock(spec=Request), Response(), course_uuid, False, db_session=db_session, current_user=AnonymousUser()
+            )
+        await api_get_course_by_orgslug(
+            Mock(spec=Request), 1, 10, "org", db_session=db_session, current_user=AnonymousUser()
+        )
+
+    @pytest.mark.asyncio
+    async def test_anonymous_reads_are_cached(self, seeded_session, count_queries):
+        """Test that repeated anonymous reads don't reach the database"""
+        await self._warm(seeded_session)
+
+        with count_queries() as queries:
+            await self._warm(seeded_session)
+            meta = await api_get_course_meta(
+                Mock(spec=Request), Response(), "course_1", False, db_session=seeded_session, current_user=AnonymousUser()
+            )
+
+        assert queries.count == 0
+        assert [chapter["name"] for chapter in meta["chapters"]] == ["Intro"]
+
+    @pytest.mark.asyncio
+    async def test_chapter_change_purges_its_course(self, seeded_session, redis_client):
+        """Test that a chapter change purges its course meta and nothing else"""
+        await self._warm(seeded_session)
+        keys = set(redis_client.store)
+
+        await delete_chapter(Mock(spec=Request), "1", Mock(spec=PublicUser), seeded_session)
+
+        purged = keys - set(redis_client.store)
+        assert [key for key in purged if not key.startswith("response_tag:")] == [
+            meta_key("course_1")
+        ]
+
+    @pytest.mark.asyncio
+    async def test_course_update_purges_course_and_listing(self, seeded_session, redis_client):
+        await self._warm(seeded_session)
+
+        course_update = CourseUpdate(
+            name="Renamed", description=None, about=None, learnings=None, tags=None, public=None, open_to_contributors=None
+        )
+        await update_course(Mock(spec=Request), course_update, "course_2", Mock(spec=PublicUser), seeded_session)
+
+        assert meta_key("course_1") in redis_client.store
+        assert meta_key("course_2") not in redis_client.store
+        listing = await api_get_course_by_orgslug(
+            Mock(spec=Request), 1, 10, "org", db_session=seeded_session, current_user=AnonymousUser()
+        )
+        assert sorted(course["name"] for course in listing) == ["Course 1", "Renamed"]
+
+    @pytest.mark.asyncio
+    async def test_author_update_purges_their_courses(self, seeded_session, seed, bypass_rbac, redis_client):
+        """Test that renaming an author purges the cached pages showing them"""
+        seed.user(1, username="bruce", email="b@w.dev")
+        seeded_session.add(
+            ResourceAuthor(
+                resource_uuid="course_2",
+                user_id=1,
+                authorship=ResourceAuthorshipEnum.CREATOR,
+                authorship_status=ResourceAuthorshipStatusEnum.ACTIVE,
+            )
+        )
+        seeded_session.commit()
+        await self._warm(seeded_session)
+
+        user_update = UserUpdate(username="batman", first_name="", last_name="", email="b@w.dev")
+        bypass_rbac("src.services.users.users.rbac_check")
+        await update_user(Mock(spec=Request), seeded_session, 1, Mock(spec=PublicUser, id=1), user_update)
+
+        assert meta_key("course_1") in redis_client.store
+        assert meta_key("course_2") not in redis_client.store
+        listing = await api_get_course_by_orgslug(
+            Mock(spec=Request), 1, 10, "org", db_session=seeded_session, current_user=AnonymousUser()
+        )
+        [course] = [course for course in listing if course["course_uuid"] == "course_2"]
+        assert [author["user"]["username"] for author in course["authors"]] == ["batman"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_org_slug_is_not_cached(self, seeded_session, redis_client):
+        """Test that listing a slug no org uses leaves nothing to purge later"""
+        listing = await api_get_course_by_orgslug(
+            Mock(spec=Request), 1, 10, "new-org", db_session=seeded_session, current_user=AnonymousUser()
+        )
+
+        assert listing == []
+        assert not [key for key in redis_client.store if key.startswith("response:")]
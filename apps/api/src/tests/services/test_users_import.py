@@ -0,0 +1,150 @@
+import csv
+import io
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi import BackgroundTasks, HTTPException, Request
+from sqlmodel import select
+from src.db.user_organizations import UserOrganization
+from src.db.users import PublicUser, User
+from src.security.security import security_verify_password
+from src.services.users.bulk_import import (
+    import_users,
+    import_users_from_csv,
+    user_import_report_csv,
+)
+
+HEADER = "email,username,password,first_name,last_name\n"
+
+
+def make_csv(rows: list[str]) -> io.BytesIO:
+    return io.BytesIO((HEADER + "\n".join(rows) + "\n").encode("utf-8"))
+
+
+class TestBulkUserImport:
+    """Test cases for the bulk CSV user import"""
+
+    @pytest.fixture(autouse=True)
+    def patch_usage(self):
+        with patch("src.services.users.bulk_import.get_remaining_feature_usage", return_value=None) as check, \
+             patch("src.services.users.bulk_import.increase_feature_usage") as increase, \
+             patch("src.services.users.bulk_import.invalidate_organization_users_count"):
+            yield check, increase
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        seed.org()
+        seed.user(1, username="taken", email="taken@org.dev")
+        db_session.commit()
+        return db_session
+
+    @pytest.mark.asyncio
+    async def test_import_creates_users_by_batch(self, seeded_session, patch_usage, count_queries):
+        """Test that valid rows are created in a few statements per batch"""
+        rows = [
+            {"email": f"student{i}@org.dev", "username": f"student{i}", "password": "secret", "first_name": "Stu"}
+            for i in range(9)
+        ]
+        background_tasks = BackgroundTasks()
+
+        with patch("src.services.users.bulk_import.USER_IMPORT_BATCH_SIZE", 3), \
+             count_queries() as queries:
+            results = await import_users(seeded_session, 1, rows, background_tasks)
+
+        assert [result.status for result in results] == ["created"] * 9
+        assert [result.row for result in results] == list(range(2, 11))
+        # One existing accounts lookup and one memberships insert per batch.
+        # SQLite can't order a multi-row RETURNING, so users are inserted row
+        # by row there; PostgreSQL batches them into a single statement.
+        lookups = [s for s in queries.statements if s.startswith("SELECT")]
+        memberships_inserts = [s for s in queries.statements if s.startswith("INSERT INTO userorganization")]
+        assert len(lookups) == len(memberships_inserts) == 3
+        assert queries.count <= 3 + 3 + 9
+
+        users = seeded_session.exec(select(User).where(User.username.startswith("student"))).all()  # type: ignore
+        assert len(users) == 9
+        assert all(security_verify_password("secret", user.password) for user in users)
+        assert {user.user_uuid for user in users} == {result.user_uuid for result in results}
+
+        memberships = seeded_session.exec(select(UserOrganization).where(UserOrganization.org_id == 1)).all()
+        assert {m.user_id for m in memberships} == {user.id for user in users}
+        assert all(m.role_id == 4 for m in memberships)
+
+        assert len(background_tasks.tasks) == 9
+        assert sum(call.kwargs["count"] for call in patch_usage[1].call_args_list) == 9
+
+    @pytest.mark.asyncio
+    async def test_rows_past_the_member_limit_are_reported(self, seeded_session, patch_usage):
+        """Test that no batch overshoots the member limit and later rows get an error"""
+        rows = [
+            {"email": f"student{i}@org.dev", "username": f"student{i}", "password": "secret"}
+            for i in range(7)
+        ]
+        remaining = iter([5, 2, 0])
+        patch_usage[0].side_effect = lambda *args: next(remaining)
+
+        with patch("src.services.users.bulk_import.USER_IMPORT_BATCH_SIZE", 3):
+            results = await import_users(seeded_session, 1, rows)
+
+        assert [result.status for result in results] == ["created"] * 5 + ["error"] * 2
+        assert {result.detail for result in results[5:]} == {"Member limit reached"}
+        assert [call.kwargs["count"] for call in patch_usage[1].call_args_list] == [3, 2]
+        users = seeded_session.exec(select(User).where(User.username.startswith("student"))).all()  # type: ignore
+        assert len(users) == 5
+
+    @pytest.mark.asyncio
+    async def test_invalid_rows_are_reported(self, seeded_session):
+        """Test that each bad row gets its own error without stopping the import"""
+        rows = [
+            {"email": "not-an-email", "username": "a", "password": "x"},
+            {"email": "taken@org.dev", "username": "b", "password": "x"},
+            {"email": "c@org.dev", "username": "taken", "password": "x"},
+            {"email": "d@org.dev", "username": "d", "password": ""},
+            {"email": "e@org.dev", "username": "e", "password": "x"},
+            {"email": "e@org.dev", "username": "e2", "password": "x"},
+        ]
+
+        results = await import_users(seeded_session, 1, rows)
+
+        assert [(result.row, result.status) for result in results] == [
+            (2, "error"),
+            (3, "error"),
+            (4, "error"),
+            (5, "error"),
+            (6, "created"),
+            (7, "error"),
+        ]
+        assert results[1].detail == "Email already exists"
+        assert results[2].detail == "Username already exists"
+        assert results[3].detail == "Password is required"
+        assert results[5].detail == "Email is duplicated in the file"
+
+    @pytest.mark.asyncio
+    async def test_import_from_csv_file_and_report(self, seeded_session):
+        """Test that the uploaded CSV is parsed and reported per row"""
+        users_file = make_csv(["new@org.dev,new,secret,New,User", "taken@org.dev,x,secret,,"])
+        current_user = Mock(spec=PublicUser)
+
+        with patch("src.services.users.bulk_import.rbac_check", new_callable=AsyncMock) as rbac:
+            results = await import_users_from_csv(
+                Mock(spec=Request), 1, users_file, None, current_user, seeded_session
+            )
+
+        rbac.assert_awaited_once()
+        report = list(csv.DictReader(io.StringIO("".join(user_import_report_csv(results)))))
+        assert [(row["row"], row["email"], row["status"]) for row in report] == [
+            ("2", "new@org.dev", "created"),
+            ("3", "taken@org.dev", "error"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_import_requires_columns(self, seeded_session, bypass_rbac):
+        """Test that a CSV without the required columns is rejected"""
+        users_file = io.BytesIO(b"email,name\na@org.dev,A\n")
+        bypass_rbac("src.services.users.bulk_import.rbac_check")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await import_users_from_csv(
+                Mock(spec=Request), 1, users_file, None, Mock(spec=PublicUser), seeded_session
+            )
+
+        assert exc_info.value.status_code == 400
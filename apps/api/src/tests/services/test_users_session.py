@@ -0,0 +1,112 @@
+import pytest
+from unittest.mock import Mock, patch
+from fastapi import Request
+from src.db.organizations import Organization
+from src.db.roles import Role
+from src.db.user_organizations import UserOrganization
+from src.db.users import PublicUser, User
+from src.services.users.session_cache import (
+    invalidate_org_sessions,
+    invalidate_user_session,
+)
+from src.services.users.users import get_user_session
+
+
+class TestUserSessionCache:
+    """Test cases for the cached /users/session payload"""
+
+    @pytest.fixture(autouse=True)
+    def redis_client(self, fake_redis):
+        with patch("src.services.users.session_cache.get_redis_client", return_value=fake_redis):
+            yield fake_redis
+
+    @pytest.fixture
+    def seeded_session(self, db_session, seed):
+        """A user who is a member of three orgs"""
+        seed.user(1, username="bruce", email="b@w.dev")
+        db_session.add(Role(id=4, name="User", description="", role_uuid="role_global_user"))
+        for org_id in (1, 2, 3):
+            seed.org(org_id, name=f"Org {org_id}", slug=f"org{org_id}", email="")
+            db_session.add(
+                UserOrganization(user_id=1, org_id=org_id, role_id=4, creation_date="", update_date="")
+            )
+        db_session.commit()
+        return db_session
+
+    @pytest.fixture
+    def current_user(self):
+        user = Mock(spec=PublicUser)
+        user.id = 1
+        user.user_uuid = "user_1"
+        return user
+
+    async def _get(self, db_session, current_user):
+        return await get_user_session(Mock(spec=Request), db_session, current_user)
+
+    @pytest.mark.asyncio
+    async def test_first_call_uses_constant_queries(self, seeded_session, current_user, count_queries):
+        """Test that the payload is built with a fixed number of queries"""
+        with count_queries() as queries:
+            user_session = await self._get(seeded_session, current_user)
+
+        assert queries.count == 3
+        assert [role["org"]["slug"] for role in user_session.payload["roles"]] == ["org1", "org2", "org3"]
+        assert user_session.payload["user"]["username"] == "bruce"
+
+    @pytest.mark.asyncio
+    async def test_repeat_call_skips_database(self, seeded_session, current_user, count_queries):
+        """Test that a cached session is served without any query"""
+        first = await self._get(seeded_session, current_user)
+
+        with count_queries() as queries:
+            second = await self._get(seeded_session, current_user)
+
+        assert queries.count == 0
+        assert second.etag == first.etag
+        assert second.payload == first.payload
+
+    @pytest.mark.asyncio
+    async def test_user_invalidation_rebuilds(self, seeded_session, current_user):
+        """Test that a profile change produces a new payload and ETag"""
+        first = await self._get(seeded_session, current_user)
+
+        user = seeded_session.get(User, 1)
+        user.username = "batman"
+        seeded_session.add(user)
+        seeded_session.commit()
+        invalidate_user_session(1)
+
+        second = await self._get(seeded_session, current_user)
+        assert second.payload["user"]["username"] == "batman"
+        assert second.etag != first.etag
+
+    @pytest.mark.asyncio
+    async def test_org_invalidation_rebuilds(self, seeded_session, current_user):
+        """Test that an org change invalidates its members' sessions"""
+        await self._get(seeded_session, current_user)
+
+        org = seeded_session.get(Organization, 2)
+        org.name = "Renamed"
+        seeded_session.add(org)
+        seeded_session.commit()
+        invalidate_org_sessions(2)
+
+        user_session = await self._get(seeded_session, current_user)
+        assert user_session.payload["roles"][1]["org"]["name"] == "Renamed"
+
+    @pytest.mark.asyncio
+    async def test_unrelated_org_keeps_cache(self, seeded_session, current_user, count_queries):
+        """Test that bumping another org doesn't invalidate the session"""
+        await self._get(seeded_session, current_user)
+        invalidate_org_sessions(42)
+
+        with count_queries() as queries:
+            await self._get(seeded_session, current_user)
+        assert queries.count == 0
+
+    @pytest.mark.asyncio
+    async def test_works_without_redis(self, seeded_session, current_user):
+        """Test that the session is built from the database when Redis is off"""
+        with patch("src.services.users.session_cache.get_redis_client", return_value=None):
+            user_session = await self._get(seeded_session, current_user)
+        assert len(user_session.payload["roles"]) == 3